@@ -54,6 +54,8 @@ app.get('/api/health', (req, res) => {
     },
     cache: {
       size: cacheStats.size,
+      maxEntries: cacheStats.max,
+      ttlMinutes: cacheStats.ttl / 60000,
       maxSize: cacheStats.maxSize,
       calculatedSize: `${(cacheStats.calculatedSize / 1024 / 1024).toFixed(2)} MB`,
       keyCount: cacheStats.keys.length,
@@ -68,10 +70,12 @@ app.use('/api/auth', authRoutes);
 // Auth middleware (用于保护其他 API)
 const authMiddleware = require('./src/middleware/authMiddleware');
 const requireAdmin = require('./src/middleware/requireAdmin');
+const compressJson = require('./src/middleware/compressJson');
+const serverTiming = require('./src/middleware/serverTiming');
 
-// API Routes (受认证保护)
+// API Routes (受认证保护；大 JSON 响应按 Accept-Encoding 压缩；X-Cache / Server-Timing 响应头)
 const apiRoutes = require('./src/routes/apiRoutes');
-app.use('/api/projects', authMiddleware, apiRoutes);
+app.use('/api/projects', authMiddleware, compressJson(), serverTiming(), apiRoutes);
 
 const filterRoutes = require('./src/routes/filterRoutes');
 app.use('/api/filters', filterRoutes);
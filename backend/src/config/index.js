@@ -21,6 +21,9 @@ module.exports = {
       'application/vnd.openxmlformats-officedocument.spreadsheetml.sheet', // .xlsx
       'application/vnd.ms-excel', // .xls
     ],
+    // 分片上传会话（issue_query.py upload）：未完成的文件放在 data 目录下，不经 /uploads 静态目录暴露
+    sessionDir: process.env.UPLOAD_SESSION_DIR || path.join(__dirname, '../../data/upload-sessions'),
+    sessionTtlHours: parseInt(process.env.UPLOAD_SESSION_TTL_HOURS) || 24, // 超过该时间未续传的会话被清理
   },
 
   // CORS configuration
@@ -29,6 +32,30 @@ module.exports = {
     credentials: true,
   },
 
+  // Response compression configuration（/api/projects/* 的 JSON 响应）
+  compression: {
+    enabled: process.env.COMPRESSION_ENABLED !== 'false',
+    threshold: parseInt(process.env.COMPRESSION_THRESHOLD) || 1024, // 小于该字节数不压缩
+    brotli: process.env.COMPRESSION_BROTLI !== 'false',
+    gzipLevel: parseInt(process.env.COMPRESSION_GZIP_LEVEL) || 6,
+    brotliQuality: parseInt(process.env.COMPRESSION_BROTLI_QUALITY) || 4,
+  },
+
+  // 内存缓存（cacheService LRU）配置
+  cache: {
+    maxEntries: parseInt(process.env.CACHE_MAX_ENTRIES) || 100,
+    maxSizeMB: parseInt(process.env.CACHE_MAX_SIZE_MB) || 50,
+    ttlMinutes: parseInt(process.env.CACHE_TTL_MINUTES) || 15,
+    queryTtlMinutes: parseInt(process.env.CACHE_QUERY_TTL_MINUTES) || 60, // 分析类接口结果缓存时间
+  },
+
+  // 缓存预热（prewarmService）：导入新快照后按已保存的筛选条件重放分析接口
+  prewarm: {
+    onUpload: process.env.PREWARM_ON_UPLOAD === 'true', // 导入完成后自动在后台预热
+    concurrency: parseInt(process.env.PREWARM_CONCURRENCY) || 2, // 同时预热的筛选条件数
+    maxFilters: parseInt(process.env.PREWARM_MAX_FILTERS) || 20, // 最多预热的已保存筛选数（每个筛选占 3 个缓存条目）
+  },
+
   // Logging configuration
   logging: {
     level: process.env.LOG_LEVEL || 'info',
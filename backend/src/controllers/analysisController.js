@@ -2,6 +2,8 @@ const analysisModel = require('../models/analysisModel');
 const analysisService = require('../services/analysisService');
 const exportService = require('../services/exportService');
 const cacheService = require('../services/cacheService');
+const batchQueryService = require('../services/batchQueryService');
+const prewarmService = require('../services/prewarmService');
 
 /**
  * Get issues for a project with filters
@@ -61,7 +63,7 @@ async function getAnalysis(req, res, next) {
         console.log(`✅ Analysis calculated for project ${id}`);
         return result;
       },
-      3600 // 缓存1小时
+      cacheService.queryTtl
     );
 
     res.json({
@@ -89,7 +91,7 @@ async function getAnalysisCompact(req, res, next) {
       async () => {
         return await analysisModel.getAnalysisCompact(id, filters, { top, numerator, sortBy });
       },
-      3600
+      cacheService.queryTtl
     );
 
     res.json({
@@ -119,7 +121,7 @@ async function getTestAnalysis(req, res, next) {
         console.log(`📊 Calculating test analysis for project ${id}...`);
         return await analysisModel.getTestAnalysis(id, filters);
       },
-      3600 // 缓存1小时
+      cacheService.queryTtl
     );
 
     res.json({
@@ -162,7 +164,7 @@ async function getCrossAnalysis(req, res, next) {
         console.log(`📊 Calculating cross analysis for project ${id}: ${dimension1} × ${dimension2}`);
         return await analysisModel.getCrossAnalysis(id, dimension1, dimension2, filters);
       },
-      3600 // 缓存1小时
+      cacheService.queryTtl
     );
 
     res.json({
@@ -199,7 +201,7 @@ async function getCrossAnalysisCompact(req, res, next) {
       async () => {
         return await analysisModel.getCrossAnalysisCompact(id, dimension1, dimension2, filters, { top, sortBy });
       },
-      3600
+      cacheService.queryTtl
     );
 
     res.json({
@@ -242,7 +244,7 @@ async function getFilterStatistics(req, res, next) {
         console.log(`📊 Calculating filter statistics for project ${id}...`);
         return await analysisModel.getFilterStatistics(id, filters, includeTrendBool);
       },
-      3600 // 缓存1小时
+      cacheService.queryTtl
     );
     
     // Debug: Log result
@@ -273,7 +275,7 @@ async function getFilterStatisticsCompact(req, res, next) {
       async () => {
         return await analysisModel.getFilterStatisticsCompact(id, filters, { top, numerator, sortBy });
       },
-      3600
+      cacheService.queryTtl
     );
 
     res.json({
@@ -320,7 +322,7 @@ async function getFailureRateMatrix(req, res, next) {
         console.log(`📊 Calculating failure rate matrix for project ${id}...`);
         return await analysisModel.getFailureRateMatrix(id, filters);
       },
-      3600 // 缓存1小时
+      cacheService.queryTtl
     );
 
     res.json({
@@ -335,10 +337,10 @@ async function getFailureRateMatrix(req, res, next) {
 async function getCompactFailureRate(req, res, next) {
   try {
     const { id } = req.params;
-    const { groupBy, numerator, offset, limit, keys, ...filters } = req.query;
+    const { groupBy, numerator, sortBy, offset, limit, keys, ...filters } = req.query;
 
     const cacheKey = cacheService.generateCacheKey(
-      `fr_compact_${String(groupBy || 'none')}_${String(numerator || 'spec')}_${String(offset || 0)}_${String(limit || 200)}`,
+      `fr_compact_${String(groupBy || 'none')}_${String(numerator || 'spec')}_${String(sortBy || 'ppm')}_${String(offset || 0)}_${String(limit || 200)}`,
       id,
       { ...filters, keys: keys || undefined }
     );
@@ -349,13 +351,14 @@ async function getCompactFailureRate(req, res, next) {
         return await analysisModel.getCompactFailureRate(id, {
           groupBy,
           numerator,
+          sortBy,
           offset,
           limit,
           keys,
           filters,
         });
       },
-      3600
+      cacheService.queryTtl
     );
 
     res.json({
@@ -389,7 +392,60 @@ async function getCompactSampleSize(req, res, next) {
           filters,
         });
       },
-      3600
+      cacheService.queryTtl
+    );
+
+    res.json({
+      success: true,
+      data,
+    });
+  } catch (error) {
+    next(error);
+  }
+}
+
+/**
+ * Run several analysis queries against one project in a single request
+ * POST /api/projects/:id/batch
+ * Body: { filters: {...}, queries: [{ id, endpoint, filters: {...} }] }
+ */
+async function runBatch(req, res, next) {
+  try {
+    const { id } = req.params;
+    const { filters, queries } = req.body || {};
+
+    console.log(`📦 Batch query for project ${id}: ${Array.isArray(queries) ? queries.length : 0} queries`);
+    const data = await batchQueryService.runBatch(id, { filters, queries });
+    console.log(
+      `✅ Batch done for project ${id}: ${data.stats.computed} computed, ${data.stats.cacheHits} cached, ` +
+        `${data.stats.datasetLoads} dataset loads, ${data.stats.durationMs}ms`
+    );
+
+    res.json({
+      success: true,
+      data,
+    });
+  } catch (error) {
+    next(error);
+  }
+}
+
+/**
+ * 按已保存的筛选条件预热分析缓存（issue_query.py prewarm 默认调用），body: { concurrency, maxFilters }
+ */
+async function prewarmProject(req, res, next) {
+  try {
+    const { id } = req.params;
+    const { concurrency, maxFilters } = req.body || {};
+    const options = {};
+    if (concurrency) options.concurrency = concurrency;
+    // 与 CLI prewarm --max_filters 对应；不是正整数时用 PREWARM_MAX_FILTERS
+    if (parseInt(maxFilters, 10) > 0) options.maxFilters = parseInt(maxFilters, 10);
+
+    const data = await prewarmService.prewarmProject(id, options);
+    console.log(
+      `🔥 Prewarmed project ${id}: ${data.filters} filter set(s), ${data.computed} entries populated, ` +
+        `${data.cacheHits} cached, ${data.errors} errors, ${data.durationMs}ms`
     );
 
     res.json({
@@ -548,6 +604,8 @@ module.exports = {
   getFailureRateMatrix,
   getCompactFailureRate,
   getCompactSampleSize,
+  runBatch,
+  prewarmProject,
   exportExcel,
   exportMatrix,
   exportCrossAnalysis,
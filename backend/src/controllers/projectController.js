@@ -3,8 +3,8 @@ const path = require('path');
 const fs = require('fs').promises;
 const config = require('../config');
 const projectModel = require('../models/projectModel');
-const { parseExcelFile } = require('../services/excelParser');
-const { parsePhaseFromFileName, deriveProjectKeyFromFileName } = require('../services/projectNaming');
+const projectImportService = require('../services/projectImportService');
+const uploadSessionService = require('../services/uploadSessionService');
 const cacheService = require('../services/cacheService');
 const { forceSaveDatabase } = require('../models/database');
 
@@ -95,6 +95,19 @@ async function getProjectById(req, res, next) {
   }
 }
 
+function createdProjectPayload(project) {
+  return {
+    project_id: project.id,
+    name: project.name,
+    project_key: project.project_key,
+    phase: project.phase,
+    last_issue_date: project.last_issue_date,
+    total_issues: project.total_issues,
+    config_names: project.config_names,
+    validation_report: project.validation_report,
+  };
+}
+
 /**
  * Create new project by uploading Excel file
  */
@@ -119,95 +132,19 @@ async function createProject(req, res, next) {
     }
 
     uploadedFilePath = req.file.path;
-    const fileName = req.file.originalname;
-    const baseProjectName = req.body.name || path.parse(fileName).name;
-    const uploader = req.body.uploader || null;
-    const phase = parsePhaseFromFileName(fileName);
-    const projectKey = deriveProjectKeyFromFileName(fileName) || baseProjectName;
-
-    // 生成北京时间戳（UTC+8）
-    const now = new Date();
-    const beijingTime = new Date(now.getTime() + 8 * 60 * 60 * 1000);
-    const dateStr = beijingTime.toISOString().split('T')[0]; // YYYY-MM-DD
-    const timeStr = beijingTime.toISOString().split('T')[1].slice(0, 8); // HH:mm:ss
-    const versionTimestamp = `${dateStr} ${timeStr}`; // "2025-11-30 14:25:33"
-    
-    // 项目名称不包含时间戳，时间戳单独存储
-    const projectName = baseProjectName;
-
-    console.log(`📄 Processing Excel file: ${fileName}`);
-    console.log(`📝 Project: ${projectName}, Upload time (Beijing): ${versionTimestamp}`);
-
-    // Parse Excel file
-    const { issues, sampleSizes, configNames, validationReport } = await parseExcelFile(uploadedFilePath);
-
-
-    const lastIssueDate = issues
-      .map((i) => i.openDate)
-      .filter(Boolean)
-      .map((d) => {
-        if (typeof d === 'string') return d;
-        if (d instanceof Date) {
-          const year = String(d.getFullYear()).padStart(4, '0');
-          const month = String(d.getMonth() + 1).padStart(2, '0');
-          const day = String(d.getDate()).padStart(2, '0');
-          return `${year}-${month}-${day}`;
-        }
-        return String(d);
-      })
-      .sort()
-      .at(-1);
-    console.log(`✅ Extracted ${configNames.length} config names: ${configNames.join(', ')}`);
-
-    // Create project
-    const projectId = await projectModel.createProject({
-      name: projectName,
-      projectKey,
-      phase,
-      fileName,
-      uploader,
-      configNames,
-      validationReport,
-      totalIssues: issues.length,
-      uploadTime: versionTimestamp,  // 存储北京时间戳
-      lastIssueDate,
+    const project = await projectImportService.importProjectFile(uploadedFilePath, {
+      fileName: req.file.originalname,
+      name: req.body.name,
+      uploader: req.body.uploader,
     });
 
-    console.log(`✅ Created project ID: ${projectId}`);
-
-    // Insert issues and sample sizes
-    await projectModel.insertIssues(projectId, issues);
-    await projectModel.insertSampleSizes(projectId, sampleSizes);
-
-    console.log(`✅ Inserted all data for project ${projectId}`);
-
-    // 强制保存数据库（关键操作）
-    await forceSaveDatabase();
-    console.log(`💾 Database saved for project ${projectId}`);
-
-    // 清除该项目的所有缓存 - 防止用户看到旧数据
-    cacheService.clearProjectCache(projectId);
-    console.log(`🗑️  All cache cleared for project ${projectId} to ensure fresh data`);
-
     // Clean up uploaded file
     await fs.unlink(uploadedFilePath);
     uploadedFilePath = null;
 
-    // Get created project
-    const project = await projectModel.getProjectById(projectId);
-
     res.status(201).json({
       success: true,
-      data: {
-        project_id: projectId,
-        name: project.name,
-        project_key: project.project_key,
-        phase: project.phase,
-        last_issue_date: project.last_issue_date,
-        total_issues: project.total_issues,
-        config_names: project.config_names,
-        validation_report: project.validation_report,
-      },
+      data: createdProjectPayload(project),
     });
   } catch (error) {
     // Clean up uploaded file on error
@@ -223,6 +160,89 @@ async function createProject(req, res, next) {
   }
 }
 
+/**
+ * 创建（或恢复）分片上传会话
+ * body: { fileName, size, sha256 }；同一用户同一文件重复创建返回同一个 uploadId 与已收到的 offset
+ */
+async function createUpload(req, res, next) {
+  try {
+    const { fileName, size, sha256 } = req.body || {};
+    const session = await uploadSessionService.create({ userId: req.user.id, fileName, size, sha256 });
+    res.status(session.offset === 0 ? 201 : 200).json({
+      success: true,
+      data: session,
+    });
+  } catch (error) {
+    next(error);
+  }
+}
+
+/**
+ * 查询上传会话（续传前取 offset）
+ */
+async function getUpload(req, res, next) {
+  try {
+    const session = await uploadSessionService.get(req.params.uploadId, req.user.id);
+    res.json({
+      success: true,
+      data: uploadSessionService.describe(session),
+    });
+  } catch (error) {
+    next(error);
+  }
+}
+
+/**
+ * 追加一个分片：请求体为原始字节（application/octet-stream），Upload-Offset 头为该分片在文件中的起始位置
+ */
+async function appendUpload(req, res, next) {
+  try {
+    const offsetHeader = req.get('Upload-Offset');
+    const offset = /^\d+$/.test(String(offsetHeader)) ? parseInt(offsetHeader, 10) : NaN;
+    const session = await uploadSessionService.append(req.params.uploadId, req.user.id, offset, req);
+    res.set('Upload-Offset', String(session.offset));
+    res.json({
+      success: true,
+      data: session,
+    });
+  } catch (error) {
+    next(error);
+  }
+}
+
+/**
+ * 所有分片到齐：校验 sha256 后导入为新项目，返回与 POST /api/projects 相同的数据
+ */
+async function completeUpload(req, res, next) {
+  try {
+    const { name, uploader } = req.body || {};
+    const project = await uploadSessionService.complete(req.params.uploadId, req.user.id, (filePath, session) =>
+      projectImportService.importProjectFile(filePath, { fileName: session.fileName, name, uploader })
+    );
+    res.status(201).json({
+      success: true,
+      data: createdProjectPayload(project),
+    });
+  } catch (error) {
+    next(error);
+  }
+}
+
+/**
+ * 放弃上传会话
+ */
+async function deleteUpload(req, res, next) {
+  try {
+    await uploadSessionService.remove(req.params.uploadId, req.user.id);
+    res.json({
+      success: true,
+      message: 'Upload session deleted',
+    });
+  } catch (error) {
+    next(error);
+  }
+}
+
 /**
  * Delete project
  */
@@ -274,4 +294,9 @@ module.exports = {
   getProjectById,
   createProject,
   deleteProject,
+  createUpload,
+  getUpload,
+  appendUpload,
+  completeUpload,
+  deleteUpload,
 };
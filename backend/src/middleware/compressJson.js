@@ -0,0 +1,101 @@
+const zlib = require('zlib');
+const config = require('../config');
+
+/**
+ * 解析 Accept-Encoding，返回客户端可接受的编码（br 优先于 gzip），都不可接受时返回 null
+ */
+function negotiateEncoding(acceptEncoding, { brotli = true } = {}) {
+  if (!acceptEncoding) return null;
+
+  const accepted = new Map();
+  String(acceptEncoding)
+    .split(',')
+    .forEach((part) => {
+      const [name, ...params] = part.trim().toLowerCase().split(';');
+      if (!name) return;
+      let q = 1;
+      params.forEach((p) => {
+        const [k, v] = p.trim().split('=');
+        if (k === 'q') q = Number(v);
+      });
+      accepted.set(name, Number.isFinite(q) ? q : 0);
+    });
+
+  const acceptable = (name) => {
+    if (accepted.has(name)) return accepted.get(name) > 0;
+    return accepted.has('*') && accepted.get('*') > 0;
+  };
+
+  if (brotli && acceptable('br')) return 'br';
+  if (acceptable('gzip')) return 'gzip';
+  return null;
+}
+
+function compressBuffer(body, encoding, level) {
+  return new Promise((resolve, reject) => {
+    const done = (err, result) => (err ? reject(err) : resolve(result));
+    if (encoding === 'br') {
+      zlib.brotliCompress(
+        body,
+        {
+          params: {
+            [zlib.constants.BROTLI_PARAM_MODE]: zlib.constants.BROTLI_MODE_TEXT,
+            [zlib.constants.BROTLI_PARAM_QUALITY]: level.brotli,
+            [zlib.constants.BROTLI_PARAM_SIZE_HINT]: body.length,
+          },
+        },
+        done
+      );
+    } else {
+      zlib.gzip(body, { level: level.gzip }, done);
+    }
+  });
+}
+
+/**
+ * JSON 响应压缩中间件
+ * 只包装 res.json：超过阈值且客户端支持时用 br/gzip 压缩（在 libuv 线程池中执行，不阻塞事件循环），
+ * 文件下载等直接 res.send/pipe 的响应不受影响
+ */
+function compressJson(options = {}) {
+  const settings = { ...config.compression, ...options };
+
+  return function compressJsonMiddleware(req, res, next) {
+    if (!settings.enabled) return next();
+
+    const originalJson = res.json.bind(res);
+
+    res.json = function compressedJson(obj) {
+      res.vary('Accept-Encoding');
+
+      const encoding = negotiateEncoding(req.headers['accept-encoding'], { brotli: settings.brotli });
+      if (!encoding || req.method === 'HEAD' || res.get('Content-Encoding')) {
+        return originalJson(obj);
+      }
+
+      const body = Buffer.from(JSON.stringify(obj), 'utf8');
+      if (body.length < settings.threshold) {
+        return originalJson(obj);
+      }
+
+      compressBuffer(body, encoding, { gzip: settings.gzipLevel, brotli: settings.brotliQuality })
+        .then((compressed) => {
+          if (!res.get('Content-Type')) {
+            res.set('Content-Type', 'application/json; charset=utf-8');
+          }
+          res.set('Content-Encoding', encoding);
+          res.send(compressed);
+        })
+        .catch((error) => {
+          console.error('❌ Response compression failed:', error);
+          originalJson(obj);
+        });
+      return res;
+    };
+
+    next();
+  };
+}
+
+module.exports = compressJson;
+module.exports.negotiateEncoding = negotiateEncoding;
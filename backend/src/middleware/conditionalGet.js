@@ -0,0 +1,50 @@
+const crypto = require('crypto');
+const projectModel = require('../models/projectModel');
+const cacheService = require('../services/cacheService');
+
+// 进程启动标识：部署新版本（计算逻辑可能变化）后旧 ETag 全部失效
+const BOOT_ID = `${process.pid}.${Date.now()}`;
+
+/**
+ * 生成快照查询的 ETag
+ * 快照上传后数据不再变化，所以同一快照版本（id + upload_time + updated_at）、同一接口、同一组 filters
+ * （与 cacheService 缓存键相同的标准化）的结果不变，ETag 不需要先算出结果再哈希
+ * @param {Object} project - projects 表记录
+ * @param {string} route - 路由路径（如 /:id/filter-statistics）
+ * @param {Object} query - 查询参数
+ * @returns {string} 弱 ETag
+ */
+function snapshotETag(project, route, query) {
+  const cacheKey = cacheService.generateCacheKey(route, project.id, query);
+  const version = `${project.upload_time || ''}|${project.updated_at || ''}`;
+  const hash = crypto.createHash('sha1').update(`${BOOT_ID}|${cacheKey}|${version}`).digest('base64url');
+  return `W/"${hash.substring(0, 27)}"`;
+}
+
+/**
+ * 条件请求中间件（挂在只读的快照分析路由上）
+ * 设置 ETag；请求带的 If-None-Match 与之相同时直接返回 304，不查缓存也不计算
+ * 供 issue_query.py watch 轮询以及浏览器重新验证使用
+ */
+function conditionalGet() {
+  return async function conditionalGetMiddleware(req, res, next) {
+    if (req.method !== 'GET' && req.method !== 'HEAD') return next();
+    try {
+      const project = await projectModel.getProjectById(req.params.id);
+      // 项目不存在时交给控制器返回 404
+      if (!project) return next();
+
+      res.set('ETag', snapshotETag(project, req.route.path, req.query));
+      res.set('Cache-Control', 'private, no-cache');
+      if (req.fresh) {
+        return res.status(304).end();
+      }
+      next();
+    } catch (error) {
+      next(error);
+    }
+  };
+}
+
+module.exports = conditionalGet;
+module.exports.snapshotETag = snapshotETag;
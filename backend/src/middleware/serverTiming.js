@@ -0,0 +1,51 @@
+const cacheService = require('../services/cacheService');
+
+/**
+ * 汇总本次请求的缓存查找：全部内存命中为 HIT，全部需要计算（含等待并发中的同一请求）为 MISS，其余为 PARTIAL；
+ * 没有走 cacheService 的接口返回 null（不设置 X-Cache）
+ */
+function cacheStatus(stats) {
+  if (!stats.lookups) return null;
+  if (stats.hits === stats.lookups) return 'HIT';
+  if (stats.hits === 0) return 'MISS';
+  return 'PARTIAL';
+}
+
+function formatServerTiming(stats, totalMs) {
+  const parts = [];
+  if (stats.lookups) {
+    parts.push(`cache;desc="${stats.hits}/${stats.lookups} hit"`);
+    parts.push(`fetch;dur=${stats.fetchMs.toFixed(1)}`);
+  }
+  parts.push(`total;dur=${totalMs.toFixed(1)}`);
+  return parts.join(', ');
+}
+
+/**
+ * 响应耗时/缓存状态响应头中间件
+ * 包装 res.json：写出前设置 X-Cache（cacheService 命中情况）与 Server-Timing（fetch=等待数据耗时，total=从进入路由到 res.json 的耗时），
+ * 供客户端（issue_query.py --trace）区分服务端计算、缓存命中与网络传输。
+ * 请求头 X-Cache-Bypass: 1 时本次请求的 getOrFetch 跳过内存缓存读取、重新计算后写回（issue_query.py bench 的 cold 阶段）
+ */
+function serverTiming() {
+  return function serverTimingMiddleware(req, res, next) {
+    const started = process.hrtime.bigint();
+    const stats = { lookups: 0, hits: 0, shared: 0, misses: 0, fetchMs: 0, bypass: req.headers['x-cache-bypass'] === '1' };
+    const originalJson = res.json.bind(res);
+
+    res.json = function timedJson(obj) {
+      if (!res.headersSent) {
+        const status = cacheStatus(stats);
+        if (status) res.set('X-Cache', status);
+        res.set('Server-Timing', formatServerTiming(stats, Number(process.hrtime.bigint() - started) / 1e6));
+      }
+      return originalJson(obj);
+    };
+
+    cacheService.runWithStats(stats, next);
+  };
+}
+
+module.exports = serverTiming;
+module.exports.cacheStatus = cacheStatus;
+module.exports.formatServerTiming = formatServerTiming;
@@ -65,6 +65,22 @@ class AnalysisModel {
     return { issues };
   }
 
+  /**
+   * 一次性读取某组筛选条件下的 issues + sample sizes，供批量查询在多个统计之间共享
+   * 各 get* 方法的可选 dataset 参数即为此结构；不传时照旧各自查库
+   */
+  async loadAnalysisDataset(projectId, filters = {}) {
+    const [issuesResult, sampleSizes] = await Promise.all([
+      this.getIssuesForAnalysis(projectId, { ...filters }, { limit: 999999 }),
+      this.getSampleSizes(projectId),
+    ]);
+    return { issues: issuesResult.issues, sampleSizes };
+  }
+
+  _datasetIssues(dataset, limit) {
+    return dataset.issues.length > limit ? dataset.issues.slice(0, limit) : dataset.issues;
+  }
+
   /**
    * Get sample sizes for a project
    */
@@ -225,12 +241,14 @@ class AnalysisModel {
    * Group by failed_test, calculate total samples from all WFs containing this test
    * 根据筛选条件计算统一的样本总数
    */
-  async getTestAnalysis(projectId, filters = {}) {
+  async getTestAnalysis(projectId, filters = {}, dataset = null) {
     // Get issues and sample sizes
-    const [issuesResult, sampleSizes] = await Promise.all([
-      this.getIssuesForAnalysis(projectId, { ...filters }, { limit: 100000 }),
-      this.getSampleSizes(projectId),
-    ]);
+    const [issuesResult, sampleSizes] = dataset
+      ? [{ issues: this._datasetIssues(dataset, 100000) }, dataset.sampleSizes]
+      : await Promise.all([
+          this.getIssuesForAnalysis(projectId, { ...filters }, { limit: 100000 }),
+          this.getSampleSizes(projectId),
+        ]);
 
     const issues = issuesResult.issues;
 
@@ -285,7 +303,7 @@ class AnalysisModel {
    * Get cross analysis data (dimension1 × dimension2)
    * Supports dimensions: symptom, config, wf, failed_test, failed_location
    */
-  async getCrossAnalysis(projectId, dimension1, dimension2, filters = {}) {
+  async getCrossAnalysis(projectId, dimension1, dimension2, filters = {}, dataset = null) {
     // Validate dimensions
     const validDimensions = ['symptom', 'config', 'wf', 'failed_test', 'failed_location'];
     if (!validDimensions.includes(dimension1) || !validDimensions.includes(dimension2)) {
@@ -297,11 +315,11 @@ class AnalysisModel {
     }
 
     // Get filtered issues
-    const issuesResult = await this.getIssuesForAnalysis(projectId, { ...filters }, { limit: 999999 });
+    const issuesResult = dataset || (await this.getIssuesForAnalysis(projectId, { ...filters }, { limit: 999999 }));
     const issues = issuesResult.issues;
 
     // Get sample sizes
-    const sampleSizes = await this.getSampleSizes(projectId);
+    const sampleSizes = dataset ? dataset.sampleSizes : await this.getSampleSizes(projectId);
     
     // Use analysisService to calculate cross stats
     const wfSampleMap = analysisService.buildWFSampleMap(sampleSizes);
@@ -337,15 +355,15 @@ class AnalysisModel {
     };
   }
 
-  async getCrossAnalysisCompact(projectId, dimension1, dimension2, filters = {}, options = {}) {
+  async getCrossAnalysisCompact(projectId, dimension1, dimension2, filters = {}, options = {}, dataset = null) {
     const topRaw = Number(options.top);
     const top = Number.isFinite(topRaw) ? Math.min(Math.max(0, topRaw), 5000) : 300;
     const sortBy = String(options.sortBy || 'specSN');
 
-    const issuesResult = await this.getIssuesForAnalysis(projectId, { ...filters }, { limit: 999999 });
+    const issuesResult = dataset || (await this.getIssuesForAnalysis(projectId, { ...filters }, { limit: 999999 }));
     const issues = issuesResult.issues;
 
-    const sampleSizes = await this.getSampleSizes(projectId);
+    const sampleSizes = dataset ? dataset.sampleSizes : await this.getSampleSizes(projectId);
     const wfSampleMap = analysisService.buildWFSampleMap(sampleSizes);
     const matrix = analysisService.calculateCrossStats(issues, wfSampleMap, dimension1, dimension2, filters);
 
@@ -435,12 +453,12 @@ class AnalysisModel {
   /**
    * Get filter statistics for筛选结果页面
    */
-  async getFilterStatistics(projectId, filters = {}, includeTrend = false) {
-    const issuesResult = await this.getIssuesForAnalysis(projectId, { ...filters }, { limit: 999999 });
+  async getFilterStatistics(projectId, filters = {}, includeTrend = false, dataset = null) {
+    const issuesResult = dataset || (await this.getIssuesForAnalysis(projectId, { ...filters }, { limit: 999999 }));
     const issues = issuesResult.issues;
 
     // Get sample sizes
-    const sampleSizes = await this.getSampleSizes(projectId);
+    const sampleSizes = dataset ? dataset.sampleSizes : await this.getSampleSizes(projectId);
     
     // Use analysisService to calculate filter stats
     const wfSampleMap = analysisService.buildWFSampleMap(sampleSizes);
@@ -452,18 +470,20 @@ class AnalysisModel {
    * 返回结构：{ wfs: [...], tests: [...], configs: [...], matrix: {...} }
    * matrix 格式：{ "wf-testIndex": { "config": "failureCount/totalSamples" } }
    */
-  async getFailureRateMatrix(projectId, filters = {}) {
+  async getFailureRateMatrix(projectId, filters = {}, dataset = null) {
     const db = getDatabase();
 
     // 获取所有 issues（支持筛选）
-    const issuesResult = await this.getIssuesForAnalysis(projectId, { ...filters }, { limit: 100000 });
+    const issuesResult = dataset
+      ? { issues: this._datasetIssues(dataset, 100000) }
+      : await this.getIssuesForAnalysis(projectId, { ...filters }, { limit: 100000 });
     const issues = issuesResult.issues;
 
     // 获取 sample sizes（包含 tests 信息）
-    const sampleSizes = await this.getSampleSizes(projectId);
+    const sampleSizes = dataset ? dataset.sampleSizes : await this.getSampleSizes(projectId);
 
-    // 按 WF 排序
-    const sortedSampleSizes = sampleSizes.sort((a, b) => {
+    // 按 WF 排序（复制后排序，避免修改共享的 dataset）
+    const sortedSampleSizes = [...sampleSizes].sort((a, b) => {
       const numA = parseInt(a.waterfall) || 0;
       const numB = parseInt(b.waterfall) || 0;
       return numA - numB;
@@ -564,24 +584,29 @@ class AnalysisModel {
           // 优先显示 Spec Failure，其次是 Strife
           const specCount = failureCounts.specSNs.size || 0;
           const strifeCount = failureCounts.strifeSNs.size || 0;
+          // text 只显示一种失败（Spec 优先），数值字段同时给出两种分子，供 CLI 本地汇总重新计算失败率
+          const counts = { specCount, strifeCount, samples: totalSamples };
           
           if (specCount > 0) {
             // 有 Spec Failure：显示为 xxF/xxT
             matrix[matrixKey].configs[config] = {
               text: `${specCount}F/${totalSamples}T`,
               type: 'spec',
+              ...counts,
             };
           } else if (strifeCount > 0) {
             // 仅有 Strife：显示为 xxSF/xxT
             matrix[matrixKey].configs[config] = {
               text: `${strifeCount}SF/${totalSamples}T`,
               type: 'strife',
+              ...counts,
             };
           } else if (totalSamples > 0) {
             // 没有失败，但有样本：0F/xxT
             matrix[matrixKey].configs[config] = {
               text: `0F/${totalSamples}T`,
               type: 'none',
+              ...counts,
             };
           } else {
             // 没有任何数据
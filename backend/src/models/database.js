@@ -262,6 +262,34 @@ function getDatabase() {
   };
 }
 
+/**
+ * 在一个事务内执行 fn(db)，fn 拿到原始 sql.js Database，可自行 prepare/bind/step 复用语句
+ * 成功则 COMMIT 并防抖保存一次；fn 抛错则 ROLLBACK 后继续抛出
+ * 批量写入用它代替 getDatabase().prepare().run()（后者每行都会重新 prepare、查询 last_insert_rowid 并触发保存）
+ * @param {Function} fn - 同步函数
+ * @returns {*} fn 的返回值
+ */
+function runInTransaction(fn) {
+  if (!db) {
+    throw new Error('Database not initialized. Call initDatabase() first.');
+  }
+  db.run('BEGIN TRANSACTION');
+  let result;
+  try {
+    result = fn(db);
+    db.run('COMMIT');
+  } catch (error) {
+    try {
+      db.run('ROLLBACK');
+    } catch (rollbackError) {
+      // 出错时 SQLite 可能已自动回滚
+    }
+    throw error;
+  }
+  debouncedSaveDatabase().catch(err => console.error('Failed to save database:', err));
+  return result;
+}
+
 /**
  * Close database connection
  */
@@ -279,5 +307,6 @@ module.exports = {
   initDatabase,
   getDatabase,
   closeDatabase,
+  runInTransaction,
   forceSaveDatabase, // 导出强制保存函数供关键操作使用
 };
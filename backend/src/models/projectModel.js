@@ -1,4 +1,96 @@
-const { getDatabase } = require('./database');
+const { getDatabase, runInTransaction } = require('./database');
+
+const ISSUE_COLUMNS = [
+  'project_id', 'fa_number', 'open_date', 'wf', 'config', 'symptom', 'failed_test', 'test_id',
+  'priority', 'failure_type', 'root_cause', 'fa_status', 'department', 'owner',
+  'sample_status', 'failed_location', 'function_or_cosmetic', 'multi_component', 'sn', 'unit_number', 'failed_cycle_count', 'raw_data',
+];
+// 多行 INSERT：22 列 × 40 行 = 880 个参数，低于 SQLite 默认的 999 个上限
+const ISSUE_ROWS_PER_STATEMENT = 40;
+// 每个事务写入的行数（流式导入时攒够这么多行提交一次）
+const ISSUE_ROWS_PER_TRANSACTION = 1000;
+
+function insertIssuesSql(rowCount) {
+  const placeholders = `(${ISSUE_COLUMNS.map(() => '?').join(', ')})`;
+  return `INSERT INTO issues (${ISSUE_COLUMNS.join(', ')}) VALUES ${Array(rowCount).fill(placeholders).join(', ')}`;
+}
+
+function issueParams(projectId, issue) {
+  return [
+    projectId,
+    issue.faNumber,
+    issue.openDate,
+    issue.wf,
+    issue.config,
+    issue.symptom,
+    issue.failedTest,
+    issue.testId,
+    issue.priority,
+    issue.failureType,
+    issue.rootCause,
+    issue.faStatus,
+    issue.department,
+    issue.owner,
+    issue.sampleStatus,
+    issue.failedLocation,
+    issue.functionOrCosmetic,
+    issue.multiComponent,
+    issue.sn,
+    issue.unitNumber,
+    issue.failedCycleCount,
+    issue.rawData,
+  ].map((value) => (value === undefined ? null : value));
+}
+
+/**
+ * 批量写入 issues：攒够 ISSUE_ROWS_PER_TRANSACTION 行后在一个事务里用多行 INSERT 写入
+ * 流式导入时解析一行 add 一行，内存里最多只保留一个批次
+ */
+class IssueBatchWriter {
+  constructor(projectId) {
+    this.projectId = projectId;
+    this.pending = [];
+    this.count = 0;
+  }
+
+  add(issue) {
+    this.pending.push(issue);
+    if (this.pending.length >= ISSUE_ROWS_PER_TRANSACTION) {
+      this.flush();
+    }
+  }
+
+  flush() {
+    if (this.pending.length === 0) return;
+    const rows = this.pending;
+    this.pending = [];
+
+    runInTransaction((db) => {
+      let fullStmt = null;
+      try {
+        for (let start = 0; start < rows.length; start += ISSUE_ROWS_PER_STATEMENT) {
+          const chunk = rows.slice(start, start + ISSUE_ROWS_PER_STATEMENT);
+          const params = chunk.flatMap((issue) => issueParams(this.projectId, issue));
+          if (chunk.length === ISSUE_ROWS_PER_STATEMENT) {
+            fullStmt = fullStmt || db.prepare(insertIssuesSql(ISSUE_ROWS_PER_STATEMENT));
+            fullStmt.run(params);
+          } else {
+            const stmt = db.prepare(insertIssuesSql(chunk.length));
+            try {
+              stmt.run(params);
+            } finally {
+              stmt.free();
+            }
+          }
+        }
+      } finally {
+        if (fullStmt) fullStmt.free();
+      }
+    });
+
+    this.count += rows.length;
+  }
+}
 
 /**
  * Project Model - Database operations for projects
@@ -9,11 +101,11 @@ class ProjectModel {
    */
   async createProject(projectData) {
     const db = getDatabase();
-    const { name, projectKey, phase, fileName, uploader, configNames, validationReport, totalIssues, uploadTime, lastIssueDate } = projectData;
+    const { name, projectKey, phase, fileName, uploader, configNames, validationReport, totalIssues, uploadTime, lastIssueDate, status } = projectData;
 
     const stmt = db.prepare(
-      `INSERT INTO projects (name, project_key, phase, file_name, uploader, config_names, validation_report, total_issues, upload_time, last_issue_date)
-       VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)`
+      `INSERT INTO projects (name, project_key, phase, file_name, uploader, config_names, validation_report, total_issues, upload_time, last_issue_date, status)
+       VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)`
     );
     
     const result = stmt.run(
@@ -26,12 +118,28 @@ class ProjectModel {
       JSON.stringify(validationReport),
       totalIssues,
       uploadTime,
-      lastIssueDate || null
+      lastIssueDate || null,
+      status || 'active'
     );
 
     return result.lastInsertRowid;
   }
 
+  /**
+   * 流式导入完成后写入汇总信息并把项目状态从 importing 改为 active
+   */
+  async finalizeProject(projectId, { configNames, validationReport, totalIssues, lastIssueDate }) {
+    const db = getDatabase();
+
+    const result = db.prepare(
+      `UPDATE projects
+       SET config_names = ?, validation_report = ?, total_issues = ?, last_issue_date = ?, status = 'active', updated_at = CURRENT_TIMESTAMP
+       WHERE id = ?`
+    ).run(JSON.stringify(configNames), JSON.stringify(validationReport), totalIssues, lastIssueDate || null, projectId);
+
+    return result.changes > 0;
+  }
+
   /**
    * Get all projects with pagination
    */
@@ -138,60 +246,62 @@ class ProjectModel {
    * Insert issues for a project
    */
   async insertIssues(projectId, issues) {
-    const db = getDatabase();
-
-    const stmt = db.prepare(
-      `INSERT INTO issues (
-        project_id, fa_number, open_date, wf, config, symptom, failed_test, test_id,
-        priority, failure_type, root_cause, fa_status, department, owner,
-        sample_status, failed_location, function_or_cosmetic, multi_component, sn, unit_number, failed_cycle_count, raw_data
-      ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)`
-    );
-
-    // sql.js doesn't support transactions, so we insert directly
+    const writer = this.createIssueWriter(projectId);
     for (const issue of issues) {
-      stmt.run(
-        projectId,
-        issue.faNumber,
-        issue.openDate,
-        issue.wf,
-        issue.config,
-        issue.symptom,
-        issue.failedTest,
-        issue.testId,
-        issue.priority,
-        issue.failureType,
-        issue.rootCause,
-        issue.faStatus,
-        issue.department,
-        issue.owner,
-        issue.sampleStatus,
-        issue.failedLocation,
-        issue.functionOrCosmetic,
-        issue.multiComponent,
-        issue.sn,
-        issue.unitNumber,
-        issue.failedCycleCount,
-        issue.rawData
-      );
+      writer.add(issue);
     }
+    writer.flush();
+  }
+
+  /**
+   * 创建批量写入器（流式导入逐条 add，结束时 flush）
+   */
+  createIssueWriter(projectId) {
+    return new IssueBatchWriter(projectId);
+  }
+
+  /**
+   * 按 (wf, failed_test) 回填 test_id（流式导入时 WF Sample Size 可能排在 System TF 之后）
+   * @param {Array} matches - [{ wf, failedTest, testId }]
+   */
+  async assignTestIds(projectId, matches) {
+    if (matches.length === 0) return;
+
+    runInTransaction((db) => {
+      const stmt = db.prepare(`UPDATE issues SET test_id = ? WHERE project_id = ? AND wf = ? AND failed_test = ?`);
+      try {
+        for (const { wf, failedTest, testId } of matches) {
+          stmt.run([testId, projectId, wf, failedTest]);
+        }
+      } finally {
+        stmt.free();
+      }
+    });
   }
 
   /**
    * Insert sample sizes for a project
    */
   async insertSampleSizes(projectId, sampleSizes) {
-    const db = getDatabase();
+    if (sampleSizes.length === 0) return;
 
-    const stmt = db.prepare(
-      `INSERT INTO sample_sizes (project_id, waterfall, test_name, tests, config_samples)
-       VALUES (?, ?, ?, ?, ?)`
-    );
-
-    // sql.js doesn't support transactions, so we insert directly
-    for (const sample of sampleSizes) {
-      stmt.run(projectId, sample.waterfall, sample.testName, sample.tests, sample.configSamples);
-    }
+    runInTransaction((db) => {
+      const stmt = db.prepare(
+        `INSERT INTO sample_sizes (project_id, waterfall, test_name, tests, config_samples)
+         VALUES (?, ?, ?, ?, ?)`
+      );
+      try {
+        for (const sample of sampleSizes) {
+          stmt.run(
+            [projectId, sample.waterfall, sample.testName, sample.tests, sample.configSamples].map((value) =>
+              value === undefined ? null : value
+            )
+          );
+        }
+      } finally {
+        stmt.free();
+      }
+    });
   }
 }
 
@@ -5,6 +5,10 @@ const router = express.Router();
 const projectController = require('../controllers/projectController');
 const analysisController = require('../controllers/analysisController');
 const requirePowerUser = require('../middleware/requirePowerUser');
+const conditionalGet = require('../middleware/conditionalGet');
+
+// 快照数据上传后不变：分析类 GET 带 ETag，未变化时返回 304
+const snapshotETag = conditionalGet();
 
 // Project routes
 router.get('/', projectController.getProjects);
@@ -30,23 +34,32 @@ router.post('/',
   },
   projectController.createProject
 );
+// 分片上传（issue_query.py upload，断点续传）
+router.post('/uploads', requirePowerUser, projectController.createUpload);
+router.get('/uploads/:uploadId', requirePowerUser, projectController.getUpload);
+router.put('/uploads/:uploadId', requirePowerUser, projectController.appendUpload);
+router.post('/uploads/:uploadId/complete', requirePowerUser, projectController.completeUpload);
+router.delete('/uploads/:uploadId', requirePowerUser, projectController.deleteUpload);
+
 router.get('/:id', projectController.getProjectById);
 router.delete('/:id', projectController.deleteProject);
 
 // Analysis routes for specific project
-router.get('/:id/issues', analysisController.getIssues);
-router.get('/:id/filter-options', analysisController.getFilterOptions);
-router.get('/:id/analysis', analysisController.getAnalysis);
-router.get('/:id/analysis-compact', analysisController.getAnalysisCompact);
-router.get('/:id/analysis/test', analysisController.getTestAnalysis);
-router.get('/:id/analysis/cross', analysisController.getCrossAnalysis);
-router.get('/:id/analysis/cross-compact', analysisController.getCrossAnalysisCompact);
-router.get('/:id/filter-statistics', analysisController.getFilterStatistics);
-router.get('/:id/filter-statistics-compact', analysisController.getFilterStatisticsCompact);
-router.get('/:id/sample-sizes', analysisController.getSampleSizes);
-router.get('/:id/failure-rate-matrix', analysisController.getFailureRateMatrix);
-router.get('/:id/fr-compact', analysisController.getCompactFailureRate);
-router.get('/:id/sample-size-compact', analysisController.getCompactSampleSize);
+router.get('/:id/issues', snapshotETag, analysisController.getIssues);
+router.get('/:id/filter-options', snapshotETag, analysisController.getFilterOptions);
+router.get('/:id/analysis', snapshotETag, analysisController.getAnalysis);
+router.get('/:id/analysis-compact', snapshotETag, analysisController.getAnalysisCompact);
+router.get('/:id/analysis/test', snapshotETag, analysisController.getTestAnalysis);
+router.get('/:id/analysis/cross', snapshotETag, analysisController.getCrossAnalysis);
+router.get('/:id/analysis/cross-compact', snapshotETag, analysisController.getCrossAnalysisCompact);
+router.get('/:id/filter-statistics', snapshotETag, analysisController.getFilterStatistics);
+router.get('/:id/filter-statistics-compact', snapshotETag, analysisController.getFilterStatisticsCompact);
+router.get('/:id/sample-sizes', snapshotETag, analysisController.getSampleSizes);
+router.get('/:id/failure-rate-matrix', snapshotETag, analysisController.getFailureRateMatrix);
+router.get('/:id/fr-compact', snapshotETag, analysisController.getCompactFailureRate);
+router.get('/:id/sample-size-compact', snapshotETag, analysisController.getCompactSampleSize);
+router.post('/:id/batch', analysisController.runBatch);
+router.post('/:id/prewarm', requirePowerUser, analysisController.prewarmProject);
 
 // Export routes
 router.get('/:id/export/excel', analysisController.exportExcel);
@@ -11,14 +11,16 @@ class AnalysisService {
    * Calculate comprehensive analysis for a project
    * 根据筛选条件计算样本总数
    */
-  async calculateProjectAnalysis(projectId, filters = {}) {
+  async calculateProjectAnalysis(projectId, filters = {}, dataset = null) {
     // 延迟加载 analysisModel 以避免循环依赖
     const analysisModel = require('../models/analysisModel');
     
-    const [issues, sampleSizes] = await Promise.all([
-      analysisModel.getIssuesForAnalysis(projectId, { ...filters }, { limit: 999999 }),
-      analysisModel.getSampleSizes(projectId),
-    ]);
+    const [issues, sampleSizes] = dataset
+      ? [{ issues: dataset.issues }, dataset.sampleSizes]
+      : await Promise.all([
+          analysisModel.getIssuesForAnalysis(projectId, { ...filters }, { limit: 999999 }),
+          analysisModel.getSampleSizes(projectId),
+        ]);
 
     const allIssues = issues.issues;
 
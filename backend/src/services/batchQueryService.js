@@ -0,0 +1,233 @@
+const analysisModel = require('../models/analysisModel');
+const analysisService = require('./analysisService');
+const cacheService = require('./cacheService');
+
+const MAX_BATCH_QUERIES = 100;
+
+// CLI / 前端常用的别名 -> 规范 endpoint（与 apiRoutes 中 /:id/ 之后的路径一致）
+const ENDPOINT_ALIASES = {
+  'analysis-test': 'analysis/test',
+  cross: 'analysis/cross',
+  'cross-compact': 'analysis/cross-compact',
+  'filter-stats': 'filter-statistics',
+  'filter-stats-compact': 'filter-statistics-compact',
+  'failure-matrix': 'failure-rate-matrix',
+};
+
+function badRequest(message, code = 'INVALID_BATCH') {
+  const error = new Error(message);
+  error.statusCode = 400;
+  error.code = code;
+  return error;
+}
+
+/**
+ * 把 JSON body 里的值转换成与 query string 相同的语义（字符串 / 字符串数组）
+ */
+function toQueryParams(obj) {
+  const params = {};
+  Object.entries(obj || {}).forEach(([key, value]) => {
+    if (value === null || value === undefined) return;
+    if (Array.isArray(value)) {
+      params[key] = value.map((v) => String(v));
+    } else if (typeof value === 'object') {
+      throw badRequest(`Invalid value for "${key}": expected string, number, boolean or array`);
+    } else {
+      params[key] = String(value);
+    }
+  });
+  return params;
+}
+
+function requireDimensions(dimension1, dimension2) {
+  if (!dimension1 || !dimension2) {
+    throw badRequest('Missing required parameters: dimension1 and dimension2', 'MISSING_PARAMETERS');
+  }
+}
+
+/**
+ * 每个 endpoint 的执行计划：缓存键与对应单接口完全一致，因此批量与单次请求共享 cacheService
+ * - filters: 用于共享 dataset 的筛选条件（已剥离 endpoint 专属参数）
+ * - usesDataset: 是否基于 loadAnalysisDataset 的 issues + sample sizes 计算
+ * - wrap: 与单接口 data 字段保持相同的外层结构
+ */
+const ENDPOINTS = {
+  analysis: (id, params) => ({
+    cacheKey: cacheService.generateCacheKey('analysis', id, params),
+    filters: params,
+    usesDataset: true,
+    run: (dataset) => analysisService.calculateProjectAnalysis(id, params, dataset),
+  }),
+  'analysis-compact': (id, { top, numerator, sortBy, ...filters }) => ({
+    cacheKey: cacheService.generateCacheKey(
+      `analysis_compact_${String(top || 20)}_${String(numerator || 'spec')}_${String(sortBy || 'ppm')}`,
+      id,
+      filters
+    ),
+    filters,
+    run: () => analysisModel.getAnalysisCompact(id, filters, { top, numerator, sortBy }),
+  }),
+  'analysis/test': (id, params) => ({
+    cacheKey: cacheService.generateCacheKey('test_analysis', id, params),
+    filters: params,
+    usesDataset: true,
+    run: (dataset) => analysisModel.getTestAnalysis(id, params, dataset),
+    wrap: (testStats) => ({ testStats }),
+  }),
+  'analysis/cross': (id, { dimension1, dimension2, ...filters }) => {
+    requireDimensions(dimension1, dimension2);
+    return {
+      cacheKey: cacheService.generateCacheKey(`cross_${dimension1}_${dimension2}`, id, filters),
+      filters,
+      usesDataset: true,
+      run: (dataset) => analysisModel.getCrossAnalysis(id, dimension1, dimension2, filters, dataset),
+      wrap: (crossAnalysis) => ({ crossAnalysis }),
+    };
+  },
+  'analysis/cross-compact': (id, { dimension1, dimension2, top, sortBy, ...filters }) => {
+    requireDimensions(dimension1, dimension2);
+    return {
+      cacheKey: cacheService.generateCacheKey(
+        `cross_compact_${dimension1}_${dimension2}_${String(top || 300)}_${String(sortBy || 'specSN')}`,
+        id,
+        filters
+      ),
+      filters,
+      usesDataset: true,
+      run: (dataset) =>
+        analysisModel.getCrossAnalysisCompact(id, dimension1, dimension2, filters, { top, sortBy }, dataset),
+      wrap: (crossAnalysis) => ({ crossAnalysis }),
+    };
+  },
+  'filter-statistics': (id, { includeTrend, ...filters }) => {
+    const includeTrendBool = includeTrend === 'true' || includeTrend === '1';
+    return {
+      cacheKey: cacheService.generateCacheKey(`filter_stats_${includeTrendBool}`, id, filters),
+      filters,
+      usesDataset: true,
+      run: (dataset) => analysisModel.getFilterStatistics(id, filters, includeTrendBool, dataset),
+    };
+  },
+  'filter-statistics-compact': (id, { top, numerator, sortBy, ...filters }) => ({
+    cacheKey: cacheService.generateCacheKey(
+      `filter_stats_compact_${String(top || 20)}_${String(numerator || 'spec')}_${String(sortBy || 'ppm')}`,
+      id,
+      filters
+    ),
+    filters,
+    run: () => analysisModel.getFilterStatisticsCompact(id, filters, { top, numerator, sortBy }),
+  }),
+  'failure-rate-matrix': (id, params) => ({
+    cacheKey: cacheService.generateCacheKey('failure_matrix', id, params),
+    filters: params,
+    usesDataset: true,
+    run: (dataset) => analysisModel.getFailureRateMatrix(id, params, dataset),
+  }),
+  'fr-compact': (id, { groupBy, numerator, sortBy, offset, limit, keys, ...filters }) => ({
+    cacheKey: cacheService.generateCacheKey(
+      `fr_compact_${String(groupBy || 'none')}_${String(numerator || 'spec')}_${String(sortBy || 'ppm')}_${String(offset || 0)}_${String(limit || 200)}`,
+      id,
+      { ...filters, keys: keys || undefined }
+    ),
+    filters,
+    run: () => analysisModel.getCompactFailureRate(id, { groupBy, numerator, sortBy, offset, limit, keys, filters }),
+  }),
+  'sample-size-compact': (id, { groupBy, offset, limit, keys, ...filters }) => ({
+    cacheKey: cacheService.generateCacheKey(
+      `sample_compact_${String(groupBy || 'failed_test')}_${String(offset || 0)}_${String(limit || 200)}`,
+      id,
+      { ...filters, keys: keys || undefined }
+    ),
+    filters,
+    run: () => analysisModel.getCompactSampleSize(id, { groupBy, offset, limit, keys, filters }),
+  }),
+  'filter-options': (id, params) => ({
+    filters: params,
+    run: () => analysisModel.getFilterOptions(id, params),
+  }),
+  'sample-sizes': (id) => ({
+    filters: {},
+    run: () => analysisModel.getSampleSizes(id),
+  }),
+};
+
+/**
+ * 批量查询服务
+ * 同一批次内筛选条件相同的子查询只解析一次 WHERE、只读一次 issues + sample sizes，
+ * 结果按单接口相同的缓存键写入 cacheService
+ */
+class BatchQueryService {
+  resolveEndpoint(endpoint) {
+    const name = String(endpoint || '').trim().replace(/^\/+/, '');
+    return ENDPOINT_ALIASES[name] || name;
+  }
+
+  planQuery(projectId, query, sharedFilters = {}) {
+    if (!query || typeof query !== 'object') {
+      throw badRequest('Each query must be an object with an endpoint');
+    }
+    const endpoint = this.resolveEndpoint(query.endpoint);
+    const build = ENDPOINTS[endpoint];
+    if (!build) {
+      throw badRequest(`Unsupported endpoint: ${query.endpoint}`, 'UNSUPPORTED_ENDPOINT');
+    }
+    const params = { ...toQueryParams(sharedFilters), ...toQueryParams(query.filters) };
+    return { endpoint, ...build(projectId, params) };
+  }
+
+  async runBatch(projectId, { filters = {}, queries } = {}) {
+    if (!Array.isArray(queries) || queries.length === 0) {
+      throw badRequest('queries must be a non-empty array');
+    }
+    if (queries.length > MAX_BATCH_QUERIES) {
+      throw badRequest(`Too many queries: ${queries.length} (max ${MAX_BATCH_QUERIES})`);
+    }
+    const ids = queries.map((q, index) => String(q?.id ?? index));
+    if (new Set(ids).size !== ids.length) {
+      throw badRequest('Query ids must be unique');
+    }
+
+    const startedAt = Date.now();
+    const stats = { queries: queries.length, cacheHits: 0, computed: 0, datasetLoads: 0, errors: 0 };
+    const datasets = new Map();
+    const getDataset = (datasetFilters) => {
+      const key = cacheService.generateCacheKey('batch_dataset', projectId, datasetFilters);
+      if (!datasets.has(key)) {
+        stats.datasetLoads += 1;
+        datasets.set(key, analysisModel.loadAnalysisDataset(projectId, datasetFilters));
+      }
+      return datasets.get(key);
+    };
+
+    const results = {};
+    for (let i = 0; i < queries.length; i += 1) {
+      const query = queries[i];
+      const id = ids[i];
+      try {
+        const plan = this.planQuery(projectId, query, filters);
+        const fetchFn = async () => plan.run(plan.usesDataset ? await getDataset(plan.filters) : null);
+        let data;
+        if (plan.cacheKey && cacheService.getFromMemory(plan.cacheKey) !== undefined) {
+          stats.cacheHits += 1;
+          data = cacheService.getFromMemory(plan.cacheKey);
+        } else {
+          data = plan.cacheKey ? await cacheService.getOrFetch(plan.cacheKey, fetchFn, cacheService.queryTtl) : await fetchFn();
+          stats.computed += 1;
+        }
+        results[id] = { success: true, endpoint: plan.endpoint, data: plan.wrap ? plan.wrap(data) : data };
+      } catch (error) {
+        stats.errors += 1;
+        results[id] = {
+          success: false,
+          endpoint: query?.endpoint,
+          error: { code: error.code || 'QUERY_FAILED', message: error.message },
+        };
+      }
+    }
+    datasets.clear();
+
+    return { results, stats: { ...stats, durationMs: Date.now() - startedAt } };
+  }
+}
+
+module.exports = new BatchQueryService();
@@ -1,5 +1,7 @@
 const { LRUCache } = require('lru-cache');
 const crypto = require('crypto');
+const { AsyncLocalStorage } = require('async_hooks');
+const config = require('../config');
 
 /**
  * 缓存服务 - 使用 LRU 缓存策略优化性能
@@ -8,20 +10,50 @@ const crypto = require('crypto');
 class CacheService {
   constructor() {
     this.cacheVersion = 'v3';
-    // 内存缓存 - LRU 策略
+    // 内存缓存 - LRU 策略（默认 100 条 / 50MB / 15 分钟，可通过 config.cache 调整）
     this.memoryCache = new LRUCache({
-      max: 100, // 最多缓存 100 个项目
-      maxSize: 50 * 1024 * 1024, // 最大 50MB
+      max: config.cache.maxEntries,
+      maxSize: config.cache.maxSizeMB * 1024 * 1024,
       sizeCalculation: (value) => {
         return JSON.stringify(value).length;
       },
-      ttl: 1000 * 60 * 15, // 15分钟过期
+      ttl: config.cache.ttlMinutes * 60 * 1000,
       updateAgeOnGet: true, // 访问时更新过期时间
       updateAgeOnHas: false,
     });
 
+    // 分析类接口结果的缓存时间（毫秒，getOrFetch 的 ttl 参数单位）
+    this.queryTtl = config.cache.queryTtlMinutes * 60 * 1000;
+
     // 请求去重 - 防止相同请求并发执行
     this.pendingRequests = new Map();
+
+    // 当前 HTTP 请求的缓存统计（serverTiming 中间件通过 runWithStats 注入）
+    this.requestStats = new AsyncLocalStorage();
+  }
+
+  /**
+   * 在请求上下文中执行 fn：期间每次 getOrFetch 的命中情况都累加到 stats
+   * @param {Object} stats - { lookups, hits, shared, misses, fetchMs }
+   * @param {Function} fn - 要执行的函数（通常是 express 的 next）
+   */
+  runWithStats(stats, fn) {
+    return this.requestStats.run(stats, fn);
+  }
+
+  /**
+   * 记录一次缓存查找
+   * @param {string} source - memory（内存命中）/ shared（复用并发中的同一请求）/ miss（本次计算）
+   * @param {number} ms - 等待数据的耗时（毫秒）
+   */
+  _recordLookup(source, ms) {
+    const stats = this.requestStats.getStore();
+    if (!stats) return;
+    stats.lookups += 1;
+    if (source === 'memory') stats.hits += 1;
+    else if (source === 'shared') stats.shared += 1;
+    else stats.misses += 1;
+    stats.fetchMs += ms;
   }
 
   /**
@@ -135,6 +167,8 @@ class CacheService {
   getStats() {
     return {
       size: this.memoryCache.size,
+      max: this.memoryCache.max,
+      ttl: this.memoryCache.ttl,
       maxSize: this.memoryCache.maxSize,
       calculatedSize: this.memoryCache.calculatedSize,
       keys: [...this.memoryCache.keys()],
@@ -173,15 +207,28 @@ class CacheService {
    * @returns {Promise} 数据
    */
   async getOrFetch(cacheKey, fetchFn, ttl) {
+    // 请求带 X-Cache-Bypass（serverTiming 写入 stats.bypass）：不读缓存、不合并并发请求，计算结果照常写回同一个键
+    if (this.requestStats.getStore()?.bypass) {
+      const started = process.hrtime.bigint();
+      const data = await fetchFn();
+      this._recordLookup('miss', Number(process.hrtime.bigint() - started) / 1e6);
+      this.setToMemory(cacheKey, data, ttl);
+      return data;
+    }
+
     // 1. 尝试从内存缓存获取
     const cached = this.getFromMemory(cacheKey);
     if (cached !== undefined) {
       console.log(`💾 Cache hit (memory): ${cacheKey}`);
+      this._recordLookup('memory', 0);
       return cached;
     }
 
     // 2. 使用请求去重执行数据获取
+    const source = this.pendingRequests.has(cacheKey) ? 'shared' : 'miss';
+    const started = process.hrtime.bigint();
     const data = await this.deduplicate(cacheKey, fetchFn);
+    this._recordLookup(source, Number(process.hrtime.bigint() - started) / 1e6);
 
     // 3. 存入内存缓存
     this.setToMemory(cacheKey, data, ttl);
@@ -1,6 +1,14 @@
+const path = require('path');
 const XLSX = require('xlsx');
+const ExcelJS = require('exceljs');
 const config = require('../config');
 
+const SYSTEM_TF_SHEET_NAMES = ['System TF', 'SystemTF', 'System'];
+const SAMPLE_SIZE_SHEET_NAMES = ['WF Sample Size', 'WF Sample Sizes', 'Sample Size', 'WF'];
+// System TF 表头在前 61 行内自动识别；WF Sample Size 在前 21 行内
+const SYSTEM_TF_HEADER_SCAN_ROWS = 61;
+const SAMPLE_SIZE_HEADER_SCAN_ROWS = 21;
+
 /**
  * Parse Excel file and extract data
  * @param {string} filePath - Path to Excel file
@@ -15,7 +23,7 @@ async function parseExcelFile(filePath) {
     console.log('📊 Available sheets in Excel file:', workbook.SheetNames);
 
     // Parse System TF sheet (find by name: 'System TF')
-    const systemTFSheetName = findSheetByName(workbook.SheetNames, ['System TF', 'SystemTF', 'System']);
+    const systemTFSheetName = findSheetByName(workbook.SheetNames, SYSTEM_TF_SHEET_NAMES);
     if (!systemTFSheetName) {
       throw new Error(`Could not find "System TF" sheet in Excel file. Available sheets: ${workbook.SheetNames.join(', ')}`);
     }
@@ -24,7 +32,7 @@ async function parseExcelFile(filePath) {
     const issues = parseSystemTF(systemTFSheet);
 
     // Parse WF Sample size sheet (find by name: 'WF Sample Size' or similar)
-    const sampleSizeSheetName = findSheetByName(workbook.SheetNames, ['WF Sample Size', 'WF Sample Sizes', 'Sample Size', 'WF']);
+    const sampleSizeSheetName = findSheetByName(workbook.SheetNames, SAMPLE_SIZE_SHEET_NAMES);
     if (!sampleSizeSheetName) {
       throw new Error(`Could not find "WF Sample Size" sheet in Excel file. Available sheets: ${workbook.SheetNames.join(', ')}`);
     }
@@ -38,13 +46,16 @@ async function parseExcelFile(filePath) {
     const issuesWithTestId = matchFailedTests(issues, sampleSizes);
 
     // Generate validation report
-    const validationReport = generateValidationReport(issuesWithTestId, sampleSizes, configNames);
+    const summary = new IssueSummary();
+    issues.forEach((issue) => summary.add(issue));
+    const validationReport = generateValidationReport(summary, sampleSizes, configNames);
 
     return {
       issues: issuesWithTestId,
       sampleSizes,
       configNames,
       validationReport,
+      lastIssueDate: summary.lastIssueDate,
     };
   } catch (error) {
     console.error('Excel parsing error:', error);
@@ -52,6 +63,178 @@ async function parseExcelFile(filePath) {
   }
 }
 
+/**
+ * 是否走流式解析（exceljs 的流式读取只支持 .xlsx；.xls 仍整表读取）
+ */
+function isStreamableExcel(fileName) {
+  return path.extname(fileName || '').toLowerCase() === '.xlsx';
+}
+
+/**
+ * 流式解析 .xlsx：System TF 逐行读取，每解析出一条 issue 就回调 onIssue，
+ * 不像 XLSX.readFile 那样先把整个工作簿展开进内存，峰值内存与文件大小无关
+ * WF Sample Size 只有几十行，读完整张表再解析；两张表在文件里的先后顺序不固定，
+ * 所以 testId 不在解析时匹配，而是返回 testIdMatches 由调用方写库后按 (wf, failedTest) 回填
+ * @param {string} filePath - .xlsx 文件路径
+ * @param {Function} onIssue - 每条 issue 调用一次（可返回 Promise，解析会等待它完成）
+ * @returns {Promise<Object>} sampleSizes, configNames, validationReport, testIdMatches, totalIssues, lastIssueDate
+ */
+async function streamExcelFile(filePath, onIssue) {
+  try {
+    const workbookReader = new ExcelJS.stream.xlsx.WorkbookReader(filePath, {
+      entries: 'emit',
+      sharedStrings: 'cache',
+      hyperlinks: 'ignore',
+      styles: 'ignore', // 与 XLSX.readFile 一致：日期保持 Excel 序列号，由 parseExcelDate 转换
+      worksheets: 'emit',
+    });
+
+    const summary = new IssueSummary();
+    let sheetNames = null;
+    let systemTFSheetName = null;
+    let sampleSizeSheetName = null;
+    let systemTFParsed = false;
+    let sampleSizeRows = null;
+
+    for await (const worksheetReader of workbookReader) {
+      if (sheetNames === null) {
+        // workbook.xml 在 zip 里位于各 sheet 之前，第一张 sheet 到达时已经知道全部名称
+        sheetNames = (workbookReader.model?.sheets || []).map((sheet) => sheet.name);
+        console.log('📊 Available sheets in Excel file:', sheetNames);
+        systemTFSheetName = findSheetByName(sheetNames, SYSTEM_TF_SHEET_NAMES);
+        if (!systemTFSheetName) {
+          throw new Error(`Could not find "System TF" sheet in Excel file. Available sheets: ${sheetNames.join(', ')}`);
+        }
+        console.log('✅ Found System TF sheet:', systemTFSheetName);
+        sampleSizeSheetName = findSheetByName(sheetNames, SAMPLE_SIZE_SHEET_NAMES);
+        if (!sampleSizeSheetName) {
+          throw new Error(`Could not find "WF Sample Size" sheet in Excel file. Available sheets: ${sheetNames.join(', ')}`);
+        }
+        console.log('✅ Found WF Sample Size sheet:', sampleSizeSheetName);
+      }
+
+      const sheetName = resolveWorksheetName(workbookReader, worksheetReader);
+      if (sheetName === systemTFSheetName) {
+        await streamSystemTF(worksheetReader, summary, onIssue);
+        systemTFParsed = true;
+      } else if (sheetName === sampleSizeSheetName) {
+        sampleSizeRows = [];
+        for await (const row of worksheetReader) {
+          sampleSizeRows[row.number - 1] = rowCellValues(row);
+        }
+      } else {
+        await skipWorksheet(worksheetReader);
+      }
+    }
+
+    if (!systemTFParsed || sampleSizeRows === null) {
+      throw new Error(`Could not find "${systemTFParsed ? 'WF Sample Size' : 'System TF'}" sheet in Excel file. Available sheets: ${(sheetNames || []).join(', ')}`);
+    }
+
+    const { sampleSizes, configNames: rawConfigNames } = parseSampleSizeRows(sampleSizeRows);
+    const configNames = rawConfigNames.length === 0 ? Array.from(summary.configs).sort() : rawConfigNames;
+
+    return {
+      sampleSizes,
+      configNames,
+      validationReport: generateValidationReport(summary, sampleSizes, configNames),
+      testIdMatches: summary.testIdMatches(sampleSizes),
+      totalIssues: summary.totalIssues,
+      lastIssueDate: summary.lastIssueDate,
+    };
+  } catch (error) {
+    console.error('Excel parsing error:', error);
+    throw new Error(`Failed to parse Excel file: ${error.message}`);
+  }
+}
+
+/**
+ * System TF 的流式版本：先缓存前 SYSTEM_TF_HEADER_SCAN_ROWS 行识别表头，之后逐行解析
+ */
+async function streamSystemTF(worksheetReader, summary, onIssue) {
+  const headRows = [];
+  let headerRow = null;
+  let columnMapping = null;
+  let firstIssue = null;
+
+  const handleRow = async (values) => {
+    const issue = systemTFRowToIssue(values, columnMapping);
+    if (!issue) return;
+    summary.add(issue);
+    if (!firstIssue) firstIssue = issue;
+    await onIssue(issue);
+  };
+
+  const startRows = async () => {
+    headerRow = detectHeaderRowIndex(headRows);
+    columnMapping = buildSystemTFColumnMapping(Array.from(headRows[headerRow] || []));
+    for (let rowNum = headerRow + 1; rowNum < headRows.length; rowNum++) {
+      if (headRows[rowNum]) await handleRow(headRows[rowNum]);
+    }
+    headRows.length = 0;
+  };
+
+  for await (const row of worksheetReader) {
+    const rowNum = row.number - 1;
+    const values = rowCellValues(row);
+    if (columnMapping === null) {
+      if (rowNum < SYSTEM_TF_HEADER_SCAN_ROWS) {
+        headRows[rowNum] = values;
+        continue;
+      }
+      await startRows();
+    }
+    if (rowNum > headerRow) {
+      await handleRow(values);
+    }
+  }
+  if (columnMapping === null) {
+    await startRows();
+  }
+
+  logParsedIssues(summary.totalIssues, firstIssue);
+}
+
+async function skipWorksheet(worksheetReader) {
+  // 不需要的 sheet 也要读完，zip 里后面的条目才能继续解析
+  // eslint-disable-next-line no-unused-vars
+  for await (const row of worksheetReader) {
+    // ignore
+  }
+}
+
+/**
+ * exceljs 的 sheet 名称：新版本已按 workbook.xml.rels 解析好；否则 name 为 Sheet<N>，
+ * 这里按 rels 把 worksheets/sheet<N>.xml 对应回 workbook.xml 里的名称
+ */
+function resolveWorksheetName(workbookReader, worksheetReader) {
+  const sheets = workbookReader.model?.sheets || [];
+  if (sheets.some((sheet) => sheet.name === worksheetReader.name)) {
+    return worksheetReader.name;
+  }
+  const target = `worksheets/sheet${worksheetReader.id}.xml`;
+  const rel = (workbookReader.workbookRels || []).find((r) => String(r.Target).replace(/^\/?(xl\/)?/, '') === target);
+  const sheet = rel && sheets.find((s) => s.rId === rel.Id);
+  return sheet ? sheet.name : worksheetReader.name;
+}
+
+/**
+ * exceljs 行 -> 0 基列号的单元格值数组（与 XLSX 的 cell.v 对齐：富文本取文本、公式取结果、超链接取显示文本）
+ */
+function rowCellValues(row) {
+  return row.values.slice(1).map(cellValue);
+}
+
+function cellValue(value) {
+  if (value === null || value === undefined) return null;
+  if (typeof value !== 'object' || value instanceof Date) return value;
+  if (Array.isArray(value.richText)) return value.richText.map((part) => part.text).join('');
+  if ('result' in value) return cellValue(value.result);
+  if ('text' in value) return cellValue(value.text);
+  if ('error' in value) return value.error;
+  return value;
+}
+
 /**
  * Parse System TF sheet to extract issues
  * @param {Object} sheet - XLSX sheet object
@@ -62,84 +245,111 @@ function parseSystemTF(sheet) {
   const range = XLSX.utils.decode_range(sheet['!ref']);
 
   const headerRow = detectSystemTFHeaderRow(sheet, range);
-  const columnMapping = {};
-  
-  console.log('📋 System TF Sheet - Building column mapping:');
-  for (let colNum = 0; colNum <= range.e.c; colNum++) {
-    const cellAddress = XLSX.utils.encode_cell({ r: headerRow, c: colNum });
-    const cell = sheet[cellAddress];
-    const headerValue = cell ? String(cell.v).trim() : null;
-    
-    if (headerValue) {
-      const fieldName = getFieldNameByHeader(headerValue);
-      if (fieldName) {
-        columnMapping[colNum] = fieldName;
-        console.log(`  Col ${colNum} "${headerValue}" -> ${fieldName}`);
-      } else {
-        console.log(`  Col ${colNum} "${headerValue}" -> (not mapped)`);
-      }
+  const columnMapping = buildSystemTFColumnMapping(sheetRowValues(sheet, range, headerRow));
+
+  for (let rowNum = headerRow + 1; rowNum <= range.e.r; rowNum++) {
+    const issue = systemTFRowToIssue(sheetRowValues(sheet, range, rowNum), columnMapping);
+    if (issue) {
+      issues.push(issue);
     }
   }
 
-  for (let rowNum = headerRow + 1; rowNum <= range.e.r; rowNum++) {
-    const row = {};
-    let hasData = false;
+  logParsedIssues(issues.length, issues[0]);
+  return issues;
+}
 
-    // 使用动态映射读取数据
-    for (let colNum = 0; colNum <= range.e.c; colNum++) {
-      const cellAddress = XLSX.utils.encode_cell({ r: rowNum, c: colNum });
-      const cell = sheet[cellAddress];
-      const value = cell ? cell.v : null;
+/**
+ * 读取一行的单元格原始值（下标为 0 基列号），整表解析与流式解析共用后续的按行处理逻辑
+ */
+function sheetRowValues(sheet, range, rowNum) {
+  const values = [];
+  for (let colNum = 0; colNum <= range.e.c; colNum++) {
+    const cell = sheet[XLSX.utils.encode_cell({ r: rowNum, c: colNum })];
+    values.push(cell ? cell.v : null);
+  }
+  return values;
+}
 
-      if (value !== null && value !== undefined && value !== '') {
-        hasData = true;
-      }
+/**
+ * 按表头建立 列号 -> 字段名 的映射
+ */
+function buildSystemTFColumnMapping(headerValues) {
+  const columnMapping = {};
 
-      const fieldName = columnMapping[colNum];
-      if (fieldName) {
-        row[fieldName] = value;
-      }
+  console.log('📋 System TF Sheet - Building column mapping:');
+  headerValues.forEach((value, colNum) => {
+    const headerValue = value !== null && value !== undefined ? String(value).trim() : null;
+    if (!headerValue) return;
+    const fieldName = getFieldNameByHeader(headerValue);
+    if (fieldName) {
+      columnMapping[colNum] = fieldName;
+      console.log(`  Col ${colNum} "${headerValue}" -> ${fieldName}`);
+    } else {
+      console.log(`  Col ${colNum} "${headerValue}" -> (not mapped)`);
     }
+  });
 
-    // Only add row if it has data
-    if (hasData && row.faNumber) {
-      issues.push(parseIssueRow(row));
-    }
-  }
+  return columnMapping;
+}
 
-  console.log(`✅ Parsed ${issues.length} issues from System TF`);
-  if (issues.length > 0) {
+/**
+ * 一行数据 -> issue；空行或没有 FA# 的行返回 null
+ */
+function systemTFRowToIssue(values, columnMapping) {
+  const hasData = values.some((value) => value !== null && value !== undefined && value !== '');
+
+  // 使用动态映射读取数据（按列号顺序；没有单元格的映射列为 null）
+  const row = {};
+  Object.entries(columnMapping).forEach(([colNum, fieldName]) => {
+    const value = values[colNum];
+    row[fieldName] = value === undefined ? null : value;
+  });
+
+  // Only add row if it has data
+  return hasData && row.faNumber ? parseIssueRow(row) : null;
+}
+
+function logParsedIssues(count, firstIssue) {
+  console.log(`✅ Parsed ${count} issues from System TF`);
+  if (firstIssue) {
     console.log('Sample issue:', {
-      faNumber: issues[0].faNumber,
-      wf: issues[0].wf,
-      config: issues[0].config,
-      symptom: issues[0].symptom
+      faNumber: firstIssue.faNumber,
+      wf: firstIssue.wf,
+      config: firstIssue.config,
+      symptom: firstIssue.symptom
     });
   }
-
-  return issues;
 }
 
 function detectSystemTFHeaderRow(sheet, range) {
-  const maxRow = Math.min(range.e.r, 60);
+  const rows = [];
+  for (let rowNum = 0; rowNum <= Math.min(range.e.r, SYSTEM_TF_HEADER_SCAN_ROWS - 1); rowNum++) {
+    rows.push(sheetRowValues(sheet, range, rowNum));
+  }
+  return detectHeaderRowIndex(rows);
+}
+
+/**
+ * 在前若干行里找映射字段最多（至少 5 个且包含 FA#）的一行作为表头
+ * @param {Array} rows - 下标为行号（0 基）的行值数组，可以是稀疏数组
+ */
+function detectHeaderRowIndex(rows) {
   let bestRow = config.excel.headerRow - 1;
   let bestScore = -1;
-  for (let rowNum = 0; rowNum <= maxRow; rowNum++) {
+  rows.forEach((values, rowNum) => {
     const mapped = new Set();
-    for (let colNum = 0; colNum <= range.e.c; colNum++) {
-      const cellAddress = XLSX.utils.encode_cell({ r: rowNum, c: colNum });
-      const cell = sheet[cellAddress];
-      const headerValue = cell ? String(cell.v).trim() : null;
-      if (!headerValue) continue;
+    (values || []).forEach((value) => {
+      const headerValue = value !== null && value !== undefined ? String(value).trim() : null;
+      if (!headerValue) return;
       const fieldName = getFieldNameByHeader(headerValue);
       if (fieldName) mapped.add(fieldName);
-    }
+    });
     const score = mapped.size;
     if (score > bestScore && mapped.has('faNumber') && score >= 5) {
       bestScore = score;
       bestRow = rowNum;
     }
-  }
+  });
   console.log(`📍 System TF detected header row: ${bestRow + 1}`);
   return bestRow;
 }
@@ -284,20 +494,29 @@ function findSheetByName(sheetNames, possibleNames) {
  * @returns {Object} Sample sizes and config names
  */
 function parseSampleSizes(sheet) {
-  const sampleSizes = [];
   const range = XLSX.utils.decode_range(sheet['!ref']);
-
-  const headerRow = detectWFSampleSizeHeaderRow(sheet, range);
-  const headerValues = [];
-  for (let colNum = 0; colNum <= range.e.c; colNum++) {
-    const cell = sheet[XLSX.utils.encode_cell({ r: headerRow, c: colNum })];
-    headerValues.push(cell?.v ? String(cell.v).trim() : '');
+  const rows = [];
+  for (let rowNum = 0; rowNum <= range.e.r; rowNum++) {
+    rows.push(sheetRowValues(sheet, range, rowNum));
   }
+  return parseSampleSizeRows(rows);
+}
+
+/**
+ * 按行解析 WF Sample size（整表解析与流式解析共用）
+ * @param {Array} rows - 下标为行号（0 基）的行值数组，可以是稀疏数组
+ * @returns {Object} Sample sizes and config names
+ */
+function parseSampleSizeRows(rows) {
+  const sampleSizes = [];
+
+  const headerRow = detectWFSampleSizeHeaderRow(rows);
+  const headerValues = Array.from(rows[headerRow] || [], (value) => (value ? String(value).trim() : ''));
 
   const testColumnIndexes = [];
   let isSingleTestColumn = false;
 
-  for (let colNum = 1; colNum <= range.e.c; colNum++) {
+  for (let colNum = 1; colNum < headerValues.length; colNum++) {
     const header = headerValues[colNum];
     if (!header) break;
     if (/^test[\s_-]*\d+$/i.test(header)) {
@@ -315,17 +534,16 @@ function parseSampleSizes(sheet) {
   const configStartCol = isSingleTestColumn ? 2 : (testColumnIndexes.length > 0 ? testColumnIndexes[testColumnIndexes.length - 1] + 1 : 1);
   const configNames = headerValues.slice(configStartCol).filter(Boolean);
 
-  for (let rowNum = headerRow + 1; rowNum <= range.e.r; rowNum++) {
-    const wfCell = sheet[XLSX.utils.encode_cell({ r: rowNum, c: 0 })];
-    if (!wfCell?.v) continue;
-    const waterfall = String(wfCell.v).trim();
+  for (let rowNum = headerRow + 1; rowNum < rows.length; rowNum++) {
+    const values = rows[rowNum] || [];
+    if (!values[0]) continue;
+    const waterfall = String(values[0]).trim();
     if (!waterfall) continue;
 
     let tests = [];
     if (isSingleTestColumn) {
       // Parse legacy single column separated by "+"
-      const testNameCell = sheet[XLSX.utils.encode_cell({ r: rowNum, c: 1 })];
-      const testNameStr = testNameCell?.v ? String(testNameCell.v).trim() : '';
+      const testNameStr = values[1] ? String(values[1]).trim() : '';
       if (testNameStr && testNameStr !== '/') {
         tests = testNameStr
           .split('+')
@@ -340,8 +558,7 @@ function parseSampleSizes(sheet) {
       // Parse multi-column format
       tests = testColumnIndexes
         .map((colNum, index) => {
-          const cell = sheet[XLSX.utils.encode_cell({ r: rowNum, c: colNum })];
-          const value = cell?.v ? String(cell.v).trim() : '';
+          const value = values[colNum] ? String(values[colNum]).trim() : '';
           if (!value || value === '/') return null;
           return { testId: `Test${index + 1}`, testName: value, index };
         })
@@ -350,9 +567,7 @@ function parseSampleSizes(sheet) {
 
     const configSamples = {};
     configNames.forEach((configName, idx) => {
-      const colNum = configStartCol + idx;
-      const cell = sheet[XLSX.utils.encode_cell({ r: rowNum, c: colNum })];
-      const value = cell?.v;
+      const value = values[configStartCol + idx];
       if (value === null || value === undefined || value === '' || value === '/') {
         configSamples[configName] = 0;
       } else {
@@ -372,10 +587,10 @@ function parseSampleSizes(sheet) {
   return { sampleSizes, configNames };
 }
 
-function detectWFSampleSizeHeaderRow(sheet, range) {
-  const maxRow = Math.min(range.e.r, 20);
-  for (let rowNum = 0; rowNum <= maxRow; rowNum++) {
-    const a = sheet[XLSX.utils.encode_cell({ r: rowNum, c: 0 })]?.v;
+function detectWFSampleSizeHeaderRow(rows) {
+  const maxRow = Math.min(rows.length, SAMPLE_SIZE_HEADER_SCAN_ROWS);
+  for (let rowNum = 0; rowNum < maxRow; rowNum++) {
+    const a = rows[rowNum]?.[0];
     const v0 = a ? String(a).trim().toLowerCase() : '';
     if (v0 === 'wf' || v0 === 'waterfall' || v0 === 'water fall') {
       return rowNum;
@@ -384,6 +599,24 @@ function detectWFSampleSizeHeaderRow(sheet, range) {
   return 0;
 }
 
+/**
+ * Build WF -> Tests mapping
+ */
+function buildWfTestMap(sampleSizes) {
+  const wfTestMap = new Map();
+  sampleSizes.forEach((sample) => {
+    wfTestMap.set(sample.waterfall, JSON.parse(sample.tests));
+  });
+  return wfTestMap;
+}
+
+function findTestId(wfTestMap, wf, failedTest) {
+  if (!failedTest || !wf) return null;
+  const tests = wfTestMap.get(wf) || [];
+  const matchedTest = tests.find((test) => test.testName === failedTest);
+  return matchedTest ? matchedTest.testId : null;
+}
+
 /**
  * Match failed tests with test IDs from sample sizes
  * @param {Array} issues - Array of issues
@@ -391,53 +624,115 @@ function detectWFSampleSizeHeaderRow(sheet, range) {
  * @returns {Array} Issues with testId matched
  */
 function matchFailedTests(issues, sampleSizes) {
-  const wfTestMap = new Map();
-
-  // Build WF -> Tests mapping
-  sampleSizes.forEach((sample) => {
-    wfTestMap.set(sample.waterfall, JSON.parse(sample.tests));
-  });
+  const wfTestMap = buildWfTestMap(sampleSizes);
 
   // Match each issue's failed test
-  return issues.map((issue) => {
-    if (!issue.failedTest || !issue.wf) {
-      return { ...issue, testId: null };
+  return issues.map((issue) => ({
+    ...issue,
+    testId: findTestId(wfTestMap, issue.wf, issue.failedTest),
+  }));
+}
+
+/**
+ * 逐条累计 issues 的汇总（计数、WF、(WF, Failed Test) 组合、最新 Open Date）
+ * 流式导入不保留 issues 数组，校验报告与 testId 回填都基于这份汇总
+ */
+class IssueSummary {
+  constructor() {
+    this.totalIssues = 0;
+    this.validIssues = 0;
+    this.wfs = new Set();
+    this.configs = new Set();
+    this.failedTests = new Map(); // wf -> Map(failedTest -> count)
+    this.lastIssueDate = null;
+  }
+
+  add(issue) {
+    this.totalIssues += 1;
+    if (issue.faNumber && issue.wf && issue.config && issue.symptom) {
+      this.validIssues += 1;
+    }
+    this.wfs.add(issue.wf);
+    if (issue.config) {
+      this.configs.add(issue.config);
+    }
+    if (issue.failedTest) {
+      if (!this.failedTests.has(issue.wf)) {
+        this.failedTests.set(issue.wf, new Map());
+      }
+      const counts = this.failedTests.get(issue.wf);
+      counts.set(issue.failedTest, (counts.get(issue.failedTest) || 0) + 1);
+    }
+    const date = formatIssueDate(issue.openDate);
+    if (date && (this.lastIssueDate === null || date > this.lastIssueDate)) {
+      this.lastIssueDate = date;
     }
+  }
 
-    const tests = wfTestMap.get(issue.wf) || [];
-    const matchedTest = tests.find((test) => test.testName === issue.failedTest);
+  /**
+   * 能匹配到 testId 的 (wf, failedTest) 组合，供导入后批量回填 issues.test_id
+   */
+  testIdMatches(sampleSizes) {
+    const wfTestMap = buildWfTestMap(sampleSizes);
+    const matches = [];
+    this.failedTests.forEach((counts, wf) => {
+      counts.forEach((count, failedTest) => {
+        const testId = findTestId(wfTestMap, wf, failedTest);
+        if (testId) matches.push({ wf, failedTest, testId });
+      });
+    });
+    return matches;
+  }
 
-    return {
-      ...issue,
-      testId: matchedTest ? matchedTest.testId : null,
-    };
-  });
+  unmatchedTestCount(sampleSizes) {
+    const wfTestMap = buildWfTestMap(sampleSizes);
+    let unmatched = 0;
+    this.failedTests.forEach((counts, wf) => {
+      counts.forEach((count, failedTest) => {
+        if (!findTestId(wfTestMap, wf, failedTest)) unmatched += count;
+      });
+    });
+    return unmatched;
+  }
+}
+
+function formatIssueDate(openDate) {
+  if (!openDate) return null;
+  if (typeof openDate === 'string') return openDate;
+  if (openDate instanceof Date) {
+    const year = String(openDate.getFullYear()).padStart(4, '0');
+    const month = String(openDate.getMonth() + 1).padStart(2, '0');
+    const day = String(openDate.getDate()).padStart(2, '0');
+    return `${year}-${month}-${day}`;
+  }
+  return String(openDate);
 }
 
 /**
  * Generate validation report
+ * @param {IssueSummary} summary - 全部 issues 的汇总
  */
-function generateValidationReport(issues, sampleSizes, configNames) {
+function generateValidationReport(summary, sampleSizes, configNames) {
   const report = {
-    totalIssues: issues.length,
-    validIssues: issues.filter((i) => i.faNumber && i.wf && i.config && i.symptom).length,
+    totalIssues: summary.totalIssues,
+    validIssues: summary.validIssues,
     warnings: [],
   };
 
   // Check for issues without test ID match
-  const unmatchedTests = issues.filter((i) => i.failedTest && !i.testId);
-  if (unmatchedTests.length > 0) {
+  const unmatchedTests = summary.unmatchedTestCount(sampleSizes);
+  if (unmatchedTests > 0) {
     report.warnings.push({
       level: 'warning',
       type: 'test_mismatch',
-      message: `${unmatchedTests.length} issues have Failed Test that doesn't match any test in WF Sample size`,
-      affectedCount: unmatchedTests.length,
+      message: `${unmatchedTests} issues have Failed Test that doesn't match any test in WF Sample size`,
+      affectedCount: unmatchedTests,
     });
   }
 
   // Check for missing WF in sample sizes
   const wfSet = new Set(sampleSizes.map((s) => s.waterfall));
-  const missingWFs = [...new Set(issues.map((i) => i.wf))].filter((wf) => wf && !wfSet.has(wf));
+  const missingWFs = [...summary.wfs].filter((wf) => wf && !wfSet.has(wf));
   if (missingWFs.length > 0) {
     report.warnings.push({
       level: 'error',
@@ -475,4 +770,6 @@ function parseExcelDate(excelDate) {
 
 module.exports = {
   parseExcelFile,
+  streamExcelFile,
+  isStreamableExcel,
 };
@@ -0,0 +1,124 @@
+const { getDatabase } = require('../models/database');
+const projectModel = require('../models/projectModel');
+const batchQueryService = require('./batchQueryService');
+const cacheService = require('./cacheService');
+const config = require('../config');
+
+// 与 FilterResultsPage 打开已保存筛选时发出的请求一致（filter-statistics 带 includeTrend=true）
+const PREWARM_QUERIES = [
+  { id: 'analysis', endpoint: 'analysis' },
+  { id: 'filter-statistics', endpoint: 'filter-statistics', filters: { includeTrend: 'true' } },
+  { id: 'failure-rate-matrix', endpoint: 'failure-rate-matrix' },
+];
+
+/**
+ * 缓存预热：新快照导入后按已保存的筛选条件重放分析接口，让第一个打开的人直接命中缓存
+ * 查询走 batchQueryService，缓存键与单接口完全一致
+ */
+class PrewarmService {
+  /**
+   * 收集需要预热的筛选条件
+   * saved_filters 挂在保存时的快照（project_id）上，这里按 project_key 取同一项目所有快照、所有用户的筛选
+   * 按规范化后的缓存键去重，最前面总是无筛选的 {}（项目首页）
+   * @returns {Array<Object>} [{ name, filters }]
+   */
+  collectFilterSets(project, maxFilters = config.prewarm.maxFilters) {
+    const db = getDatabase();
+    const rows = project.project_key
+      ? db
+          .prepare(
+            `SELECT sf.name, sf.filters FROM saved_filters sf
+             JOIN projects p ON p.id = sf.project_id
+             WHERE p.project_key = ?
+             ORDER BY sf.created_at DESC`
+          )
+          .all(project.project_key)
+      : db.prepare('SELECT name, filters FROM saved_filters WHERE project_id = ? ORDER BY created_at DESC').all(project.id);
+
+    const sets = [{ name: '(all)', filters: {} }];
+    const seen = new Set([cacheService.generateCacheKey('prewarm', project.id, {})]);
+    for (const row of rows) {
+      if (sets.length >= maxFilters + 1) break;
+      let filters;
+      try {
+        filters = JSON.parse(row.filters);
+      } catch (error) {
+        continue;
+      }
+      if (!filters || typeof filters !== 'object' || Array.isArray(filters)) continue;
+      const key = cacheService.generateCacheKey('prewarm', project.id, filters);
+      if (seen.has(key)) continue;
+      seen.add(key);
+      sets.push({ name: row.name, filters });
+    }
+    return sets;
+  }
+
+  /**
+   * 预热一个项目
+   * @param {number} projectId
+   * @param {Object} options - { concurrency: 同时执行的筛选条件数, maxFilters }
+   * @returns {Promise<Object>} { projectId, filters, queries, computed, cacheHits, errors, durationMs, items }
+   */
+  async prewarmProject(projectId, { concurrency = config.prewarm.concurrency, maxFilters = config.prewarm.maxFilters } = {}) {
+    const project = await projectModel.getProjectById(projectId);
+    if (!project) {
+      const error = new Error('Project not found');
+      error.statusCode = 404;
+      error.code = 'PROJECT_NOT_FOUND';
+      throw error;
+    }
+
+    const startedAt = Date.now();
+    const sets = this.collectFilterSets(project, maxFilters);
+    const items = new Array(sets.length);
+    let next = 0;
+
+    const worker = async () => {
+      while (next < sets.length) {
+        const index = next;
+        next += 1;
+        const { name, filters } = sets[index];
+        try {
+          const { stats } = await batchQueryService.runBatch(project.id, { filters, queries: PREWARM_QUERIES });
+          items[index] = { name, filters, ...stats };
+        } catch (error) {
+          // 筛选条件本身不合法（例如旧版本保存的嵌套对象）时 runBatch 会整体拒绝
+          items[index] = { name, filters, queries: PREWARM_QUERIES.length, cacheHits: 0, computed: 0, errors: PREWARM_QUERIES.length, durationMs: 0 };
+        }
+      }
+    };
+    const workers = Math.max(1, Math.min(parseInt(concurrency, 10) || 1, sets.length));
+    await Promise.all(Array.from({ length: workers }, worker));
+
+    const sum = (field) => items.reduce((total, item) => total + item[field], 0);
+    return {
+      projectId: project.id,
+      filters: sets.length,
+      queries: sum('queries'),
+      computed: sum('computed'),
+      cacheHits: sum('cacheHits'),
+      errors: sum('errors'),
+      durationMs: Date.now() - startedAt,
+      items,
+    };
+  }
+
+  /**
+   * 导入完成后在后台预热（config.prewarm.onUpload 打开时由 projectImportService 调用），失败只记录日志
+   */
+  schedule(projectId) {
+    setImmediate(() => {
+      this.prewarmProject(projectId)
+        .then((report) => {
+          console.log(
+            `🔥 Prewarmed project ${projectId}: ${report.filters} filter set(s), ${report.computed} entries populated, ` +
+              `${report.cacheHits} cached, ${report.errors} errors, ${report.durationMs}ms`
+          );
+        })
+        .catch((error) => console.error(`Failed to prewarm project ${projectId}:`, error));
+    });
+  }
+}
+
+module.exports = new PrewarmService();
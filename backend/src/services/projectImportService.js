@@ -0,0 +1,130 @@
+const path = require('path');
+const projectModel = require('../models/projectModel');
+const { forceSaveDatabase } = require('../models/database');
+const { parseExcelFile, streamExcelFile, isStreamableExcel } = require('./excelParser');
+const { parsePhaseFromFileName, deriveProjectKeyFromFileName } = require('./projectNaming');
+const cacheService = require('./cacheService');
+const prewarmService = require('./prewarmService');
+const config = require('../config');
+
+/**
+ * 生成北京时间戳（UTC+8），格式 "2025-11-30 14:25:33"
+ */
+function beijingTimestamp(now = new Date()) {
+  const beijingTime = new Date(now.getTime() + 8 * 60 * 60 * 1000);
+  const dateStr = beijingTime.toISOString().split('T')[0]; // YYYY-MM-DD
+  const timeStr = beijingTime.toISOString().split('T')[1].slice(0, 8); // HH:mm:ss
+  return `${dateStr} ${timeStr}`;
+}
+
+/**
+ * 项目导入：把已落盘的 Excel 文件解析并写入数据库
+ * 表单上传（multer）与分片上传（uploadSessionService）完成后都走这里
+ */
+class ProjectImportService {
+  /**
+   * @param {string} filePath - 已保存到磁盘的 Excel 文件
+   * @param {Object} options - { fileName: 原始文件名, name: 项目名（可选）, uploader }
+   * @returns {Promise<Object>} 新建的项目（getProjectById 的结果）
+   */
+  async importProjectFile(filePath, { fileName, name, uploader }) {
+    const baseProjectName = name || path.parse(fileName).name;
+    const phase = parsePhaseFromFileName(fileName);
+    const projectKey = deriveProjectKeyFromFileName(fileName) || baseProjectName;
+    const versionTimestamp = beijingTimestamp();
+
+    // 项目名称不包含时间戳，时间戳单独存储
+    const projectName = baseProjectName;
+
+    console.log(`📄 Processing Excel file: ${fileName}`);
+    console.log(`📝 Project: ${projectName}, Upload time (Beijing): ${versionTimestamp}`);
+
+    const projectData = {
+      name: projectName,
+      projectKey,
+      phase,
+      fileName,
+      uploader: uploader || null,
+      uploadTime: versionTimestamp, // 存储北京时间戳
+    };
+
+    const projectId = isStreamableExcel(fileName)
+      ? await this.streamImport(filePath, projectData)
+      : await this.bufferedImport(filePath, projectData);
+
+    console.log(`✅ Inserted all data for project ${projectId}`);
+
+    // 强制保存数据库（关键操作）
+    await forceSaveDatabase();
+    console.log(`💾 Database saved for project ${projectId}`);
+
+    // 清除该项目的所有缓存 - 防止用户看到旧数据
+    cacheService.clearProjectCache(projectId);
+    console.log(`🗑️  All cache cleared for project ${projectId} to ensure fresh data`);
+
+    if (config.prewarm.onUpload) {
+      prewarmService.schedule(projectId);
+    }
+
+    return projectModel.getProjectById(projectId);
+  }
+
+  /**
+   * .xlsx：先建 importing 状态的项目，边解析边批量写入 issues，结束后回填 testId、写汇总并置为 active
+   * 失败时整个项目（含已写入的 issues）硬删除
+   */
+  async streamImport(filePath, projectData) {
+    const projectId = await projectModel.createProject({
+      ...projectData,
+      configNames: [],
+      validationReport: null,
+      totalIssues: 0,
+      status: 'importing',
+    });
+    console.log(`✅ Created project ID: ${projectId} (importing)`);
+
+    try {
+      const writer = projectModel.createIssueWriter(projectId);
+      const { sampleSizes, configNames, validationReport, testIdMatches, totalIssues, lastIssueDate } =
+        await streamExcelFile(filePath, (issue) => writer.add(issue));
+      writer.flush();
+      console.log(`✅ Extracted ${configNames.length} config names: ${configNames.join(', ')}`);
+
+      await projectModel.assignTestIds(projectId, testIdMatches);
+      await projectModel.insertSampleSizes(projectId, sampleSizes);
+      await projectModel.finalizeProject(projectId, { configNames, validationReport, totalIssues, lastIssueDate });
+    } catch (error) {
+      try {
+        await projectModel.hardDeleteProject(projectId);
+      } catch (deleteError) {
+        console.error(`Failed to remove partially imported project ${projectId}:`, deleteError);
+      }
+      throw error;
+    }
+
+    return projectId;
+  }
+
+  /**
+   * .xls：exceljs 不支持流式读取，整表解析后一次写入
+   */
+  async bufferedImport(filePath, projectData) {
+    const { issues, sampleSizes, configNames, validationReport, lastIssueDate } = await parseExcelFile(filePath);
+    console.log(`✅ Extracted ${configNames.length} config names: ${configNames.join(', ')}`);
+
+    const projectId = await projectModel.createProject({
+      ...projectData,
+      configNames,
+      validationReport,
+      totalIssues: issues.length,
+      lastIssueDate,
+    });
+    console.log(`✅ Created project ID: ${projectId}`);
+
+    await projectModel.insertIssues(projectId, issues);
+    await projectModel.insertSampleSizes(projectId, sampleSizes);
+    return projectId;
+  }
+}
+
+module.exports = new ProjectImportService();
@@ -0,0 +1,248 @@
+const crypto = require('crypto');
+const fs = require('fs');
+const fsp = require('fs').promises;
+const path = require('path');
+const { Transform } = require('stream');
+const { pipeline } = require('stream/promises');
+const config = require('../config');
+
+const ALLOWED_EXTENSIONS = ['.xlsx', '.xls'];
+const UPLOAD_ID_PATTERN = /^[0-9a-f]{32}$/;
+const SHA256_PATTERN = /^[0-9a-f]{64}$/;
+
+function uploadError(statusCode, message, code) {
+  const error = new Error(message);
+  error.statusCode = statusCode;
+  error.code = code;
+  return error;
+}
+
+/**
+ * 限制写入字节数：超过声明的文件大小时中止（已写入的部分保留，offset 仍然有效）
+ */
+function limitBytes(maxBytes) {
+  let received = 0;
+  return new Transform({
+    transform(chunk, encoding, callback) {
+      received += chunk.length;
+      if (received > maxBytes) {
+        callback(uploadError(413, 'Chunk exceeds declared file size', 'UPLOAD_TOO_LARGE'));
+        return;
+      }
+      callback(null, chunk);
+    },
+  });
+}
+
+/**
+ * 分片上传会话（供 issue_query.py upload 断点续传）
+ * 每个会话在 sessionDir 下对应 <id>.json（元数据）与 <id>.part（已收到的字节）
+ * 会话 id 由 (用户, 文件名, 大小, sha256) 决定：中断后重新创建同一文件的会话会拿到同一个 id 与已收到的 offset
+ */
+class UploadSessionService {
+  constructor(options = {}) {
+    this.sessionDir = options.sessionDir || config.upload.sessionDir;
+    this.ttlMs = (options.ttlHours || config.upload.sessionTtlHours) * 60 * 60 * 1000;
+    this.busy = new Set(); // 正在写入或导入的会话，同一会话同时只允许一个请求
+  }
+
+  metaPath(uploadId) {
+    return path.join(this.sessionDir, `${uploadId}.json`);
+  }
+
+  partPath(uploadId) {
+    return path.join(this.sessionDir, `${uploadId}.part`);
+  }
+
+  /**
+   * 创建（或恢复）上传会话
+   * @param {Object} params - { userId, fileName, size, sha256 }
+   * @returns {Promise<Object>} { uploadId, fileName, size, offset }
+   */
+  async create({ userId, fileName, size, sha256 }) {
+    const baseName = path.basename(String(fileName || ''));
+    const extension = path.extname(baseName).toLowerCase();
+    if (!baseName || !ALLOWED_EXTENSIONS.includes(extension)) {
+      throw uploadError(400, 'Invalid file type. Only .xlsx and .xls files are allowed.', 'INVALID_FILE_TYPE');
+    }
+    const totalSize = Number(size);
+    if (!Number.isInteger(totalSize) || totalSize <= 0) {
+      throw uploadError(400, 'size must be a positive integer', 'INVALID_UPLOAD');
+    }
+    if (totalSize > config.upload.maxFileSize) {
+      throw uploadError(413, `File too large: ${totalSize} bytes (max ${config.upload.maxFileSize})`, 'UPLOAD_TOO_LARGE');
+    }
+    const checksum = String(sha256 || '').toLowerCase();
+    if (!SHA256_PATTERN.test(checksum)) {
+      throw uploadError(400, 'sha256 must be a hex SHA-256 digest', 'INVALID_UPLOAD');
+    }
+
+    const uploadId = crypto
+      .createHash('sha256')
+      .update(JSON.stringify([userId, baseName, totalSize, checksum]))
+      .digest('hex')
+      .slice(0, 32);
+
+    await fsp.mkdir(this.sessionDir, { recursive: true });
+    this.cleanupExpired().catch((error) => console.error('Failed to clean up upload sessions:', error));
+
+    const existing = await this.readSession(uploadId);
+    if (existing) {
+      console.log(`📥 Resuming upload ${uploadId} (${baseName}) at ${existing.offset}/${totalSize}`);
+      return this.describe(existing);
+    }
+
+    const now = new Date().toISOString();
+    const meta = { uploadId, userId, fileName: baseName, size: totalSize, sha256: checksum, createdAt: now, updatedAt: now };
+    await fsp.writeFile(this.partPath(uploadId), Buffer.alloc(0), { flag: 'a' });
+    await fsp.writeFile(this.metaPath(uploadId), JSON.stringify(meta));
+    console.log(`📥 Created upload ${uploadId} (${baseName}, ${totalSize} bytes)`);
+    return this.describe({ ...meta, offset: 0 });
+  }
+
+  /**
+   * 查询会话（offset 为 .part 文件当前大小）
+   */
+  async get(uploadId, userId) {
+    const session = UPLOAD_ID_PATTERN.test(String(uploadId)) ? await this.readSession(uploadId) : null;
+    // 别人的会话一律按不存在处理
+    if (!session || session.userId !== userId) {
+      throw uploadError(404, 'Upload session not found', 'UPLOAD_NOT_FOUND');
+    }
+    return session;
+  }
+
+  /**
+   * 在 offset 处追加一段数据；offset 必须等于已收到的字节数，否则 409（客户端重新查询 offset 后续传）
+   * @param {ReadableStream} stream - 请求体
+   * @returns {Promise<Object>} 追加后的会话状态
+   */
+  async append(uploadId, userId, offset, stream) {
+    return this.withSession(uploadId, async () => {
+      // offset 在占用会话之后再读，避免两个并发请求按同一个旧 offset 追加
+      const session = await this.get(uploadId, userId);
+      if (!Number.isInteger(offset) || offset !== session.offset) {
+        throw uploadError(409, `Upload-Offset ${offset} does not match current offset ${session.offset}`, 'UPLOAD_OFFSET_MISMATCH');
+      }
+      try {
+        await pipeline(stream, limitBytes(session.size - session.offset), fs.createWriteStream(this.partPath(uploadId), { flags: 'a' }));
+      } finally {
+        await this.touch(session);
+      }
+      return this.describe(await this.get(uploadId, userId));
+    });
+  }
+
+  /**
+   * 所有字节到齐后校验 sha256，通过则调用 handler(filePath, session) 导入，结束后删除会话
+   * 校验失败时会话被删除（需要重新上传）
+   */
+  async complete(uploadId, userId, handler) {
+    return this.withSession(uploadId, async () => {
+      const session = await this.get(uploadId, userId);
+      if (session.offset !== session.size) {
+        throw uploadError(409, `Upload incomplete: ${session.offset}/${session.size} bytes received`, 'UPLOAD_INCOMPLETE');
+      }
+      const digest = await this.checksum(this.partPath(uploadId));
+      if (digest !== session.sha256) {
+        await this.removeFiles(uploadId);
+        throw uploadError(422, 'Uploaded file checksum does not match sha256', 'UPLOAD_CHECKSUM_MISMATCH');
+      }
+      try {
+        return await handler(this.partPath(uploadId), session);
+      } finally {
+        await this.removeFiles(uploadId);
+      }
+    });
+  }
+
+  async remove(uploadId, userId) {
+    await this.withSession(uploadId, async () => {
+      await this.get(uploadId, userId);
+      await this.removeFiles(uploadId);
+    });
+  }
+
+  /**
+   * 删除超过 ttl 未更新的会话
+   * @returns {Promise<number>} 删除的会话数
+   */
+  async cleanupExpired(now = Date.now()) {
+    let entries;
+    try {
+      entries = await fsp.readdir(this.sessionDir);
+    } catch (error) {
+      if (error.code === 'ENOENT') return 0;
+      throw error;
+    }
+
+    let removed = 0;
+    for (const entry of entries) {
+      if (!entry.endsWith('.json')) continue;
+      const uploadId = entry.slice(0, -'.json'.length);
+      if (this.busy.has(uploadId)) continue;
+      const session = await this.readSession(uploadId);
+      if (session && now - Date.parse(session.updatedAt) > this.ttlMs) {
+        await this.removeFiles(uploadId);
+        removed += 1;
+      }
+    }
+    if (removed > 0) {
+      console.log(`🗑️  Removed ${removed} expired upload session(s)`);
+    }
+    return removed;
+  }
+
+  async withSession(uploadId, fn) {
+    if (this.busy.has(uploadId)) {
+      throw uploadError(409, 'Upload session is busy', 'UPLOAD_BUSY');
+    }
+    this.busy.add(uploadId);
+    try {
+      return await fn();
+    } finally {
+      this.busy.delete(uploadId);
+    }
+  }
+
+  async readSession(uploadId) {
+    try {
+      const meta = JSON.parse(await fsp.readFile(this.metaPath(uploadId), 'utf-8'));
+      const { size: received } = await fsp.stat(this.partPath(uploadId));
+      return { ...meta, offset: received };
+    } catch (error) {
+      if (error.code === 'ENOENT') return null;
+      throw error;
+    }
+  }
+
+  async touch(session) {
+    const { offset, ...meta } = session;
+    await fsp.writeFile(this.metaPath(session.uploadId), JSON.stringify({ ...meta, updatedAt: new Date().toISOString() }));
+  }
+
+  async removeFiles(uploadId) {
+    await fsp.rm(this.partPath(uploadId), { force: true });
+    await fsp.rm(this.metaPath(uploadId), { force: true });
+  }
+
+  async checksum(filePath) {
+    const hash = crypto.createHash('sha256');
+    for await (const chunk of fs.createReadStream(filePath)) {
+      hash.update(chunk);
+    }
+    return hash.digest('hex');
+  }
+
+  describe(session) {
+    return {
+      uploadId: session.uploadId,
+      fileName: session.fileName,
+      size: session.size,
+      offset: session.offset,
+    };
+  }
+}
+
+module.exports = new UploadSessionService();
+module.exports.UploadSessionService = UploadSessionService;
@@ -0,0 +1,68 @@
+const test = require('node:test');
+const assert = require('node:assert/strict');
+const fs = require('node:fs');
+const path = require('node:path');
+const { initDatabase, closeDatabase, getDatabase } = require('../src/models/database');
+const batchQueryService = require('../src/services/batchQueryService');
+const cacheService = require('../src/services/cacheService');
+
+// 与 tools/tests/test_local_parity.py 共用：tools/issue_local.py 的本地镜像（issue_query.py --local）必须得到同样的 expected
+// 改了分析逻辑后用 UPDATE_PARITY_FIXTURE=1 node test/analysisParity.test.js 重新生成 expected，再让本地实现跟上
+const FIXTURE_PATH = path.join(__dirname, 'fixtures', 'analysisParity.json');
+
+const ISSUE_COLUMNS = [
+  'fa_number', 'open_date', 'wf', 'config', 'symptom', 'failed_test', 'test_id', 'priority', 'failure_type', 'root_cause',
+  'fa_status', 'department', 'owner', 'sample_status', 'failed_location', 'function_or_cosmetic', 'multi_component', 'sn',
+  'unit_number', 'failed_cycle_count', 'raw_data',
+];
+
+test('固定快照上 filter-statistics / cross / failure-rate-matrix / filter-options 的结果与 fixture 一致', async () => {
+  const fixture = JSON.parse(fs.readFileSync(FIXTURE_PATH, 'utf-8'));
+  await initDatabase();
+  const db = getDatabase();
+
+  const projectId = 950000000 + Math.round(Math.random() * 1000000);
+  db.prepare(`INSERT INTO projects (id, name, project_key, phase) VALUES (?, ?, ?, ?)`).run(
+    projectId,
+    fixture.project.name,
+    fixture.project.project_key,
+    fixture.project.phase
+  );
+  const insertIssue = db.prepare(
+    `INSERT INTO issues (project_id, ${ISSUE_COLUMNS.join(', ')}) VALUES (?, ${ISSUE_COLUMNS.map(() => '?').join(', ')})`
+  );
+  fixture.issues.forEach((issue) => insertIssue.run(projectId, ...ISSUE_COLUMNS.map((c) => issue[c] ?? null)));
+  const insertSampleSize = db.prepare(
+    `INSERT INTO sample_sizes (project_id, waterfall, test_name, tests, config_samples) VALUES (?, ?, ?, ?, ?)`
+  );
+  fixture.sampleSizes.forEach((s) =>
+    insertSampleSize.run(projectId, s.waterfall, s.test_name, JSON.stringify(s.tests), JSON.stringify(s.config_samples))
+  );
+
+  try {
+    cacheService.clearProjectCache(projectId);
+    const { results } = await batchQueryService.runBatch(projectId, {
+      queries: fixture.checks.map((check, index) => ({ id: String(index), endpoint: check.endpoint, filters: check.params })),
+    });
+
+    if (process.env.UPDATE_PARITY_FIXTURE === '1') {
+      fixture.checks.forEach((check, index) => {
+        assert.ok(results[index].success, `${check.label}: ${results[index].error?.message}`);
+        check.expected = results[index].data;
+      });
+      fs.writeFileSync(FIXTURE_PATH, `${JSON.stringify(fixture, null, 2)}\n`);
+      return;
+    }
+
+    fixture.checks.forEach((check, index) => {
+      assert.ok(results[index].success, `${check.label}: ${results[index].error?.message}`);
+      assert.deepEqual(results[index].data, check.expected, check.label);
+    });
+  } finally {
+    cacheService.clearProjectCache(projectId);
+    db.prepare(`DELETE FROM issues WHERE project_id = ?`).run(projectId);
+    db.prepare(`DELETE FROM sample_sizes WHERE project_id = ?`).run(projectId);
+    db.prepare(`DELETE FROM projects WHERE id = ?`).run(projectId);
+    await closeDatabase();
+  }
+});
@@ -0,0 +1,86 @@
+const test = require('node:test');
+const assert = require('node:assert/strict');
+const { initDatabase, closeDatabase, getDatabase } = require('../src/models/database');
+const analysisModel = require('../src/models/analysisModel');
+const analysisService = require('../src/services/analysisService');
+const batchQueryService = require('../src/services/batchQueryService');
+const cacheService = require('../src/services/cacheService');
+
+test('runBatch 共享一次 dataset 读取，结果与单接口一致并写入相同缓存键', async () => {
+  await initDatabase();
+  const db = getDatabase();
+
+  const projectId = 920000000 + Math.round(Math.random() * 1000000);
+  db.prepare(`INSERT INTO projects (id, name, project_key, phase) VALUES (?, ?, ?, ?)`).run(
+    projectId,
+    'P3',
+    'P3',
+    'DVT'
+  );
+  db.prepare(
+    `INSERT INTO sample_sizes (project_id, waterfall, tests, config_samples, test_name) VALUES (?, ?, ?, ?, ?)`
+  ).run(projectId, '1', JSON.stringify([{ testId: 'T1', testName: 'Alpha' }]), JSON.stringify({ R1CASN: 10, R2CBCN: 5 }), '');
+  db.prepare(
+    `INSERT INTO sample_sizes (project_id, waterfall, tests, config_samples, test_name) VALUES (?, ?, ?, ?, ?)`
+  ).run(projectId, '2', JSON.stringify([{ testId: 'T2', testName: 'Beta' }]), JSON.stringify({ R1CASN: 20 }), '');
+
+  const ins = db.prepare(
+    `INSERT INTO issues (project_id, fa_number, sn, open_date, wf, config, failed_test, failure_type, fa_status, failed_location, symptom, raw_data)
+     VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)`
+  );
+  ins.run(projectId, 'FA-1', 'SN-1', '2026-01-01', '1', 'R1CASN', 'Alpha', 'Spec.', 'open', 'L1', 'S1', '{}');
+  ins.run(projectId, 'FA-2', 'SN-2', '2026-01-02', '1', 'R2CBCN', 'Alpha', 'Spec.', 'open', 'L2', 'S2', '{}');
+  ins.run(projectId, 'FA-3', 'SN-3', '2026-01-03', '2', 'R1CASN', 'Beta', 'Strife', 'open', 'L3', 'S1', '{}');
+
+  cacheService.clearProjectCache(projectId);
+
+  const filters = { date_from: '2026-01-01' };
+  const batch = await batchQueryService.runBatch(projectId, {
+    filters,
+    queries: [
+      { id: 'analysis', endpoint: 'analysis' },
+      { id: 'stats', endpoint: 'filter-stats' },
+      { id: 'cross', endpoint: 'cross', filters: { dimension1: 'wf', dimension2: 'symptom' } },
+      { id: 'matrix', endpoint: 'failure-rate-matrix' },
+      { id: 'bad', endpoint: 'nope' },
+      { id: 'missing', endpoint: 'cross' },
+    ],
+  });
+
+  assert.equal(batch.stats.datasetLoads, 1);
+  assert.equal(batch.stats.computed, 4);
+  assert.equal(batch.stats.errors, 2);
+  assert.equal(batch.results.bad.success, false);
+  assert.equal(batch.results.bad.error.code, 'UNSUPPORTED_ENDPOINT');
+  assert.equal(batch.results.missing.error.code, 'MISSING_PARAMETERS');
+
+  assert.deepEqual(batch.results.analysis.data, await analysisService.calculateProjectAnalysis(projectId, filters));
+  assert.deepEqual(batch.results.stats.data, await analysisModel.getFilterStatistics(projectId, filters, false));
+  assert.deepEqual(batch.results.cross.data, {
+    crossAnalysis: await analysisModel.getCrossAnalysis(projectId, 'wf', 'symptom', filters),
+  });
+  assert.deepEqual(batch.results.matrix.data, await analysisModel.getFailureRateMatrix(projectId, filters));
+
+  assert.ok(cacheService.getFromMemory(cacheService.generateCacheKey('analysis', projectId, filters)) !== undefined);
+  assert.ok(cacheService.getFromMemory(cacheService.generateCacheKey('filter_stats_false', projectId, filters)) !== undefined);
+
+  const again = await batchQueryService.runBatch(projectId, {
+    filters,
+    queries: [{ id: 'analysis', endpoint: 'analysis' }, { id: 'stats', endpoint: 'filter-statistics' }],
+  });
+  assert.equal(again.stats.cacheHits, 2);
+  assert.equal(again.stats.datasetLoads, 0);
+
+  await assert.rejects(() => batchQueryService.runBatch(projectId, { queries: [] }), { statusCode: 400 });
+  await assert.rejects(
+    () => batchQueryService.runBatch(projectId, { queries: [{ id: 'a', endpoint: 'analysis' }, { id: 'a', endpoint: 'analysis' }] }),
+    { statusCode: 400 }
+  );
+
+  cacheService.clearProjectCache(projectId);
+  db.prepare(`DELETE FROM issues WHERE project_id = ?`).run(projectId);
+  db.prepare(`DELETE FROM sample_sizes WHERE project_id = ?`).run(projectId);
+  db.prepare(`DELETE FROM projects WHERE id = ?`).run(projectId);
+
+  await closeDatabase();
+});
@@ -0,0 +1,24 @@
+const test = require('node:test');
+const assert = require('node:assert/strict');
+
+const cacheService = require('../src/services/cacheService');
+
+test('queryTtl 以毫秒计，getOrFetch 写入的条目按 1 小时过期', async () => {
+  assert.equal(cacheService.queryTtl, 60 * 60 * 1000);
+
+  const key = `ttl:${Date.now()}:${Math.random().toString(16).slice(2)}`;
+  const data = await cacheService.getOrFetch(key, async () => ({ value: 1 }), cacheService.queryTtl);
+  assert.deepEqual(data, { value: 1 });
+
+  const remaining = cacheService.memoryCache.getRemainingTTL(key);
+  assert.ok(remaining > 59 * 60 * 1000, `remaining ttl ${remaining}ms`);
+
+  cacheService.delete(key);
+});
+
+test('getStats 返回 LRU 上限与默认 TTL', () => {
+  const stats = cacheService.getStats();
+  assert.equal(stats.max, 100);
+  assert.equal(stats.ttl, 15 * 60 * 1000);
+  assert.equal(stats.maxSize, 50 * 1024 * 1024);
+});
@@ -0,0 +1,78 @@
+const test = require('node:test');
+const assert = require('node:assert/strict');
+
+function createMockRes() {
+  let statusCode = 200;
+  let body;
+  return {
+    get statusCode() {
+      return statusCode;
+    },
+    get body() {
+      return body;
+    },
+    status(code) {
+      statusCode = code;
+      return this;
+    },
+    json(payload) {
+      body = payload;
+      return payload;
+    },
+  };
+}
+
+async function callFrCompact(analysisController, projectId, query) {
+  const res = createMockRes();
+  let nextError = null;
+  await analysisController.getCompactFailureRate({ params: { id: projectId }, query }, res, (err) => {
+    nextError = err;
+  });
+  assert.equal(nextError, null);
+  assert.equal(res.statusCode, 200);
+  return res.body.data;
+}
+
+test('fr-compact 接口把 sortBy 传给模型，且不同排序不共用缓存', async () => {
+  const { initDatabase, closeDatabase, getDatabase } = require('../src/models/database');
+  const analysisController = require('../src/controllers/analysisController');
+  const cacheService = require('../src/services/cacheService');
+
+  await initDatabase();
+  const db = getDatabase();
+
+  const projectId = 930000000 + Math.round(Math.random() * 1000000);
+  db.prepare(`INSERT INTO projects (id, name, project_key, phase) VALUES (?, ?, ?, ?)`).run(projectId, 'P4', 'P4', 'EVT');
+  db.prepare(
+    `INSERT INTO sample_sizes (project_id, waterfall, tests, config_samples, test_name) VALUES (?, ?, ?, ?, ?)`
+  ).run(projectId, '1', JSON.stringify([{ testId: 'T1', testName: 'Alpha' }]), JSON.stringify({ R1CASN: 10 }), '');
+
+  const ins = db.prepare(
+    `INSERT INTO issues (project_id, fa_number, sn, open_date, wf, config, failed_test, failure_type, fa_status, failed_location, symptom, raw_data)
+     VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)`
+  );
+  ins.run(projectId, 'FA-1', 'SN-1', '2026-01-01', '1', 'R1CASN', 'Alpha', 'Spec.', 'open', 'L1', 'Zeta', '{}');
+  ins.run(projectId, 'FA-2', 'SN-2', '2026-01-02', '1', 'R1CASN', 'Alpha', 'Spec.', 'open', 'L1', 'Zeta', '{}');
+  ins.run(projectId, 'FA-3', 'SN-3', '2026-01-03', '1', 'R1CASN', 'Alpha', 'Spec.', 'open', 'L1', 'Alpha', '{}');
+
+  cacheService.clearProjectCache(projectId);
+
+  const byFailures = await callFrCompact(analysisController, projectId, { groupBy: 'symptom', sortBy: 'failures' });
+  assert.equal(byFailures.sortBy, 'failures');
+  assert.deepEqual(byFailures.keys, ['Zeta', 'Alpha']);
+  assert.deepEqual(byFailures.failures, [2, 1]);
+
+  const byKey = await callFrCompact(analysisController, projectId, { groupBy: 'symptom', sortBy: 'key' });
+  assert.equal(byKey.sortBy, 'key');
+  assert.deepEqual(byKey.keys, ['Alpha', 'Zeta']);
+
+  const paged = await callFrCompact(analysisController, projectId, { groupBy: 'symptom', sortBy: 'key', offset: '1', limit: '1' });
+  assert.deepEqual(paged.keys, ['Zeta']);
+  assert.equal(paged.totalKeys, 2);
+
+  cacheService.clearProjectCache(projectId);
+  db.prepare('DELETE FROM issues WHERE project_id = ?').run(projectId);
+  db.prepare('DELETE FROM sample_sizes WHERE project_id = ?').run(projectId);
+  db.prepare('DELETE FROM projects WHERE id = ?').run(projectId);
+  await closeDatabase();
+});
@@ -0,0 +1,98 @@
+const test = require('node:test');
+const assert = require('node:assert/strict');
+const zlib = require('node:zlib');
+
+const compressJson = require('../src/middleware/compressJson');
+const { negotiateEncoding } = compressJson;
+
+function createMockRes() {
+  const headers = {};
+  let sent;
+  let jsonBody;
+  let resolveDone;
+  const done = new Promise((resolve) => {
+    resolveDone = resolve;
+  });
+  return {
+    headers,
+    done,
+    get sent() {
+      return sent;
+    },
+    get jsonBody() {
+      return jsonBody;
+    },
+    vary(field) {
+      headers.vary = field;
+      return this;
+    },
+    get(name) {
+      return headers[name.toLowerCase()];
+    },
+    set(name, value) {
+      headers[name.toLowerCase()] = value;
+      return this;
+    },
+    send(body) {
+      sent = body;
+      resolveDone();
+      return this;
+    },
+    json(payload) {
+      jsonBody = payload;
+      resolveDone();
+      return this;
+    },
+  };
+}
+
+async function runMiddleware(middleware, acceptEncoding, payload) {
+  const req = { method: 'GET', headers: acceptEncoding ? { 'accept-encoding': acceptEncoding } : {} };
+  const res = createMockRes();
+  middleware(req, res, () => {});
+  res.json(payload);
+  await res.done;
+  return res;
+}
+
+const largePayload = {
+  success: true,
+  data: { rows: Array.from({ length: 500 }, (_, i) => ({ symptom: `Rattle lv${i % 5}`, totalCount: i })) },
+};
+
+test('negotiateEncoding 按 q 值与 br 优先级选择编码', () => {
+  assert.equal(negotiateEncoding('gzip, deflate, br'), 'br');
+  assert.equal(negotiateEncoding('gzip, deflate, br', { brotli: false }), 'gzip');
+  assert.equal(negotiateEncoding('br;q=0, gzip'), 'gzip');
+  assert.equal(negotiateEncoding('identity'), null);
+  assert.equal(negotiateEncoding('*'), 'br');
+  assert.equal(negotiateEncoding('gzip;q=0'), null);
+  assert.equal(negotiateEncoding(undefined), null);
+});
+
+test('compressJson 超过阈值时 gzip/br 压缩，可还原为原 JSON', async () => {
+  const middleware = compressJson({ enabled: true, threshold: 1024, brotli: true });
+
+  const gz = await runMiddleware(middleware, 'gzip', largePayload);
+  assert.equal(gz.headers['content-encoding'], 'gzip');
+  assert.equal(gz.headers.vary, 'Accept-Encoding');
+  assert.match(gz.headers['content-type'], /application\/json/);
+  assert.deepEqual(JSON.parse(zlib.gunzipSync(gz.sent).toString('utf8')), largePayload);
+  assert.ok(gz.sent.length < Buffer.byteLength(JSON.stringify(largePayload)));
+
+  const br = await runMiddleware(middleware, 'gzip, br', largePayload);
+  assert.equal(br.headers['content-encoding'], 'br');
+  assert.deepEqual(JSON.parse(zlib.brotliDecompressSync(br.sent).toString('utf8')), largePayload);
+});
+
+test('compressJson 小响应或客户端不支持时保持原样', async () => {
+  const middleware = compressJson({ enabled: true, threshold: 1024, brotli: true });
+
+  const small = await runMiddleware(middleware, 'gzip', { success: true, data: [] });
+  assert.equal(small.headers['content-encoding'], undefined);
+  assert.deepEqual(small.jsonBody, { success: true, data: [] });
+
+  const plain = await runMiddleware(middleware, undefined, largePayload);
+  assert.equal(plain.headers['content-encoding'], undefined);
+  assert.deepEqual(plain.jsonBody, largePayload);
+});
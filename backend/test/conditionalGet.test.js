@@ -0,0 +1,118 @@
+const test = require('node:test');
+const assert = require('node:assert/strict');
+const os = require('node:os');
+const path = require('node:path');
+const fs = require('node:fs/promises');
+
+function createTempDbPath() {
+  const fileName = `issue-analyzor-test-${Date.now()}-${Math.random().toString(16).slice(2)}.db`;
+  return path.join(os.tmpdir(), fileName);
+}
+
+function createMockRes() {
+  const headers = {};
+  let statusCode = 200;
+  let ended = false;
+  return {
+    headers,
+    get statusCode() {
+      return statusCode;
+    },
+    get ended() {
+      return ended;
+    },
+    set(name, value) {
+      headers[name.toLowerCase()] = value;
+      return this;
+    },
+    status(code) {
+      statusCode = code;
+      return this;
+    },
+    end() {
+      ended = true;
+      return this;
+    },
+  };
+}
+
+// 模拟 express 的 req.fresh：If-None-Match 与响应 ETag 相同即为 fresh
+function createMockReq(projectId, query, ifNoneMatch, res) {
+  return {
+    method: 'GET',
+    params: { id: String(projectId) },
+    route: { path: '/:id/filter-statistics' },
+    query,
+    headers: ifNoneMatch ? { 'if-none-match': ifNoneMatch } : {},
+    get fresh() {
+      return Boolean(ifNoneMatch) && ifNoneMatch === res.headers.etag;
+    },
+  };
+}
+
+async function callMiddleware(middleware, projectId, query, ifNoneMatch) {
+  const res = createMockRes();
+  const req = createMockReq(projectId, query, ifNoneMatch, res);
+  let nextCalled = false;
+  let nextError = null;
+  await middleware(req, res, (err) => {
+    nextCalled = true;
+    nextError = err || null;
+  });
+  assert.equal(nextError, null);
+  return { res, nextCalled };
+}
+
+test('snapshotETag 与 filters 顺序无关，filters 或快照版本变化时改变', () => {
+  const dbPath = createTempDbPath();
+  process.env.DATABASE_PATH = dbPath;
+  const { snapshotETag } = require('../src/middleware/conditionalGet');
+
+  const project = { id: 7, upload_time: '2026-01-01 10:00:00', updated_at: '2026-01-01 10:00:00' };
+  const route = '/:id/filter-statistics';
+  const etag = snapshotETag(project, route, { wfs: '1,2', symptoms: 'S1' });
+
+  assert.match(etag, /^W\/"[A-Za-z0-9_-]{27}"$/);
+  assert.equal(snapshotETag(project, route, { symptoms: 'S1', wfs: '1,2' }), etag);
+  assert.notEqual(snapshotETag(project, route, { wfs: '1' }), etag);
+  assert.notEqual(snapshotETag(project, '/:id/analysis', { wfs: '1,2', symptoms: 'S1' }), etag);
+  assert.notEqual(snapshotETag({ ...project, updated_at: '2026-02-01 00:00:00' }, route, { wfs: '1,2', symptoms: 'S1' }), etag);
+});
+
+test('conditionalGet 首次返回 ETag，If-None-Match 相同时 304 且不进入控制器', async () => {
+  const dbPath = createTempDbPath();
+  process.env.DATABASE_PATH = dbPath;
+
+  const { initDatabase, closeDatabase, getDatabase } = require('../src/models/database');
+  const conditionalGet = require('../src/middleware/conditionalGet');
+
+  await initDatabase();
+  const db = getDatabase();
+  const projectId = 940000000 + Math.round(Math.random() * 1000000);
+  db.prepare(`INSERT INTO projects (id, name, project_key, phase) VALUES (?, ?, ?, ?)`).run(projectId, 'P5', 'P5', 'EVT');
+
+  const middleware = conditionalGet();
+
+  const first = await callMiddleware(middleware, projectId, { wfs: '1' });
+  assert.equal(first.nextCalled, true);
+  assert.equal(first.res.headers['cache-control'], 'private, no-cache');
+  const etag = first.res.headers.etag;
+  assert.ok(etag);
+
+  const revalidated = await callMiddleware(middleware, projectId, { wfs: '1' }, etag);
+  assert.equal(revalidated.nextCalled, false);
+  assert.equal(revalidated.res.statusCode, 304);
+  assert.equal(revalidated.res.ended, true);
+
+  const otherFilters = await callMiddleware(middleware, projectId, { wfs: '2' }, etag);
+  assert.equal(otherFilters.nextCalled, true);
+  assert.notEqual(otherFilters.res.headers.etag, etag);
+
+  const missing = await callMiddleware(middleware, projectId + 1, { wfs: '1' });
+  assert.equal(missing.nextCalled, true);
+  assert.equal(missing.res.headers.etag, undefined);
+
+  db.prepare('DELETE FROM projects WHERE id = ?').run(projectId);
+  await closeDatabase();
+  await fs.rm(dbPath, { force: true });
+});
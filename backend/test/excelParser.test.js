@@ -4,7 +4,7 @@ const os = require('node:os');
 const path = require('node:path');
 const fs = require('node:fs/promises');
 const XLSX = require('xlsx');
-const { parseExcelFile } = require('../src/services/excelParser');
+const { parseExcelFile, streamExcelFile } = require('../src/services/excelParser');
 
 test('WF Sample Size 支持 Test-1 / Test - 1 表头识别为测试列', async () => {
   const workbook = XLSX.utils.book_new();
@@ -52,3 +52,58 @@ test('WF Sample Size 支持 Test-1 / Test - 1 表头识别为测试列', async (
   }
 });
 
+
+test('streamExcelFile 与 parseExcelFile 解析结果一致（WF Sample Size 排在 System TF 之前也能回填 testId）', async () => {
+  const workbook = XLSX.utils.book_new();
+
+  const wfSampleSizeSheet = XLSX.utils.aoa_to_sheet([
+    ['WF', 'Test-1', 'Test-2', 'R1CASN', 'R2CBCN'],
+    ['1', 'TestA', 'TestB', 12, 8],
+    ['2', 'TestC', '', 6, 6],
+  ]);
+  XLSX.utils.book_append_sheet(workbook, wfSampleSizeSheet, 'WF Sample Size');
+  XLSX.utils.book_append_sheet(workbook, XLSX.utils.aoa_to_sheet([['unused']]), 'Notes');
+
+  const systemTFData = [
+    ['Tracker'],
+    [],
+    ['FA#', 'Open Date', 'WF', 'Config', 'Failed Test', 'Failure Symptom', 'Priority'],
+  ];
+  for (let i = 1; i <= 150; i++) {
+    systemTFData.push([`FA-${i}`, `2025-12-${String((i % 28) + 1).padStart(2, '0')}`, String((i % 2) + 1), i % 3 ? 'R1CASN' : 'R2CBCN', i % 2 ? 'TestA' : 'TestC', `SYM${i % 4}`, 'P1']);
+  }
+  systemTFData.push([]);
+  systemTFData.push(['', '', '1', 'R1CASN']);
+  XLSX.utils.book_append_sheet(workbook, XLSX.utils.aoa_to_sheet(systemTFData), 'System TF');
+
+  const tmpFile = path.join(os.tmpdir(), `issue-analyzer-test-${Date.now()}-${Math.random().toString(16).slice(2)}.xlsx`);
+  try {
+    XLSX.writeFile(workbook, tmpFile);
+
+    const parsed = await parseExcelFile(tmpFile);
+    const streamedIssues = [];
+    const streamed = await streamExcelFile(tmpFile, async (issue) => {
+      streamedIssues.push(issue);
+    });
+
+    assert.equal(streamed.totalIssues, 150);
+    assert.deepEqual(streamed.sampleSizes, parsed.sampleSizes);
+    assert.deepEqual(streamed.configNames, parsed.configNames);
+    assert.deepEqual(streamed.validationReport, parsed.validationReport);
+    assert.equal(streamed.lastIssueDate, parsed.lastIssueDate);
+
+    // 流式解析不匹配 testId，按 testIdMatches 回填后与整表解析一致
+    const testIds = new Map(streamed.testIdMatches.map((m) => [`${m.wf}|${m.failedTest}`, m.testId]));
+    const backfilled = streamedIssues.map((issue) => ({
+      ...issue,
+      testId: testIds.get(`${issue.wf}|${issue.failedTest}`) || null,
+    }));
+    assert.deepEqual(backfilled, parsed.issues);
+  } finally {
+    try {
+      await fs.unlink(tmpFile);
+    } catch {
+      // ignore
+    }
+  }
+});
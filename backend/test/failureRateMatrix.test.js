@@ -0,0 +1,39 @@
+const test = require('node:test');
+const assert = require('node:assert/strict');
+const { initDatabase, closeDatabase, getDatabase } = require('../src/models/database');
+const analysisModel = require('../src/models/analysisModel');
+
+test('getFailureRateMatrix 单元格同时带 specCount / strifeCount / samples（text 只显示 Spec）', async () => {
+  await initDatabase();
+  const db = getDatabase();
+
+  const projectId = 940000000 + Math.round(Math.random() * 1000000);
+  db.prepare(`INSERT INTO projects (id, name, project_key, phase) VALUES (?, ?, ?, ?)`).run(projectId, 'FRM', 'FRM', 'EVT');
+  db.prepare(
+    `INSERT INTO sample_sizes (project_id, waterfall, tests, config_samples, test_name) VALUES (?, ?, ?, ?, ?)`
+  ).run(projectId, '1', JSON.stringify([{ testId: 'T1', testName: 'Alpha' }]), JSON.stringify({ R1CASN: 10, R2CBCN: 5, R3CBCN: 8 }), '');
+
+  const ins = db.prepare(
+    `INSERT INTO issues (project_id, fa_number, sn, open_date, wf, config, failed_test, failure_type, fa_status, failed_location, symptom, raw_data)
+     VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)`
+  );
+  // R1CASN：1 个 Spec + 2 个 Strife；R2CBCN：只有 Strife
+  ins.run(projectId, 'FA-1', 'SN-1', '2026-01-01', '1', 'R1CASN', 'Alpha', 'Spec.', 'open', 'L1', 'S1', '{}');
+  ins.run(projectId, 'FA-2', 'SN-2', '2026-01-02', '1', 'R1CASN', 'Alpha', 'Strife', 'open', 'L1', 'S1', '{}');
+  ins.run(projectId, 'FA-3', 'SN-3', '2026-01-03', '1', 'R1CASN', 'Alpha', 'Strife', 'open', 'L1', 'S2', '{}');
+  ins.run(projectId, 'FA-4', 'SN-4', '2026-01-04', '1', 'R2CBCN', 'Alpha', 'Strife', 'open', 'L2', 'S2', '{}');
+
+  const { matrix } = await analysisModel.getFailureRateMatrix(projectId);
+  const cells = matrix['1-0'].configs;
+
+  assert.deepEqual(cells.R1CASN, { text: '1F/10T', type: 'spec', specCount: 1, strifeCount: 2, samples: 10 });
+  assert.deepEqual(cells.R2CBCN, { text: '1SF/5T', type: 'strife', specCount: 0, strifeCount: 1, samples: 5 });
+  assert.deepEqual(cells.R3CBCN, { text: '0F/8T', type: 'none', specCount: 0, strifeCount: 0, samples: 8 });
+  assert.equal(cells.R4FNSN, null);
+
+  db.prepare(`DELETE FROM issues WHERE project_id = ?`).run(projectId);
+  db.prepare(`DELETE FROM sample_sizes WHERE project_id = ?`).run(projectId);
+  db.prepare(`DELETE FROM projects WHERE id = ?`).run(projectId);
+
+  await closeDatabase();
+});
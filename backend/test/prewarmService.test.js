@@ -0,0 +1,69 @@
+const test = require('node:test');
+const assert = require('node:assert/strict');
+const { initDatabase, closeDatabase, getDatabase } = require('../src/models/database');
+const prewarmService = require('../src/services/prewarmService');
+const cacheService = require('../src/services/cacheService');
+
+test('prewarmProject 按同一 project_key 下已保存的筛选去重后预热，第二次全部命中缓存', async () => {
+  await initDatabase();
+  const db = getDatabase();
+
+  const oldId = 930000000 + Math.round(Math.random() * 1000000);
+  const newId = oldId + 1;
+  const projectKey = `PW${oldId}`;
+  const insertProject = db.prepare(`INSERT INTO projects (id, name, project_key, phase) VALUES (?, ?, ?, ?)`);
+  insertProject.run(oldId, projectKey, projectKey, 'EVT');
+  insertProject.run(newId, projectKey, projectKey, 'DVT');
+
+  db.prepare(
+    `INSERT INTO sample_sizes (project_id, waterfall, tests, config_samples, test_name) VALUES (?, ?, ?, ?, ?)`
+  ).run(newId, '1', JSON.stringify([{ testId: 'T1', testName: 'Alpha' }]), JSON.stringify({ R1CASN: 10 }), '');
+  const ins = db.prepare(
+    `INSERT INTO issues (project_id, fa_number, sn, open_date, wf, config, failed_test, failure_type, fa_status, failed_location, symptom, raw_data)
+     VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)`
+  );
+  ins.run(newId, 'FA-1', 'SN-1', '2026-01-01', '1', 'R1CASN', 'Alpha', 'Spec.', 'open', 'L1', 'S1', '{}');
+  ins.run(newId, 'FA-2', 'SN-2', '2026-01-02', '1', 'R1CASN', 'Alpha', 'Strife', 'open', 'L2', 'S2', '{}');
+
+  // 筛选保存在旧快照上；两个用户保存了同一组条件（数组顺序不同），另有一条无法解析的旧数据
+  const insertFilter = db.prepare(`INSERT INTO saved_filters (user_id, project_id, name, filters) VALUES (?, ?, ?, ?)`);
+  insertFilter.run(1, oldId, 'spec', JSON.stringify({ failure_types: ['Spec.', 'Strife'] }));
+  insertFilter.run(2, oldId, 'spec again', JSON.stringify({ failure_types: ['Strife', 'Spec.'] }));
+  insertFilter.run(1, oldId, 'wf1', JSON.stringify({ wfs: ['1'] }));
+  insertFilter.run(1, oldId, 'broken', 'not json');
+
+  cacheService.clearProjectCache(newId);
+
+  const sets = prewarmService.collectFilterSets({ id: newId, project_key: projectKey });
+  assert.deepEqual(sets[0], { name: '(all)', filters: {} });
+  assert.equal(sets.length, 3);
+
+  const report = await prewarmService.prewarmProject(newId, { concurrency: 2 });
+  assert.equal(report.projectId, newId);
+  assert.equal(report.filters, 3);
+  assert.equal(report.queries, 9);
+  assert.equal(report.computed, 9);
+  assert.equal(report.errors, 0);
+  assert.equal(report.items.length, 3);
+
+  // 与浏览器请求同样的缓存键
+  const wf1 = { wfs: ['1'] };
+  assert.ok(cacheService.getFromMemory(cacheService.generateCacheKey('analysis', newId, wf1)) !== undefined);
+  assert.ok(cacheService.getFromMemory(cacheService.generateCacheKey('filter_stats_true', newId, wf1)) !== undefined);
+  assert.ok(cacheService.getFromMemory(cacheService.generateCacheKey('failure_matrix', newId, wf1)) !== undefined);
+
+  const again = await prewarmService.prewarmProject(newId, { concurrency: 1 });
+  assert.equal(again.computed, 0);
+  assert.equal(again.cacheHits, 9);
+
+  assert.equal(prewarmService.collectFilterSets({ id: newId, project_key: projectKey }, 1).length, 2);
+  await assert.rejects(() => prewarmService.prewarmProject(newId + 1000000000), { statusCode: 404 });
+
+  cacheService.clearProjectCache(newId);
+  db.prepare(`DELETE FROM saved_filters WHERE project_id = ?`).run(oldId);
+  db.prepare(`DELETE FROM issues WHERE project_id = ?`).run(newId);
+  db.prepare(`DELETE FROM sample_sizes WHERE project_id = ?`).run(newId);
+  db.prepare(`DELETE FROM projects WHERE id IN (?, ?)`).run(oldId, newId);
+
+  await closeDatabase();
+});
@@ -0,0 +1,136 @@
+const test = require('node:test');
+const assert = require('node:assert/strict');
+
+const serverTiming = require('../src/middleware/serverTiming');
+const { cacheStatus, formatServerTiming } = serverTiming;
+const cacheService = require('../src/services/cacheService');
+
+function createMockRes() {
+  const headers = {};
+  let jsonBody;
+  return {
+    headers,
+    headersSent: false,
+    get jsonBody() {
+      return jsonBody;
+    },
+    set(name, value) {
+      headers[name.toLowerCase()] = value;
+      return this;
+    },
+    json(payload) {
+      jsonBody = payload;
+      return this;
+    },
+  };
+}
+
+// 模拟一个路由：在中间件注入的上下文里执行 handler，结束时 res.json
+function runRoute(handler, headers = {}) {
+  const res = createMockRes();
+  return new Promise((resolve, reject) => {
+    serverTiming()({ method: 'GET', headers }, res, () => {
+      handler()
+        .then((data) => {
+          res.json({ success: true, data });
+          resolve(res);
+        })
+        .catch(reject);
+    });
+  });
+}
+
+function uniqueKey(prefix) {
+  return `${prefix}:${Date.now()}:${Math.random().toString(16).slice(2)}`;
+}
+
+test('cacheStatus 按命中比例返回 HIT/MISS/PARTIAL，无查找时返回 null', () => {
+  assert.equal(cacheStatus({ lookups: 0, hits: 0 }), null);
+  assert.equal(cacheStatus({ lookups: 2, hits: 2 }), 'HIT');
+  assert.equal(cacheStatus({ lookups: 2, hits: 0 }), 'MISS');
+  assert.equal(cacheStatus({ lookups: 3, hits: 1 }), 'PARTIAL');
+});
+
+test('formatServerTiming 输出 cache/fetch/total 指标', () => {
+  assert.equal(
+    formatServerTiming({ lookups: 2, hits: 1, fetchMs: 12.345 }, 20),
+    'cache;desc="1/2 hit", fetch;dur=12.3, total;dur=20.0'
+  );
+  assert.equal(formatServerTiming({ lookups: 0, hits: 0, fetchMs: 0 }, 1.26), 'total;dur=1.3');
+});
+
+test('serverTiming 首次请求为 MISS，再次请求命中内存缓存为 HIT', async () => {
+  const key = uniqueKey('timing');
+  let calls = 0;
+  const handler = () =>
+    cacheService.getOrFetch(
+      key,
+      async () => {
+        calls += 1;
+        await new Promise((resolve) => setTimeout(resolve, 5));
+        return { value: 42 };
+      },
+      60 * 1000
+    );
+
+  const first = await runRoute(handler);
+  assert.equal(first.headers['x-cache'], 'MISS');
+  assert.match(first.headers['server-timing'], /^cache;desc="0\/1 hit", fetch;dur=\d+\.\d, total;dur=\d+\.\d$/);
+  assert.deepEqual(first.jsonBody, { success: true, data: { value: 42 } });
+
+  const second = await runRoute(handler);
+  assert.equal(second.headers['x-cache'], 'HIT');
+  assert.match(second.headers['server-timing'], /cache;desc="1\/1 hit", fetch;dur=0\.0/);
+  assert.equal(calls, 1);
+
+  cacheService.delete(key);
+});
+
+test('serverTiming 并发请求各自统计，混合命中为 PARTIAL', async () => {
+  const hitKey = uniqueKey('timing-hit');
+  const missKey = uniqueKey('timing-miss');
+  cacheService.setToMemory(hitKey, { cached: true }, 60 * 1000);
+
+  const [mixed, plain] = await Promise.all([
+    runRoute(async () => {
+      const a = await cacheService.getOrFetch(hitKey, async () => ({ cached: false }), 60 * 1000);
+      const b = await cacheService.getOrFetch(missKey, async () => ({ computed: true }), 60 * 1000);
+      return { a, b };
+    }),
+    runRoute(async () => ({ noCache: true })),
+  ]);
+
+  assert.equal(mixed.headers['x-cache'], 'PARTIAL');
+  assert.match(mixed.headers['server-timing'], /cache;desc="1\/2 hit"/);
+  assert.equal(plain.headers['x-cache'], undefined);
+  assert.match(plain.headers['server-timing'], /^total;dur=\d+\.\d$/);
+
+  cacheService.delete(hitKey);
+  cacheService.delete(missKey);
+});
+
+test('X-Cache-Bypass: 1 跳过缓存读取并重新计算，结果写回同一个键', async () => {
+  const key = uniqueKey('timing-bypass');
+  let calls = 0;
+  const handler = () =>
+    cacheService.getOrFetch(
+      key,
+      async () => {
+        calls += 1;
+        return { value: calls };
+      },
+      60 * 1000
+    );
+
+  await runRoute(handler);
+  const bypassed = await runRoute(handler, { 'x-cache-bypass': '1' });
+  assert.equal(bypassed.headers['x-cache'], 'MISS');
+  assert.deepEqual(bypassed.jsonBody.data, { value: 2 });
+
+  const after = await runRoute(handler);
+  assert.equal(after.headers['x-cache'], 'HIT');
+  assert.deepEqual(after.jsonBody.data, { value: 2 });
+  assert.equal(calls, 2);
+
+  cacheService.delete(key);
+});
@@ -0,0 +1,113 @@
+const test = require('node:test');
+const assert = require('node:assert/strict');
+const crypto = require('node:crypto');
+const os = require('node:os');
+const path = require('node:path');
+const fs = require('node:fs/promises');
+const { Readable } = require('node:stream');
+
+const { UploadSessionService } = require('../src/services/uploadSessionService');
+
+function createTempSessionDir() {
+  return path.join(os.tmpdir(), `issue-analyzor-uploads-${Date.now()}-${Math.random().toString(16).slice(2)}`);
+}
+
+function sha256(buffer) {
+  return crypto.createHash('sha256').update(buffer).digest('hex');
+}
+
+test('分片追加：offset 不匹配返回 409，重新创建会话从已收到的 offset 续传，完成时校验 sha256', async () => {
+  const sessionDir = createTempSessionDir();
+  const service = new UploadSessionService({ sessionDir });
+  const content = crypto.randomBytes(10000);
+  const params = { userId: 1, fileName: 'M60 EVT.xlsx', size: content.length, sha256: sha256(content) };
+
+  try {
+    const created = await service.create(params);
+    assert.match(created.uploadId, /^[0-9a-f]{32}$/);
+    assert.equal(created.offset, 0);
+
+    const afterFirst = await service.append(created.uploadId, 1, 0, Readable.from([content.subarray(0, 4000)]));
+    assert.equal(afterFirst.offset, 4000);
+
+    await assert.rejects(
+      service.append(created.uploadId, 1, 0, Readable.from([content.subarray(0, 4000)])),
+      (error) => error.statusCode === 409 && error.code === 'UPLOAD_OFFSET_MISMATCH'
+    );
+    await assert.rejects(
+      service.complete(created.uploadId, 1, async () => assert.fail('handler should not run')),
+      (error) => error.statusCode === 409 && error.code === 'UPLOAD_INCOMPLETE'
+    );
+
+    // 中断后重新创建：同一个 uploadId，offset 为已收到的字节数；其他用户看不到这个会话
+    const resumed = await service.create(params);
+    assert.equal(resumed.uploadId, created.uploadId);
+    assert.equal(resumed.offset, 4000);
+    await assert.rejects(service.get(created.uploadId, 2), (error) => error.statusCode === 404);
+
+    await service.append(created.uploadId, 1, 4000, Readable.from([content.subarray(4000)]));
+
+    let received = null;
+    const result = await service.complete(created.uploadId, 1, async (filePath, session) => {
+      received = await fs.readFile(filePath);
+      assert.equal(session.fileName, 'M60 EVT.xlsx');
+      return { imported: true };
+    });
+    assert.deepEqual(result, { imported: true });
+    assert.ok(received.equals(content));
+
+    // 完成后会话被删除
+    await assert.rejects(service.get(created.uploadId, 1), (error) => error.code === 'UPLOAD_NOT_FOUND');
+    assert.deepEqual(await fs.readdir(sessionDir), []);
+  } finally {
+    await fs.rm(sessionDir, { recursive: true, force: true });
+  }
+});
+
+test('拒绝非 Excel 文件、超出声明大小的分片和 sha256 不匹配的文件', async () => {
+  const sessionDir = createTempSessionDir();
+  const service = new UploadSessionService({ sessionDir });
+  const content = Buffer.from('not really a workbook');
+
+  try {
+    await assert.rejects(
+      service.create({ userId: 1, fileName: 'notes.txt', size: 10, sha256: sha256(content) }),
+      (error) => error.statusCode === 400 && error.code === 'INVALID_FILE_TYPE'
+    );
+    await assert.rejects(
+      service.create({ userId: 1, fileName: 'a.xlsx', size: 10, sha256: 'abc' }),
+      (error) => error.statusCode === 400
+    );
+
+    const session = await service.create({ userId: 1, fileName: 'a.xlsx', size: content.length, sha256: sha256(Buffer.from('other')) });
+    await assert.rejects(
+      service.append(session.uploadId, 1, 0, Readable.from([Buffer.concat([content, Buffer.from('!')])])),
+      (error) => error.statusCode === 413
+    );
+
+    const { offset } = await service.get(session.uploadId, 1);
+    await service.append(session.uploadId, 1, offset, Readable.from([content.subarray(offset)]));
+    await assert.rejects(
+      service.complete(session.uploadId, 1, async () => assert.fail('handler should not run')),
+      (error) => error.statusCode === 422 && error.code === 'UPLOAD_CHECKSUM_MISMATCH'
+    );
+    await assert.rejects(service.get(session.uploadId, 1), (error) => error.statusCode === 404);
+  } finally {
+    await fs.rm(sessionDir, { recursive: true, force: true });
+  }
+});
+
+test('cleanupExpired 删除超过保留时间未更新的会话', async () => {
+  const sessionDir = createTempSessionDir();
+  const service = new UploadSessionService({ sessionDir, ttlHours: 1 });
+  const content = Buffer.from('abc');
+
+  try {
+    const session = await service.create({ userId: 1, fileName: 'a.xls', size: content.length, sha256: sha256(content) });
+    assert.equal(await service.cleanupExpired(), 0);
+    assert.equal(await service.cleanupExpired(Date.now() + 2 * 60 * 60 * 1000), 1);
+    await assert.rejects(service.get(session.uploadId, 1), (error) => error.statusCode === 404);
+  } finally {
+    await fs.rm(sessionDir, { recursive: true, force: true });
+  }
+});
@@ -0,0 +1,1726 @@
+import array
+import base64
+import collections
+import functools
+import hashlib
+import itertools
+import json
+import os
+import re
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from datetime import datetime, timedelta, timezone
+
+from issue_local import _OPTION_FIELDS, _OPTION_FILTER_ORDER, LocalMirror, LocalSession, _js_round
+from issue_transport import (
+  LOGIN_PATH, READ_CHUNK_SIZE, ConnectionPool, HttpError, _build_url, _http_json, _maybe_get_env, _open_json, _use_thread_transport, get_transport,
+  iter_json_items, iter_response_body,
+)
+
+
+FILTER_SPECS = [
+  {"name": "date_from", "type": "string", "example": "2025-12-01", "desc": "Open Date 起始（含）"},
+  {"name": "date_to", "type": "string", "example": "2025-12-31", "desc": "Open Date 结束（含）"},
+  {"name": "priorities", "type": "csv", "example": "P0,P1", "desc": "Priority 多选"},
+  {"name": "sample_statuses", "type": "csv", "example": "Fail,Pass", "desc": "Sample Status 多选"},
+  {"name": "departments", "type": "csv", "example": "EE,ME", "desc": "Department 多选"},
+  {"name": "wfs", "type": "csv", "example": "1,2,3", "desc": "WF 多选"},
+  {"name": "configs", "type": "csv", "example": "R1CASN,R2CBCN", "desc": "Config 多选"},
+  {"name": "failed_tests", "type": "csv", "example": "Test A,Test B", "desc": "Failed Test 多选"},
+  {"name": "test_ids", "type": "csv", "example": "Test1,Test2", "desc": "Test ID 多选"},
+  {"name": "failure_types", "type": "csv", "example": "Spec.,Strife", "desc": "Failure Type 多选"},
+  {"name": "function_cosmetic", "type": "csv", "example": "Function,Cosmetic", "desc": "Function/Cosmetic 多选"},
+  {"name": "failed_locations", "type": "csv", "example": "ISB,USB", "desc": "Failed Location 多选"},
+  {"name": "symptoms", "type": "csv", "example": "Rattle lv3", "desc": "Symptom 多选"},
+  {"name": "fa_statuses", "type": "csv", "example": "open,close", "desc": "FA Status 多选"},
+  {"name": "unit_number", "type": "string", "example": "Unit123", "desc": "Unit# 模糊搜索"},
+  {"name": "sn", "type": "string", "example": "SN001", "desc": "SN 模糊搜索"},
+  {"name": "fa_search", "type": "string", "example": "FA-2025", "desc": "FA# 模糊搜索"},
+  {"name": "page", "type": "int", "example": "1", "desc": "分页页码（仅 issues 接口使用）"},
+  {"name": "limit", "type": "int", "example": "100", "desc": "分页大小（issues 接口默认 100）"},
+  {"name": "sort_by", "type": "string", "example": "open_date", "desc": "排序字段（issues）"},
+  {"name": "sort_order", "type": "string", "example": "DESC", "desc": "排序方向（ASC/DESC）"},
+  {"name": "includeTrend", "type": "bool", "example": "false", "desc": "filter-statistics 是否返回趋势"},
+]
+
+STATS_KINDS = {
+  "symptom": {"path": ["statistics", "symptomDistribution"], "key": "symptom"},
+  "wf": {"path": ["statistics", "wfDistribution"], "key": "wf"},
+  "config": {"path": ["statistics", "configDistribution"], "key": "config"},
+  "failed_test": {"path": ["statistics", "failedTestDistribution"], "key": "testName"},
+  "failed_location": {"path": ["statistics", "failedLocationDistribution"], "key": "failedLocation"},
+  "failure_type": {"path": ["statistics", "failureTypeDistribution"], "key": "type"},
+  "function_cosmetic": {"path": ["statistics", "functionCosmeticDistribution"], "key": "category"},
+  "fa_status": {"path": ["statistics", "faStatusDistribution"], "key": "status"},
+}
+
+# failure-matrix --rollup/--pivot 的维度名 -> 输出列名
+MATRIX_DIMENSIONS = {"wf": "wf", "test": "testName", "config": "config"}
+
+TOKEN_REFRESH_MARGIN_SECONDS = 300
+
+BATCH_MAX_QUERIES = 100
+
+RESPONSE_CACHE_VERSION = 1
+RESPONSE_CACHE_TTL_SECONDS = 7 * 24 * 3600
+RESPONSE_CACHE_MAX_BYTES = 256 * 1024 * 1024
+PROJECTS_CACHE_TTL_SECONDS = 60
+PROJECTS_PAGE_SIZE = 200
+
+SNAPSHOT_WORKERS = 4
+
+COMPACT_PAGE_SIZE = 1000
+
+ISSUES_ALL_PAGE_SIZE = 500
+ISSUES_ALL_WORKERS = 4
+
+LOCAL_DB_FILENAME = "mirror.sqlite3"
+
+SWEEP_WORKERS = 4
+
+EXPORT_KINDS = {"excel": "export/excel", "matrix": "export/matrix", "cross": "export/cross"}
+EXPORT_WORKERS = 4
+# 服务端 upload_time 是不带时区的北京时间（projectImportService.beijingTimestamp），不能按本机时区解析
+UPLOAD_TIME_TZ = timezone(timedelta(hours=8))
+
+# prewarm：与服务端 prewarmService 的 PREWARM_QUERIES 一致（filter-statistics 与 FilterResultsPage 一样带 includeTrend=true）
+PREWARM_QUERIES = [
+  {"id": "analysis", "endpoint": "analysis", "filters": {}},
+  {"id": "filter-statistics", "endpoint": "filter-statistics", "filters": {"includeTrend": "true"}},
+  {"id": "failure-rate-matrix", "endpoint": "failure-rate-matrix", "filters": {}},
+]
+PREWARM_WORKERS = 2
+PREWARM_MAX_FILTERS = 20
+
+UPLOAD_PATH = "/api/projects/uploads"
+UPLOAD_CHUNK_SIZE = 4 * 1024 * 1024
+UPLOAD_MAX_RETRIES = 5
+UPLOAD_RETRY_MAX_DELAY = 30
+
+ASYNC_MAX_CONCURRENCY = 16
+ASYNC_ITER_BATCH = 500
+
+EXPIRES_IN_UNITS = {
+  "ms": 0.001,
+  "s": 1,
+  "sec": 1,
+  "second": 1,
+  "seconds": 1,
+  "m": 60,
+  "min": 60,
+  "minute": 60,
+  "minutes": 60,
+  "h": 3600,
+  "hour": 3600,
+  "hours": 3600,
+  "d": 86400,
+  "day": 86400,
+  "days": 86400,
+  "w": 7 * 86400,
+  "week": 7 * 86400,
+  "weeks": 7 * 86400,
+  "y": 365.25 * 86400,
+  "year": 365.25 * 86400,
+  "years": 365.25 * 86400,
+}
+
+
+def _parse_csv(value):
+  if value is None:
+    return None
+  if isinstance(value, list):
+    items = []
+    for v in value:
+      items.extend([x.strip() for x in str(v).split(",")])
+    items = [x for x in items if x]
+    return ",".join(items) if items else None
+  items = [x.strip() for x in str(value).split(",")]
+  items = [x for x in items if x]
+  return ",".join(items) if items else None
+
+
+def _user_cache_dir():
+  override = _maybe_get_env("ISSUE_ANALYZOR_CACHE_DIR")
+  if override:
+    return override
+  if os.name == "nt":
+    root = _maybe_get_env("LOCALAPPDATA") or os.path.join(os.path.expanduser("~"), "AppData", "Local")
+  else:
+    root = _maybe_get_env("XDG_CACHE_HOME") or os.path.join(os.path.expanduser("~"), ".cache")
+  return os.path.join(root, "issue_analyzor")
+
+
+def _write_private_file(path, data):
+  os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+  tmp = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+  fd = os.open(tmp, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600)
+  try:
+    with os.fdopen(fd, "wb") as f:
+      f.write(data.encode("utf-8") if isinstance(data, str) else data)
+    os.chmod(tmp, 0o600)
+    os.replace(tmp, path)
+  except Exception:
+    try:
+      os.unlink(tmp)
+    except OSError:
+      pass
+    raise
+
+
+def _parse_expires_in(value):
+  if value is None or isinstance(value, bool):
+    return None
+  if isinstance(value, (int, float)):
+    return float(value)
+  m = re.fullmatch(r"\s*(\d+(?:\.\d+)?)\s*([a-zA-Z]*)\s*", str(value))
+  if not m:
+    return None
+  unit = m.group(2).lower() or "s"
+  if unit not in EXPIRES_IN_UNITS:
+    return None
+  return float(m.group(1)) * EXPIRES_IN_UNITS[unit]
+
+
+def _jwt_exp(token):
+  try:
+    payload = token.split(".")[1]
+    payload += "=" * (-len(payload) % 4)
+    exp = json.loads(base64.urlsafe_b64decode(payload.encode("ascii"))).get("exp")
+    return float(exp) if exp else None
+  except Exception:
+    return None
+
+
+class TokenStore:
+  """JWT 磁盘缓存：按 base + username 保存 token 与过期时间（文件权限 0600）。"""
+
+  def __init__(self, path=None, margin=TOKEN_REFRESH_MARGIN_SECONDS):
+    self.path = path or _maybe_get_env("ISSUE_ANALYZOR_TOKEN_CACHE") or os.path.join(_user_cache_dir(), "tokens.json")
+    self.margin = margin
+    self._lock = threading.Lock()
+
+  @staticmethod
+  def _key(base, username):
+    return f"{base.rstrip('/')}|{username}"
+
+  def _load(self):
+    try:
+      with open(self.path, "r", encoding="utf-8") as f:
+        data = json.load(f)
+      return data if isinstance(data, dict) else {}
+    except (OSError, ValueError):
+      return {}
+
+  def _save(self, data):
+    try:
+      _write_private_file(self.path, json.dumps(data, ensure_ascii=False))
+    except OSError as e:
+      sys.stderr.write(f"WARN: token cache not saved: {e}\n")
+
+  def get(self, base, username):
+    entry = self._load().get(self._key(base, username))
+    if not isinstance(entry, dict) or not entry.get("token"):
+      return None
+    if float(entry.get("expires_at") or 0) - self.margin <= time.time():
+      return None
+    return entry["token"]
+
+  def put(self, base, username, token, expires_at):
+    with self._lock:
+      now = time.time()
+      data = {k: v for k, v in self._load().items() if isinstance(v, dict) and float(v.get("expires_at") or 0) > now}
+      data[self._key(base, username)] = {"token": token, "expires_at": expires_at}
+      self._save(data)
+
+  def discard(self, base, username, token=None):
+    with self._lock:
+      data = self._load()
+      entry = data.get(self._key(base, username))
+      if not isinstance(entry, dict) or (token and entry.get("token") != token):
+        return
+      del data[self._key(base, username)]
+      self._save(data)
+
+
+def _normalize_params(params):
+  # 对齐后端 CacheService._normalizeFilters（test_client.py 校验）；另外把逗号分隔的多选字符串也拆开排序
+  csv_names = {spec["name"] for spec in FILTER_SPECS if spec["type"] == "csv"}
+  normalized = {}
+  for key in sorted(params or {}):
+    value = params[key]
+    if value is None or value == "":
+      continue
+    if isinstance(value, (list, tuple)):
+      items = sorted(str(v) for v in value if v is not None and v != "")
+      if items:
+        normalized[key] = items
+    elif key in csv_names:
+      items = sorted(x.strip() for x in str(value).split(",") if x.strip())
+      if items:
+        normalized[key] = ",".join(items)
+    else:
+      normalized[key] = str(value)
+  return normalized
+
+
+_CACHE_MISS = object()
+
+
+class ResponseCache:
+  """GET 响应磁盘缓存：每个 key 一个文件，读命中时刷新 mtime，总大小超限时按 mtime 淘汰最久未用的条目。"""
+
+  def __init__(self, root=None, ttl=RESPONSE_CACHE_TTL_SECONDS, max_bytes=RESPONSE_CACHE_MAX_BYTES):
+    self.root = root or os.path.join(_user_cache_dir(), "responses")
+    self.ttl = ttl
+    self.max_bytes = max_bytes
+    self._size = None
+    self._lock = threading.Lock()
+
+  @staticmethod
+  def make_key(base, path, params=None):
+    normalized = json.dumps(_normalize_params(params), ensure_ascii=False, sort_keys=True)
+    return f"v{RESPONSE_CACHE_VERSION}|{base.rstrip('/')}|{path}|{normalized}"
+
+  def _path(self, key):
+    return os.path.join(self.root, hashlib.sha256(key.encode("utf-8")).hexdigest() + ".json")
+
+  def get(self, key, ttl=None):
+    entry = self._load(key, ttl)
+    if entry is _CACHE_MISS:
+      return entry
+    if "response" in entry:
+      return (entry.get("response") or {}).get("data")
+    return entry.get("data")
+
+  def _load(self, key, ttl=None):
+    path = self._path(key)
+    try:
+      with open(path, "r", encoding="utf-8") as f:
+        entry = json.load(f)
+    except (OSError, ValueError):
+      return _CACHE_MISS
+    if not isinstance(entry, dict) or entry.get("key") != key:
+      return _CACHE_MISS
+    ttl = self.ttl if ttl is None else ttl
+    if float(entry.get("stored_at") or 0) + ttl <= time.time():
+      return _CACHE_MISS
+    try:
+      os.utime(path)
+    except OSError:
+      pass
+    return entry
+
+  @staticmethod
+  def _header(key):
+    # 首行只含 key/stored_at，流式读取时先校验首行再解析正文
+    return '{"key": %s, "stored_at": %r,\n' % (json.dumps(key, ensure_ascii=False), time.time())
+
+  def put(self, key, data):
+    path = self._path(key)
+    raw = self._header(key) + '"data": ' + json.dumps(data, ensure_ascii=False) + "}"
+    try:
+      old_size = os.path.getsize(path) if os.path.exists(path) else 0
+      _write_private_file(path, raw)
+    except OSError as e:
+      sys.stderr.write(f"WARN: response cache not saved: {e}\n")
+      return
+    self._account(len(raw.encode("utf-8")) - old_size)
+
+  def _account(self, delta):
+    with self._lock:
+      if self._size is None:
+        self._size = self._scan_size()
+      else:
+        self._size += delta
+      if self._size > self.max_bytes:
+        self._evict()
+
+  def open_stream(self, key, ttl=None):
+    path = self._path(key)
+    try:
+      f = open(path, "rb")
+    except OSError:
+      return None
+    try:
+      header = json.loads(f.readline().decode("utf-8").rstrip().rstrip(",") + "}")
+      body_field = f.read(16).decode("utf-8", errors="replace").split('"')[1]
+    except (OSError, ValueError, IndexError):
+      f.close()
+      return None
+    ttl = self.ttl if ttl is None else ttl
+    if header.get("key") != key or float(header.get("stored_at") or 0) + ttl <= time.time() or body_field not in ("data", "response"):
+      f.close()
+      return None
+    try:
+      os.utime(path)
+    except OSError:
+      pass
+
+    def chunks():
+      with f:
+        f.seek(0)
+        while True:
+          chunk = f.read(READ_CHUNK_SIZE)
+          if not chunk:
+            return
+          yield chunk
+
+    return chunks(), body_field
+
+  def tee(self, key, chunks):
+    # 只有调用方读完并 commit 后才替换正式条目
+    return _CacheTee(self, key, chunks)
+
+  def _entries(self):
+    entries = []
+    try:
+      names = os.listdir(self.root)
+    except OSError:
+      return entries
+    for name in names:
+      if not name.endswith(".json"):
+        continue
+      path = os.path.join(self.root, name)
+      try:
+        st = os.stat(path)
+      except OSError:
+        continue
+      entries.append((st.st_mtime, st.st_size, path))
+    return entries
+
+  def _scan_size(self):
+    return sum(size for _, size, _ in self._entries())
+
+  def _evict(self):
+    entries = sorted(self._entries())
+    total = sum(size for _, size, _ in entries)
+    target = self.max_bytes * 0.9
+    for _, size, path in entries:
+      if total <= target:
+        break
+      try:
+        os.unlink(path)
+        total -= size
+      except OSError:
+        pass
+    self._size = total
+
+
+class _CacheTee:
+  def __init__(self, cache, key, chunks):
+    self._cache = cache
+    self._key = key
+    self._chunks = chunks
+    self._path = cache._path(key)
+    self._tmp = f"{self._path}.{os.getpid()}.{threading.get_ident()}.tmp"
+    self._file = None
+    self._size = 0
+    try:
+      os.makedirs(cache.root, exist_ok=True)
+      fd = os.open(self._tmp, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600)
+      self._file = os.fdopen(fd, "wb")
+      self._write((cache._header(key) + '"response": ').encode("utf-8"))
+    except OSError as e:
+      sys.stderr.write(f"WARN: response cache not saved: {e}\n")
+      self.abort()
+
+  def _write(self, data):
+    if self._file is None:
+      return
+    try:
+      self._file.write(data)
+      self._size += len(data)
+    except OSError as e:
+      sys.stderr.write(f"WARN: response cache not saved: {e}\n")
+      self.abort()
+
+  def __iter__(self):
+    for chunk in self._chunks:
+      self._write(chunk)
+      yield chunk
+
+  def commit(self):
+    for chunk in self._chunks:
+      self._write(chunk)
+    if self._file is None:
+      return
+    self._write(b"}")
+    try:
+      old_size = os.path.getsize(self._path) if os.path.exists(self._path) else 0
+      self._file.close()
+      self._file = None
+      os.replace(self._tmp, self._path)
+    except OSError as e:
+      sys.stderr.write(f"WARN: response cache not saved: {e}\n")
+      self.abort()
+      return
+    self._cache._account(self._size - old_size)
+
+  def abort(self):
+    f, self._file = self._file, None
+    if f is not None:
+      f.close()
+    try:
+      os.unlink(self._tmp)
+    except OSError:
+      pass
+
+
+def login_data(base, username, password):
+  url = _build_url(base, LOGIN_PATH)
+  data = _http_json("POST", url, body_obj={"username": username, "password": password}, timeout=60)
+  payload = (data or {}).get("data") if isinstance(data, dict) else None
+  if not isinstance(payload, dict) or not payload.get("token"):
+    raise RuntimeError(f"Login failed: {data}")
+  return payload
+
+
+def login(base, username, password):
+  return login_data(base, username, password)["token"]
+
+
+def api_get(base, token, path, params=None):
+  url = _build_url(base, path, params=params)
+  headers = {"Authorization": f"Bearer {token}"}
+  data = _http_json("GET", url, headers=headers, timeout=120)
+  if not isinstance(data, dict) or not data.get("success"):
+    raise RuntimeError(f"Unexpected response: {data}")
+  return data.get("data")
+
+
+def api_get_if_changed(base, token, path, params=None, etag=None):
+  # 服务端返回 304 时不下载 body，返回 (None, etag)
+  url = _build_url(base, path, params=params)
+  headers = {"Authorization": f"Bearer {token}"}
+  if etag:
+    headers["If-None-Match"] = etag
+  with _open_json("GET", url, headers=headers, timeout=120) as resp:
+    if resp.status == 304:
+      # 304 没有 body，读一次让连接可以放回连接池
+      resp.read()
+      return None, etag
+    raw = b"".join(iter_response_body(resp)).decode("utf-8", errors="replace")
+    new_etag = resp.headers.get("ETag")
+  data = json.loads(raw) if raw else None
+  if not isinstance(data, dict) or not data.get("success"):
+    raise RuntimeError(f"Unexpected response: {data}")
+  return data.get("data"), new_etag
+
+
+def api_get_raw(base, token, path, params=None, headers=None, timeout=300):
+  url = _build_url(base, path, params=params)
+  with _open_json("GET", url, headers={"Authorization": f"Bearer {token}", **(headers or {})}, timeout=timeout) as resp:
+    size = sum(len(chunk) for chunk in iter_response_body(resp))
+    return size, resp.headers
+
+
+def api_post(base, token, path, body_obj, timeout=300):
+  url = _build_url(base, path)
+  headers = {"Authorization": f"Bearer {token}"}
+  data = _http_json("POST", url, headers=headers, body_obj=body_obj, timeout=timeout)
+  if not isinstance(data, dict) or not data.get("success"):
+    raise RuntimeError(f"Unexpected response: {data}")
+  return data.get("data")
+
+
+def api_download(base, token, path, params, dest, timeout=300):
+  # 先写 dest.part，完整写完再改名
+  url = _build_url(base, path, params=params)
+  headers = {"Authorization": f"Bearer {token}", "Accept": "*/*"}
+  tmp = dest + ".part"
+  size = 0
+  with _open_json("GET", url, headers=headers, timeout=timeout) as resp:
+    try:
+      with open(tmp, "wb") as f:
+        for chunk in iter_response_body(resp):
+          f.write(chunk)
+          size += len(chunk)
+    except BaseException:
+      try:
+        os.remove(tmp)
+      except OSError:
+        pass
+      raise
+  os.replace(tmp, dest)
+  return size
+
+
+def api_put_bytes(base, token, path, data, headers=None, timeout=300):
+  url = _build_url(base, path)
+  req_headers = {"Authorization": f"Bearer {token}", "Content-Type": "application/octet-stream"}
+  if headers:
+    req_headers.update(headers)
+  result = _http_json("PUT", url, headers=req_headers, timeout=timeout, body=data)
+  if not isinstance(result, dict) or not result.get("success"):
+    raise RuntimeError(f"Unexpected response: {result}")
+  return result.get("data")
+
+
+class AuthSession:
+  """懒登录会话：优先复用 TokenStore 里的 token，只有服务端返回 401 时才重新登录一次。"""
+
+  def __init__(self, base, username, password_provider, token_store=None, response_cache=None, refresh_cache=False):
+    self.base = base
+    self.username = username
+    self._password_provider = password_provider
+    self._password = None
+    self.token_store = token_store
+    self.response_cache = response_cache
+    self.refresh_cache = refresh_cache
+    self._token = None
+    self._lock = threading.Lock()
+
+  def _login(self):
+    if self._password is None:
+      self._password = self._password_provider()
+    payload = login_data(self.base, self.username, self._password)
+    token = payload["token"]
+    expires_at = _jwt_exp(token)
+    if expires_at is None:
+      ttl = _parse_expires_in(payload.get("expiresIn"))
+      expires_at = time.time() + ttl if ttl else None
+    if self.token_store is not None and expires_at:
+      self.token_store.put(self.base, self.username, token, expires_at)
+    return token
+
+  def token(self):
+    with self._lock:
+      if self._token is None and self.token_store is not None:
+        self._token = self.token_store.get(self.base, self.username)
+      if self._token is None:
+        self._token = self._login()
+      return self._token
+
+  def _refresh(self, rejected):
+    with self._lock:
+      if self._token == rejected:
+        if self.token_store is not None:
+          self.token_store.discard(self.base, self.username, rejected)
+        self._token = self._login()
+      return self._token
+
+  def _with_token(self, call):
+    token = self.token()
+    try:
+      return call(token)
+    except HttpError as e:
+      if e.status != 401:
+        raise
+    return call(self._refresh(token))
+
+  def cached(self, path, params, fetch, ttl=None):
+    # --refresh 时跳过读取但仍写回
+    cache = self.response_cache
+    if cache is None:
+      return fetch()
+    key = cache.make_key(self.base, path, params)
+    if not self.refresh_cache:
+      hit = cache.get(key, ttl=ttl)
+      if hit is not _CACHE_MISS:
+        return hit
+    data = fetch()
+    cache.put(key, data)
+    return data
+
+  def get(self, path, params=None, ttl=None, cache=True):
+    # cache=False：不读写 response_cache（逐页遍历、因用户而异的接口）
+    fetch = lambda: self._with_token(lambda token: api_get(self.base, token, path, params=params))
+    return self.cached(path, params, fetch, ttl=ttl) if cache else fetch()
+
+  def stream(self, path, params, item_path, meta):
+    # 命中 response_cache 时直接从缓存文件流式读取；未命中时边解析边把响应写入缓存
+    cache = self.response_cache
+    key = cache.make_key(self.base, path, params) if cache is not None else None
+    if cache is not None and not self.refresh_cache:
+      hit = cache.open_stream(key)
+      if hit is not None:
+        chunks, body_field = hit
+        if body_field == "response":
+          yield from iter_json_items(chunks, ("response",) + tuple(item_path), meta, strip=1)
+        else:
+          meta[("success",)] = True
+          yield from iter_json_items(chunks, ("data",) + tuple(item_path[1:]), meta)
+        return
+
+    url = _build_url(self.base, path, params=params)
+    token = self.token()
+    try:
+      resp = _open_json("GET", url, headers={"Authorization": f"Bearer {token}"}, timeout=300)
+    except HttpError as e:
+      if e.status != 401:
+        raise
+      token = self._refresh(token)
+      resp = _open_json("GET", url, headers={"Authorization": f"Bearer {token}"}, timeout=300)
+    with resp:
+      chunks = iter_response_body(resp)
+      tee = cache.tee(key, chunks) if cache is not None else None
+      try:
+        yield from iter_json_items(tee if tee is not None else chunks, item_path, meta)
+        if meta.get(("success",)) is not True:
+          raise RuntimeError(f"Unexpected response: success={meta.get(('success',))}")
+        if tee is not None:
+          tee.commit()
+      finally:
+        if tee is not None:
+          tee.abort()
+
+  def get_if_changed(self, path, params=None, etag=None):
+    return self._with_token(lambda token: api_get_if_changed(self.base, token, path, params=params, etag=etag))
+
+  def get_raw(self, path, params=None, headers=None):
+    return self._with_token(lambda token: api_get_raw(self.base, token, path, params=params, headers=headers))
+
+  def post(self, path, body_obj):
+    return self._with_token(lambda token: api_post(self.base, token, path, body_obj))
+
+  def download(self, path, params, dest):
+    return self._with_token(lambda token: api_download(self.base, token, path, params, dest))
+
+  def put_bytes(self, path, data, headers=None):
+    return self._with_token(lambda token: api_put_bytes(self.base, token, path, data, headers=headers))
+
+
+def _auth_session(base, username, password_provider, token_cache=True, response_cache=True, cache_ttl=None, refresh_cache=False):
+  cache = None
+  if response_cache and not _maybe_get_env("ISSUE_ANALYZOR_NO_CACHE"):
+    cache = ResponseCache(ttl=RESPONSE_CACHE_TTL_SECONDS if cache_ttl is None else cache_ttl)
+  return AuthSession(
+    base,
+    username,
+    password_provider,
+    token_store=TokenStore() if token_cache else None,
+    response_cache=cache,
+    refresh_cache=refresh_cache,
+  )
+
+
+def _parse_upload_time(s):
+  if not s:
+    return None
+  try:
+    return datetime.fromisoformat(str(s).replace("Z", "+00:00"))
+  except Exception:
+    return None
+
+
+def _match_projects(projects, project_key=None, phase=None, name=None):
+  candidates = projects
+  if project_key:
+    candidates = [p for p in candidates if str(p.get("project_key") or "").strip() == project_key]
+  if phase:
+    candidates = [p for p in candidates if str(p.get("phase") or "").strip() == phase]
+  if name:
+    needle = str(name).strip().lower()
+    candidates = [p for p in candidates if needle in str(p.get("name") or "").lower()]
+  if not candidates:
+    raise RuntimeError("No project matches selection criteria")
+  return sorted(
+    candidates,
+    key=lambda p: (
+      _parse_upload_time(p.get("upload_time")) or datetime.min,
+      int(p.get("id") or 0),
+    ),
+  )
+
+
+def select_project(projects, project_id=None, project_key=None, phase=None, name=None):
+  if project_id is not None:
+    for p in projects:
+      if str(p.get("id")) == str(project_id):
+        return p
+    raise RuntimeError(f"project_id not found: {project_id}")
+  return _match_projects(projects, project_key=project_key, phase=phase, name=name)[-1]
+
+
+def select_snapshots(projects, project_key=None, phase=None, name=None):
+  return _match_projects(projects, project_key=project_key, phase=phase, name=name)
+
+
+def _extract_path(obj, path_list):
+  cur = obj
+  for k in path_list:
+    if cur is None:
+      return None
+    if isinstance(cur, dict):
+      cur = cur.get(k)
+    else:
+      return None
+  return cur
+
+
+def normalize_filters(filters=None, keep_lists=False, **kwargs):
+  params = {}
+  for key, value in {**(filters or {}), **kwargs}.items():
+    if value is None:
+      continue
+    if isinstance(value, bool):
+      value = "true" if value else "false"
+    elif isinstance(value, (list, tuple)):
+      items = [str(v).strip() for v in value if v is not None and str(v).strip()]
+      if not items:
+        continue
+      value = items if keep_lists else ",".join(items)
+    params[key] = value
+  return params
+
+
+def latest_snapshots(projects):
+  latest = {}
+  for p in _match_projects(projects):
+    latest[(str(p.get("project_key") or p.get("name") or ""), str(p.get("phase") or ""))] = p
+  return [latest[k] for k in sorted(latest)]
+
+
+def _export_version(project):
+  # 写成下载文件的 mtime，用来判断本地文件是否已是该快照的导出
+  t = _parse_upload_time(project.get("upload_time"))
+  if t is None:
+    return None
+  if t.tzinfo is None:
+    t = t.replace(tzinfo=UPLOAD_TIME_TZ)
+  return int(t.timestamp())
+
+
+def plan_exports(projects, kinds, pairs=None, filters=None, out_dir="."):
+  # 文件名不含日期：同一 project_key/phase 上传新快照后覆盖同一个文件；多个快照同名时（--all-snapshots）追加 _p<id>
+  filters = dict(filters or {})
+  tag = ""
+  if filters:
+    tag = "_f" + hashlib.sha1(json.dumps(filters, sort_keys=True, ensure_ascii=False).encode("utf-8")).hexdigest()[:8]
+  labels = [_safe_file_name("_".join(str(v) for v in (p.get("project_key") or p.get("name"), p.get("phase")) if v)) for p in projects]
+  repeated = {label for label in labels if labels.count(label) > 1}
+  jobs = []
+  for project, label in zip(projects, labels):
+    if label in repeated:
+      label = f"{label}_p{project.get('id')}"
+    for kind in kinds:
+      for pair in (pairs or []) if kind == "cross" else [None]:
+        params = dict(filters)
+        name = f"{label}_{kind}"
+        if pair is not None:
+          params["dimension1"], params["dimension2"] = pair
+          name += f"_{_safe_file_name(pair[0])}x{_safe_file_name(pair[1])}"
+        jobs.append({
+          "project": project,
+          "kind": kind,
+          "dimensions": f"{pair[0]}x{pair[1]}" if pair else "",
+          "params": params,
+          "path": os.path.join(out_dir, f"{name}{tag}.xlsx"),
+          "version": _export_version(project),
+        })
+  return jobs
+
+
+def export_up_to_date(job):
+  # mtime 等于快照的 upload_time 时视为最新（快照上传后内容不变）
+  if job["version"] is None:
+    return False
+  try:
+    return int(os.stat(job["path"]).st_mtime) == job["version"]
+  except OSError:
+    return False
+
+
+def iter_exports(session, jobs, workers=EXPORT_WORKERS):
+  if not jobs:
+    return
+
+  def download(job):
+    started = time.monotonic()
+    size = session.download(f"/api/projects/{job['project']['id']}/{EXPORT_KINDS[job['kind']]}", job["params"], job["path"])
+    if job["version"] is not None:
+      os.utime(job["path"], (job["version"], job["version"]))
+    return size, time.monotonic() - started
+
+  pool = ThreadPoolExecutor(max_workers=max(1, min(int(workers), len(jobs))), thread_name_prefix="export")
+  futures = {}
+  try:
+    futures = {pool.submit(download, job): job for job in jobs}
+    for future in as_completed(futures):
+      job = futures[future]
+      try:
+        size, seconds = future.result()
+      except (RuntimeError, OSError) as e:
+        yield job, None, None, e
+        continue
+      yield job, size, seconds, None
+  finally:
+    for future in futures:
+      future.cancel()
+    pool.shutdown(wait=False)
+
+
+def _prewarm_key(filters):
+  canonical = {}
+  for k, v in (filters or {}).items():
+    if v is None:
+      continue
+    canonical[k] = sorted(str(x) for x in v) if isinstance(v, list) else str(v)
+  return json.dumps(canonical, sort_keys=True, ensure_ascii=False)
+
+
+def prewarm_filter_sets(saved_filters, project_ids, max_filters=PREWARM_MAX_FILTERS):
+  # 第一个总是无筛选的 {}（项目首页）；saved_filters 按 created_at 倒序，超过 max_filters 的旧筛选不预热
+  wanted = {str(i) for i in project_ids}
+  sets = [{"name": "(all)", "filters": {}}]
+  seen = {_prewarm_key({})}
+  for item in saved_filters or []:
+    if len(sets) > max_filters:
+      break
+    filters = item.get("filters")
+    if str(item.get("project_id")) not in wanted or not isinstance(filters, dict):
+      continue
+    key = _prewarm_key(filters)
+    if key in seen:
+      continue
+    seen.add(key)
+    sets.append({"name": item.get("name") or "", "filters": filters})
+  return sets
+
+
+def iter_prewarm(session, project_id, filter_sets, workers=PREWARM_WORKERS):
+  # 筛选值原样发送（数组保持数组），与浏览器 GET 请求落到同一个缓存键
+  if not filter_sets:
+    return
+  path = f"/api/projects/{project_id}/batch"
+
+  def warm(item):
+    started = time.monotonic()
+    data = session.post(path, {"filters": item["filters"], "queries": PREWARM_QUERIES}) or {}
+    return data.get("stats") or {}, time.monotonic() - started
+
+  pool = ThreadPoolExecutor(max_workers=max(1, min(int(workers), len(filter_sets))), thread_name_prefix="prewarm")
+  futures = {}
+  try:
+    futures = {pool.submit(warm, item): item for item in filter_sets}
+    for future in as_completed(futures):
+      item = futures[future]
+      try:
+        stats, seconds = future.result()
+      except (RuntimeError, OSError) as e:
+        yield item, None, None, e
+        continue
+      yield item, stats, seconds, None
+  finally:
+    for future in futures:
+      future.cancel()
+    pool.shutdown(wait=False)
+
+
+def file_sha256(path, chunk_size=UPLOAD_CHUNK_SIZE):
+  digest = hashlib.sha256()
+  with open(path, "rb") as f:
+    for chunk in iter(lambda: f.read(chunk_size), b""):
+      digest.update(chunk)
+  return digest.hexdigest()
+
+
+def upload_file(session, path, name=None, uploader=None, chunk_size=UPLOAD_CHUNK_SIZE, retries=UPLOAD_MAX_RETRIES, on_progress=None, on_retry=None):
+  # 服务端按 (用户, 文件名, 大小, sha256) 生成上传会话：中断后重新上传同一个文件会从服务端已收到的 offset 续传
+  size = os.path.getsize(path)
+  body = {"fileName": os.path.basename(path), "size": size, "sha256": file_sha256(path)}
+  upload_path = None
+  offset = None
+  failures = 0
+  with open(path, "rb") as f:
+    while True:
+      try:
+        if offset is None:
+          upload = session.post(UPLOAD_PATH, body)
+          upload_path = f"{UPLOAD_PATH}/{upload['uploadId']}"
+          offset = int(upload["offset"])
+          if on_progress:
+            on_progress(offset, size)
+        if offset >= size:
+          break
+        f.seek(offset)
+        chunk = f.read(min(max(1, int(chunk_size)), size - offset))
+        state = session.put_bytes(upload_path, chunk, headers={"Upload-Offset": str(offset)})
+        offset = int(state["offset"])
+        failures = 0
+        if on_progress:
+          on_progress(offset, size)
+      except RuntimeError as e:
+        # 4xx（文件类型/大小不合法、权限）重试也不会成功；409 是 offset 不一致或会话正忙，重新取 offset 即可
+        if isinstance(e, HttpError) and e.status < 500 and e.status != 409:
+          raise
+        failures += 1
+        if failures > retries:
+          raise
+        delay = min(2 ** (failures - 1), UPLOAD_RETRY_MAX_DELAY)
+        if on_retry:
+          on_retry(e, failures, delay)
+        time.sleep(delay)
+        offset = None
+  # complete 不重试：服务端可能已经导入完成并删除了会话，重试只会得到 404
+  return session.post(f"{upload_path}/complete", {"name": name, "uploader": uploader})
+
+
+def fetch_projects(session):
+  # 兼容直接返回 list 与分页的 {projects, total, page, limit} 两种形态
+  projects = []
+  page = 1
+  while True:
+    data = session.get("/api/projects", params={"page": page, "limit": PROJECTS_PAGE_SIZE}, ttl=PROJECTS_CACHE_TTL_SECONDS)
+    if isinstance(data, list):
+      return data
+    if not isinstance(data, dict) or not isinstance(data.get("projects"), list):
+      raise RuntimeError(f"Unexpected projects payload: {data}")
+    rows = data["projects"]
+    projects.extend(rows)
+    total = int(data.get("total") or 0)
+    if not rows or len(projects) >= total:
+      return projects
+    page += 1
+
+
+def fetch_snapshots(session, projects, endpoint, params, workers=SNAPSHOT_WORKERS):
+  def fetch(p):
+    return session.get(f"/api/projects/{p['id']}/{endpoint}", params=params)
+
+  with ThreadPoolExecutor(max_workers=max(1, min(workers, len(projects))), thread_name_prefix="snapshot") as pool:
+    return list(pool.map(fetch, projects))
+
+
+def _stats_rows(data, kind, match=None):
+  spec = STATS_KINDS[kind]
+  rows = _extract_path(data, spec["path"]) or []
+  if not isinstance(rows, list):
+    raise RuntimeError(f"Unexpected stats rows for {kind}: {rows}")
+  if match:
+    needle = match.strip().lower()
+    rows = [r for r in rows if needle in str(r.get(spec["key"]) or "").strip().lower()]
+  return rows
+
+
+class RateLimiter:
+  """线程安全的限速器：wait() 按等间隔排期，每秒最多放行 rate 次；rate 为 0 时不限速。"""
+
+  def __init__(self, rate=0):
+    self.interval = 1.0 / rate if rate and rate > 0 else 0.0
+    self._next = 0.0
+    self._lock = threading.Lock()
+
+  def wait(self):
+    if not self.interval:
+      return
+    with self._lock:
+      slot = max(time.monotonic(), self._next)
+      self._next = slot + self.interval
+    delay = slot - time.monotonic()
+    if delay > 0:
+      time.sleep(delay)
+
+
+def sweep_dimension(name):
+  fields = {column: field for field, column in _OPTION_FIELDS}
+  for param, column in _OPTION_FILTER_ORDER:
+    if name in (param, column):
+      return param, fields[column], column
+  raise RuntimeError(f"Unknown sweep dimension: {name} (supported: {', '.join(p for p, _ in _OPTION_FILTER_ORDER)})")
+
+
+def sweep_combinations(options, dims, filters):
+  # 服务端按逗号拆分 filter 值，含逗号的取值无法单独查询，放进 skipped
+  per_dim, skipped = [], []
+  for param, field, column in dims:
+    values = [str(v) for v in options.get(field) or [] if v is not None and str(v) != ""]
+    chosen = filters.get(param)
+    if chosen:
+      allowed = set(chosen) if isinstance(chosen, list) else set(str(chosen).split(","))
+      values = [v for v in values if v in allowed]
+    skipped.extend((column, v) for v in values if "," in v)
+    per_dim.append([v for v in values if "," not in v])
+  return list(itertools.product(*per_dim)), skipped
+
+
+def iter_sweep(session, project_id, dims, combos, filters, workers=SWEEP_WORKERS, rate=0):
+  if not combos:
+    return
+  limiter = RateLimiter(rate)
+  path = f"/api/projects/{project_id}/filter-statistics"
+
+  def fetch(combo):
+    limiter.wait()
+    params = dict(filters)
+    params.update((param, value) for (param, _, _), value in zip(dims, combo))
+    return session.get(path, params=params)
+
+  pool = ThreadPoolExecutor(max_workers=max(1, min(int(workers), len(combos))), thread_name_prefix="sweep")
+  futures = {}
+  try:
+    futures = {pool.submit(fetch, combo): combo for combo in combos}
+    for future in as_completed(futures):
+      values = {column: value for (_, _, column), value in zip(dims, futures[future])}
+      try:
+        data = future.result()
+      except RuntimeError as e:
+        yield values, None, e
+        continue
+      yield values, data, None
+  finally:
+    # 调用方提前停止（head、Ctrl-C）时不再发出排队中的请求
+    for future in futures:
+      future.cancel()
+    pool.shutdown(wait=False)
+
+
+def iter_all_issues(session, pid, filters, page_size=ISSUES_ALL_PAGE_SIZE, workers=ISSUES_ALL_WORKERS, on_total=None):
+  # 首页拿 total，其余页用有界线程池并发预取（最多 2*workers 页在途）
+  path = f"/api/projects/{pid}/issues"
+  base_params = {k: v for k, v in filters.items() if k not in ("page", "limit")}
+  page_size = max(1, int(page_size))
+  workers = max(1, int(workers))
+
+  def fetch(page):
+    data = session.get(path, params={**base_params, "page": page, "limit": page_size}, cache=False) or {}
+    return data.get("issues") or []
+
+  # 整表翻页不进响应缓存：几百个页面条目会把常用的分析结果挤出 LRU（同 sync/diff）
+  first = session.get(path, params={**base_params, "page": 1, "limit": page_size}, cache=False) or {}
+  total = int(first.get("total") or 0)
+  if on_total:
+    on_total(total)
+  yield from first.get("issues") or []
+  pages = (total + page_size - 1) // page_size
+  if pages <= 1:
+    return
+
+  pending = collections.deque()
+  next_page = 2
+  pool = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="issues-page")
+  try:
+    while next_page <= pages and len(pending) < workers * 2:
+      pending.append(pool.submit(fetch, next_page))
+      next_page += 1
+    while pending:
+      rows = pending.popleft().result()
+      if next_page <= pages:
+        pending.append(pool.submit(fetch, next_page))
+        next_page += 1
+      yield from rows
+  finally:
+    for fut in pending:
+      fut.cancel()
+    pool.shutdown(wait=True)
+
+
+def _matrix_cell_counts(cell):
+  # 旧服务端只有 text（xF/yT 或 xSF/yT，只显示一种失败），同时有 Spec 与 Strife 的单元格 strifeFail 会被低估为 0
+  if "specCount" in cell and "strifeCount" in cell and "samples" in cell:
+    return int(cell["specCount"] or 0), int(cell["strifeCount"] or 0), int(cell["samples"] or 0)
+  m = re.fullmatch(r"(\d+)(S?)F/(\d+)T", str(cell.get("text") or ""))
+  if not m:
+    return None
+  failures = int(m.group(1))
+  strife = m.group(2) == "S"
+  return (0 if strife else failures), (failures if strife else 0), int(m.group(3))
+
+
+def _matrix_entry_cells(matrix_key, entry):
+  wf = matrix_key.rsplit("-", 1)[0]
+  for config, cell in ((entry or {}).get("configs") or {}).items():
+    if not cell:
+      continue
+    counts = _matrix_cell_counts(cell)
+    if counts is None:
+      continue
+    yield {
+      "wf": wf,
+      "testName": entry.get("testName"),
+      "config": config,
+      "specFail": counts[0],
+      "strifeFail": counts[1],
+      "samples": counts[2],
+    }
+
+
+def matrix_cells(data):
+  rows = []
+  for matrix_key, entry in ((data or {}).get("matrix") or {}).items():
+    rows.extend(_matrix_entry_cells(matrix_key, entry))
+  return rows
+
+
+@functools.lru_cache(maxsize=None)
+def _numpy():
+  # NumPy 是可选依赖，且导入要上百毫秒：只在本地汇总时才导入；ISSUE_ANALYZOR_NO_NUMPY=1 强制用纯 Python
+  if _maybe_get_env("ISSUE_ANALYZOR_NO_NUMPY"):
+    return None
+  try:
+    import numpy
+  except ImportError:
+    return None
+  return numpy
+
+
+def _matrix_rates(row):
+  samples = row["samples"]
+  row["specFailureRate"] = _js_round(row["specFail"] / samples * 1000000) if samples > 0 else 0
+  row["strifeFailureRate"] = _js_round(row["strifeFail"] / samples * 1000000) if samples > 0 else 0
+  return row
+
+
+class FailureMatrix:
+  """failure-rate-matrix 的稀疏列式表示：每个非空单元格一条记录（wf/test/config 三个整数编码 + specFail/strifeFail/samples），
+  维度取值按首次出现的顺序编码；列存在 array('q') 里，装有 NumPy 时汇总用 ndarray 向量化计算。
+
+  一次拉取后可以本地做任意汇总（rollup）、透视（pivot）和 Top N，失败率由分子与样本数重新计算（与服务端同一公式）。
+  汇总时分子直接相加；样本数属于 (wf, config)（同一 WF 的各 test 共用同一批样本），同一组内每个 (wf, config) 只计一次。
+  """
+
+  COLUMNS = ("wf", "test", "config", "specFail", "strifeFail", "samples")
+
+  def __init__(self):
+    self.labels = {d: [] for d in MATRIX_DIMENSIONS}
+    self._codes = {d: {} for d in MATRIX_DIMENSIONS}
+    self.columns = {c: array.array("q") for c in self.COLUMNS}
+
+  @classmethod
+  def from_cells(cls, cells):
+    matrix = cls()
+    for cell in cells:
+      matrix.add(cell["wf"], cell["testName"], cell["config"], cell["specFail"], cell["strifeFail"], cell["samples"])
+    return matrix
+
+  def _code(self, dim, label):
+    codes = self._codes[dim]
+    code = codes.get(label)
+    if code is None:
+      code = codes[label] = len(codes)
+      self.labels[dim].append(label)
+    return code
+
+  def add(self, wf, test, config, spec_fail, strife_fail, samples):
+    cols = self.columns
+    cols["wf"].append(self._code("wf", wf))
+    cols["test"].append(self._code("test", test))
+    cols["config"].append(self._code("config", config))
+    cols["specFail"].append(int(spec_fail))
+    cols["strifeFail"].append(int(strife_fail))
+    cols["samples"].append(int(samples))
+
+  def __len__(self):
+    return len(self.columns["wf"])
+
+  def _group_rows(self, by, groups):
+    rows = []
+    for key in sorted(groups):
+      spec_fail, strife_fail, samples = groups[key]
+      row = {MATRIX_DIMENSIONS[d]: self.labels[d][code] for d, code in zip(by, key)}
+      row.update(specFail=int(spec_fail), strifeFail=int(strife_fail), samples=int(samples))
+      rows.append(_matrix_rates(row))
+    return rows
+
+  def rollup(self, by):
+    by = list(by)
+    for d in by:
+      if d not in MATRIX_DIMENSIONS:
+        raise RuntimeError(f"Unknown matrix dimension: {d} (supported: {', '.join(MATRIX_DIMENSIONS)})")
+    if not len(self):
+      return []
+    np = _numpy()
+    if np is not None:
+      return self._group_rows(by, self._rollup_numpy(np, by))
+    cols = self.columns
+    groups, counted = {}, set()
+    for i in range(len(self)):
+      key = tuple(cols[d][i] for d in by)
+      acc = groups.setdefault(key, [0, 0, 0])
+      acc[0] += cols["specFail"][i]
+      acc[1] += cols["strifeFail"][i]
+      pair = (key, cols["wf"][i], cols["config"][i])
+      if pair not in counted:
+        counted.add(pair)
+        acc[2] += cols["samples"][i]
+    return self._group_rows(by, groups)
+
+  def _rollup_numpy(self, np, by):
+    cols = {c: np.frombuffer(self.columns[c], dtype=np.int64) for c in self.COLUMNS}
+    sizes = [len(self.labels[d]) for d in by]
+    if by:
+      group_ids, inverse = np.unique(np.ravel_multi_index([cols[d] for d in by], sizes), return_inverse=True)
+      inverse = inverse.reshape(-1)
+    else:
+      group_ids, inverse = np.zeros(1, dtype=np.int64), np.zeros(len(self), dtype=np.int64)
+    n = len(group_ids)
+    spec_fail = np.bincount(inverse, weights=cols["specFail"], minlength=n)
+    strife_fail = np.bincount(inverse, weights=cols["strifeFail"], minlength=n)
+    # 每个 (组, wf, config) 只取第一条记录的样本数
+    pairs = (inverse * len(self.labels["wf"]) + cols["wf"]) * len(self.labels["config"]) + cols["config"]
+    _, first = np.unique(pairs, return_index=True)
+    samples = np.bincount(inverse[first], weights=cols["samples"][first], minlength=n)
+    keys = zip(*np.unravel_index(group_ids, sizes)) if by else [()]
+    return {tuple(int(c) for c in key): acc for key, acc in zip(keys, zip(spec_fail, strife_fail, samples))}
+
+  def pivot(self, row_dim, col_dim, metric="specFailureRate"):
+    if row_dim == col_dim:
+      raise RuntimeError("--pivot needs two different dimensions")
+    row_col, col_col = MATRIX_DIMENSIONS.get(row_dim), MATRIX_DIMENSIONS.get(col_dim)
+    pivoted = collections.OrderedDict()
+    col_labels = set()
+    for r in self.rollup([row_dim, col_dim]):
+      label = r[col_col]
+      col_labels.add(label)
+      pivoted.setdefault(r[row_col], {row_col: r[row_col]})[str(label)] = r.get(metric)
+    columns = [row_col] + [str(label) for label in self.labels[col_dim] if label in col_labels]
+    return columns, list(pivoted.values())
+
+
+def top_rows(rows, k, metric="specFailureRate"):
+  ranked = sorted(rows, key=lambda r: (r.get(metric) is None, -(r.get(metric) or 0), -(r.get("samples") or 0)))
+  return ranked[:k] if k and k > 0 else ranked
+
+
+def _ppm(failures, total):
+  return round(failures / total * 1000000) if total else 0
+
+
+def _compact_page_rows(data, key_name="key"):
+  keys = data.get("keys") or []
+  failures = data.get("failures")
+  totals = data.get("totalSamples")
+  for i, k in enumerate(keys):
+    total = totals[i] if isinstance(totals, list) else totals
+    if failures is None:
+      yield {key_name: k, "totalSamples": total}
+    else:
+      yield {key_name: k, "failures": failures[i], "totalSamples": total, "ppm": _ppm(failures[i], total or 0)}
+
+
+def iter_compact_rows(session, pid, endpoint, params, page_size=COMPACT_PAGE_SIZE, key_name="key"):
+  page_size = max(1, min(int(page_size), COMPACT_PAGE_SIZE))
+  offset = 0
+  while True:
+    data = session.get(f"/api/projects/{pid}/{endpoint}", params={**params, "offset": offset, "limit": page_size}) or {}
+    keys = data.get("keys") or []
+    yield from _compact_page_rows(data, key_name=key_name)
+    offset += len(keys)
+    if params.get("keys") or not keys or offset >= int(data.get("totalKeys") or 0):
+      return
+
+
+def _safe_file_name(name):
+  cleaned = re.sub(r"[^0-9A-Za-z._-]+", "_", str(name)).strip("._")
+  return cleaned or "query"
+
+
+def _local_db_path(args):
+  return getattr(args, "local_db", None) or _maybe_get_env("ISSUE_ANALYZOR_LOCAL_DB") or os.path.join(_user_cache_dir(), LOCAL_DB_FILENAME)
+
+
+def _password_provider(password):
+  # 库调用不交互式提示（notebook / 定时任务里 getpass 会卡住）：没有密码时在需要登录的那一刻报错
+  def provide():
+    value = password or _maybe_get_env("ISSUE_ANALYZOR_PASSWORD")
+    if not value:
+      raise RuntimeError("Missing password (pass password=... or a callable, or set ISSUE_ANALYZOR_PASSWORD)")
+    return value
+  return provide
+
+
+class IssueAnalyzorClient:
+  """可 import 的同步客户端：每个服务端接口一个方法，CLI 子命令只在外面做参数解析和输出。
+
+  同一个 client 的所有请求共享一个会话（懒登录、token 缓存、401 时重登一次）和进程级连接池，
+  方法线程安全，可以直接丢进线程池；asyncio 场景用 AsyncIssueAnalyzorClient。
+
+    from issue_client import IssueAnalyzorClient
+    client = IssueAnalyzorClient("http://localhost:3000", "admin", "password123")
+    project = client.select_project(project_key="M60", phase="DVT")
+    rows = client.stats(project["id"], "symptom", wfs=["1", "2"], configs="R1CASN")
+
+  filters 可以传 dict，也可以直接写成关键字参数（名字见 FILTER_SPECS），两者会合并。
+  """
+
+  def __init__(self, base="http://localhost:3000", username=None, password=None, session=None, token_cache=True, response_cache=True, cache_ttl=None, refresh_cache=False):
+    if session is None:
+      username = username or _maybe_get_env("ISSUE_ANALYZOR_USERNAME")
+      if not username:
+        raise RuntimeError("Missing username")
+      provider = password if callable(password) else _password_provider(password)
+      session = _auth_session(
+        base,
+        username,
+        provider,
+        token_cache=token_cache,
+        response_cache=response_cache,
+        cache_ttl=cache_ttl,
+        refresh_cache=refresh_cache,
+      )
+    self.session = session
+
+  @classmethod
+  def local(cls, path=None):
+    return cls(session=LocalSession(LocalMirror(path or _local_db_path(None))))
+
+  def close(self):
+    mirror = getattr(self.session, "mirror", None)
+    if mirror is not None:
+      mirror.close()
+
+  def __enter__(self):
+    return self
+
+  def __exit__(self, *exc):
+    self.close()
+
+  def login(self):
+    token = getattr(self.session, "token", None)
+    return token() if token is not None else None
+
+  def get(self, path, params=None, ttl=None):
+    return self.session.get(path, params=params, ttl=ttl)
+
+  def post(self, path, body_obj):
+    return self.session.post(path, body_obj)
+
+  def get_if_changed(self, path, params=None, etag=None):
+    return self.session.get_if_changed(path, params=params, etag=etag)
+
+  @staticmethod
+  def _path(project_id, endpoint):
+    return f"/api/projects/{project_id}/{endpoint}"
+
+  # ---- projects ----
+
+  def projects(self, project_key=None, phase=None, name=None):
+    projects = fetch_projects(self.session)
+    if project_key:
+      projects = [p for p in projects if str(p.get("project_key") or "") == project_key]
+    if phase:
+      projects = [p for p in projects if str(p.get("phase") or "") == phase]
+    if name:
+      needle = name.strip().lower()
+      projects = [p for p in projects if needle in str(p.get("name") or "").lower()]
+    return projects
+
+  def select_project(self, project_id=None, project_key=None, phase=None, name=None):
+    def select():
+      return select_project(fetch_projects(self.session), project_id=project_id, project_key=project_key, phase=phase, name=name)
+
+    # 与 projects 列表同样只缓存 PROJECTS_CACHE_TTL_SECONDS：快照被删除后很快就选不到
+    if project_id is not None:
+      return self.session.cached(f"/api/projects/{project_id}#selected", {}, select, ttl=PROJECTS_CACHE_TTL_SECONDS)
+    return select()
+
+  def select_snapshots(self, project_key=None, phase=None, name=None):
+    return select_snapshots(fetch_projects(self.session), project_key=project_key, phase=phase, name=name)
+
+  def snapshots(self, projects, endpoint, filters=None, workers=SNAPSHOT_WORKERS, **kwargs):
+    return fetch_snapshots(self.session, projects, endpoint, normalize_filters(filters, **kwargs), workers=workers)
+
+  # ---- issues ----
+
+  def issues(self, project_id, filters=None, **kwargs):
+    return self.session.get(self._path(project_id, "issues"), params=normalize_filters(filters, **kwargs))
+
+  def stream_issues(self, project_id, filters=None, meta=None, **kwargs):
+    meta = {} if meta is None else meta
+    return self.session.stream(self._path(project_id, "issues"), normalize_filters(filters, **kwargs), ("data", "issues"), meta)
+
+  def iter_issues(self, project_id, filters=None, page_size=ISSUES_ALL_PAGE_SIZE, workers=ISSUES_ALL_WORKERS, on_total=None, **kwargs):
+    return iter_all_issues(self.session, project_id, normalize_filters(filters, **kwargs), page_size=page_size, workers=workers, on_total=on_total)
+
+  def filter_options(self, project_id, filters=None, **kwargs):
+    # filter-options 的筛选值按数组（重复参数）传给服务端
+    return self.session.get(self._path(project_id, "filter-options"), params=normalize_filters(filters, keep_lists=True, **kwargs))
+
+  # ---- analysis ----
+
+  def analysis(self, project_id, filters=None, **kwargs):
+    return self.session.get(self._path(project_id, "analysis"), params=normalize_filters(filters, **kwargs))
+
+  def analysis_test(self, project_id, filters=None, **kwargs):
+    return self.session.get(self._path(project_id, "analysis/test"), params=normalize_filters(filters, **kwargs))
+
+  def cross(self, project_id, dimension1, dimension2, filters=None, **kwargs):
+    params = normalize_filters(filters, dimension1=dimension1, dimension2=dimension2, **kwargs)
+    return self.session.get(self._path(project_id, "analysis/cross"), params=params)
+
+  def filter_statistics(self, project_id, filters=None, **kwargs):
+    return self.session.get(self._path(project_id, "filter-statistics"), params=normalize_filters(filters, **kwargs))
+
+  def filter_statistics_if_changed(self, project_id, filters=None, etag=None, **kwargs):
+    return self.get_if_changed(self._path(project_id, "filter-statistics"), params=normalize_filters(filters, **kwargs), etag=etag)
+
+  def stats(self, project_id, kind, filters=None, match=None, **kwargs):
+    if kind not in STATS_KINDS:
+      raise RuntimeError(f"Unknown kind: {kind}")
+    return _stats_rows(self.filter_statistics(project_id, filters, **kwargs), kind, match)
+
+  def sample_sizes(self, project_id):
+    return self.session.get(self._path(project_id, "sample-sizes"), params={})
+
+  def failure_rate_matrix(self, project_id, filters=None, **kwargs):
+    return self.session.get(self._path(project_id, "failure-rate-matrix"), params=normalize_filters(filters, **kwargs))
+
+  def stream_failure_rate_matrix(self, project_id, filters=None, meta=None, **kwargs):
+    meta = {} if meta is None else meta
+    return self.session.stream(self._path(project_id, "failure-rate-matrix"), normalize_filters(filters, **kwargs), ("data", "matrix"), meta)
+
+  def load_failure_matrix(self, project_id, filters=None, **kwargs):
+    cells = self.stream_failure_rate_matrix(project_id, filters, **kwargs)
+    try:
+      return FailureMatrix.from_cells(row for key, entry in cells for row in _matrix_entry_cells(key, entry))
+    finally:
+      cells.close()
+
+  # ---- compact ----
+
+  def analysis_compact(self, project_id, filters=None, top=None, numerator=None, sort=None, **kwargs):
+    params = normalize_filters(filters, top=top, numerator=numerator, sortBy=sort, **kwargs)
+    return self.session.get(self._path(project_id, "analysis-compact"), params=params)
+
+  def filter_statistics_compact(self, project_id, filters=None, top=None, numerator=None, sort=None, **kwargs):
+    params = normalize_filters(filters, top=top, numerator=numerator, sortBy=sort, **kwargs)
+    return self.session.get(self._path(project_id, "filter-statistics-compact"), params=params)
+
+  def cross_compact(self, project_id, dimension1, dimension2, filters=None, top=None, sort=None, **kwargs):
+    params = normalize_filters(filters, dimension1=dimension1, dimension2=dimension2, top=top, sortBy=sort, **kwargs)
+    return self.session.get(self._path(project_id, "analysis/cross-compact"), params=params)
+
+  def fr_compact(self, project_id, group_by="none", filters=None, numerator=None, sort=None, keys=None, **kwargs):
+    params = normalize_filters(filters, groupBy=group_by, numerator=numerator, sortBy=sort, keys=keys, **kwargs)
+    return self.session.get(self._path(project_id, "fr-compact"), params=params)
+
+  def iter_fr_compact(self, project_id, group_by, filters=None, numerator=None, sort=None, keys=None, page_size=COMPACT_PAGE_SIZE, key_name="key", **kwargs):
+    params = normalize_filters(filters, groupBy=group_by, numerator=numerator, sortBy=sort, keys=keys, **kwargs)
+    return iter_compact_rows(self.session, project_id, "fr-compact", params, page_size=page_size, key_name=key_name)
+
+  def iter_sample_size_compact(self, project_id, group_by, filters=None, keys=None, page_size=COMPACT_PAGE_SIZE, **kwargs):
+    params = normalize_filters(filters, groupBy=group_by, keys=keys, **kwargs)
+    return iter_compact_rows(self.session, project_id, "sample-size-compact", params, page_size=page_size)
+
+  def batch(self, project_id, queries, filters=None):
+    if len(queries) > BATCH_MAX_QUERIES:
+      raise RuntimeError(f"batch accepts at most {BATCH_MAX_QUERIES} queries per request")
+    body = {
+      "filters": filters or {},
+      "queries": [{"id": q["id"], "endpoint": q["endpoint"], "filters": q.get("filters") or {}} for q in queries],
+    }
+    return self.session.post(self._path(project_id, "batch"), body) or {}
+
+  def sweep(self, project_id, over, filters=None, workers=SWEEP_WORKERS, rate=0, on_plan=None, **kwargs):
+    filters = normalize_filters(filters, **kwargs)
+    dims = [sweep_dimension(d) for d in over]
+    options = self.filter_options(project_id, filters) or {}
+    combos, skipped = sweep_combinations(options, dims, filters)
+    if on_plan:
+      on_plan(combos, skipped)
+    yield from iter_sweep(self.session, project_id, dims, combos, filters, workers=workers, rate=rate)
+
+  # ---- export ----
+
+  def export(self, project_id, kind, dest, filters=None, dimension1=None, dimension2=None, **kwargs):
+    if kind not in EXPORT_KINDS:
+      raise RuntimeError(f"Unknown export kind: {kind} (expected {', '.join(EXPORT_KINDS)})")
+    params = normalize_filters(filters, **kwargs)
+    if kind == "cross":
+      if not dimension1 or not dimension2:
+        raise RuntimeError("cross export requires dimension1 and dimension2")
+      params.update(dimension1=dimension1, dimension2=dimension2)
+    return self.session.download(self._path(project_id, EXPORT_KINDS[kind]), params, dest)
+
+  def iter_exports(self, jobs, workers=EXPORT_WORKERS):
+    return iter_exports(self.session, jobs, workers=workers)
+
+  # ---- prewarm ----
+
+  def saved_filters(self, project_id=None):
+    params = {"projectId": project_id} if project_id is not None else None
+    # 结果因登录用户而异，缓存键里没有用户名，所以不缓存
+    return self.session.get("/api/filters", params=params, cache=False) or []
+
+  def prewarm_filter_sets(self, project, max_filters=PREWARM_MAX_FILTERS):
+    key = project.get("project_key")
+    ids = [p.get("id") for p in self.projects(project_key=key)] if key else []
+    return prewarm_filter_sets(self.saved_filters(), ids or [project.get("id")], max_filters=max_filters)
+
+  def iter_prewarm(self, project_id, filter_sets, workers=PREWARM_WORKERS):
+    return iter_prewarm(self.session, project_id, filter_sets, workers=workers)
+
+  def prewarm(self, project_id, concurrency=None, max_filters=None):
+    body = {"concurrency": concurrency} if concurrency else {}
+    if max_filters:
+      body["maxFilters"] = max_filters
+    return self.session.post(self._path(project_id, "prewarm"), body) or {}
+
+  # ---- upload ----
+
+  def upload(self, path, name=None, uploader=None, chunk_size=UPLOAD_CHUNK_SIZE, retries=UPLOAD_MAX_RETRIES, on_progress=None, on_retry=None):
+    return upload_file(self.session, path, name=name, uploader=uploader, chunk_size=chunk_size, retries=retries, on_progress=on_progress, on_retry=on_retry)
+
+
+class AsyncIssueAnalyzorClient:
+  """IssueAnalyzorClient 的 asyncio 版本：方法同名同参，返回协程；iter_* / stream_* 返回 async 迭代器。
+
+  阻塞的 HTTP 调用放在最多 max_concurrency 个线程里执行，并发查询共享同一个 token，连接池为该 client 独有（大小同 max_concurrency）：
+
+    async with AsyncIssueAnalyzorClient("http://localhost:3000", "admin", "password123") as client:
+      project = await client.select_project(project_key="M60")
+      crosses = await asyncio.gather(*(client.cross(project["id"], "wf", d) for d in ("config", "symptom")))
+      async for issue in client.iter_issues(project["id"], wfs="1"):
+        ...
+  """
+
+  def __init__(self, *args, client=None, max_concurrency=ASYNC_MAX_CONCURRENCY, **kwargs):
+    self.client = client if client is not None else IssueAnalyzorClient(*args, **kwargs)
+    self.max_concurrency = max(1, int(max_concurrency))
+    # 默认连接池的空闲连接上限低于并发数时，多出来的连接每次用完就关闭：工作线程改用自己的池（不改全局池，
+    # 不影响同进程的其他 client）；全局 transport 是 --record/--replay 等自定义实现时照常使用
+    self._transport = ConnectionPool(maxsize=self.max_concurrency) if isinstance(get_transport(), ConnectionPool) else None
+    self._executor = ThreadPoolExecutor(
+      max_workers=self.max_concurrency,
+      thread_name_prefix="issue-client",
+      initializer=_use_thread_transport,
+      initargs=(self._transport,),
+    )
+
+  async def _call(self, fn, *args, **kwargs):
+    import asyncio  # 只有 async 客户端用到，不拖慢普通命令行调用
+
+    return await asyncio.get_running_loop().run_in_executor(self._executor, functools.partial(fn, *args, **kwargs))
+
+  async def _iterate(self, source, batch):
+    # 每次在线程里取一批，避免逐行切换线程
+    try:
+      while True:
+        items = await self._call(list, itertools.islice(source, batch))
+        if not items:
+          return
+        for item in items:
+          yield item
+    finally:
+      await self._call(source.close)
+
+  async def aclose(self):
+    try:
+      await self._call(self.client.close)
+    finally:
+      self._executor.shutdown(wait=False)
+      if self._transport is not None:
+        self._transport.close()
+
+  async def __aenter__(self):
+    return self
+
+  async def __aexit__(self, *exc):
+    await self.aclose()
+
+  # ---- 与 IssueAnalyzorClient 同名同参的协程 ----
+
+  async def login(self):
+    return await self._call(self.client.login)
+
+  async def get(self, path, params=None, ttl=None):
+    return await self._call(self.client.get, path, params=params, ttl=ttl)
+
+  async def post(self, path, body_obj):
+    return await self._call(self.client.post, path, body_obj)
+
+  async def get_if_changed(self, path, params=None, etag=None):
+    return await self._call(self.client.get_if_changed, path, params=params, etag=etag)
+
+  async def projects(self, project_key=None, phase=None, name=None):
+    return await self._call(self.client.projects, project_key=project_key, phase=phase, name=name)
+
+  async def select_project(self, project_id=None, project_key=None, phase=None, name=None):
+    return await self._call(self.client.select_project, project_id=project_id, project_key=project_key, phase=phase, name=name)
+
+  async def select_snapshots(self, project_key=None, phase=None, name=None):
+    return await self._call(self.client.select_snapshots, project_key=project_key, phase=phase, name=name)
+
+  async def snapshots(self, projects, endpoint, filters=None, workers=SNAPSHOT_WORKERS, **kwargs):
+    return await self._call(self.client.snapshots, projects, endpoint, filters=filters, workers=workers, **kwargs)
+
+  async def issues(self, project_id, filters=None, **kwargs):
+    return await self._call(self.client.issues, project_id, filters=filters, **kwargs)
+
+  async def filter_options(self, project_id, filters=None, **kwargs):
+    return await self._call(self.client.filter_options, project_id, filters=filters, **kwargs)
+
+  async def analysis(self, project_id, filters=None, **kwargs):
+    return await self._call(self.client.analysis, project_id, filters=filters, **kwargs)
+
+  async def analysis_test(self, project_id, filters=None, **kwargs):
+    return await self._call(self.client.analysis_test, project_id, filters=filters, **kwargs)
+
+  async def cross(self, project_id, dimension1, dimension2, filters=None, **kwargs):
+    return await self._call(self.client.cross, project_id, dimension1, dimension2, filters=filters, **kwargs)
+
+  async def filter_statistics(self, project_id, filters=None, **kwargs):
+    return await self._call(self.client.filter_statistics, project_id, filters=filters, **kwargs)
+
+  async def filter_statistics_if_changed(self, project_id, filters=None, etag=None, **kwargs):
+    return await self._call(self.client.filter_statistics_if_changed, project_id, filters=filters, etag=etag, **kwargs)
+
+  async def stats(self, project_id, kind, filters=None, match=None, **kwargs):
+    return await self._call(self.client.stats, project_id, kind, filters=filters, match=match, **kwargs)
+
+  async def sample_sizes(self, project_id):
+    return await self._call(self.client.sample_sizes, project_id)
+
+  async def failure_rate_matrix(self, project_id, filters=None, **kwargs):
+    return await self._call(self.client.failure_rate_matrix, project_id, filters=filters, **kwargs)
+
+  async def load_failure_matrix(self, project_id, filters=None, **kwargs):
+    return await self._call(self.client.load_failure_matrix, project_id, filters=filters, **kwargs)
+
+  async def analysis_compact(self, project_id, filters=None, top=None, numerator=None, sort=None, **kwargs):
+    return await self._call(self.client.analysis_compact, project_id, filters=filters, top=top, numerator=numerator, sort=sort, **kwargs)
+
+  async def filter_statistics_compact(self, project_id, filters=None, top=None, numerator=None, sort=None, **kwargs):
+    return await self._call(self.client.filter_statistics_compact, project_id, filters=filters, top=top, numerator=numerator, sort=sort, **kwargs)
+
+  async def cross_compact(self, project_id, dimension1, dimension2, filters=None, top=None, sort=None, **kwargs):
+    return await self._call(self.client.cross_compact, project_id, dimension1, dimension2, filters=filters, top=top, sort=sort, **kwargs)
+
+  async def fr_compact(self, project_id, group_by="none", filters=None, numerator=None, sort=None, keys=None, **kwargs):
+    return await self._call(self.client.fr_compact, project_id, group_by=group_by, filters=filters, numerator=numerator, sort=sort, keys=keys, **kwargs)
+
+  async def batch(self, project_id, queries, filters=None):
+    return await self._call(self.client.batch, project_id, queries, filters=filters)
+
+  async def export(self, project_id, kind, dest, filters=None, dimension1=None, dimension2=None, **kwargs):
+    return await self._call(self.client.export, project_id, kind, dest, filters=filters, dimension1=dimension1, dimension2=dimension2, **kwargs)
+
+  async def upload(self, path, name=None, uploader=None, chunk_size=UPLOAD_CHUNK_SIZE, retries=UPLOAD_MAX_RETRIES, on_progress=None, on_retry=None):
+    return await self._call(self.client.upload, path, name=name, uploader=uploader, chunk_size=chunk_size, retries=retries, on_progress=on_progress, on_retry=on_retry)
+
+  async def saved_filters(self, project_id=None):
+    return await self._call(self.client.saved_filters, project_id=project_id)
+
+  async def prewarm_filter_sets(self, project, max_filters=PREWARM_MAX_FILTERS):
+    return await self._call(self.client.prewarm_filter_sets, project, max_filters=max_filters)
+
+  async def prewarm(self, project_id, concurrency=None, max_filters=None):
+    return await self._call(self.client.prewarm, project_id, concurrency=concurrency, max_filters=max_filters)
+
+  # ---- iter_* / stream_*：async 迭代器，batch 为每次在线程里取的条数 ----
+
+  def stream_issues(self, project_id, filters=None, meta=None, batch=ASYNC_ITER_BATCH, **kwargs):
+    return self._iterate(self.client.stream_issues(project_id, filters=filters, meta=meta, **kwargs), batch)
+
+  def iter_issues(self, project_id, filters=None, page_size=ISSUES_ALL_PAGE_SIZE, workers=ISSUES_ALL_WORKERS, on_total=None, batch=ASYNC_ITER_BATCH, **kwargs):
+    return self._iterate(self.client.iter_issues(project_id, filters=filters, page_size=page_size, workers=workers, on_total=on_total, **kwargs), batch)
+
+  def stream_failure_rate_matrix(self, project_id, filters=None, meta=None, batch=ASYNC_ITER_BATCH, **kwargs):
+    return self._iterate(self.client.stream_failure_rate_matrix(project_id, filters=filters, meta=meta, **kwargs), batch)
+
+  def iter_fr_compact(self, project_id, group_by, filters=None, numerator=None, sort=None, keys=None, page_size=COMPACT_PAGE_SIZE, key_name="key", batch=ASYNC_ITER_BATCH, **kwargs):
+    return self._iterate(self.client.iter_fr_compact(project_id, group_by, filters=filters, numerator=numerator, sort=sort, keys=keys, page_size=page_size, key_name=key_name, **kwargs), batch)
+
+  def iter_sample_size_compact(self, project_id, group_by, filters=None, keys=None, page_size=COMPACT_PAGE_SIZE, batch=ASYNC_ITER_BATCH, **kwargs):
+    return self._iterate(self.client.iter_sample_size_compact(project_id, group_by, filters=filters, keys=keys, page_size=page_size, **kwargs), batch)
+
+  def sweep(self, project_id, over, filters=None, workers=SWEEP_WORKERS, rate=0, on_plan=None, batch=ASYNC_ITER_BATCH, **kwargs):
+    return self._iterate(self.client.sweep(project_id, over, filters=filters, workers=workers, rate=rate, on_plan=on_plan, **kwargs), batch)
+
+  def iter_exports(self, jobs, workers=EXPORT_WORKERS, batch=ASYNC_ITER_BATCH):
+    return self._iterate(self.client.iter_exports(jobs, workers=workers), batch)
+
+  def iter_prewarm(self, project_id, filter_sets, workers=PREWARM_WORKERS, batch=ASYNC_ITER_BATCH):
+    return self._iterate(self.client.iter_prewarm(project_id, filter_sets, workers=workers), batch)
@@ -0,0 +1,952 @@
+import decimal
+import functools
+import json
+import math
+import os
+import re
+import threading
+from datetime import datetime, timedelta
+
+from issue_transport import _iso_now, iter_json_items
+
+
+SYNC_INSERT_BATCH = 1000
+
+MIRROR_ISSUE_COLUMNS = [
+  "id", "project_id", "fa_number", "open_date", "wf", "config", "symptom", "failed_test", "test_id", "priority",
+  "failure_type", "root_cause", "fa_status", "department", "owner", "sample_status", "failed_location",
+  "function_or_cosmetic", "multi_component", "sn", "unit_number", "failed_cycle_count", "raw_data", "created_at",
+]
+
+# 与 database/init.sql 中 issues/sample_sizes 的列和索引保持一致：本地执行同样的 SQL 时查询计划（进而行顺序）与服务端一致
+MIRROR_SCHEMA = """
+CREATE TABLE IF NOT EXISTS projects (
+  id INTEGER PRIMARY KEY,
+  data TEXT NOT NULL,
+  issue_count INTEGER,
+  sample_size_count INTEGER,
+  synced_at TEXT
+);
+CREATE TABLE IF NOT EXISTS issues (
+  id INTEGER PRIMARY KEY,
+  project_id INTEGER NOT NULL,
+  fa_number TEXT NOT NULL,
+  open_date DATE,
+  wf TEXT,
+  config TEXT,
+  symptom TEXT,
+  failed_test TEXT,
+  test_id TEXT,
+  priority TEXT,
+  failure_type TEXT,
+  root_cause TEXT,
+  fa_status TEXT,
+  department TEXT,
+  owner TEXT,
+  sample_status TEXT,
+  failed_location TEXT,
+  function_or_cosmetic TEXT,
+  multi_component TEXT,
+  sn TEXT,
+  unit_number TEXT,
+  failed_cycle_count INTEGER,
+  raw_data TEXT,
+  created_at DATETIME
+);
+CREATE INDEX IF NOT EXISTS idx_issues_project ON issues(project_id);
+CREATE INDEX IF NOT EXISTS idx_issues_wf ON issues(wf);
+CREATE INDEX IF NOT EXISTS idx_issues_config ON issues(config);
+CREATE INDEX IF NOT EXISTS idx_issues_symptom ON issues(symptom);
+CREATE INDEX IF NOT EXISTS idx_issues_open_date ON issues(open_date);
+CREATE INDEX IF NOT EXISTS idx_issues_test_id ON issues(test_id);
+CREATE INDEX IF NOT EXISTS idx_issues_fa_status ON issues(fa_status);
+CREATE INDEX IF NOT EXISTS idx_issues_priority ON issues(priority);
+CREATE UNIQUE INDEX IF NOT EXISTS idx_issues_project_fa_number ON issues(project_id, fa_number);
+CREATE INDEX IF NOT EXISTS idx_issues_project_wf ON issues(project_id, wf);
+CREATE INDEX IF NOT EXISTS idx_issues_project_config ON issues(project_id, config);
+CREATE INDEX IF NOT EXISTS idx_issues_project_symptom ON issues(project_id, symptom);
+CREATE INDEX IF NOT EXISTS idx_issues_project_failed_test ON issues(project_id, failed_test);
+CREATE INDEX IF NOT EXISTS idx_issues_project_date ON issues(project_id, open_date DESC);
+CREATE INDEX IF NOT EXISTS idx_issues_project_failure_type ON issues(project_id, failure_type);
+CREATE INDEX IF NOT EXISTS idx_issues_wf_config ON issues(wf, config);
+CREATE INDEX IF NOT EXISTS idx_issues_failed_test ON issues(failed_test);
+CREATE INDEX IF NOT EXISTS idx_issues_failure_type ON issues(failure_type);
+CREATE INDEX IF NOT EXISTS idx_issues_department ON issues(department);
+CREATE TABLE IF NOT EXISTS sample_sizes (
+  id INTEGER PRIMARY KEY,
+  project_id INTEGER NOT NULL,
+  waterfall TEXT NOT NULL,
+  test_name TEXT,
+  tests TEXT,
+  config_samples TEXT,
+  created_at DATETIME
+);
+CREATE INDEX IF NOT EXISTS idx_sample_sizes_project ON sample_sizes(project_id);
+CREATE INDEX IF NOT EXISTS idx_sample_sizes_wf ON sample_sizes(waterfall);
+CREATE UNIQUE INDEX IF NOT EXISTS idx_sample_sizes_project_wf ON sample_sizes(project_id, waterfall);
+"""
+
+MIRROR_CROSS_DIMENSIONS = ["symptom", "config", "wf", "failed_test", "failed_location"]
+MIRROR_MATRIX_CONFIGS = ["R1CASN", "R2CBCN", "R3CBCN", "R4FNSN"]
+
+# buildIssuesWhere 里 "xxx IN (...)" 类筛选：(query 参数, 列名)，顺序与服务端一致
+_ISSUE_IN_FILTERS_HEAD = [("priorities", "priority"), ("sample_statuses", "sample_status"), ("departments", "department")]
+_ISSUE_IN_FILTERS_TAIL = [
+  ("wfs", "wf"),
+  ("configs", "config"),
+  ("failed_tests", "failed_test"),
+  ("test_ids", "test_id"),
+  ("failure_types", "failure_type"),
+  ("function_cosmetic", "function_or_cosmetic"),
+  ("failed_locations", "failed_location"),
+  ("symptoms", "symptom"),
+  ("fa_statuses", "fa_status"),
+]
+
+# getFilterOptions：(返回字段, 列名, 对应的 currentFilters 参数)；WHERE 条件按服务端的拼接顺序
+_OPTION_FILTER_ORDER = [
+  ("symptoms", "symptom"),
+  ("failed_locations", "failed_location"),
+  ("wfs", "wf"),
+  ("failed_tests", "failed_test"),
+  ("configs", "config"),
+  ("priorities", "priority"),
+  ("fa_statuses", "fa_status"),
+  ("failure_types", "failure_type"),
+  ("function_cosmetic", "function_or_cosmetic"),
+  ("test_ids", "test_id"),
+  ("sample_statuses", "sample_status"),
+  ("departments", "department"),
+]
+_OPTION_FIELDS = [
+  ("priorities", "priority"),
+  ("sampleStatuses", "sample_status"),
+  ("departments", "department"),
+  ("wfs", "wf"),
+  ("configs", "config"),
+  ("failedTests", "failed_test"),
+  ("testIds", "test_id"),
+  ("failureTypes", "failure_type"),
+  ("functionCosmetic", "function_or_cosmetic"),
+  ("failedLocations", "failed_location"),
+  ("symptoms", "symptom"),
+  ("faStatuses", "fa_status"),
+]
+
+
+# ---- 与 JS 语义对齐的小工具（本地计算结果要与 analysisService 逐字段一致）----
+
+_JS_INT_PREFIX = re.compile(r"\s*([+-]?\d+)")
+_JS_ARRAY_INDEX = re.compile(r"0|[1-9]\d*")
+
+
+def _js_parse_int(value):
+  # parseInt(value)：解析不出时返回 None（对应 NaN）
+  m = _JS_INT_PREFIX.match("" if value is None else str(value))
+  return int(m.group(1)) if m else None
+
+
+def _js_number(value):
+  # Number(value)：空串为 0，无法解析为 NaN；整数值返回 int，避免输出 100.0
+  if isinstance(value, bool):
+    return int(value)
+  if isinstance(value, (int, float)):
+    n = value
+  elif value is None:
+    return 0
+  else:
+    text = str(value).strip()
+    if not text:
+      return 0
+    try:
+      n = float(text)
+    except ValueError:
+      return math.nan
+  if isinstance(n, float) and n.is_integer():
+    return int(n)
+  return n
+
+
+def _js_number_or_zero(value):
+  n = _js_number(value)
+  return 0 if n != n else n
+
+
+def _js_round(x):
+  return int(math.floor(x + 0.5))
+
+
+def _js_fixed2(x):
+  # parseFloat(x.toFixed(2))：toFixed 按十进制精确值 round half up，Python round 是银行家舍入
+  v = float(decimal.Decimal(x).quantize(decimal.Decimal("0.01"), rounding=decimal.ROUND_HALF_UP))
+  return int(v) if v.is_integer() else v
+
+
+def _js_object(d):
+  # JS 普通对象的属性顺序：形如数组下标的 key 按数值升序排在最前，其余保持插入顺序
+  index_keys = sorted((k for k in d if _JS_ARRAY_INDEX.fullmatch(k) and int(k) < 4294967295), key=int)
+  if not index_keys:
+    return d
+  ordered = {k: d[k] for k in index_keys}
+  ordered.update((k, v) for k, v in d.items() if k not in ordered)
+  return ordered
+
+
+def _js_numeric_cmp(a, b):
+  # (a, b) => Number(a) - Number(b)：NaN 视为相等
+  d = _js_number(a) - _js_number(b)
+  if d != d:
+    return 0
+  return (d > 0) - (d < 0)
+
+
+def _wf_sort_key(value):
+  return _js_parse_int(value) or 0
+
+
+def _normalize_name(name):
+  if not name:
+    return ""
+  return re.sub(r"\s+", " ", str(name)).strip()
+
+
+def _normalize_csv_array(value):
+  if not value:
+    return None
+  if isinstance(value, (list, tuple)):
+    return [str(v).strip() for v in value if str(v).strip()]
+  if isinstance(value, str):
+    return [v.strip() for v in value.split(",") if v.strip()]
+  return None
+
+
+def build_issues_where(project_id, filters, exclude_retest_pass=False):
+  # issueWhere.buildIssuesWhere 的 Python 版本
+  where = "project_id = ?"
+  params = [project_id]
+  if exclude_retest_pass:
+    where += " AND (fa_status IS NULL OR lower(trim(fa_status)) <> 'retest pass')"
+
+  def add_in(pairs):
+    nonlocal where
+    for key, column in pairs:
+      values = _normalize_csv_array(filters.get(key))
+      if values:
+        where += f" AND {column} IN ({','.join('?' * len(values))})"
+        params.extend(values)
+
+  if filters.get("date_from"):
+    where += " AND CAST(open_date AS TEXT) >= ?"
+    params.append(filters["date_from"])
+  if filters.get("date_to"):
+    where += " AND CAST(open_date AS TEXT) <= ?"
+    params.append(filters["date_to"])
+  add_in(_ISSUE_IN_FILTERS_HEAD)
+  if filters.get("unit_number"):
+    where += " AND raw_data LIKE ?"
+    params.append(f'%"Unit#":"%{filters["unit_number"]}%"%')
+  if filters.get("sn"):
+    where += " AND raw_data LIKE ?"
+    params.append(f'%"SN":"%{filters["sn"]}%"%')
+  add_in(_ISSUE_IN_FILTERS_TAIL)
+  if filters.get("fa_search"):
+    where += " AND fa_number LIKE ?"
+    params.append(f"%{filters['fa_search']}%")
+  return where, params
+
+
+# ---- analysisService 口径的本地实现 ----
+
+
+def build_wf_sample_map(sample_sizes):
+  wf_map = {}
+  for sample in sample_sizes:
+    tests = sample.get("tests") or []
+    names = []
+    for t in tests:
+      name = _normalize_name((t or {}).get("testName"))
+      if name and name != "/" and name not in names:
+        names.append(name)
+    config_samples = {}
+    for key, value in _js_object(sample.get("config_samples") or {}).items():
+      normalized = _normalize_name(key)
+      if normalized:
+        config_samples[normalized] = config_samples.get(normalized, 0) + _js_number_or_zero(value)
+    wf_map[sample.get("waterfall")] = {
+      "tests": sample.get("tests"),
+      "testName": _normalize_name(sample.get("test_name")) or " + ".join(names),
+      "configSamples": config_samples,
+      "totalSamples": sum(config_samples.values()),
+    }
+  return wf_map
+
+
+def _test_to_wfs(wf_map):
+  mapping = {}
+  for wf, sample in wf_map.items():
+    tests = sample.get("tests")
+    if not isinstance(tests, list):
+      continue
+    for t in tests:
+      name = _normalize_name((t or {}).get("testName"))
+      if name:
+        mapping.setdefault(name, {})[wf] = True
+  return mapping
+
+
+def _select_target_wfs(wf_map, filters):
+  wfs = filters.get("wfs")
+  failed_tests = filters.get("failed_tests")
+  if failed_tests:
+    mapping = _test_to_wfs(wf_map)
+    target = {}
+    for name in failed_tests:
+      target.update(mapping.get(_normalize_name(name)) or {})
+    if wfs:
+      target = {wf: True for wf in target if wf in set(wfs)}
+    return list(target)
+  if wfs:
+    return list(dict.fromkeys(wfs))
+  return list(wf_map)
+
+
+def _wf_sample_size(wf, wf_map, filters):
+  sample = wf_map.get(wf)
+  if not sample:
+    return 0
+  configs = filters.get("configs")
+  if configs:
+    return sum(sample["configSamples"].get(c) or 0 for c in configs)
+  return sample.get("totalSamples") or 0
+
+
+def _total_samples(wf_map, filters):
+  configs = filters.get("configs")
+  total = 0
+  for wf in _select_target_wfs(wf_map, filters):
+    sample = wf_map.get(wf)
+    if not sample:
+      continue
+    if configs:
+      total += sum(sample["configSamples"].get(c) or 0 for c in configs)
+    else:
+      total += sample.get("totalSamples") or 0
+  return total
+
+
+def _include_in_analysis(issue):
+  status = str(issue.get("fa_status")).lower().strip() if issue.get("fa_status") else ""
+  return status != "retest pass"
+
+
+def _sn_of(issue):
+  return issue.get("sn") or issue.get("fa_number")
+
+
+class _FailureBucket:
+  __slots__ = ("total", "spec", "strife", "spec_sns", "strife_sns")
+
+  def __init__(self):
+    self.total = 0
+    self.spec = 0
+    self.strife = 0
+    self.spec_sns = set()
+    self.strife_sns = set()
+
+  def add(self, issue):
+    self.total += 1
+    sn = _sn_of(issue)
+    if issue.get("failure_type") == "Spec.":
+      self.spec += 1
+      if sn:
+        self.spec_sns.add(sn)
+    elif issue.get("failure_type") == "Strife":
+      self.strife += 1
+      if sn:
+        self.strife_sns.add(sn)
+
+
+def _bucket_by(issues, key_fn):
+  buckets = {}
+  for issue in issues:
+    key = key_fn(issue)
+    if not key:
+      continue
+    bucket = buckets.get(key)
+    if bucket is None:
+      bucket = buckets[key] = _FailureBucket()
+    bucket.add(issue)
+  return buckets
+
+
+def _rate_fields(bucket, total_samples):
+  return {
+    "specRate": f"{len(bucket.spec_sns)}F/{total_samples}T" if total_samples > 0 else "N/A",
+    "strifeRate": f"{len(bucket.strife_sns)}SF/{total_samples}T" if total_samples > 0 else "N/A",
+    "specFailureRate": _js_round(len(bucket.spec_sns) / total_samples * 1000000) if total_samples > 0 else 0,
+  }
+
+
+def _percent(count, total):
+  return _js_fixed2(count / total * 100) if total > 0 else 0
+
+
+def _by_spec_rate(rows):
+  return sorted(rows, key=lambda r: -r["specFailureRate"])
+
+
+def _count_distribution(issues, key_fn, name):
+  counts = {}
+  for issue in issues:
+    key = str(key_fn(issue))
+    counts[key] = counts.get(key, 0) + 1
+  rows = [{name: k, "count": c, "percentage": _percent(c, len(issues))} for k, c in _js_object(counts).items()]
+  return sorted(rows, key=lambda r: -r["count"])
+
+
+def _parse_trend_date(value):
+  m = re.match(r"(\d{4})-(\d{2})-(\d{2})", str(value or ""))
+  if not m:
+    return None
+  try:
+    return datetime(int(m.group(1)), int(m.group(2)), int(m.group(3)))
+  except ValueError:
+    return None
+
+
+def _time_trend(issues, date_from, date_to):
+  # 趋势按 UTC 日期分桶（服务端容器默认时区为 UTC）
+  start = _parse_trend_date(date_from)
+  end = _parse_trend_date(date_to)
+  days = math.ceil((end - start).total_seconds() / 86400) if start and end else 0
+  granularity = "month" if days > 60 else "week" if days > 7 else "day"
+  buckets = {}
+  for issue in issues:
+    date = _parse_trend_date(issue.get("open_date"))
+    if date is None:
+      continue
+    if granularity == "day":
+      key = date.strftime("%Y-%m-%d")
+    elif granularity == "week":
+      key = (date - timedelta(days=(date.weekday() + 1) % 7)).strftime("%Y-%m-%d")
+    else:
+      key = date.strftime("%Y-%m")
+    buckets.setdefault(key, _FailureBucket()).add(issue)
+  data = [
+    {"date": k, "totalCount": b.total, "specCount": len(b.spec_sns), "strifeCount": len(b.strife_sns)}
+    for k, b in buckets.items()
+  ]
+  return {"enabled": True, "granularity": granularity, "data": sorted(data, key=lambda r: r["date"])}
+
+
+def calculate_filter_stats(issues, wf_map, filters, include_trend=False):
+  # analysisService.calculateFilterStats 的 Python 版本（字段、排序、取整方式一致）
+  normalized = dict(filters)
+  for key in ("wfs", "configs", "failed_tests"):
+    value = normalized.get(key)
+    if value:
+      # 与服务端一致：字符串整体当作单个值（不按逗号拆分）
+      normalized[key] = value if isinstance(value, list) else [value] if isinstance(value, str) else None
+
+  valid = [i for i in issues if _include_in_analysis(i)]
+  total_count = len(valid)
+  overall = _FailureBucket()
+  wfs_seen, configs_seen, symptoms_seen = {}, {}, {}
+  for issue in valid:
+    overall.add(issue)
+    for seen, field in ((wfs_seen, "wf"), (configs_seen, "config"), (symptoms_seen, "symptom")):
+      if issue.get(field):
+        seen[issue[field]] = True
+  global_total = _total_samples(wf_map, normalized)
+
+  symptom_distribution = _by_spec_rate([
+    {
+      "symptom": symptom,
+      "totalCount": b.total,
+      "specCount": b.spec,
+      "strifeCount": b.strife,
+      "specSNCount": len(b.spec_sns),
+      "strifeSNCount": len(b.strife_sns),
+      "totalSamples": global_total,
+      "percentage": _js_fixed2(b.total / total_count * 100),
+      **_rate_fields(b, global_total),
+    }
+    for symptom, b in _bucket_by(valid, lambda i: i.get("symptom")).items()
+  ])
+
+  wf_distribution = []
+  for wf, b in _bucket_by(valid, lambda i: i.get("wf")).items():
+    samples = _wf_sample_size(wf, wf_map, normalized)
+    wf_distribution.append({
+      "wf": wf,
+      "totalCount": b.total,
+      "specCount": b.spec,
+      "strifeCount": b.strife,
+      "specSNCount": len(b.spec_sns),
+      "strifeSNCount": len(b.strife_sns),
+      "percentage": _js_fixed2(b.total / total_count * 100),
+      "totalSamples": samples,
+      **_rate_fields(b, samples),
+    })
+  wf_distribution = _by_spec_rate(wf_distribution)
+
+  config_distribution = sorted(
+    [
+      {
+        "config": config,
+        "totalCount": b.total,
+        "specCount": b.spec,
+        "strifeCount": b.strife,
+        "specSNCount": len(b.spec_sns),
+        "strifeSNCount": len(b.strife_sns),
+        "percentage": _js_fixed2(b.total / total_count * 100),
+      }
+      for config, b in _bucket_by(valid, lambda i: i.get("config")).items()
+    ],
+    key=lambda r: -r["totalCount"],
+  )
+
+  test_wfs = _test_to_wfs(wf_map)
+  failed_test_distribution = []
+  for name, b in _bucket_by(valid, lambda i: _normalize_name(i.get("failed_test"))).items():
+    display = list(test_wfs.get(name) or {})
+    if normalized.get("wfs"):
+      allowed = set(normalized["wfs"])
+      display = [wf for wf in display if wf in allowed]
+    display.sort(key=functools.cmp_to_key(_js_numeric_cmp))
+    samples = 0
+    if test_wfs.get(name):
+      samples = _total_samples(wf_map, {**normalized, "failed_tests": [name]})
+    elif display:
+      fallback = {k: v for k, v in normalized.items() if k != "failed_tests"}
+      samples = _total_samples(wf_map, {**fallback, "wfs": display})
+    failed_test_distribution.append({
+      "testName": name,
+      "totalCount": b.total,
+      "specCount": b.spec,
+      "strifeCount": b.strife,
+      "specSNCount": len(b.spec_sns),
+      "strifeSNCount": len(b.strife_sns),
+      "totalSamples": samples,
+      "wfs": ", ".join(display),
+      "percentage": _percent(b.total, total_count),
+      **_rate_fields(b, samples),
+    })
+  failed_test_distribution = _by_spec_rate(failed_test_distribution)
+
+  failed_location_distribution = _by_spec_rate([
+    {
+      "failedLocation": location,
+      "totalCount": b.total,
+      "specCount": b.spec,
+      "strifeCount": b.strife,
+      "specSNCount": len(b.spec_sns),
+      "strifeSNCount": len(b.strife_sns),
+      "totalSamples": global_total,
+      "percentage": _percent(b.total, total_count),
+      **_rate_fields(b, global_total),
+    }
+    for location, b in _bucket_by(valid, lambda i: str(i.get("failed_location")).strip() if i.get("failed_location") else "").items()
+  ])
+
+  failure_type_distribution = [
+    {
+      "type": "Spec.",
+      "count": overall.spec,
+      "snCount": len(overall.spec_sns),
+      "percentage": _percent(overall.spec, total_count),
+      "rate": f"{len(overall.spec_sns)}F/{global_total}T" if global_total > 0 else "N/A",
+    },
+    {
+      "type": "Strife",
+      "count": overall.strife,
+      "snCount": len(overall.strife_sns),
+      "percentage": _percent(overall.strife, total_count),
+      "rate": f"{len(overall.strife_sns)}SF/{global_total}T" if global_total > 0 else "N/A",
+    },
+  ]
+
+  statistics = {
+    "totalCount": total_count,
+    "specCount": overall.spec,
+    "strifeCount": overall.strife,
+    "specSNCount": len(overall.spec_sns),
+    "strifeSNCount": len(overall.strife_sns),
+    "uniqueWFs": len(wfs_seen),
+    "uniqueConfigs": len(configs_seen),
+    "uniqueSymptoms": len(symptoms_seen),
+    "totalSamples": global_total,
+    "wfList": sorted(wfs_seen, key=_wf_sort_key),
+    "configList": sorted(configs_seen),
+    "symptomDistribution": symptom_distribution,
+    "wfDistribution": wf_distribution,
+    "configDistribution": config_distribution,
+    "failedTestDistribution": failed_test_distribution,
+    "failedLocationDistribution": failed_location_distribution,
+    "failureTypeDistribution": failure_type_distribution,
+    "functionCosmeticDistribution": _count_distribution(valid, lambda i: i.get("function_or_cosmetic") or "未知", "category"),
+    "faStatusDistribution": _count_distribution(issues, lambda i: i.get("fa_status") or "未知", "status"),
+  }
+  result = {"statistics": statistics}
+  if include_trend and filters.get("date_from") and filters.get("date_to"):
+    result["timeTrend"] = _time_trend(valid, filters["date_from"], filters["date_to"])
+  return result
+
+
+def calculate_cross_stats(issues, wf_map, dimension1, dimension2, filters):
+  # analysisService.calculateCrossStats 的 Python 版本
+  wfs = _normalize_csv_array(filters.get("wfs"))
+  failed_tests = _normalize_csv_array(filters.get("failed_tests"))
+  configs = _normalize_csv_array(filters.get("configs"))
+  target_wfs = _select_target_wfs(wf_map, {"wfs": wfs, "failed_tests": failed_tests})
+
+  config_totals = {}
+  all_configs = {}
+  for sample in wf_map.values():
+    for name in sample.get("configSamples") or {}:
+      if _normalize_name(name):
+        all_configs[_normalize_name(name)] = True
+  for issue in issues:
+    if _normalize_name(issue.get("config")):
+      all_configs[_normalize_name(issue.get("config"))] = True
+  for config in all_configs:
+    config_totals[config] = sum((wf_map[wf]["configSamples"].get(config) or 0) for wf in target_wfs if wf in wf_map)
+  target_configs = None
+  if configs:
+    target_configs = list(dict.fromkeys(c for c in (_normalize_name(c) for c in configs) if c))
+
+  def samples_of(sample):
+    if target_configs is not None:
+      return sum(sample["configSamples"].get(c) or 0 for c in target_configs)
+    return sum(sample["configSamples"].values())
+
+  cells = {}
+  for issue in issues:
+    v1 = issue.get(dimension1)
+    v2 = issue.get(dimension2)
+    if not v1 or not v2:
+      continue
+    key = f"{v1}||{v2}"
+    cell = cells.get(key)
+    if cell is None:
+      cell = cells[key] = (v1, v2, _FailureBucket())
+    bucket = cell[2]
+    bucket.total += 1
+    sn = _sn_of(issue)
+    if issue.get("failure_type") == "Spec.":
+      bucket.spec += 1
+      bucket.spec_sns.add(sn)
+    elif issue.get("failure_type") == "Strife":
+      bucket.strife += 1
+      bucket.strife_sns.add(sn)
+
+  # 与服务端一致：同一 WF 内重复出现的 test 会被重复计入分母
+  test_samples = {}
+  if dimension2 == "failed_test":
+    for wf, sample in wf_map.items():
+      if isinstance(sample.get("tests"), list):
+        for t in sample["tests"]:
+          name = _normalize_name((t or {}).get("testName"))
+          if name:
+            test_samples.setdefault(name, []).append(sample)
+  results = []
+  for v1, v2, b in cells.values():
+    if dimension2 == "config":
+      samples = config_totals.get(_normalize_name(v2)) or 0
+    elif dimension2 == "wf":
+      sample = wf_map.get(v2)
+      samples = samples_of(sample) if sample else 0
+    elif dimension2 == "failed_test":
+      samples = sum(samples_of(sample) for sample in test_samples.get(_normalize_name(v2)) or [])
+    else:
+      samples = sum(samples_of(wf_map[wf]) for wf in target_wfs if wf in wf_map)
+    spec_sn = len(b.spec_sns)
+    strife_sn = len(b.strife_sns)
+    results.append({
+      "dimension1Value": v1,
+      "dimension2Value": v2,
+      "totalCount": b.total,
+      "specCount": b.spec,
+      "strifeCount": b.strife,
+      "specSNCount": spec_sn,
+      "strifeSNCount": strife_sn,
+      "percentage": _js_fixed2(b.total / len(issues) * 100) if issues else 0,
+      "totalSamples": samples,
+      "totalFailureRate": f"{spec_sn}F+{strife_sn}SF/{samples}T" if samples > 0 else "N/A",
+      "specFailureRate": f"{spec_sn}F/{samples}T" if samples > 0 else "N/A",
+      "strifeFailureRate": f"{strife_sn}SF/{samples}T" if samples > 0 else "N/A",
+    })
+  return sorted(results, key=lambda r: -r["totalCount"])
+
+
+def _sort_dimension_values(values, dimension):
+  if dimension == "wf":
+    return sorted(values, key=_wf_sort_key)
+  return sorted(values)
+
+
+def calculate_failure_rate_matrix(issues, sample_sizes):
+  # analysisModel.getFailureRateMatrix 的 Python 版本
+  ordered = sorted(sample_sizes, key=lambda s: _wf_sort_key(s.get("waterfall")))
+  wfs = [s.get("waterfall") for s in ordered]
+  tests_by_wf = {}
+  test_to_wf = {}
+  for sample in ordered:
+    tests_by_wf[sample.get("waterfall")] = sample.get("tests") or []
+    for t in sample.get("tests") or []:
+      test_to_wf[t.get("testName")] = sample.get("waterfall")
+
+  failures = {}
+  processed = set()
+  for issue in issues:
+    if not issue.get("failed_test") or not issue.get("config"):
+      continue
+    if issue.get("fa_number") in processed:
+      continue
+    processed.add(issue.get("fa_number"))
+    if not test_to_wf.get(issue["failed_test"]):
+      continue
+    key = f"{issue.get('wf')}-{issue['failed_test']}-{issue['config']}"
+    spec_sns, strife_sns = failures.setdefault(key, (set(), set()))
+    sn = _sn_of(issue)
+    failure_type = str(issue.get("failure_type")).strip() if issue.get("failure_type") else ""
+    if failure_type in ("Spec.", "Spec") and sn:
+      spec_sns.add(sn)
+    elif failure_type == "Strife" and sn:
+      strife_sns.add(sn)
+
+  matrix = {}
+  for wf in wfs:
+    sample = next((s for s in ordered if s.get("waterfall") == wf), None)
+    config_samples = (sample or {}).get("config_samples") or {}
+    for idx, test in enumerate(tests_by_wf.get(wf) or []):
+      name = test.get("testName")
+      entry = {"testName": name}
+      if test.get("testId") is not None:
+        entry["testId"] = test["testId"]
+      entry["configs"] = {}
+      for config in MIRROR_MATRIX_CONFIGS:
+        spec_sns, strife_sns = failures.get(f"{wf}-{name}-{config}") or ((), ())
+        total = config_samples.get(config) or 0
+        counts = {"specCount": len(spec_sns), "strifeCount": len(strife_sns), "samples": total}
+        if spec_sns:
+          cell = {"text": f"{len(spec_sns)}F/{total}T", "type": "spec", **counts}
+        elif strife_sns:
+          cell = {"text": f"{len(strife_sns)}SF/{total}T", "type": "strife", **counts}
+        elif _js_number_or_zero(total) > 0:
+          cell = {"text": f"0F/{total}T", "type": "none", **counts}
+        else:
+          cell = None
+        entry["configs"][config] = cell
+      matrix[f"{wf}-{idx}"] = entry
+
+  return {
+    "wfs": wfs,
+    "tests": ["Test1", "Test2", "Test3"],
+    "configs": list(MIRROR_MATRIX_CONFIGS),
+    "matrix": matrix,
+    "testsByWf": _js_object(tests_by_wf),
+  }
+
+
+class LocalMirror:
+  """sync 下来的快照镜像（SQLite，表结构与服务端 issues/sample_sizes 一致）；快照上传后不可变，同步一次即可离线反复查询。"""
+
+  def __init__(self, path, create=False):
+    if not create and not os.path.exists(path):
+      raise RuntimeError(f"Local mirror not found: {path} (run `sync` first)")
+    if create:
+      os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    import sqlite3  # 只有 sync / --local 用到
+
+    self.path = path
+    self._conn = sqlite3.connect(path, check_same_thread=False)
+    self._conn.row_factory = sqlite3.Row
+    self._lock = threading.Lock()
+    with self._lock:
+      self._conn.executescript(MIRROR_SCHEMA)
+
+  def close(self):
+    self._conn.close()
+
+  def _all(self, sql, params=()):
+    with self._lock:
+      return [dict(r) for r in self._conn.execute(sql, params)]
+
+  def projects(self):
+    return [json.loads(r["data"]) for r in self._all("SELECT data FROM projects ORDER BY id")]
+
+  def synced(self, pid):
+    rows = self._all("SELECT issue_count, sample_size_count, synced_at FROM projects WHERE id = ?", (pid,))
+    return rows[0] if rows else None
+
+  def _require(self, pid):
+    if self.synced(pid) is None:
+      raise RuntimeError(f"Project {pid} is not in the local mirror {self.path} (run `sync` first)")
+
+  def store_project(self, project, issues, sample_sizes, expected_total=None):
+    # expected_total() 与实际条数不一致时回滚
+    pid = project["id"]
+    placeholders = ",".join("?" * len(MIRROR_ISSUE_COLUMNS))
+    insert_issue = f"INSERT INTO issues ({','.join(MIRROR_ISSUE_COLUMNS)}) VALUES ({placeholders})"
+    count = 0
+    with self._lock, self._conn:
+      self._conn.execute("DELETE FROM issues WHERE project_id = ?", (pid,))
+      self._conn.execute("DELETE FROM sample_sizes WHERE project_id = ?", (pid,))
+      self._conn.execute("DELETE FROM projects WHERE id = ?", (pid,))
+      batch = []
+      for issue in issues:
+        batch.append(tuple(pid if c == "project_id" else issue.get(c) for c in MIRROR_ISSUE_COLUMNS))
+        if len(batch) >= SYNC_INSERT_BATCH:
+          self._conn.executemany(insert_issue, batch)
+          count += len(batch)
+          batch = []
+      if batch:
+        self._conn.executemany(insert_issue, batch)
+        count += len(batch)
+      expected = expected_total() if expected_total else None
+      if expected is not None and expected != count:
+        raise RuntimeError(f"Project {pid}: fetched {count} issues but server reported total={expected}")
+      self._conn.executemany(
+        "INSERT INTO sample_sizes (id, project_id, waterfall, test_name, tests, config_samples, created_at) VALUES (?, ?, ?, ?, ?, ?, ?)",
+        [
+          (
+            s.get("id"),
+            pid,
+            s.get("waterfall"),
+            s.get("test_name"),
+            json.dumps(s.get("tests") or [], ensure_ascii=False),
+            json.dumps(s.get("config_samples") or {}, ensure_ascii=False),
+            s.get("created_at"),
+          )
+          for s in sample_sizes
+        ],
+      )
+      self._conn.execute(
+        "INSERT INTO projects (id, data, issue_count, sample_size_count, synced_at) VALUES (?, ?, ?, ?, ?)",
+        (pid, json.dumps(project, ensure_ascii=False), count, len(sample_sizes), _iso_now()),
+      )
+      self._conn.execute("ANALYZE")
+    return count
+
+  def issues_for_analysis(self, pid, filters, limit):
+    where, params = build_issues_where(pid, filters, exclude_retest_pass=True)
+    return self._all(f"SELECT * FROM issues WHERE {where} LIMIT ?", (*params, int(limit)))
+
+  def iter_issues(self, pid, batch=SYNC_INSERT_BATCH):
+    self._require(pid)
+    cursor = self._conn.cursor()
+    with self._lock:
+      cursor.execute("SELECT * FROM issues WHERE project_id = ? ORDER BY fa_number", (pid,))
+    try:
+      while True:
+        with self._lock:
+          rows = cursor.fetchmany(batch)
+        if not rows:
+          return
+        for r in rows:
+          yield dict(r)
+    finally:
+      cursor.close()
+
+  def sample_sizes(self, pid):
+    rows = self._all("SELECT * FROM sample_sizes WHERE project_id = ? ORDER BY waterfall", (pid,))
+    for r in rows:
+      r["tests"] = json.loads(r["tests"]) if r["tests"] else []
+      r["config_samples"] = json.loads(r["config_samples"]) if r["config_samples"] else {}
+    return rows
+
+  def filter_statistics(self, pid, params):
+    self._require(pid)
+    filters = {k: v for k, v in params.items() if k != "includeTrend"}
+    include_trend = str(params.get("includeTrend")) in ("true", "1")
+    issues = self.issues_for_analysis(pid, filters, 999999)
+    return calculate_filter_stats(issues, build_wf_sample_map(self.sample_sizes(pid)), filters, include_trend)
+
+  def cross_analysis(self, pid, params):
+    self._require(pid)
+    filters = dict(params)
+    dimension1 = filters.pop("dimension1", None)
+    dimension2 = filters.pop("dimension2", None)
+    if not dimension1 or not dimension2:
+      raise RuntimeError("Missing required parameters: dimension1 and dimension2")
+    if dimension1 not in MIRROR_CROSS_DIMENSIONS or dimension2 not in MIRROR_CROSS_DIMENSIONS:
+      raise RuntimeError(f"Invalid dimension. Allowed: {', '.join(MIRROR_CROSS_DIMENSIONS)}")
+    if dimension1 == dimension2:
+      raise RuntimeError("Dimension1 and dimension2 must be different")
+    issues = self.issues_for_analysis(pid, filters, 999999)
+    cells = calculate_cross_stats(issues, build_wf_sample_map(self.sample_sizes(pid)), dimension1, dimension2, filters)
+    return {
+      "crossAnalysis": {
+        "dimension1": dimension1,
+        "dimension2": dimension2,
+        "matrix": cells,
+        "dimension1Values": _sort_dimension_values(dict.fromkeys(c["dimension1Value"] for c in cells), dimension1),
+        "dimension2Values": _sort_dimension_values(dict.fromkeys(c["dimension2Value"] for c in cells), dimension2),
+      }
+    }
+
+  def failure_rate_matrix(self, pid, params):
+    self._require(pid)
+    return calculate_failure_rate_matrix(self.issues_for_analysis(pid, params, 100000), self.sample_sizes(pid))
+
+  def filter_options(self, pid, params):
+    # 服务端只在参数以重复 key 传成数组时可用；这里把逗号分隔的值拆成数组，结果与数组形式的请求一致
+    self._require(pid)
+    current = {key: _normalize_csv_array(params.get(key)) for key, _ in _OPTION_FILTER_ORDER}
+    result = {}
+    for field, column in _OPTION_FIELDS:
+      conditions = ["project_id = ?"]
+      values = [pid]
+      for key, other in _OPTION_FILTER_ORDER:
+        if other != column and current[key]:
+          conditions.append(f"{other} IN ({','.join('?' * len(current[key]))})")
+          values.extend(current[key])
+      order = "CAST(wf AS INTEGER), wf" if column == "wf" else column
+      sql = (
+        f"SELECT DISTINCT {column} FROM issues WHERE {' AND '.join(conditions)} "
+        f"AND {column} IS NOT NULL AND {column} != '' ORDER BY {order}"
+      )
+      result[field] = [r[column] for r in self._all(sql, values)]
+    return result
+
+  def get_sample_sizes(self, pid, params):
+    self._require(pid)
+    return self.sample_sizes(pid)
+
+
+class LocalSession:
+  """--local 时替代 AuthSession：接口相同，但只从本地镜像计算，不登录、不发请求。"""
+
+  ROUTES = [
+    (re.compile(r"/api/projects/(\d+)/filter-statistics"), "filter_statistics"),
+    (re.compile(r"/api/projects/(\d+)/analysis/cross"), "cross_analysis"),
+    (re.compile(r"/api/projects/(\d+)/failure-rate-matrix"), "failure_rate_matrix"),
+    (re.compile(r"/api/projects/(\d+)/filter-options"), "filter_options"),
+    (re.compile(r"/api/projects/(\d+)/sample-sizes"), "get_sample_sizes"),
+  ]
+
+  def __init__(self, mirror):
+    self.mirror = mirror
+
+  def cached(self, path, params, fetch, ttl=None):
+    return fetch()
+
+  def get_if_changed(self, path, params=None, etag=None):
+    return self.get(path, params=params), None
+
+  def get(self, path, params=None, ttl=None, cache=True):
+    if path == "/api/projects":
+      return self.mirror.projects()
+    for pattern, method in self.ROUTES:
+      m = pattern.fullmatch(path)
+      if m:
+        return getattr(self.mirror, method)(int(m.group(1)), dict(params or {}))
+    raise RuntimeError(f"--local does not support {path} (only stats/cross/filter-options/failure-matrix)")
+
+  def stream(self, path, params, item_path, meta):
+    envelope = {"success": True, "data": self.get(path, params)}
+    yield from iter_json_items([json.dumps(envelope, ensure_ascii=False).encode("utf-8")], item_path, meta)
+
+  def post(self, path, body_obj):
+    raise RuntimeError(f"--local does not support POST {path}")
@@ -1,234 +1,642 @@
 import argparse
+import collections
 import csv
 import getpass
+import hashlib
+import io
+import itertools
 import json
+import math
 import os
+import socket
+import subprocess
 import sys
-import urllib.error
+import threading
+import time
 import urllib.parse
-import urllib.request
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
 
+from issue_client import (
+  BATCH_MAX_QUERIES, COMPACT_PAGE_SIZE, EXPORT_KINDS, EXPORT_WORKERS, FILTER_SPECS, ISSUES_ALL_PAGE_SIZE, ISSUES_ALL_WORKERS, LOCAL_DB_FILENAME,
+  MATRIX_DIMENSIONS, PREWARM_MAX_FILTERS, PREWARM_QUERIES, PREWARM_WORKERS, PROJECTS_CACHE_TTL_SECONDS, RESPONSE_CACHE_TTL_SECONDS, STATS_KINDS,
+  SWEEP_WORKERS, UPLOAD_CHUNK_SIZE, UPLOAD_MAX_RETRIES, _CACHE_MISS, AuthSession, IssueAnalyzorClient, _auth_session, _compact_page_rows,
+  _extract_path, _local_db_path, _match_projects, _matrix_entry_cells, _parse_csv, _ppm, _safe_file_name, _stats_rows, _user_cache_dir,
+  export_up_to_date, latest_snapshots, matrix_cells, normalize_filters, plan_exports, select_project, sweep_dimension, top_rows,
+)
+from issue_local import LocalMirror, LocalSession
+from issue_transport import (
+  POOL_MAXSIZE, READ_CHUNK_SIZE, STREAMED_ARRAY, STREAMED_OBJECT, Cassette, ConnectionPool, HttpError, RecordingTransport, ReplayServer,
+  UrllibTransport, _build_url, _http_json, _iso_now, _maybe_get_env, get_tracer, get_transport, set_tracer, set_transport,
+)
 
-FILTER_SPECS = [
-  {"name": "date_from", "type": "string", "example": "2025-12-01", "desc": "Open Date 起始（含）"},
-  {"name": "date_to", "type": "string", "example": "2025-12-31", "desc": "Open Date 结束（含）"},
-  {"name": "priorities", "type": "csv", "example": "P0,P1", "desc": "Priority 多选"},
-  {"name": "sample_statuses", "type": "csv", "example": "Fail,Pass", "desc": "Sample Status 多选"},
-  {"name": "departments", "type": "csv", "example": "EE,ME", "desc": "Department 多选"},
-  {"name": "wfs", "type": "csv", "example": "1,2,3", "desc": "WF 多选"},
-  {"name": "configs", "type": "csv", "example": "R1CASN,R2CBCN", "desc": "Config 多选"},
-  {"name": "failed_tests", "type": "csv", "example": "Test A,Test B", "desc": "Failed Test 多选"},
-  {"name": "test_ids", "type": "csv", "example": "Test1,Test2", "desc": "Test ID 多选"},
-  {"name": "failure_types", "type": "csv", "example": "Spec.,Strife", "desc": "Failure Type 多选"},
-  {"name": "function_cosmetic", "type": "csv", "example": "Function,Cosmetic", "desc": "Function/Cosmetic 多选"},
-  {"name": "failed_locations", "type": "csv", "example": "ISB,USB", "desc": "Failed Location 多选"},
-  {"name": "symptoms", "type": "csv", "example": "Rattle lv3", "desc": "Symptom 多选"},
-  {"name": "fa_statuses", "type": "csv", "example": "open,close", "desc": "FA Status 多选"},
-  {"name": "unit_number", "type": "string", "example": "Unit123", "desc": "Unit# 模糊搜索"},
-  {"name": "sn", "type": "string", "example": "SN001", "desc": "SN 模糊搜索"},
-  {"name": "fa_search", "type": "string", "example": "FA-2025", "desc": "FA# 模糊搜索"},
-  {"name": "page", "type": "int", "example": "1", "desc": "分页页码（仅 issues 接口使用）"},
-  {"name": "limit", "type": "int", "example": "100", "desc": "分页大小（issues 接口默认 100）"},
-  {"name": "sort_by", "type": "string", "example": "open_date", "desc": "排序字段（issues）"},
-  {"name": "sort_order", "type": "string", "example": "DESC", "desc": "排序方向（ASC/DESC）"},
-  {"name": "includeTrend", "type": "bool", "example": "false", "desc": "filter-statistics 是否返回趋势"},
-]
 
 QUERY_METHODS = [
-  {"cmd": "projects", "endpoint": "GET /api/projects", "desc": "列出所有 projects（上传快照）"},
-  {"cmd": "issues", "endpoint": "GET /api/projects/:id/issues", "desc": "按 filters 拉 issues 明细（分页）"},
-  {"cmd": "filter-options", "endpoint": "GET /api/projects/:id/filter-options", "desc": "按 currentFilters 返回各维度可选值"},
-  {"cmd": "analysis", "endpoint": "GET /api/projects/:id/analysis", "desc": "返回 overview + 各维度 FR（symptom/wf/config/test 等）"},
-  {"cmd": "analysis-test", "endpoint": "GET /api/projects/:id/analysis/test", "desc": "Test 维度分析"},
-  {"cmd": "cross", "endpoint": "GET /api/projects/:id/analysis/cross", "desc": "任意维度×维度交叉分析"},
-  {"cmd": "filter-stats", "endpoint": "GET /api/projects/:id/filter-statistics", "desc": "筛选结果统计（含 symptom/wf/config 等分布）"},
-  {"cmd": "stats", "endpoint": "GET /api/projects/:id/filter-statistics + 提取分布", "desc": "从 filter-statistics 提取某个分布并格式化输出"},
-  {"cmd": "sample-sizes", "endpoint": "GET /api/projects/:id/sample-sizes", "desc": "WF/Test/Config 样本量明细"},
-  {"cmd": "failure-matrix", "endpoint": "GET /api/projects/:id/failure-rate-matrix", "desc": "WF×Test×Config 失败率矩阵"},
+  {"cmd": "projects", "endpoint": "GET /api/projects", "desc": "列出所有 projects（上传快照）", "client": "projects / select_project / select_snapshots"},
+  {"cmd": "issues", "endpoint": "GET /api/projects/:id/issues", "desc": "按 filters 拉 issues 明细（分页）", "client": "issues / stream_issues / iter_issues"},
+  {"cmd": "filter-options", "endpoint": "GET /api/projects/:id/filter-options", "desc": "按 currentFilters 返回各维度可选值", "client": "filter_options"},
+  {"cmd": "analysis", "endpoint": "GET /api/projects/:id/analysis", "desc": "返回 overview + 各维度 FR（symptom/wf/config/test 等）", "client": "analysis"},
+  {"cmd": "analysis-test", "endpoint": "GET /api/projects/:id/analysis/test", "desc": "Test 维度分析", "client": "analysis_test"},
+  {"cmd": "cross", "endpoint": "GET /api/projects/:id/analysis/cross", "desc": "任意维度×维度交叉分析", "client": "cross"},
+  {"cmd": "filter-stats", "endpoint": "GET /api/projects/:id/filter-statistics", "desc": "筛选结果统计（含 symptom/wf/config 等分布）", "client": "filter_statistics"},
+  {"cmd": "stats", "endpoint": "GET /api/projects/:id/filter-statistics + 提取分布", "desc": "从 filter-statistics 提取某个分布并格式化输出", "client": "stats"},
+  {"cmd": "watch", "endpoint": "GET /api/projects/:id/filter-statistics（If-None-Match）", "desc": "按间隔轮询某个分布，未变化时 304 不下载，只输出变化的行", "client": "filter_statistics_if_changed"},
+  {"cmd": "sweep", "endpoint": "GET /api/projects/:id/filter-options + filter-statistics × N", "desc": "按 filter-options 的取值逐值/逐组合并发查询 filter-statistics，合并成长表流式输出", "client": "sweep"},
+  {"cmd": "sample-sizes", "endpoint": "GET /api/projects/:id/sample-sizes", "desc": "WF/Test/Config 样本量明细", "client": "sample_sizes"},
+  {"cmd": "failure-matrix", "endpoint": "GET /api/projects/:id/failure-rate-matrix", "desc": "WF×Test×Config 失败率矩阵", "client": "failure_rate_matrix / stream_failure_rate_matrix"},
+  {"cmd": "analysis-compact", "endpoint": "GET /api/projects/:id/analysis-compact", "desc": "overview + symptom/wf/config/test Top N（服务端聚合，只传 Top N）", "client": "analysis_compact"},
+  {"cmd": "filter-stats-compact", "endpoint": "GET /api/projects/:id/filter-statistics-compact", "desc": "同 analysis-compact，另含 failed_location Top N", "client": "filter_statistics_compact"},
+  {"cmd": "cross-compact", "endpoint": "GET /api/projects/:id/analysis/cross-compact", "desc": "交叉分析 Top N 单元格（服务端排序截断），展开为行输出", "client": "cross_compact"},
+  {"cmd": "fr-compact", "endpoint": "GET /api/projects/:id/fr-compact", "desc": "按 groupBy 分组的 failures/totalSamples，自动按 offset/limit 翻页流式输出", "client": "fr_compact / iter_fr_compact"},
+  {"cmd": "sample-size-compact", "endpoint": "GET /api/projects/:id/sample-size-compact", "desc": "按 wf/config/failed_test 分组的样本量，自动翻页流式输出", "client": "iter_sample_size_compact"},
+  {"cmd": "batch", "endpoint": "POST /api/projects/:id/batch", "desc": "按 JSON spec 一次请求执行多条 analysis/stats/cross 等查询，结果分别写文件", "client": "batch"},
+  {"cmd": "export", "endpoint": "GET /api/projects/:id/export/excel|matrix|cross", "desc": "把 Excel/矩阵/交叉分析导出边下载边写入文件，多个快照/维度并发下载，未更新的快照跳过", "client": "export / iter_exports"},
+  {"cmd": "upload", "endpoint": "POST /api/projects/uploads + PUT /api/projects/uploads/:uploadId × N + POST .../complete", "desc": "分片上传 Excel 并导入为新快照（断点续传，进度输出到 stderr）", "client": "upload"},
+  {"cmd": "prewarm", "endpoint": "POST /api/projects/:id/prewarm（--client 或非 power user：GET /api/filters + POST /api/projects/:id/batch × N）", "desc": "按已保存的筛选并发重放 analysis/filter-statistics/failure-matrix 预热服务端缓存，报告耗时与填充的条目数", "client": "saved_filters / prewarm_filter_sets / iter_prewarm / prewarm"},
+  {"cmd": "bench", "endpoint": "GET /api/projects/:id/<workload 中的 endpoint>", "desc": "按 workload 压测分析接口，输出 cold/warm 分位延迟、吞吐、错误率并可与基线对比"},
   {"cmd": "describe", "endpoint": "(local)", "desc": "打印脚本支持的 filters 与查询方法清单"},
 ]
 
-STATS_KINDS = {
-  "symptom": {"path": ["statistics", "symptomDistribution"], "key": "symptom"},
-  "wf": {"path": ["statistics", "wfDistribution"], "key": "wf"},
-  "config": {"path": ["statistics", "configDistribution"], "key": "config"},
-  "failed_test": {"path": ["statistics", "failedTestDistribution"], "key": "testName"},
-  "failed_location": {"path": ["statistics", "failedLocationDistribution"], "key": "failedLocation"},
-  "failure_type": {"path": ["statistics", "failureTypeDistribution"], "key": "type"},
-  "function_cosmetic": {"path": ["statistics", "functionCosmeticDistribution"], "key": "category"},
-  "fa_status": {"path": ["statistics", "faStatusDistribution"], "key": "status"},
+ANALYSIS_SECTIONS = {
+  "overview": {"path": ["overview"], "key": None, "metrics": ["totalIssues", "specSNCount", "strifeSNCount", "totalSampleSize", "specFailureRate"]},
+  "symptom": {"path": ["symptomStats"], "key": "symptom", "metrics": ["count", "specSNCount", "totalSamples", "specFailureRate"]},
+  "wf": {"path": ["wfStats"], "key": "wf", "metrics": ["failureCount", "specSNCount", "totalTests", "specFailureRate"]},
+  "config": {"path": ["configStats"], "key": "config", "metrics": ["failureCount", "specSNCount", "totalSamples", "specFailureRate"]},
+  "test": {"path": ["testStats"], "key": "testName", "metrics": ["failureCount", "specSNCount", "totalSamples", "specFailureRate"]},
+}
+
+MATRIX_METRICS = ["specFail", "strifeFail", "samples"]
+
+MATRIX_ROLLUP_METRICS = ["specFail", "strifeFail", "samples", "specFailureRate", "strifeFailureRate"]
+
+# stats --compact：kind -> fr-compact 的 groupBy（failure_type/function_cosmetic/fa_status 服务端无对应分组）
+COMPACT_GROUP_BY = {
+  "symptom": "symptom",
+  "wf": "wf",
+  "config": "config",
+  "failed_test": "failed_test",
+  "failed_location": "failed_location",
 }
 
+COMPACT_DISTRIBUTIONS = [
+  ("symptom", "symptoms"),
+  ("wf", "wfs"),
+  ("config", "configs"),
+  ("failed_test", "failedTests"),
+  ("failed_location", "failedLocations"),
+]
+
+SYNC_PAGE_SIZE = 2000
+
+DAEMON_PROTOCOL = 1
+# 长时间运行、会改动进程级全局状态（transport）或需要独占端口的命令不转发；
+# daemon 串行执行命令，整表下载/遍历（sync、export、diff、sweep、prewarm、issues --all）转发过去会堵住其他调用
+DAEMON_LOCAL_COMMANDS = ("daemon", "watch", "bench", "replay-server", "upload", "sync", "export", "diff", "sweep", "prewarm")
+DAEMON_LOCAL_FLAGS = ("--no_daemon", "--record", "--replay", "--no_pool", "--pool_size", "--all")
+DAEMON_ENV_PREFIXES = ("ISSUE_ANALYZOR_", "HTTP_PROXY", "HTTPS_PROXY", "NO_PROXY", "http_proxy", "https_proxy", "no_proxy")
+DAEMON_IDLE_TIMEOUT_SECONDS = 900
+DAEMON_START_TIMEOUT_SECONDS = 10
+DAEMON_MEMORY_CACHE_ENTRIES = 512
+# 值为文件/目录路径的参数：daemon 按客户端 cwd 解析相对路径
+DAEMON_PATH_ARGS = ("trace_file", "local_db", "spec", "out_dir", "save", "baseline", "against", "workload")
+
+JSON_INDENT = 2
+TABLE_WIDTH_SAMPLE_ROWS = 200
+FLUSH_INTERVAL_SECONDS = 0.2
+
+WATCH_INTERVAL_SECONDS = 60
+WATCH_METRICS = ["totalCount", "specSNCount", "strifeSNCount", "specFailureRate"]
+
+BENCH_CONCURRENCY = 4
+BENCH_REQUESTS = 200
+BENCH_REGRESSION_PCT = 10.0
+BENCH_NOISE_FLOOR_MS = 5.0
+
+SWEEP_METRICS = ["totalCount", "specCount", "strifeCount", "specSNCount", "strifeSNCount", "totalSamples", "ppm"]
+
+EXPORT_COLUMNS = ["project_id", "project_key", "phase", "upload_time", "kind", "dimensions", "status", "bytes", "seconds", "path"]
+
+PREWARM_COLUMNS = ["name", "filters", "status", "queries", "computed", "cacheHits", "errors", "durationMs", "error"]
+
+
+def _parse_server_timing(value):
+  metrics = {}
+  for part in (value or "").split(","):
+    fields = [f.strip() for f in part.split(";") if f.strip()]
+    if not fields:
+      continue
+    metric = {}
+    for field in fields[1:]:
+      k, _, v = field.partition("=")
+      v = v.strip().strip('"')
+      if k.strip() == "dur":
+        try:
+          v = float(v)
+        except ValueError:
+          continue
+      metric[k.strip()] = v
+    metrics[fields[0]] = metric
+  return metrics
+
+
+class RequestTrace:
+  """一次 HTTP 调用的耗时拆分（秒）。
+
+  dns/connect/tls 只在新建连接时有值；send 为写请求，wait 为写完到收到响应头（服务端处理 + 网络往返），
+  download 为读完响应体（流式解析时包含边读边解析），decode 为 json.loads。
+  """
+
+  def __init__(self, method, url):
+    self.method = method
+    self.url = url
+    self.started_at = time.time()
+    self.status = None
+    self.reused = None
+    self.dns = 0.0
+    self.connect = 0.0
+    self.tls = 0.0
+    self.send = 0.0
+    self.wait = 0.0
+    self.download = 0.0
+    self.decode = 0.0
+    self.total = None
+    self.wire_bytes = 0
+    self.body_bytes = 0
+    self.content_encoding = None
+    self.backend_cache = None
+    self.server_timing = {}
+    self._started = time.perf_counter()
+    self._headers_at = None
+
+  def headers_received(self, resp):
+    self._headers_at = time.perf_counter()
+    self.status = resp.status
+    self.content_encoding = resp.headers.get("Content-Encoding")
+    self.backend_cache = resp.headers.get("X-Cache")
+    self.server_timing = _parse_server_timing(resp.headers.get("Server-Timing"))
+
+  def body_done(self):
+    now = time.perf_counter()
+    self.download = now - (self._headers_at or now)
+    self.total = now - self._started
+
+  def add_decode(self, seconds):
+    self.decode += seconds
+    if self.total is not None:
+      self.total += seconds
+
+  def server_ms(self, metric):
+    return (self.server_timing.get(metric) or {}).get("dur")
+
+  def as_dict(self):
+    ms = lambda v: round(v * 1000, 2)
+    parts = urllib.parse.urlsplit(self.url)
+    return {
+      "started_at": datetime.utcfromtimestamp(self.started_at).isoformat(timespec="milliseconds") + "Z",
+      "method": self.method,
+      "host": parts.netloc,
+      "path": parts.path + ("?" + parts.query if parts.query else ""),
+      "status": self.status,
+      "connection": "n/a" if self.reused is None else ("reused" if self.reused else "new"),
+      "dns_ms": ms(self.dns),
+      "connect_ms": ms(self.connect),
+      "tls_ms": ms(self.tls),
+      "send_ms": ms(self.send),
+      "wait_ms": ms(self.wait),
+      "download_ms": ms(self.download),
+      "decode_ms": ms(self.decode),
+      "total_ms": ms(self.total or 0.0),
+      "server_fetch_ms": self.server_ms("fetch"),
+      "server_total_ms": self.server_ms("total"),
+      "backend_cache": self.backend_cache,
+      "content_encoding": self.content_encoding,
+      "wire_bytes": self.wire_bytes,
+      "body_bytes": self.body_bytes,
+    }
 
-def _iso_now():
-  return datetime.utcnow().replace(microsecond=0).isoformat() + "Z"
+
+TRACE_TABLE_COLUMNS = [
+  "method", "path", "status", "connection", "dns_ms", "connect_ms", "tls_ms", "wait_ms", "server_total_ms",
+  "download_ms", "decode_ms", "total_ms", "wire_bytes", "body_bytes", "backend_cache",
+]
+TRACE_SUM_COLUMNS = ["dns_ms", "connect_ms", "tls_ms", "wait_ms", "server_total_ms", "download_ms", "decode_ms", "total_ms", "wire_bytes", "body_bytes"]
+
+
+class Tracer:
+  """--trace：收集本进程经 _open_json 发出的每个 HTTP 请求的 RequestTrace，结束时输出汇总表或追加写入 NDJSON 文件。"""
+
+  def __init__(self):
+    self.run_id = f"{datetime.utcnow().strftime('%Y%m%dT%H%M%S')}-{os.getpid()}"
+    self.records = []
+    self._lock = threading.Lock()
+
+  def start(self, method, url):
+    trace = RequestTrace(method, url)
+    with self._lock:
+      self.records.append(trace)
+    return trace
+
+  def rows(self):
+    with self._lock:
+      return [t.as_dict() for t in self.records]
+
+  def summary(self, rows):
+    total = {"method": "TOTAL", "path": f"{len(rows)} requests", "status": "", "connection": f"{sum(1 for r in rows if r['connection'] == 'new')} new"}
+    for col in TRACE_SUM_COLUMNS:
+      total[col] = round(sum(r[col] or 0 for r in rows), 2)
+    hits = sum(1 for r in rows if r["backend_cache"] == "HIT")
+    total["backend_cache"] = f"{hits} HIT"
+    return total
+
+  def write_table(self, out):
+    rows = self.rows()
+    if not rows:
+      out.write("trace: no HTTP requests (served from local cache or mirror)\n")
+      return
+    for r in rows:
+      if len(r["path"]) > 60:
+        r["path"] = r["path"][:57] + "..."
+    TableWriter(out, TRACE_TABLE_COLUMNS).write_all(rows + [self.summary(rows)])
+
+  def append_ndjson(self, path, command):
+    with open(path, "a", encoding="utf-8") as f:
+      for r in self.rows():
+        f.write(json.dumps({"run_id": self.run_id, "command": command, **r}, ensure_ascii=False) + "\n")
+
+
+def _configure_trace(args):
+  if getattr(args, "trace", False) or getattr(args, "trace_file", None):
+    set_tracer(Tracer())
+
+
+def _report_trace(args):
+  tracer = get_tracer()
+  if tracer is None:
+    return
+  if getattr(args, "trace_file", None):
+    tracer.append_ndjson(args.trace_file, getattr(args, "cmd", None))
+  if getattr(args, "trace", False):
+    tracer.write_table(sys.stderr)
 
 
-def _json_dumps(data):
-  return json.dumps(data, ensure_ascii=False, indent=2)
+def _parse_replay_latency(value):
+  if value in (None, ""):
+    return 0
+  if str(value).strip().lower() == "recorded":
+    return "recorded"
+  try:
+    return max(0.0, float(value)) / 1000
+  except ValueError:
+    raise RuntimeError(f"Invalid --replay_latency (milliseconds or 'recorded'): {value}") from None
+
+
+def _open_replay_server(args, port=0):
+  bandwidth = getattr(args, "replay_bandwidth", None)
+  return ReplayServer(args.replay, port=port, latency=_parse_replay_latency(getattr(args, "replay_latency", None)), bandwidth=bandwidth * 1024 if bandwidth else None)
+
+
+_REPLAY_SERVER = None
+
+
+def _configure_record_replay(args):
+  global _REPLAY_SERVER
+  record, replay = getattr(args, "record", None), getattr(args, "replay", None)
+  if record and replay:
+    raise RuntimeError("--record and --replay are mutually exclusive")
+  if record:
+    os.makedirs(record, exist_ok=True)
+    # 命中本地响应缓存的请求不会发出，也就录不到
+    args.no_cache = True
+    set_transport(RecordingTransport(get_transport(), Cassette(record)))
+  elif replay and getattr(args, "func", None) is not cmd_replay_server:
+    _REPLAY_SERVER = _open_replay_server(args).start()
+    args.base = _REPLAY_SERVER.url
+    args.no_cache = True
+    args.no_token_cache = True
+    args.username = args.username or "replay"
+    args.password = args.password or "replay"
+
+
+def _report_replay(args):
+  global _REPLAY_SERVER
+  server, _REPLAY_SERVER = _REPLAY_SERVER, None
+  if server is None:
+    return
+  server.shutdown()
+  server.server_close()
+  if server.misses:
+    sample = ", ".join(f"{m} {p}" for m, p, _ in server.misses[:5])
+    sys.stderr.write(f"WARN: {len(server.misses)} request(s) not in cassette {args.replay}: {sample}\n")
 
 
-def _http_json(method, url, headers=None, body_obj=None, timeout=60):
-  req_headers = {"Accept": "application/json"}
-  if headers:
-    req_headers.update(headers)
-  data = None
-  if body_obj is not None:
-    payload = json.dumps(body_obj, ensure_ascii=False).encode("utf-8")
-    data = payload
-    req_headers["Content-Type"] = "application/json; charset=utf-8"
-  req = urllib.request.Request(url=url, method=method, headers=req_headers, data=data)
+def cmd_replay_server(args):
+  server = _open_replay_server(args, port=args.port)
+  sys.stderr.write(f"replaying {sum(len(v) for v in server.entries.values())} recorded responses from {args.replay} on {server.url} (Ctrl-C to stop)\n")
   try:
-    with urllib.request.urlopen(req, timeout=timeout) as resp:
-      raw = resp.read().decode("utf-8", errors="replace")
-      if not raw:
-        return None
-      return json.loads(raw)
-  except urllib.error.HTTPError as e:
-    raw = e.read().decode("utf-8", errors="replace")
-    try:
-      parsed = json.loads(raw) if raw else {}
-    except Exception:
-      parsed = {"raw": raw}
-    raise RuntimeError(f"HTTP {e.code} {e.reason}: {parsed}") from None
-  except urllib.error.URLError as e:
-    raise RuntimeError(f"Request failed: {e}") from None
-
-
-def _build_url(base, path, params=None):
-  base = base.rstrip("/")
-  if not path.startswith("/"):
-    path = "/" + path
-  url = base + path
-  if params:
-    encoded = urllib.parse.urlencode(params, doseq=True)
-    if encoded:
-      url += "?" + encoded
-  return url
-
-
-def _parse_csv(value):
-  if value is None:
-    return None
-  if isinstance(value, list):
-    items = []
-    for v in value:
-      items.extend([x.strip() for x in str(v).split(",")])
-    items = [x for x in items if x]
-    return ",".join(items) if items else None
-  items = [x.strip() for x in str(value).split(",")]
-  items = [x for x in items if x]
-  return ",".join(items) if items else None
+    server.serve_forever()
+  except KeyboardInterrupt:
+    pass
+  finally:
+    server.server_close()
+  if server.misses:
+    sys.stderr.write(f"{len(server.misses)} request(s) were not in the cassette\n")
 
 
-def _maybe_get_env(name):
-  v = os.environ.get(name)
-  return v if v else None
+def _configure_output(args):
+  global JSON_INDENT, TABLE_WIDTH_SAMPLE_ROWS
+  if getattr(args, "indent", None) is not None:
+    JSON_INDENT = max(0, args.indent)
+  if getattr(args, "table_sample", None):
+    TABLE_WIDTH_SAMPLE_ROWS = args.table_sample
 
 
-def _resolve_auth(args):
+def _configure_transport(args):
+  if getattr(args, "no_pool", False):
+    set_transport(UrllibTransport())
+  elif getattr(args, "pool_size", None):
+    set_transport(ConnectionPool(maxsize=args.pool_size))
+
+
+_PROMPT_ALLOWED = True
+
+
+def _resolve_username(args):
   username = args.username or _maybe_get_env("ISSUE_ANALYZOR_USERNAME")
-  password = args.password or _maybe_get_env("ISSUE_ANALYZOR_PASSWORD")
+  if not username and not _PROMPT_ALLOWED:
+    raise RuntimeError("Missing username (the daemon cannot prompt: pass --username or set ISSUE_ANALYZOR_USERNAME)")
   if not username:
     username = input("username: ").strip()
+  if not username:
+    raise RuntimeError("Missing username")
+  return username
+
+
+def _resolve_password(args):
+  password = args.password or _maybe_get_env("ISSUE_ANALYZOR_PASSWORD")
+  if not password and not _PROMPT_ALLOWED:
+    raise RuntimeError("Missing password (the daemon cannot prompt: pass --password or set ISSUE_ANALYZOR_PASSWORD)")
   if not password:
     password = getpass.getpass("password: ")
-  if not username or not password:
-    raise RuntimeError("Missing username/password")
-  return username, password
+  if not password:
+    raise RuntimeError("Missing password")
+  return password
 
 
-def login(base, username, password):
-  url = _build_url(base, "/api/auth/login")
-  data = _http_json("POST", url, body_obj={"username": username, "password": password}, timeout=60)
-  token = (((data or {}).get("data") or {}).get("token")) if isinstance(data, dict) else None
-  if not token:
-    raise RuntimeError(f"Login failed: {data}")
-  return token
+def _resolve_auth(args):
+  return _resolve_username(args), _resolve_password(args)
+
+
+def _open_session(args):
+  if getattr(args, "local", False):
+    return LocalSession(LocalMirror(_local_db_path(args)))
+  if _DAEMON is not None:
+    return _DAEMON.session_for(args)
+  return _auth_session(
+    args.base,
+    _resolve_username(args),
+    lambda: _resolve_password(args),
+    token_cache=not getattr(args, "no_token_cache", False),
+    response_cache=not getattr(args, "no_cache", False),
+    cache_ttl=getattr(args, "cache_ttl", None),
+    refresh_cache=getattr(args, "refresh", False),
+  )
 
 
-def api_get(base, token, path, params=None):
-  url = _build_url(base, path, params=params)
-  headers = {"Authorization": f"Bearer {token}"}
-  data = _http_json("GET", url, headers=headers, timeout=120)
-  if not isinstance(data, dict) or not data.get("success"):
-    raise RuntimeError(f"Unexpected response: {data}")
-  return data.get("data")
+def _open_client(args):
+  return IssueAnalyzorClient(session=_open_session(args))
 
 
-def _parse_upload_time(s):
-  if not s:
-    return None
-  try:
-    return datetime.fromisoformat(str(s).replace("Z", "+00:00"))
-  except Exception:
-    return None
+def _nl(level):
+  return "\n" + " " * (JSON_INDENT * level) if JSON_INDENT else ""
 
 
-def select_project(projects, project_id=None, project_key=None, phase=None, name=None):
-  if project_id is not None:
-    for p in projects:
-      if str(p.get("id")) == str(project_id):
-        return p
-    raise RuntimeError(f"project_id not found: {project_id}")
-  candidates = projects
-  if project_key:
-    candidates = [p for p in candidates if str(p.get("project_key") or "").strip() == project_key]
-  if phase:
-    candidates = [p for p in candidates if str(p.get("phase") or "").strip() == phase]
-  if name:
-    needle = str(name).strip().lower()
-    candidates = [p for p in candidates if needle in str(p.get("name") or "").lower()]
-  if not candidates:
-    raise RuntimeError("No project matches selection criteria")
-  candidates.sort(
-    key=lambda p: (
-      _parse_upload_time(p.get("upload_time")) or datetime.min,
-      int(p.get("id") or 0),
-    ),
-    reverse=True,
-  )
-  return candidates[0]
+def _kv_sep():
+  return ": " if JSON_INDENT else ":"
 
 
-def _extract_path(obj, path_list):
-  cur = obj
-  for k in path_list:
-    if cur is None:
-      return None
-    if isinstance(cur, dict):
-      cur = cur.get(k)
-    else:
-      return None
-  return cur
+def _json_text(value, level=0):
+  if not JSON_INDENT:
+    return json.dumps(value, ensure_ascii=False, separators=(",", ":"))
+  return json.dumps(value, ensure_ascii=False, indent=JSON_INDENT).replace("\n", _nl(level))
 
 
-def _print_table(rows, columns, out_stream):
-  def cell(row, col):
+def write_json(out, obj):
+  if JSON_INDENT:
+    encoder = json.JSONEncoder(ensure_ascii=False, indent=JSON_INDENT)
+  else:
+    encoder = json.JSONEncoder(ensure_ascii=False, separators=(",", ":"))
+  buf = []
+  size = 0
+  for chunk in encoder.iterencode(obj):
+    buf.append(chunk)
+    size += len(chunk)
+    if size >= READ_CHUNK_SIZE:
+      out.write("".join(buf))
+      buf = []
+      size = 0
+  buf.append("\n")
+  out.write("".join(buf))
+  out.flush()
+
+
+class RowWriter:
+  """逐行输出的基类：write() 时立即写出，按时间间隔 flush，保证管道下游（jq/head）能马上收到数据。"""
+
+  def __init__(self, out, columns=None):
+    self.out = out
+    self.columns = list(columns) if columns else None
+    self.count = 0
+    self._last_flush = 0.0
+
+  def write(self, row):
+    self._write(row)
+    self.count += 1
+    now = time.monotonic()
+    if now - self._last_flush >= FLUSH_INTERVAL_SECONDS:
+      self.out.flush()
+      self._last_flush = now
+
+  def write_all(self, rows):
+    for row in rows:
+      self.write(row)
+    self.close()
+
+  def _write(self, row):
+    raise NotImplementedError
+
+  def close(self):
+    self.out.flush()
+
+
+class NdjsonWriter(RowWriter):
+  def _write(self, row):
+    self.out.write(json.dumps(row, ensure_ascii=False) + "\n")
+
+
+class CsvWriter(RowWriter):
+  """columns 为空时取第一行的字段作为表头。"""
+
+  def __init__(self, out, columns=None):
+    super().__init__(out, columns)
+    self._writer = None
+
+  def _ensure_header(self, row=None):
+    if self._writer is None:
+      columns = self.columns or list((row or {}).keys())
+      self._writer = csv.DictWriter(self.out, fieldnames=columns, extrasaction="ignore")
+      self._writer.writeheader()
+
+  def _write(self, row):
+    self._ensure_header(row)
+    self._writer.writerow(row)
+
+  def close(self):
+    if self.columns:
+      self._ensure_header()
+    super().close()
+
+
+class JsonRowsWriter(RowWriter):
+  """输出 {**payload, key: [...], **tail()}，数组逐项写出；tail 在数组写完后才求值（如汇总统计）。"""
+
+  def __init__(self, out, columns=None, payload=None, key="rows", tail=None):
+    super().__init__(out, columns)
+    self.tail = tail
+    self.out.write("{")
+    sep = _nl(1)
+    for k, v in (payload or {}).items():
+      self.out.write(f"{sep}{json.dumps(k, ensure_ascii=False)}{_kv_sep()}{_json_text(v, 1)}")
+      sep = "," + _nl(1)
+    self.out.write(f"{sep}{json.dumps(key, ensure_ascii=False)}{_kv_sep()}[")
+
+  def _write(self, row):
+    self.out.write(("," if self.count else "") + _nl(2) + _json_text(row, 2))
+
+  def close(self):
+    self.out.write((_nl(1) if self.count else "") + "]")
+    for k, v in (self.tail() if self.tail else {}).items():
+      self.out.write(f",{_nl(1)}{json.dumps(k, ensure_ascii=False)}{_kv_sep()}{_json_text(v, 1)}")
+    self.out.write(_nl(0) + "}\n")
+    super().close()
+
+
+class TableWriter(RowWriter):
+  """对齐文本表：只用前 sample_rows 行估算列宽，之后逐行写出（超宽的单元格顺延，不截断）。"""
+
+  def __init__(self, out, columns, sample_rows=TABLE_WIDTH_SAMPLE_ROWS):
+    super().__init__(out, columns)
+    self.sample_rows = max(1, int(sample_rows))
+    self._pending = []
+    self._widths = None
+
+  @staticmethod
+  def _cell(row, col):
     v = row.get(col, "")
-    if v is None:
-      return ""
-    return str(v)
+    return "" if v is None else str(v)
+
+  def _write_line(self, cells):
+    self.out.write("  ".join(v.ljust(w) for v, w in zip(cells, self._widths)) + "\n")
+
+  def _start(self):
+    self._widths = [len(c) for c in self.columns]
+    for cells in self._pending:
+      self._widths = [max(w, len(v)) for w, v in zip(self._widths, cells)]
+    self._write_line(self.columns)
+    self.out.write("  ".join("-" * w for w in self._widths) + "\n")
+    for cells in self._pending:
+      self._write_line(cells)
+    self._pending = []
+
+  def _write(self, row):
+    cells = [self._cell(row, c) for c in self.columns]
+    if self._widths is not None:
+      self._write_line(cells)
+      return
+    self._pending.append(cells)
+    if len(self._pending) >= self.sample_rows:
+      self._start()
+
+  def write(self, row):
+    if self._widths is None:
+      self._write(row)
+      self.count += 1
+      return
+    super().write(row)
+
+  def close(self):
+    if self._widths is None:
+      self._start()
+    super().close()
+
+
+def make_row_writer(fmt, out, columns=None, payload=None):
+  if fmt == "ndjson":
+    return NdjsonWriter(out, columns)
+  if fmt == "csv":
+    return CsvWriter(out, columns)
+  if fmt == "json":
+    return JsonRowsWriter(out, columns, payload=payload)
+  return TableWriter(out, columns)
+
+
+def write_streamed_json(out, head, meta, items):
+  # 输出与 write_json({**head, "data": data}) 相同的文本，data 其余字段取自 meta
+  _END = object()
+  kv = _kv_sep()
+  first = next(items, _END)
+  out.write("{")
+  sep = _nl(1)
+  for k, v in head.items():
+    out.write(f"{sep}{json.dumps(k, ensure_ascii=False)}{kv}{_json_text(v, 1)}")
+    sep = "," + _nl(1)
+  out.write(f'{sep}"data"{kv}')
+  if ("data",) in meta:
+    out.write(_json_text(meta[("data",)], 1) + _nl(0) + "}\n")
+    out.flush()
+    return
 
-  widths = {c: len(c) for c in columns}
-  for r in rows:
-    for c in columns:
-      widths[c] = max(widths[c], len(cell(r, c)))
+  written = set()
+  field_sep = ["{" + _nl(2)]
 
-  header = "  ".join(c.ljust(widths[c]) for c in columns)
-  sep = "  ".join("-" * widths[c] for c in columns)
-  out_stream.write(header + "\n")
-  out_stream.write(sep + "\n")
-  for r in rows:
-    out_stream.write("  ".join(cell(r, c).ljust(widths[c]) for c in columns) + "\n")
+  def write_field(name, text):
+    out.write(f"{field_sep[0]}{json.dumps(name, ensure_ascii=False)}{kv}{text}")
+    field_sep[0] = "," + _nl(2)
 
+  def pending_fields():
+    return [k for k in list(meta) if len(k) == 2 and k[0] == "data" and k not in written]
 
-def _write_csv(rows, columns, out_stream):
-  writer = csv.DictWriter(out_stream, fieldnames=columns, extrasaction="ignore")
-  writer.writeheader()
-  for r in rows:
-    writer.writerow({c: r.get(c) for c in columns})
+  for key in pending_fields():
+    written.add(key)
+    if meta[key] is not STREAMED_ARRAY and meta[key] is not STREAMED_OBJECT:
+      write_field(key[1], _json_text(meta[key], 2))
+      continue
+    is_object = meta[key] is STREAMED_OBJECT
+    opener, closer = ("{", "}") if is_object else ("[", "]")
+    if first is _END:
+      write_field(key[1], opener + closer)
+      continue
+    write_field(key[1], opener)
+    count = 0
+    last_flush = time.monotonic()
+    item = first
+    while item is not _END:
+      prefix = ("," if count else "") + _nl(3)
+      if is_object:
+        out.write(f"{prefix}{json.dumps(item[0], ensure_ascii=False)}{kv}{_json_text(item[1], 3)}")
+      else:
+        out.write(prefix + _json_text(item, 3))
+      count += 1
+      if time.monotonic() - last_flush >= FLUSH_INTERVAL_SECONDS:
+        out.flush()
+        last_flush = time.monotonic()
+      item = next(items, _END)
+    out.write(_nl(2) + closer)
+
+  for key in pending_fields():
+    written.add(key)
+    write_field(key[1], _json_text(meta[key], 2))
+  out.write((_nl(1) + "}" if written else "{}") + _nl(0) + "}\n")
+  out.flush()
 
 
 def _filters_from_args(args):
@@ -265,26 +673,15 @@ def cmd_describe(args):
     "filter_parameters": FILTER_SPECS,
     "stats_kinds": [{"name": k, "json_path": ".".join(v["path"]), "key_field": v["key"]} for k, v in STATS_KINDS.items()],
   }
-  sys.stdout.write(_json_dumps(payload) + "\n")
+  write_json(sys.stdout, payload)
 
 
 def cmd_projects(args):
-  username, password = _resolve_auth(args)
-  token = login(args.base, username, password)
-  projects = api_get(args.base, token, "/api/projects", params={})
-  if not isinstance(projects, list):
-    raise RuntimeError(f"Unexpected projects payload: {projects}")
-  if args.project_key:
-    projects = [p for p in projects if str(p.get("project_key") or "") == args.project_key]
-  if args.phase:
-    projects = [p for p in projects if str(p.get("phase") or "") == args.phase]
-  if args.name:
-    needle = args.name.strip().lower()
-    projects = [p for p in projects if needle in str(p.get("name") or "").lower()]
+  projects = _open_client(args).projects(project_key=args.project_key, phase=args.phase, name=args.name)
 
   fmt = args.format
   if fmt == "json":
-    sys.stdout.write(_json_dumps(projects) + "\n")
+    write_json(sys.stdout, projects)
     return
 
   rows = [
@@ -299,35 +696,91 @@ def cmd_projects(args):
     for p in projects
   ]
   cols = ["id", "name", "project_key", "phase", "upload_time", "file_name"]
-  if fmt == "csv":
-    _write_csv(rows, cols, sys.stdout)
+  make_row_writer(fmt, sys.stdout, cols).write_all(rows)
+
+
+def _get_selected_project(args, client):
+  return client.select_project(project_id=args.project_id, project_key=args.project_key, phase=args.phase, name=args.project_name)
+
+
+def _get_selected_snapshots(args, client):
+  if args.project_id is not None:
+    raise RuntimeError("--all-snapshots cannot be combined with --project_id")
+  if not args.project_key and not args.project_name:
+    raise RuntimeError("--all-snapshots requires --project_key or --project_name")
+  return client.select_snapshots(project_key=args.project_key, phase=args.phase, name=args.project_name)
+
+
+def _snapshot_labels(projects):
+  labels = []
+  for p in projects:
+    labels.append(f"{str(p.get('phase') or p.get('name') or 'project').strip()}#{p.get('id')}")
+  return labels
+
+
+def _delta(cur, prev):
+  if isinstance(cur, bool) or isinstance(prev, bool):
+    return None
+  if not isinstance(cur, (int, float)) or not isinstance(prev, (int, float)):
+    return None
+  d = cur - prev
+  return round(d, 6) if isinstance(d, float) else d
+
+
+def merge_snapshot_rows(labels, rows_per_snapshot, key_fields, metrics):
+  merged = collections.OrderedDict()
+  for label, rows in zip(labels, rows_per_snapshot):
+    for r in rows:
+      key = tuple(r.get(k) for k in key_fields)
+      row = merged.setdefault(key, {k: r.get(k) for k in key_fields})
+      for m in metrics:
+        row[f"{label}.{m}"] = r.get(m)
+
+  columns = list(key_fields)
+  for i, label in enumerate(labels):
+    columns.extend(f"{label}.{m}" for m in metrics)
+    if i > 0:
+      columns.extend(f"{label}.Δ{m}" for m in metrics)
+  for row in merged.values():
+    for i in range(1, len(labels)):
+      for m in metrics:
+        row[f"{labels[i]}.Δ{m}"] = _delta(row.get(f"{labels[i]}.{m}"), row.get(f"{labels[i - 1]}.{m}"))
+  return list(merged.values()), columns
+
+
+def _run_snapshot_compare(args, client, endpoint, params, extract, key_fields, metrics, order_by=None, order_dir="desc", top=0):
+  projects = _get_selected_snapshots(args, client)
+  labels = _snapshot_labels(projects)
+  datas = client.snapshots(projects, endpoint, params)
+  rows, columns = merge_snapshot_rows(labels, [extract(d) for d in datas], key_fields, metrics)
+
+  if order_by:
+    sort_col = f"{labels[-1]}.{order_by}"
+    present = [r for r in rows if r.get(sort_col) is not None]
+    missing = [r for r in rows if r.get(sort_col) is None]
+    present.sort(key=lambda r: r[sort_col], reverse=order_dir.lower() == "desc")
+    rows = present + missing
+  if top and top > 0:
+    rows = rows[:top]
+
+  fmt = args.format or "table"
+  if fmt == "json":
+    snapshots = [
+      {"label": label, "id": p.get("id"), "name": p.get("name"), "phase": p.get("phase"), "upload_time": p.get("upload_time")}
+      for label, p in zip(labels, projects)
+    ]
+    write_json(sys.stdout, {"snapshots": snapshots, "filters": params, "columns": columns, "rows": rows})
   else:
-    _print_table(rows, cols, sys.stdout)
-
-
-def _get_selected_project(args, token):
-  projects = api_get(args.base, token, "/api/projects", params={})
-  if not isinstance(projects, list):
-    raise RuntimeError(f"Unexpected projects payload: {projects}")
-  selected = select_project(
-    projects,
-    project_id=args.project_id,
-    project_key=args.project_key,
-    phase=args.phase,
-    name=args.project_name,
-  )
-  return selected
+    make_row_writer(fmt, sys.stdout, columns).write_all(rows)
 
 
 def cmd_sample_sizes(args):
-  username, password = _resolve_auth(args)
-  token = login(args.base, username, password)
-  project = _get_selected_project(args, token)
-  pid = project["id"]
-  data = api_get(args.base, token, f"/api/projects/{pid}/sample-sizes", params={})
+  client = _open_client(args)
+  project = _get_selected_project(args, client)
+  data = client.sample_sizes(project["id"])
   fmt = args.format
   if fmt == "json":
-    sys.stdout.write(_json_dumps({"project": project, "sample_sizes": data}) + "\n")
+    write_json(sys.stdout, {"project": project, "sample_sizes": data})
     return
   rows = []
   for r in data or []:
@@ -340,119 +793,1676 @@ def cmd_sample_sizes(args):
       }
     )
   cols = ["waterfall", "test_name", "tests_count", "config_samples_keys"]
-  _print_table(rows, cols, sys.stdout)
+  TableWriter(sys.stdout, cols).write_all(rows)
 
 
 def cmd_filter_stats(args):
-  username, password = _resolve_auth(args)
-  token = login(args.base, username, password)
-  project = _get_selected_project(args, token)
-  pid = project["id"]
+  client = _open_client(args)
+  project = _get_selected_project(args, client)
   filters = _filters_from_args(args)
-  data = api_get(args.base, token, f"/api/projects/{pid}/filter-statistics", params=filters)
-  sys.stdout.write(_json_dumps({"project": project, "filters": filters, "data": data}) + "\n")
+  data = client.filter_statistics(project["id"], filters)
+  write_json(sys.stdout, {"project": project, "filters": filters, "data": data})
+
+
+def _stats_compact(args, client, filters, kind):
+  group_by = COMPACT_GROUP_BY.get(args.kind)
+  if not group_by:
+    raise RuntimeError(f"stats --compact does not support --kind {args.kind} (supported: {', '.join(COMPACT_GROUP_BY)})")
+  if args.all_snapshots:
+    raise RuntimeError("--compact cannot be combined with --all-snapshots")
+  sorts = {"ppm": "ppm", "failures": "failures", "totalCount": "failures", "specSNCount": "failures", "key": "key", kind["key"]: "key"}
+  if args.order_by and args.order_by not in sorts:
+    raise RuntimeError(f"--compact does not support --order_by {args.order_by} (supported: {', '.join(sorts)})")
+  sort = sorts.get(args.order_by, "ppm")
+  # 服务端固定方向：key 升序，failures/ppm 降序
+  direction = "asc" if sort == "key" else "desc"
+  if args.order_dir and args.order_dir != direction:
+    raise RuntimeError(f"--compact sorts by {sort} {direction} only, --order_dir {args.order_dir} is not supported")
+  project = _get_selected_project(args, client)
+  params = _compact_params(filters, groupBy=group_by, numerator=args.numerator, sortBy=sort)
+  columns = args.columns.split(",") if args.columns else [kind["key"], "failures", "totalSamples", "ppm"]
+  columns = [c.strip() for c in columns if c.strip()]
+  rows = client.iter_fr_compact(project["id"], group_by, params, page_size=args.page_size, key_name=kind["key"])
+  _run_compact_stream(args, project, rows, params, columns, key_name=kind["key"], match=args.match, limit_rows=args.top)
 
 
 def cmd_stats(args):
-  username, password = _resolve_auth(args)
-  token = login(args.base, username, password)
-  project = _get_selected_project(args, token)
-  pid = project["id"]
+  client = _open_client(args)
   filters = _filters_from_args(args)
-  data = api_get(args.base, token, f"/api/projects/{pid}/filter-statistics", params=filters)
   kind = STATS_KINDS.get(args.kind)
   if not kind:
     raise RuntimeError(f"Unknown kind: {args.kind}")
-  rows = _extract_path(data, kind["path"]) or []
-  if not isinstance(rows, list):
-    raise RuntimeError(f"Unexpected stats rows for {args.kind}: {rows}")
-
-  if args.match:
-    needle = args.match.strip().lower()
-    key_field = kind["key"]
-    rows = [r for r in rows if needle in str(r.get(key_field) or "").strip().lower()]
+  if args.compact:
+    _stats_compact(args, client, filters, kind)
+    return
+  if args.all_snapshots:
+    metrics = [c.strip() for c in args.columns.split(",") if c.strip() and c.strip() != kind["key"]] if args.columns else ["totalCount", "specSNCount", "specFailureRate"]
+    _run_snapshot_compare(
+      args,
+      client,
+      "filter-statistics",
+      filters,
+      lambda data: _stats_rows(data, args.kind, args.match),
+      [kind["key"]],
+      metrics,
+      order_by=args.order_by,
+      order_dir=args.order_dir or "desc",
+      top=args.top,
+    )
+    return
+  project = _get_selected_project(args, client)
+  rows = client.stats(project["id"], args.kind, filters, match=args.match)
 
   if args.order_by:
     sort_key = args.order_by
-    reverse = args.order_dir.lower() == "desc"
+    reverse = (args.order_dir or "desc").lower() == "desc"
     rows.sort(key=lambda r: (r.get(sort_key) is None, r.get(sort_key)), reverse=reverse)
 
   if args.top and args.top > 0:
     rows = rows[: args.top]
 
   if args.format == "json":
-    sys.stdout.write(_json_dumps({"project": project, "filters": filters, "kind": args.kind, "rows": rows}) + "\n")
+    write_json(sys.stdout, {"project": project, "filters": filters, "kind": args.kind, "rows": rows})
     return
 
   default_columns = [kind["key"], "totalCount", "specCount", "strifeCount", "specSNCount", "strifeSNCount", "totalSamples", "specFailureRate"]
   columns = args.columns.split(",") if args.columns else default_columns
   columns = [c.strip() for c in columns if c.strip()]
 
-  if args.format == "csv":
-    _write_csv(rows, columns, sys.stdout)
+  make_row_writer(args.format, sys.stdout, columns).write_all(rows)
+
+
+def watch_deltas(old_rows, new_rows, key, metrics, first=False):
+  old_index = {r.get(key): r for r in old_rows or []}
+  new_index = {r.get(key): r for r in new_rows}
+  deltas = []
+  for k, new in new_index.items():
+    old = old_index.get(k)
+    if first:
+      change = "initial"
+    elif old is None:
+      change = "added"
+    elif any(old.get(m) != new.get(m) for m in metrics):
+      change = "changed"
+    else:
+      continue
+    row = {key: k, "change": change}
+    for m in metrics:
+      row[f"old_{m}"] = (old or {}).get(m)
+      row[m] = new.get(m)
+    deltas.append(row)
+  for k, old in old_index.items():
+    if k not in new_index:
+      deltas.append({key: k, "change": "removed", **{f"old_{m}": old.get(m) for m in metrics}})
+  return deltas
+
+
+def cmd_watch(args):
+  kind = STATS_KINDS.get(args.kind)
+  if not kind:
+    raise RuntimeError(f"Unknown kind: {args.kind}")
+  if args.format == "json":
+    raise RuntimeError("watch streams rows; use --format table, csv or ndjson")
+  client = _open_client(args)
+  # 每轮都要服务端的最新结果：不读写本地响应缓存（连接和 token 仍跨轮复用）
+  client.session.response_cache = None
+  filters = _filters_from_args(args)
+  key = kind["key"]
+  metrics = [c.strip() for c in args.metrics.split(",") if c.strip()] if args.metrics else list(WATCH_METRICS)
+  columns = ["time", "project_id", key, "change"] + [c for m in metrics for c in (f"old_{m}", m)]
+  writer = make_row_writer(args.format, sys.stdout, columns) if args.format != "table" else None
+  project = _get_selected_project(args, client) if args.project_id is not None else None
+  project_id, etag, rows = None, None, None
+  polls = 0
+  try:
+    while True:
+      now = datetime.now().strftime("%H:%M:%S")
+      try:
+        # 按 project_key/phase 选择时每轮重新取最新快照，新上传的快照会被自动切换过去
+        current = project or _get_selected_project(args, client)
+        if current["id"] != project_id:
+          if project_id is not None:
+            sys.stderr.write(f"[{now}] new snapshot {project_id} -> {current['id']} ({current.get('name')})\n")
+          project_id, etag = current["id"], None
+        data, etag = client.filter_statistics_if_changed(project_id, filters, etag=etag)
+      except RuntimeError as e:
+        if rows is None:
+          raise
+        sys.stderr.write(f"[{now}] WARN: poll failed, retrying in {args.interval:g}s: {e}\n")
+        data = None
+      else:
+        if data is None:
+          if not args.quiet:
+            sys.stderr.write(f"[{now}] snapshot {project_id}: not modified\n")
+        else:
+          new_rows = _stats_rows(data, args.kind, args.match)
+          deltas = [{"time": now, "project_id": project_id, **r} for r in watch_deltas(rows, new_rows, key, metrics, first=rows is None)]
+          rows = new_rows
+          if deltas:
+            if writer is None:
+              make_row_writer("table", sys.stdout, columns).write_all(deltas)
+              sys.stdout.write("\n")
+            else:
+              for r in deltas:
+                writer.write(r)
+            sys.stdout.flush()
+          elif not args.quiet:
+            sys.stderr.write(f"[{now}] snapshot {project_id}: no {args.kind} changes\n")
+      polls += 1
+      if args.count and polls >= args.count:
+        break
+      time.sleep(args.interval)
+  except KeyboardInterrupt:
+    pass
+  finally:
+    if writer is not None:
+      writer.close()
+
+
+def sweep_rows(values, data, kind=None, match=None):
+  if kind:
+    return [{**values, **r} for r in _stats_rows(data, kind, match)]
+  stats = (data or {}).get("statistics") or {}
+  totals = {k: v for k, v in stats.items() if not isinstance(v, (list, dict))}
+  return [{**values, **totals, "ppm": _ppm(stats.get("specSNCount") or 0, stats.get("totalSamples") or 0)}]
+
+
+def cmd_sweep(args):
+  over = [d.strip() for d in args.over.split(",") if d.strip()]
+  if not over:
+    raise RuntimeError("--over requires at least one dimension")
+  dims = [sweep_dimension(d) for d in over]
+  dim_columns = [column for _, _, column in dims]
+  if len(set(dim_columns)) != len(dim_columns):
+    raise RuntimeError(f"Duplicate --over dimension: {args.over}")
+  kind = STATS_KINDS[args.kind] if args.kind else None
+  if kind and kind["key"] in dim_columns:
+    raise RuntimeError(f"--kind {args.kind} repeats an --over dimension")
+  if args.metrics:
+    metrics = [c.strip() for c in args.metrics.split(",") if c.strip()]
   else:
-    _print_table(rows, columns, sys.stdout)
+    metrics = ["totalCount", "specSNCount", "strifeSNCount", "totalSamples", "specFailureRate"] if kind else list(SWEEP_METRICS)
+  columns = dim_columns + ([kind["key"]] if kind else []) + metrics
+
+  client = _open_client(args)
+  project = _get_selected_project(args, client)
+  filters = _filters_from_args(args)
+  plan = {}
+
+  def on_plan(combos, skipped):
+    plan["total"] = len(combos)
+    for column, value in skipped:
+      sys.stderr.write(f"WARN: skip {column}={value!r}: filter values cannot contain commas\n")
+    sys.stderr.write(f"sweep: {len(combos)} queries over {' x '.join(dim_columns)} (workers={args.workers}, rate={args.rate or 'unlimited'})\n")
+
+  payload = {"project": project, "filters": filters, "over": dim_columns, "kind": args.kind}
+  writer = make_row_writer(args.format, sys.stdout, columns, payload=payload)
+  failed = 0
+  try:
+    for values, data, error in client.sweep(project["id"], over, filters, workers=args.workers, rate=args.rate, on_plan=on_plan):
+      if error is not None:
+        failed += 1
+        label = ", ".join(f"{k}={v}" for k, v in values.items())
+        sys.stderr.write(f"WARN: {label}: {error}\n")
+        continue
+      for row in sweep_rows(values, data, args.kind, args.match):
+        writer.write(row)
+  finally:
+    writer.close()
+  if failed:
+    raise RuntimeError(f"{failed} of {plan.get('total', failed)} sweep queries failed")
+
+
+def _analysis_rows(data, section):
+  rows = _extract_path(data, section["path"])
+  if section["key"] is None:
+    return [{"section": "overview", **(rows or {})}]
+  return rows if isinstance(rows, list) else []
 
 
 def cmd_analysis(args):
-  username, password = _resolve_auth(args)
-  token = login(args.base, username, password)
-  project = _get_selected_project(args, token)
-  pid = project["id"]
+  client = _open_client(args)
   filters = _filters_from_args(args)
-  data = api_get(args.base, token, f"/api/projects/{pid}/analysis", params=filters)
-  sys.stdout.write(_json_dumps({"project": project, "filters": filters, "data": data}) + "\n")
+  if args.all_snapshots:
+    section = ANALYSIS_SECTIONS[args.section]
+    _run_snapshot_compare(
+      args,
+      client,
+      "analysis",
+      filters,
+      lambda data: _analysis_rows(data, section),
+      [section["key"] or "section"],
+      section["metrics"],
+    )
+    return
+  project = _get_selected_project(args, client)
+  data = client.analysis(project["id"], filters)
+  write_json(sys.stdout, {"project": project, "filters": filters, "data": data})
 
 
 def cmd_analysis_test(args):
-  username, password = _resolve_auth(args)
-  token = login(args.base, username, password)
-  project = _get_selected_project(args, token)
-  pid = project["id"]
+  client = _open_client(args)
+  project = _get_selected_project(args, client)
   filters = _filters_from_args(args)
-  data = api_get(args.base, token, f"/api/projects/{pid}/analysis/test", params=filters)
-  sys.stdout.write(_json_dumps({"project": project, "filters": filters, "data": data}) + "\n")
+  data = client.analysis_test(project["id"], filters)
+  write_json(sys.stdout, {"project": project, "filters": filters, "data": data})
 
 
 def cmd_cross(args):
-  username, password = _resolve_auth(args)
-  token = login(args.base, username, password)
-  project = _get_selected_project(args, token)
-  pid = project["id"]
+  client = _open_client(args)
+  project = _get_selected_project(args, client)
   filters = _filters_from_args(args)
   filters = {**filters, "dimension1": args.dimension1, "dimension2": args.dimension2}
-  data = api_get(args.base, token, f"/api/projects/{pid}/analysis/cross", params=filters)
-  sys.stdout.write(_json_dumps({"project": project, "filters": filters, "data": data}) + "\n")
+  data = client.cross(project["id"], args.dimension1, args.dimension2, filters)
+  write_json(sys.stdout, {"project": project, "filters": filters, "data": data})
+
+
+def _stream_all_issues(args, client, project, filters):
+  fmt = args.format or "ndjson"
+  if fmt not in ("ndjson", "csv"):
+    raise RuntimeError("issues --all only supports --format ndjson|csv")
+  expected = {}
+  rows = client.iter_issues(
+    project["id"],
+    filters,
+    page_size=args.limit or ISSUES_ALL_PAGE_SIZE,
+    workers=args.workers,
+    on_total=lambda total: expected.setdefault("total", total),
+  )
+  writer = make_row_writer(fmt, sys.stdout)
+  try:
+    writer.write_all(rows)
+  finally:
+    rows.close()
+  count = writer.count
+  if count != expected.get("total", count):
+    sys.stderr.write(f"WARN: fetched {count} issues but server reported total={expected['total']}\n")
 
 
 def cmd_issues(args):
-  username, password = _resolve_auth(args)
-  token = login(args.base, username, password)
-  project = _get_selected_project(args, token)
-  pid = project["id"]
+  client = _open_client(args)
+  project = _get_selected_project(args, client)
   filters = _filters_from_args(args)
-  data = api_get(args.base, token, f"/api/projects/{pid}/issues", params=filters)
-  sys.stdout.write(_json_dumps({"project": project, "filters": filters, "data": data}) + "\n")
+  if args.all:
+    _stream_all_issues(args, client, project, filters)
+    return
+  meta = {}
+  items = client.stream_issues(project["id"], filters, meta)
+  try:
+    if args.format in (None, "json"):
+      write_streamed_json(sys.stdout, {"project": project, "filters": filters}, meta, items)
+    else:
+      make_row_writer(args.format, sys.stdout).write_all(items)
+  finally:
+    items.close()
 
 
 def cmd_filter_options(args):
-  username, password = _resolve_auth(args)
-  token = login(args.base, username, password)
-  project = _get_selected_project(args, token)
-  pid = project["id"]
+  client = _open_client(args)
+  project = _get_selected_project(args, client)
   filters = _filters_from_args(args)
-  data = api_get(args.base, token, f"/api/projects/{pid}/filter-options", params=filters)
-  sys.stdout.write(_json_dumps({"project": project, "filters": filters, "data": data}) + "\n")
+  data = client.filter_options(project["id"], filters)
+  write_json(sys.stdout, {"project": project, "filters": filters, "data": data})
+
+
+def _matrix_view(args, matrix):
+  metric = args.metric
+  if args.pivot:
+    if args.top:
+      raise RuntimeError("--top cannot be combined with --pivot")
+    dims = [_matrix_dimension(d) for d in args.pivot.split(",") if d.strip()]
+    if len(dims) != 2:
+      raise RuntimeError("--pivot expects ROW_DIM,COLUMN_DIM (e.g. test,config)")
+    return matrix.pivot(dims[0], dims[1], metric)
+  if args.rollup is None or args.rollup.strip() == "":
+    by = list(MATRIX_DIMENSIONS)
+  elif args.rollup.strip() == "none":
+    by = []
+  else:
+    by = [_matrix_dimension(d) for d in args.rollup.split(",") if d.strip()]
+  rows = matrix.rollup(by)
+  if args.top:
+    rows = top_rows(rows, args.top, metric)
+  return [MATRIX_DIMENSIONS[d] for d in by] + MATRIX_ROLLUP_METRICS, rows
+
+
+def _matrix_dimension(name):
+  name = name.strip()
+  for dim, column in MATRIX_DIMENSIONS.items():
+    if name in (dim, column):
+      return dim
+  raise RuntimeError(f"Unknown matrix dimension: {name} (supported: {', '.join(MATRIX_DIMENSIONS)})")
 
 
 def cmd_failure_matrix(args):
-  username, password = _resolve_auth(args)
-  token = login(args.base, username, password)
-  project = _get_selected_project(args, token)
+  client = _open_client(args)
+  filters = _filters_from_args(args)
+  if args.all_snapshots:
+    if args.rollup is not None or args.pivot or args.top:
+      raise RuntimeError("--rollup/--pivot/--top cannot be combined with --all-snapshots")
+    _run_snapshot_compare(args, client, "failure-rate-matrix", filters, matrix_cells, ["wf", "testName", "config"], MATRIX_METRICS)
+    return
+  project = _get_selected_project(args, client)
+  if args.rollup is not None or args.pivot or args.top:
+    matrix = client.load_failure_matrix(project["id"], filters)
+    columns, rows = _matrix_view(args, matrix)
+    _emit_rows(rows, columns, args.format or "table", payload={"project": project, "filters": filters, "cells": len(matrix)})
+    return
+  meta = {}
+  cells = client.stream_failure_rate_matrix(project["id"], filters, meta)
+  try:
+    if args.format in (None, "json"):
+      write_streamed_json(sys.stdout, {"project": project, "filters": filters}, meta, cells)
+    else:
+      rows = (row for key, entry in cells for row in _matrix_entry_cells(key, entry))
+      make_row_writer(args.format, sys.stdout, ["wf", "testName", "config"] + MATRIX_METRICS).write_all(rows)
+  finally:
+    cells.close()
+
+
+def _compact_summary_rows(data):
+  overview = data.get("overview") or {}
+  rows = [{
+    "dimension": "overview",
+    "key": "",
+    "failures": overview.get("failures"),
+    "totalSamples": overview.get("totalSamples"),
+    "ppm": _ppm(overview.get("failures") or 0, overview.get("totalSamples") or 0),
+  }]
+  distributions = data.get("distributions") or {}
+  for dimension, name in COMPACT_DISTRIBUTIONS:
+    if name not in distributions:
+      continue
+    for row in _compact_page_rows(distributions[name]):
+      rows.append({"dimension": dimension, **row})
+  return rows
+
+
+def cross_compact_rows(data):
+  d1 = data.get("dimension1Values") or []
+  d2 = data.get("dimension2Values") or []
+  denom = data.get("denomByDim2") or []
+  for cell in data.get("cells") or []:
+    i, j, spec, strife, issues = cell[:5]
+    total = cell[5] if len(cell) > 5 else (denom[j] if j < len(denom) else 0)
+    yield {
+      "dimension1": d1[i],
+      "dimension2": d2[j],
+      "specSNCount": spec,
+      "strifeSNCount": strife,
+      "totalCount": issues,
+      "totalSamples": total,
+      "specFailureRate": _ppm(spec, total),
+    }
+
+
+def _emit_rows(rows, columns, fmt, payload=None):
+  make_row_writer(fmt, sys.stdout, columns, payload=payload).write_all(rows)
+
+
+def _compact_params(filters, **extra):
+  params = dict(filters)
+  for k, v in extra.items():
+    if v is not None and v != "":
+      params[k] = v
+  return params
+
+
+def cmd_analysis_compact(args):
+  client = _open_client(args)
+  project = _get_selected_project(args, client)
+  filters = _filters_from_args(args)
+  fetch = client.filter_statistics_compact if args.cmd == "filter-stats-compact" else client.analysis_compact
+  params = _compact_params(filters, top=args.top, numerator=args.numerator, sortBy=args.sort)
+  data = fetch(project["id"], params) or {}
+  if args.format == "json":
+    write_json(sys.stdout, {"project": project, "filters": params, "data": data})
+    return
+  _emit_rows(_compact_summary_rows(data), ["dimension", "key", "failures", "totalSamples", "ppm"], args.format)
+
+
+def cmd_cross_compact(args):
+  client = _open_client(args)
+  project = _get_selected_project(args, client)
+  filters = _filters_from_args(args)
+  params = _compact_params(filters, dimension1=args.dimension1, dimension2=args.dimension2, top=args.top, sortBy=args.sort)
+  data = client.cross_compact(project["id"], args.dimension1, args.dimension2, params) or {}
+  cross = data.get("crossAnalysis") or {}
+  if args.format == "json":
+    write_json(sys.stdout, {"project": project, "filters": params, "data": data})
+    return
+  cols = ["dimension1", "dimension2", "specSNCount", "strifeSNCount", "totalCount", "totalSamples", "specFailureRate"]
+  _emit_rows(cross_compact_rows(cross), cols, args.format)
+
+
+def _run_compact_stream(args, project, source, params, columns, key_name="key", match=None, limit_rows=0):
+  rows = source
+  try:
+    if match:
+      needle = match.strip().lower()
+      rows = (r for r in rows if needle in str(r.get(key_name) or "").strip().lower())
+    if limit_rows and limit_rows > 0:
+      rows = itertools.islice(rows, limit_rows)
+    _emit_rows(rows, columns, args.format, payload={"project": project, "filters": params})
+  finally:
+    source.close()
+
+
+def cmd_fr_compact(args):
+  client = _open_client(args)
+  project = _get_selected_project(args, client)
+  filters = _filters_from_args(args)
+  params = _compact_params(filters, groupBy=args.group_by, numerator=args.numerator, sortBy=args.sort, keys=_parse_csv(args.keys))
+  if args.group_by == "none":
+    data = client.fr_compact(project["id"], args.group_by, params) or {}
+    row = {"key": "", "failures": data.get("failures"), "totalSamples": data.get("totalSamples"), "ppm": _ppm(data.get("failures") or 0, data.get("totalSamples") or 0)}
+    _emit_rows([row], ["key", "failures", "totalSamples", "ppm"], args.format, payload={"project": project, "filters": params})
+    return
+  rows = client.iter_fr_compact(project["id"], args.group_by, params, page_size=args.page_size)
+  _run_compact_stream(args, project, rows, params, ["key", "failures", "totalSamples", "ppm"], limit_rows=args.top)
+
+
+def cmd_sample_size_compact(args):
+  client = _open_client(args)
+  project = _get_selected_project(args, client)
+  filters = _filters_from_args(args)
+  params = _compact_params(filters, groupBy=args.group_by, keys=_parse_csv(args.keys))
+  rows = client.iter_sample_size_compact(project["id"], args.group_by, params, page_size=args.page_size)
+  _run_compact_stream(args, project, rows, params, ["key", "totalSamples"], limit_rows=args.top)
+
+
+def _load_batch_spec(path):
+  with open(path, "r", encoding="utf-8") as f:
+    return _parse_query_spec(json.load(f), path)
+
+
+def _parse_query_spec(spec, path):
+  if isinstance(spec, list):
+    spec = {"queries": spec}
+  if not isinstance(spec, dict) or not isinstance(spec.get("queries"), list) or not spec["queries"]:
+    raise RuntimeError(f"Invalid batch spec (expect {{\"queries\": [...]}}): {path}")
+  queries = []
+  seen = set()
+  for i, q in enumerate(spec["queries"]):
+    if not isinstance(q, dict) or not q.get("endpoint"):
+      raise RuntimeError(f"Invalid batch query #{i}: {q}")
+    qid = str(q.get("id") or f"q{i + 1}")
+    if qid in seen:
+      raise RuntimeError(f"Duplicate batch query id: {qid}")
+    seen.add(qid)
+    queries.append({**q, "id": qid})
+  return spec.get("filters") or {}, queries
+
+
+def _batch_output_paths(queries, out_dir):
+  # output 只取文件名部分（不能写出 out_dir），清理后不同查询落到同一文件时报错
+  paths = {}
+  owners = {}
+  for q in queries:
+    if q.get("output"):
+      file_name = _safe_file_name(os.path.basename(str(q["output"]).replace("\\", "/")))
+    else:
+      file_name = f"{_safe_file_name(q['id'])}.json"
+    out_path = os.path.join(out_dir, file_name)
+    key = os.path.normcase(file_name)
+    if key in owners:
+      raise RuntimeError(f"Batch queries {owners[key]!r} and {q['id']!r} both write {out_path}; set distinct \"output\" names")
+    owners[key] = q["id"]
+    paths[q["id"]] = out_path
+  return paths
+
+
+def cmd_batch(args):
+  shared_filters, queries = _load_batch_spec(args.spec)
+  out_paths = _batch_output_paths(queries, args.out_dir)
+  client = _open_client(args)
+  project = _get_selected_project(args, client)
+  filters = {**shared_filters, **_filters_from_args(args)}
+  os.makedirs(args.out_dir, exist_ok=True)
+
+  rows = []
+  for start in range(0, len(queries), BATCH_MAX_QUERIES):
+    chunk = queries[start:start + BATCH_MAX_QUERIES]
+    data = client.batch(project["id"], chunk, filters)
+    results = data.get("results") or {}
+    for q in chunk:
+      result = results.get(q["id"]) or {"success": False, "error": {"message": "missing from batch response"}}
+      out_path = out_paths[q["id"]]
+      query_filters = {**filters, **(q.get("filters") or {})}
+      if result.get("success"):
+        payload = {"project": project, "endpoint": q["endpoint"], "filters": query_filters, "data": result.get("data")}
+      else:
+        payload = {"project": project, "endpoint": q["endpoint"], "filters": query_filters, "error": result.get("error")}
+      with open(out_path, "w", encoding="utf-8") as f:
+        write_json(f, payload)
+      rows.append({
+        "id": q["id"],
+        "endpoint": q["endpoint"],
+        "status": "ok" if result.get("success") else "error",
+        "file": out_path,
+        "error": "" if result.get("success") else (result.get("error") or {}).get("message"),
+      })
+    stats = data.get("stats") or {}
+    sys.stderr.write(
+      f"batch: {stats.get('queries', len(chunk))} queries, {stats.get('computed', '?')} computed, "
+      f"{stats.get('cacheHits', '?')} cached, {stats.get('datasetLoads', '?')} dataset loads, {stats.get('durationMs', '?')}ms\n"
+    )
+
+  cols = ["id", "endpoint", "status", "file", "error"]
+  if args.format == "json":
+    write_json(sys.stdout, {"project": project, "results": rows})
+  else:
+    make_row_writer(args.format, sys.stdout, cols).write_all(rows)
+  if any(r["status"] != "ok" for r in rows):
+    raise RuntimeError("some batch queries failed")
+
+
+def _export_pairs(value):
+  pairs = []
+  for item in (_parse_csv(value) or "").split(","):
+    if not item:
+      continue
+    d1, sep, d2 = item.partition(":")
+    if not sep or not d1.strip() or not d2.strip():
+      raise RuntimeError(f"--pairs expects DIM1:DIM2 items, got {item!r}")
+    pairs.append((d1.strip(), d2.strip()))
+  return pairs
+
+
+def _export_projects(args, client):
+  if args.project_ids:
+    wanted = [s.strip() for s in args.project_ids.split(",") if s.strip()]
+    by_id = {str(p.get("id")): p for p in client.projects()}
+    missing = [i for i in wanted if i not in by_id]
+    if missing:
+      raise RuntimeError(f"project_id not found: {', '.join(missing)}")
+    return [by_id[i] for i in wanted]
+  if args.all_snapshots:
+    return _get_selected_snapshots(args, client)
+  if args.latest:
+    return latest_snapshots(client.projects(project_key=args.project_key, phase=args.phase, name=args.project_name))
+  return [_get_selected_project(args, client)]
+
+
+def cmd_export(args):
+  kinds = [k for k in (_parse_csv(args.kind) or "").split(",") if k]
+  unknown = [k for k in kinds if k not in EXPORT_KINDS]
+  if not kinds or unknown:
+    raise RuntimeError(f"--kind expects a comma separated subset of {','.join(EXPORT_KINDS)}")
+  pairs = _export_pairs(args.pairs)
+  if "cross" in kinds and not pairs:
+    raise RuntimeError("--kind cross requires --pairs (e.g. wf:config,config:symptom)")
+  if pairs and "cross" not in kinds:
+    raise RuntimeError("--pairs only applies to --kind cross")
+  if sum(bool(x) for x in (args.project_ids, args.all_snapshots, args.latest)) > 1:
+    raise RuntimeError("--project_ids, --all-snapshots and --latest are mutually exclusive")
+
+  client = _open_client(args)
+  projects = _export_projects(args, client)
+  filters = _filters_from_args(args)
+  jobs = plan_exports(projects, kinds, pairs, filters, args.out_dir)
+  os.makedirs(args.out_dir, exist_ok=True)
+
+  def row(job, status, size=None, seconds=None):
+    p = job["project"]
+    return {
+      "project_id": p.get("id"),
+      "project_key": p.get("project_key"),
+      "phase": p.get("phase"),
+      "upload_time": p.get("upload_time"),
+      "kind": job["kind"],
+      "dimensions": job["dimensions"],
+      "status": status,
+      "bytes": size,
+      "seconds": round(seconds, 2) if seconds is not None else None,
+      "path": job["path"],
+    }
+
+  payload = {"filters": filters, "out_dir": args.out_dir}
+  writer = make_row_writer(args.format, sys.stdout, EXPORT_COLUMNS, payload=payload)
+  pending = []
+  failed = 0
+  try:
+    for job in jobs:
+      if not args.force and export_up_to_date(job):
+        writer.write(row(job, "skipped", os.path.getsize(job["path"])))
+      else:
+        pending.append(job)
+    sys.stderr.write(f"export: {len(pending)} to download, {len(jobs) - len(pending)} up to date (workers={args.workers})\n")
+    for job, size, seconds, error in client.iter_exports(pending, workers=args.workers):
+      if error is not None:
+        failed += 1
+        sys.stderr.write(f"WARN: {job['path']}: {error}\n")
+        writer.write(row(job, "failed"))
+        continue
+      writer.write(row(job, "downloaded", size, seconds))
+  finally:
+    writer.close()
+  if failed:
+    raise RuntimeError(f"{failed} of {len(pending)} exports failed")
+
+
+def _prewarm_row(item, stats=None, error=None):
+  if error is not None:
+    stats = {"queries": len(PREWARM_QUERIES), "computed": 0, "cacheHits": 0, "errors": len(PREWARM_QUERIES)}
+  stats = stats or {}
+  return {
+    "name": item.get("name"),
+    "filters": json.dumps(item.get("filters") or {}, ensure_ascii=False, sort_keys=True),
+    "status": "error" if error is not None or stats.get("errors") else "ok",
+    "queries": stats.get("queries"),
+    "computed": stats.get("computed"),
+    "cacheHits": stats.get("cacheHits"),
+    "errors": stats.get("errors"),
+    "durationMs": stats.get("durationMs"),
+    "error": str(error) if error is not None else "",
+  }
+
+
+def cmd_prewarm(args):
+  if args.workers <= 0:
+    raise RuntimeError("--workers must be positive")
+  client = _open_client(args)
+  project = _get_selected_project(args, client)
+  started = time.monotonic()
+
+  # 默认由服务端预热，筛选的选取与 PREWARM_ON_UPLOAD 完全相同（所有用户、同一 project_key）；
+  # 不是 power user 时退回到本进程重放，只能拿到当前用户自己保存的筛选
+  report = None
+  if not args.client:
+    try:
+      report = client.prewarm(project["id"], concurrency=args.workers, max_filters=args.max_filters)
+    except HttpError as e:
+      if e.status != 403:
+        raise
+      sys.stderr.write("WARN: POST /:id/prewarm requires a power user; replaying only your own saved filters from this process (--client skips this request)\n")
+
+  rows = []
+  writer = make_row_writer(args.format, sys.stdout, PREWARM_COLUMNS, payload={"project": project, "server": report is not None})
+  try:
+    if report is not None:
+      for item in report.get("items") or []:
+        rows.append(_prewarm_row(item, item))
+        writer.write(rows[-1])
+    else:
+      filter_sets = client.prewarm_filter_sets(project, max_filters=args.max_filters)
+      sys.stderr.write(f"prewarm: project {project['id']}: {len(filter_sets)} filter set(s) x {len(PREWARM_QUERIES)} queries (workers={args.workers})\n")
+      for item, stats, _seconds, error in client.iter_prewarm(project["id"], filter_sets, workers=args.workers):
+        if error is not None:
+          sys.stderr.write(f"WARN: prewarm {item['name']!r}: {error}\n")
+        rows.append(_prewarm_row(item, stats, error))
+        writer.write(rows[-1])
+  finally:
+    writer.close()
+
+  def total(field):
+    return sum(r[field] or 0 for r in rows)
+
+  sys.stderr.write(
+    f"prewarm: project {project['id']}: {len(rows)} filter set(s), {total('computed')} entries populated, "
+    f"{total('cacheHits')} already cached, {total('errors')} errors in {time.monotonic() - started:.2f}s\n"
+  )
+  if any(r["status"] != "ok" for r in rows):
+    raise RuntimeError("some prewarm queries failed")
+
+
+def _upload_progress(out):
+  started = time.monotonic()
+  first = {}
+  tty = out.isatty()
+
+  def on_progress(offset, size):
+    if "offset" not in first:
+      first["offset"] = offset
+      if offset:
+        out.write(f"upload: resuming at {offset / 1048576:.1f} MiB\n")
+    elapsed = time.monotonic() - started
+    rate = (offset - first["offset"]) / elapsed / 1048576 if elapsed > 0 else 0.0
+    pct = 100.0 * offset / size if size else 100.0
+    line = f"upload: {offset / 1048576:.1f}/{size / 1048576:.1f} MiB ({pct:.0f}%) {rate:.1f} MiB/s"
+    if tty:
+      out.write("\r" + line + ("\n" if offset >= size else ""))
+    else:
+      out.write(line + "\n")
+    out.flush()
+
+  def on_retry(error, attempt, delay):
+    prefix = "\n" if tty else ""
+    out.write(f"{prefix}WARN: upload chunk failed ({error}); retry {attempt} in {delay}s\n")
+    out.flush()
+
+  return on_progress, on_retry
+
+
+def cmd_upload(args):
+  path = args.file
+  if not os.path.isfile(path):
+    raise RuntimeError(f"File not found: {path}")
+  if os.path.splitext(path)[1].lower() not in (".xlsx", ".xls"):
+    raise RuntimeError("Only .xlsx and .xls files can be uploaded")
+  if args.chunk_size <= 0:
+    raise RuntimeError("--chunk_size must be positive")
+  client = _open_client(args)
+  on_progress, on_retry = _upload_progress(sys.stderr)
+  result = client.upload(
+    path,
+    name=args.name,
+    uploader=args.uploader,
+    chunk_size=args.chunk_size,
+    retries=args.retries,
+    on_progress=on_progress,
+    on_retry=on_retry,
+  )
+  sys.stderr.write(f"upload: imported as project {(result or {}).get('project_id')}\n")
+  write_json(sys.stdout, result)
+
+
+# bench：endpoint 别名与服务端 batchQueryService 的 ENDPOINT_ALIASES 一致
+QUERY_ENDPOINT_ALIASES = {
+  "analysis-test": "analysis/test",
+  "cross": "analysis/cross",
+  "cross-compact": "analysis/cross-compact",
+  "filter-stats": "filter-statistics",
+  "filter-stats-compact": "filter-statistics-compact",
+  "failure-matrix": "failure-rate-matrix",
+}
+BENCH_COLD_HEADERS = {"X-Cache-Bypass": "1"}
+BENCH_COLUMNS = ["endpoint", "cache", "requests", "errors", "error_rate", "rps", "p50_ms", "p95_ms", "p99_ms", "max_ms", "mean_ms", "avg_kb", "refetched"]
+BENCH_COMPARE_COLUMNS = ["endpoint", "cache", "old_p50_ms", "new_p50_ms", "old_p95_ms", "new_p95_ms", "p95_change", "old_p99_ms", "new_p99_ms", "old_error_rate", "new_error_rate", "status"]
+
+
+def _load_bench_workload(path):
+  with open(path, "r", encoding="utf-8") as f:
+    spec = json.load(f)
+  if isinstance(spec, dict) and "requests" in spec and "queries" not in spec:
+    spec = {**spec, "queries": spec["requests"]}
+  filters, queries = _parse_query_spec(spec, path)
+  for q in queries:
+    endpoint = QUERY_ENDPOINT_ALIASES.get(q["endpoint"], q["endpoint"]).strip("/")
+    if endpoint == "batch":
+      raise RuntimeError(f"bench only replays GET endpoints: {q['id']}")
+    weight = q.get("weight", 1)
+    if not isinstance(weight, int) or weight < 1:
+      raise RuntimeError(f"Invalid weight for bench request {q['id']}: {weight}")
+    q["path"] = endpoint
+  return filters, queries
+
+
+def _server_cache_stats(base):
+  try:
+    return (_http_json("GET", _build_url(base, "/api/health"), timeout=10) or {}).get("cache")
+  except Exception:
+    return None
+
+
+def _percentile(values, pct):
+  if not values:
+    return None
+  k = (len(values) - 1) * pct / 100
+  lo, hi = math.floor(k), math.ceil(k)
+  return round(values[lo] + (values[hi] - values[lo]) * (k - lo), 1)
+
+
+class BenchRunner:
+  """bench 的执行器：有界并发（最多 concurrency 个请求在途）+ 可选限速（rate 个请求/秒，按计划时间发出），逐请求记录耗时与 X-Cache。
+
+  同一 (endpoint, 参数) 在本次运行里已经完整返回过、之后又拿到 MISS 的请求记为 refetched：
+  说明服务端缓存条目已被 LRU 淘汰或过期。
+  """
+
+  def __init__(self, session, project_id, concurrency, rate=0):
+    self.session = session
+    self.project_id = project_id
+    self.concurrency = max(1, int(concurrency))
+    self.rate = rate or 0
+    self.samples = []
+    self._completed = {}
+    self._lock = threading.Lock()
+
+  def _call(self, query, params, phase, scheduled, release, headers=None):
+    key = (query["path"], json.dumps(params, sort_keys=True))
+    started = time.perf_counter()
+    sample = {"endpoint": query["id"], "phase": phase, "lag_ms": round(max(0.0, started - scheduled) * 1000, 1)}
+    try:
+      path = f"/api/projects/{self.project_id}/{query['path']}"
+      size, resp_headers = self.session.get_raw(path, params=params, headers=headers)
+      sample.update(ok=True, bytes=size, cache=resp_headers.get("X-Cache"))
+    except HttpError as e:
+      sample.update(ok=False, status=e.status, error=str(e)[:200])
+    except RuntimeError as e:
+      sample.update(ok=False, error=str(e)[:200])
+    finally:
+      release()
+    finished = time.perf_counter()
+    sample["latency_ms"] = (finished - started) * 1000
+    with self._lock:
+      done_at = self._completed.get(key)
+      sample["refetched"] = bool(sample.get("ok") and sample.get("cache") == "MISS" and done_at is not None and started > done_at)
+      if sample.get("ok") and done_at is None:
+        self._completed[key] = finished
+      self.samples.append(sample)
+
+  def run(self, phase, plan, duration=0, headers=None):
+    slots = threading.BoundedSemaphore(self.concurrency)
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=self.concurrency, thread_name_prefix=f"bench-{phase}") as pool:
+      for i, (query, params) in enumerate(plan):
+        if duration and time.perf_counter() - started >= duration:
+          break
+        scheduled = started + i / self.rate if self.rate else time.perf_counter()
+        delay = scheduled - time.perf_counter()
+        if delay > 0:
+          time.sleep(delay)
+        slots.acquire()
+        pool.submit(self._call, query, params, phase, scheduled, slots.release, headers)
+    return time.perf_counter() - started
+
+
+def _bench_row(endpoint, cache, samples, elapsed):
+  latencies = sorted(s["latency_ms"] for s in samples)
+  ok = [s for s in samples if s.get("ok")]
+  errors = len(samples) - len(ok)
+  return {
+    "endpoint": endpoint,
+    "cache": cache,
+    "requests": len(samples),
+    "errors": errors,
+    "error_rate": round(errors / len(samples), 4) if samples else 0,
+    "rps": round(len(samples) / elapsed, 2) if elapsed else None,
+    "p50_ms": _percentile(latencies, 50),
+    "p95_ms": _percentile(latencies, 95),
+    "p99_ms": _percentile(latencies, 99),
+    "max_ms": round(latencies[-1], 1) if latencies else None,
+    "mean_ms": round(sum(latencies) / len(latencies), 1) if latencies else None,
+    "avg_kb": round(sum(s["bytes"] for s in ok) / len(ok) / 1024, 1) if ok else None,
+    "refetched": sum(1 for s in samples if s.get("refetched")),
+  }
+
+
+def bench_summary(samples, elapsed):
+  groups = collections.OrderedDict()
+  for s in samples:
+    cache = "cold" if s["phase"] == "cold" else (s.get("cache") or "-")
+    groups.setdefault((s["endpoint"], cache), []).append(s)
+  rows = [_bench_row(endpoint, cache, group, elapsed[group[0]["phase"]]) for (endpoint, cache), group in sorted(groups.items(), key=lambda kv: kv[0])]
+  for phase in ("cold", "warm"):
+    phase_samples = [s for s in samples if s["phase"] == phase]
+    if phase_samples:
+      rows.append(_bench_row("ALL", phase, phase_samples, elapsed[phase]))
+  return rows
+
+
+def compare_bench(old_rows, new_rows, threshold_pct=BENCH_REGRESSION_PCT, floor_ms=BENCH_NOISE_FLOOR_MS):
+  # p95 变慢超过 threshold_pct% 且绝对值超过 floor_ms，或错误率上升超过 1 个百分点，记为 REGRESSION
+  old_index = {(r["endpoint"], r["cache"]): r for r in old_rows}
+  new_index = {(r["endpoint"], r["cache"]): r for r in new_rows}
+  keys = list(new_index) + [k for k in old_index if k not in new_index]
+  rows = []
+  for key in keys:
+    o, n = old_index.get(key), new_index.get(key)
+    row = {"endpoint": key[0], "cache": key[1]}
+    for col in ("p50_ms", "p95_ms", "p99_ms", "error_rate"):
+      row[f"old_{col}"] = (o or {}).get(col)
+      row[f"new_{col}"] = (n or {}).get(col)
+    if o is None or n is None:
+      row["p95_change"] = None
+      row["status"] = "new" if o is None else "missing"
+    else:
+      old_p95, new_p95 = o.get("p95_ms") or 0, n.get("p95_ms") or 0
+      row["p95_change"] = f"{(new_p95 - old_p95) / old_p95 * 100:+.1f}%" if old_p95 else None
+      slower = new_p95 > old_p95 * (1 + threshold_pct / 100) and new_p95 - old_p95 > floor_ms
+      faster = new_p95 < old_p95 * (1 - threshold_pct / 100) and old_p95 - new_p95 > floor_ms
+      more_errors = (n.get("error_rate") or 0) - (o.get("error_rate") or 0) > 0.01
+      row["status"] = "REGRESSION" if slower or more_errors else ("faster" if faster else "ok")
+    rows.append(row)
+  return rows
+
+
+def _load_bench_run(path):
+  with open(path, "r", encoding="utf-8") as f:
+    run = json.load(f)
+  if not isinstance(run, dict) or not isinstance(run.get("rows"), list):
+    raise RuntimeError(f"Not a bench run file (missing rows): {path}")
+  return run
+
+
+def _write_bench_compare(args, out, comparison, payload=None):
+  if args.format == "json":
+    write_json(out, {**(payload or {}), "comparison": comparison})
+  else:
+    make_row_writer(args.format, out, BENCH_COMPARE_COLUMNS).write_all(comparison)
+  regressions = [r for r in comparison if r["status"] == "REGRESSION"]
+  if regressions:
+    raise RuntimeError(f"{len(regressions)} bench regression(s): " + ", ".join(f"{r['endpoint']}/{r['cache']}" for r in regressions))
+
+
+def cmd_bench(args):
+  if args.against:
+    if not args.baseline:
+      raise RuntimeError("--against needs --baseline")
+    old, new = _load_bench_run(args.baseline), _load_bench_run(args.against)
+    _write_bench_compare(args, sys.stdout, compare_bench(old["rows"], new["rows"], args.threshold), {"baseline": args.baseline, "against": args.against})
+    return
+  if not args.workload:
+    raise RuntimeError("bench needs --workload (or --baseline + --against to compare two saved runs)")
+  shared_filters, queries = _load_bench_workload(args.workload)
+  client = _open_client(args)
+  # 测的是服务端：不读写本地响应缓存
+  client.session.response_cache = None
+  project = _get_selected_project(args, client)
+  filters = {**_filters_from_args(args), **shared_filters}
+  transport = get_transport()
+  if isinstance(transport, ConnectionPool) and transport.maxsize < args.concurrency:
+    transport.maxsize = args.concurrency
+  client.login()
+
+  run_id = f"{datetime.utcnow().strftime('%Y%m%dT%H%M%S')}-{os.getpid()}"
+  runner = BenchRunner(client.session, project["id"], args.concurrency, args.rate)
+  cache_before = _server_cache_stats(args.base)
+  elapsed = {}
+  if not args.skip_cold:
+    # X-Cache-Bypass：服务端跳过缓存读取、重新计算（cold），结果写回原来的键，不留下额外的缓存条目
+    cold = [(q, normalize_filters({**filters, **(q.get("filters") or {})})) for q in queries]
+    elapsed["cold"] = runner.run("cold", cold, headers=BENCH_COLD_HEADERS)
+  weighted = [q for q in queries for _ in range(q.get("weight", 1))]
+  warm = ((q, normalize_filters({**filters, **(q.get("filters") or {})})) for q in itertools.islice(itertools.cycle(weighted), args.requests))
+  elapsed["warm"] = runner.run("warm", warm, duration=args.duration)
+  cache_after = _server_cache_stats(args.base)
+
+  rows = bench_summary(runner.samples, elapsed)
+  run = {
+    "version": 1,
+    "run_id": run_id,
+    "started_at": _iso_now(),
+    "base": args.base,
+    "project": {k: project.get(k) for k in ("id", "name", "project_key", "phase")},
+    "workload": args.workload,
+    "settings": {"concurrency": args.concurrency, "rate": args.rate, "requests": args.requests, "duration": args.duration, "cold": not args.skip_cold},
+    "filters": filters,
+    "server_cache": {"before": cache_before, "after": cache_after},
+    "rows": rows,
+  }
+  if args.save:
+    with open(args.save, "w", encoding="utf-8") as f:
+      write_json(f, run)
+  if cache_before and cache_after:
+    sys.stderr.write(
+      f"server cache: {cache_before.get('size')} -> {cache_after.get('size')} entries (max {cache_after.get('maxEntries', '?')}), "
+      f"{cache_after.get('calculatedSize')}\n"
+    )
+  lag = max((s["lag_ms"] for s in runner.samples), default=0)
+  if args.rate and lag > 1000 / args.rate:
+    sys.stderr.write(f"WARN: could not keep up with --rate {args.rate} (max schedule lag {lag:.0f}ms); raise --concurrency\n")
+
+  comparison = compare_bench(_load_bench_run(args.baseline)["rows"], rows, args.threshold) if args.baseline else None
+  if args.format == "json":
+    write_json(sys.stdout, {**run, "comparison": comparison} if comparison is not None else run)
+  else:
+    make_row_writer(args.format, sys.stdout, BENCH_COLUMNS).write_all(rows)
+  if comparison is not None:
+    if args.format != "json":
+      if args.format != "ndjson":
+        sys.stdout.write("\n")
+      _write_bench_compare(args, sys.stdout, comparison)
+    elif any(r["status"] == "REGRESSION" for r in comparison):
+      raise RuntimeError("bench regression(s) against baseline")
+
+
+def _daemon_socket_path():
+  return _maybe_get_env("ISSUE_ANALYZOR_DAEMON_SOCKET") or os.path.join(_user_cache_dir(), "daemon.sock")
+
+
+def _daemon_env():
+  # 影响请求结果的环境变量；与 daemon 启动时不同的调用不转发
+  return {k: v for k, v in os.environ.items() if k.startswith(DAEMON_ENV_PREFIXES) and k != "ISSUE_ANALYZOR_NO_DAEMON"}
+
+
+def _recv_exact(sock, n):
+  buf = b""
+  while len(buf) < n:
+    chunk = sock.recv(n - len(buf))
+    if not chunk:
+      return None
+    buf += chunk
+  return buf
+
+
+def forward_to_daemon(argv, out=None, err=None):
+  # 返回 None 时由调用方本地执行。协议：请求为一行 JSON；响应为若干帧，每帧 1 字节通道（o=stdout、e=stderr、x=退出码、f=拒绝，改为本地执行）+ 4 字节大端长度 + 数据
+  if not hasattr(socket, "AF_UNIX") or _maybe_get_env("ISSUE_ANALYZOR_NO_DAEMON"):
+    return None
+  if not argv or argv[0] in DAEMON_LOCAL_COMMANDS or any(a.split("=", 1)[0] in DAEMON_LOCAL_FLAGS for a in argv):
+    return None
+  path = _daemon_socket_path()
+  if not os.path.exists(path):
+    return None
+  sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+  try:
+    sock.connect(path)
+  except OSError:
+    sock.close()
+    return None
+  out = out or sys.stdout.buffer
+  err = err or sys.stderr.buffer
+  request = {"op": "run", "version": DAEMON_PROTOCOL, "argv": list(argv), "cwd": os.getcwd(), "env": _daemon_env()}
+  with sock:
+    sock.sendall(json.dumps(request).encode("utf-8") + b"\n")
+    started = False
+    while True:
+      header = _recv_exact(sock, 5)
+      if header is None:
+        if not started:
+          return None
+        err.write(b"ERROR: daemon connection closed unexpectedly\n")
+        return 2
+      channel, length = header[:1], int.from_bytes(header[1:], "big")
+      payload = _recv_exact(sock, length) if length else b""
+      if channel == b"f":
+        return None
+      started = True
+      if channel == b"x":
+        return int(payload or b"0")
+      stream = out if channel == b"o" else err
+      stream.write(payload)
+      stream.flush()
+
+
+class MemoryResponseCache:
+  """daemon 用：在 ResponseCache 前面加一层进程内 LRU，命中时不读文件。
+
+  保存的是 JSON 文本，每次命中重新解析，调用方就地修改（排序/截断）结果不会污染缓存；流式接口（open_stream/tee）仍直接走磁盘缓存。
+  """
+
+  def __init__(self, disk, max_entries=DAEMON_MEMORY_CACHE_ENTRIES):
+    self.disk = disk
+    self.max_entries = max(1, int(max_entries))
+    self._entries = collections.OrderedDict()
+    self._lock = threading.Lock()
+
+  def __getattr__(self, name):
+    return getattr(self.disk, name)
+
+  def make_key(self, base, path, params=None):
+    return self.disk.make_key(base, path, params)
+
+  def _remember(self, key, data):
+    with self._lock:
+      self._entries[key] = (time.time(), json.dumps(data, ensure_ascii=False))
+      self._entries.move_to_end(key)
+      while len(self._entries) > self.max_entries:
+        self._entries.popitem(last=False)
+
+  def get(self, key, ttl=None):
+    with self._lock:
+      hit = self._entries.get(key)
+      if hit is not None:
+        self._entries.move_to_end(key)
+    if hit is not None and time.time() - hit[0] <= (self.disk.ttl if ttl is None else ttl):
+      return json.loads(hit[1])
+    data = self.disk.get(key, ttl=ttl)
+    if data is not _CACHE_MISS:
+      self._remember(key, data)
+    return data
+
+  def put(self, key, data):
+    self.disk.put(key, data)
+    self._remember(key, data)
+
+
+class _FrameSink(io.RawIOBase):
+  """daemon 端的 stdout/stderr：每次写出作为一帧（通道字节 + 长度 + 数据）发给 forward_to_daemon。"""
+
+  def __init__(self, sock, channel):
+    super().__init__()
+    self._sock = sock
+    self._channel = channel
+
+  def writable(self):
+    return True
+
+  def write(self, b):
+    data = bytes(b)
+    self._sock.sendall(self._channel + len(data).to_bytes(4, "big") + data)
+    return len(data)
+
+
+def _frame_stream(sock, channel):
+  return io.TextIOWrapper(io.BufferedWriter(_FrameSink(sock, channel), READ_CHUNK_SIZE), encoding="utf-8")
+
+
+def _send_frame(sock, channel, data=b""):
+  sock.sendall(channel + len(data).to_bytes(4, "big") + data)
+
+
+class IssueQueryDaemon:
+  """常驻进程：保留 argparse 解析器、登录会话（token）、连接池和内存结果缓存，逐个执行转发来的命令。
+
+  命令串行执行（期间把 sys.stdout/stderr 换成发往客户端的帧流），所以进程级的输出/trace 设置可以按请求设置再还原；
+  空闲超过 idle_timeout 秒自动退出。
+  """
+
+  def __init__(self, socket_path, idle_timeout=DAEMON_IDLE_TIMEOUT_SECONDS):
+    self.socket_path = socket_path
+    self.idle_timeout = idle_timeout
+    self.parser = build_parser()
+    self.env = _daemon_env()
+    self.started_at = time.time()
+    self.requests = 0
+    self._sessions = {}
+    self._run_lock = threading.Lock()
+    self._active_lock = threading.Lock()
+    self._active = 0
+    self._last_active = time.monotonic()
+    self.server = None
+
+  def session_for(self, args):
+    # 命令对 session 的临时修改在请求结束后还原
+    password = getattr(args, "password", None)
+    key = (
+      args.base.rstrip("/"),
+      getattr(args, "username", None),
+      # 明文密码不进常驻内存的 key
+      hashlib.sha256(password.encode("utf-8")).hexdigest() if password else None,
+      not getattr(args, "no_token_cache", False),
+      not getattr(args, "no_cache", False),
+      getattr(args, "cache_ttl", None),
+    )
+    entry = self._sessions.get(key)
+    if entry is None:
+      session = _auth_session(
+        args.base,
+        _resolve_username(args),
+        lambda: _resolve_password(args),
+        token_cache=key[3],
+        response_cache=key[4],
+        cache_ttl=key[5],
+      )
+      if session.response_cache is not None:
+        session.response_cache = MemoryResponseCache(session.response_cache)
+      entry = self._sessions[key] = (session, session.response_cache)
+    session = entry[0]
+    session.refresh_cache = getattr(args, "refresh", False)
+    return session
+
+  def _restore_sessions(self):
+    for session, cache in self._sessions.values():
+      session.response_cache = cache
+      session.refresh_cache = False
+
+  def _run(self, argv, cwd):
+    global JSON_INDENT, TABLE_WIDTH_SAMPLE_ROWS
+    try:
+      args = self.parser.parse_args(argv)
+    except SystemExit as e:
+      return e.code if isinstance(e.code, int) else (0 if e.code is None else 2)
+    # 相对路径按客户端的工作目录解析（daemon 自己的 cwd 不变）
+    for name in DAEMON_PATH_ARGS:
+      value = getattr(args, name, None)
+      if isinstance(value, str) and value and not os.path.isabs(value):
+        setattr(args, name, os.path.join(cwd, value))
+    saved = (JSON_INDENT, TABLE_WIDTH_SAMPLE_ROWS)
+    try:
+      run_command(args)
+      return 0
+    except BrokenPipeError:
+      return 1
+    except SystemExit as e:
+      return e.code if isinstance(e.code, int) else 0
+    except Exception as e:
+      sys.stderr.write(f"ERROR: {e}\n")
+      return 2
+    finally:
+      JSON_INDENT, TABLE_WIDTH_SAMPLE_ROWS = saved
+      set_tracer(None)
+      self._restore_sessions()
+
+  def execute(self, request, sock):
+    out, err = _frame_stream(sock, b"o"), _frame_stream(sock, b"e")
+    with self._run_lock:
+      real = (sys.stdout, sys.stderr)
+      sys.stdout, sys.stderr = out, err
+      try:
+        code = self._run(request.get("argv") or [], request.get("cwd") or os.getcwd())
+      finally:
+        sys.stdout, sys.stderr = real
+        self.requests += 1
+      for stream in (out, err):
+        try:
+          stream.flush()
+        except OSError:
+          pass
+    _send_frame(sock, b"x", str(code).encode("ascii"))
+
+  def status(self):
+    return {
+      "pid": os.getpid(),
+      "socket": self.socket_path,
+      "started_at": datetime.utcfromtimestamp(self.started_at).replace(microsecond=0).isoformat() + "Z",
+      "requests": self.requests,
+      "sessions": len(self._sessions),
+      "idle_timeout": self.idle_timeout,
+      "idle_seconds": round(time.monotonic() - self._last_active, 1),
+    }
+
+  def handle(self, sock, rfile):
+    line = rfile.readline()
+    if not line:
+      return
+    with self._active_lock:
+      self._active += 1
+    try:
+      request = json.loads(line)
+      op = request.get("op")
+      if op == "status":
+        _send_frame(sock, b"o", (json.dumps(self.status(), ensure_ascii=False) + "\n").encode("utf-8"))
+        _send_frame(sock, b"x", b"0")
+      elif op == "stop":
+        _send_frame(sock, b"x", b"0")
+        threading.Thread(target=self.server.shutdown, daemon=True).start()
+      elif request.get("version") != DAEMON_PROTOCOL or request.get("env") != self.env:
+        # 版本或环境变量（账号/代理/缓存开关）不一致：让客户端自己执行
+        _send_frame(sock, b"f")
+      else:
+        self.execute(request, sock)
+    except (BrokenPipeError, ConnectionResetError):
+      pass
+    finally:
+      with self._active_lock:
+        self._active -= 1
+        self._last_active = time.monotonic()
+
+  def _watch_idle(self):
+    while True:
+      time.sleep(min(5.0, self.idle_timeout))
+      with self._active_lock:
+        idle = self._active == 0 and time.monotonic() - self._last_active >= self.idle_timeout
+      if idle:
+        self.server.shutdown()
+        return
+
+  def serve(self):
+    import socketserver
+
+    global _DAEMON, _PROMPT_ALLOWED
+    daemon = self
+
+    class Handler(socketserver.StreamRequestHandler):
+      def handle(self):
+        daemon.handle(self.connection, self.rfile)
+
+    os.makedirs(os.path.dirname(os.path.abspath(self.socket_path)), mode=0o700, exist_ok=True)
+    if _daemon_alive(self.socket_path):
+      raise RuntimeError(f"daemon already running on {self.socket_path}")
+    if os.path.exists(self.socket_path):
+      os.unlink(self.socket_path)
+    self.server = socketserver.ThreadingUnixStreamServer(self.socket_path, Handler)
+    self.server.daemon_threads = True
+    os.chmod(self.socket_path, 0o600)
+    _DAEMON, _PROMPT_ALLOWED = self, False
+    threading.Thread(target=self._watch_idle, name="daemon-idle", daemon=True).start()
+    try:
+      self.server.serve_forever()
+    finally:
+      _DAEMON, _PROMPT_ALLOWED = None, True
+      self.server.server_close()
+      try:
+        os.unlink(self.socket_path)
+      except OSError:
+        pass
+      get_transport().close()
+
+
+_DAEMON = None
+
+
+def _daemon_request(path, op):
+  sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+  sock.settimeout(5)
+  with sock:
+    sock.connect(path)
+    sock.sendall(json.dumps({"op": op}).encode("utf-8") + b"\n")
+    out = b""
+    while True:
+      header = _recv_exact(sock, 5)
+      if header is None:
+        return out
+      payload = _recv_exact(sock, int.from_bytes(header[1:], "big")) or b""
+      if header[:1] == b"x":
+        return out
+      out += payload
+
+
+def _daemon_alive(path):
+  try:
+    _daemon_request(path, "status")
+    return True
+  except OSError:
+    return False
+
+
+def cmd_daemon(args):
+  if not hasattr(socket, "AF_UNIX"):
+    raise RuntimeError("daemon needs Unix domain sockets (not available on this platform)")
+  path = _daemon_socket_path()
+  if args.action == "run":
+    sys.stderr.write(f"issue_query daemon listening on {path} (idle timeout {args.idle_timeout:g}s)\n")
+    IssueQueryDaemon(path, idle_timeout=args.idle_timeout).serve()
+  elif args.action == "start":
+    if _daemon_alive(path):
+      sys.stderr.write(f"daemon already running on {path}\n")
+      return
+    os.makedirs(os.path.dirname(os.path.abspath(path)), mode=0o700, exist_ok=True)
+    log_path = os.path.join(os.path.dirname(os.path.abspath(path)), "daemon.log")
+    with open(log_path, "ab") as log, open(os.devnull, "rb") as devnull:
+      proc = subprocess.Popen(
+        [sys.executable, os.path.abspath(__file__), "daemon", "run", "--idle_timeout", str(args.idle_timeout)],
+        stdin=devnull, stdout=log, stderr=log, start_new_session=True, close_fds=True,
+      )
+    deadline = time.monotonic() + DAEMON_START_TIMEOUT_SECONDS
+    while not _daemon_alive(path):
+      if proc.poll() is not None or time.monotonic() > deadline:
+        raise RuntimeError(f"daemon failed to start (see {log_path})")
+      time.sleep(0.05)
+    sys.stderr.write(f"daemon started (pid {proc.pid}) on {path}\n")
+  elif args.action == "stop":
+    if not _daemon_alive(path):
+      sys.stderr.write("daemon not running\n")
+      return
+    _daemon_request(path, "stop")
+    sys.stderr.write("daemon stopped\n")
+  else:
+    if not _daemon_alive(path):
+      raise RuntimeError(f"daemon not running ({path})")
+    sys.stdout.write(_daemon_request(path, "status").decode("utf-8"))
+
+
+def cmd_sync(args):
+  client = _open_client(args)
+  # 镜像本身就是持久缓存：分页拉 issues 时不再逐页写响应缓存
+  client.session.response_cache = None
+  projects = _get_selected_snapshots(args, client) if args.all_snapshots else [_get_selected_project(args, client)]
+  mirror = LocalMirror(_local_db_path(args), create=True)
+  rows = []
+  try:
+    for project in projects:
+      pid = project["id"]
+      synced = mirror.synced(pid)
+      if synced is not None and not args.force:
+        rows.append({"id": pid, "name": project.get("name"), "phase": project.get("phase"), "issues": synced["issue_count"], "sample_sizes": synced["sample_size_count"], "status": "cached", "seconds": 0})
+        continue
+      started = time.monotonic()
+      expected = {}
+      sample_sizes = client.sample_sizes(pid) or []
+      # 按 fa_number（项目内唯一）分页保证翻页稳定；写入时沿用服务端 id，行序与服务端一致
+      issues = client.iter_issues(
+        pid,
+        {"sort_by": "fa_number", "sort_order": "ASC"},
+        page_size=args.page_size,
+        workers=args.workers,
+        on_total=lambda total: expected.setdefault("total", total),
+      )
+      try:
+        count = mirror.store_project(project, issues, sample_sizes, expected_total=lambda: expected.get("total"))
+      finally:
+        issues.close()
+      rows.append({"id": pid, "name": project.get("name"), "phase": project.get("phase"), "issues": count, "sample_sizes": len(sample_sizes), "status": "synced", "seconds": round(time.monotonic() - started, 2)})
+  finally:
+    mirror.close()
+  sys.stderr.write(f"sync: mirror at {mirror.path}\n")
+  make_row_writer(args.format, sys.stdout, ["id", "name", "phase", "issues", "sample_sizes", "status", "seconds"], payload={"db": mirror.path}).write_all(rows)
+
+
+def _first_difference(a, b, path="data"):
+  if isinstance(a, dict) and isinstance(b, dict):
+    for key in list(a) + [k for k in b if k not in a]:
+      if key not in a or key not in b:
+        return f"{path}.{key}"
+      found = _first_difference(a[key], b[key], f"{path}.{key}")
+      if found:
+        return found
+    return None
+  if isinstance(a, list) and isinstance(b, list):
+    for i, (x, y) in enumerate(zip(a, b)):
+      found = _first_difference(x, y, f"{path}[{i}]")
+      if found:
+        return found
+    return f"{path} (length {len(a)} != {len(b)})" if len(a) != len(b) else None
+  return None if a == b else f"{path} ({a!r} != {b!r})"
+
+
+def cmd_verify_local(args):
+  # 同一组参数分别请求服务端、用本地镜像计算，逐字段比对（数值 1 与 1.0 视为相等）
+  remote = _open_client(args)
+  local = IssueAnalyzorClient.local(_local_db_path(args))
+  project = _get_selected_project(args, remote)
   pid = project["id"]
   filters = _filters_from_args(args)
-  data = api_get(args.base, token, f"/api/projects/{pid}/failure-rate-matrix", params=filters)
-  sys.stdout.write(_json_dumps({"project": project, "filters": filters, "data": data}) + "\n")
+  checks = [("filter-statistics", "filter-statistics", filters), ("failure-rate-matrix", "failure-rate-matrix", filters)]
+  for pair in (_parse_csv(args.cross) or "").split(","):
+    if not pair:
+      continue
+    if ":" not in pair:
+      raise RuntimeError(f"Invalid --cross pair, expect dim1:dim2: {pair}")
+    d1, d2 = pair.split(":", 1)
+    checks.append((f"cross {d1}x{d2}", "analysis/cross", {**filters, "dimension1": d1, "dimension2": d2}))
+  # filter-options 在服务端只接受数组形式的筛选，这里只核对不带筛选的全量选项
+  checks.append(("filter-options", "filter-options", {}))
+
+  rows = []
+  for label, endpoint, params in checks:
+    path = f"/api/projects/{pid}/{endpoint}"
+    started = time.monotonic()
+    expected = json.loads(json.dumps(remote.get(path, params=params)))
+    remote_ms = round((time.monotonic() - started) * 1000)
+    started = time.monotonic()
+    actual = json.loads(json.dumps(local.get(path, params=params)))
+    local_ms = round((time.monotonic() - started) * 1000)
+    diff = _first_difference(expected, actual)
+    rows.append({"check": label, "status": "ok" if diff is None else "DIFF", "server_ms": remote_ms, "local_ms": local_ms, "difference": diff or ""})
+  make_row_writer(args.format, sys.stdout, ["check", "status", "server_ms", "local_ms", "difference"], payload={"project": project, "filters": filters}).write_all(rows)
+  if any(r["status"] != "ok" for r in rows):
+    raise RuntimeError("local mirror results differ from the server")
+
+
+DIFF_CONTEXT_FIELDS = ["wf", "config", "symptom", "fa_status"]
+DIFF_RECORD_COLUMNS = ["change", "fa_number", "sn", "unit_number", "wf", "config", "symptom", "fa_status", "changes"]
+DIFF_DELTA_COLUMNS = ["dimension", "value", "old", "new", "delta"]
+
+
+def _diff_text(value):
+  return "" if value is None else str(value).strip()
+
+
+class SnapshotDiff:
+  """两个快照的哈希连接：旧快照按匹配键建索引（只保留键 + 需要比较/展示的字段），新快照逐行探测。
+
+  每行只查一次 dict，整体 O(n + m)；内存与旧快照的键数成正比，新快照不落内存。
+  """
+
+  def __init__(self, match_on, compare, dimensions):
+    self.match_on = list(match_on)
+    self.compare = list(compare)
+    self.dimensions = list(dimensions)
+    self.kept = list(dict.fromkeys(DIFF_CONTEXT_FIELDS + self.compare))
+    self.index = {}
+    self.old_counts = {d: collections.Counter() for d in self.dimensions}
+    self.new_counts = {d: collections.Counter() for d in self.dimensions}
+    self.stats = {"old": 0, "new": 0, "added": 0, "removed": 0, "changed": 0, "unchanged": 0, "duplicate_keys": 0}
+
+  def _key(self, issue):
+    return tuple(_diff_text(issue.get(f)) for f in self.match_on)
+
+  def _count(self, counts, issue):
+    for d in self.dimensions:
+      counts[d][_diff_text(issue.get(d))] += 1
+
+  def _record(self, change, key, values, changes=""):
+    row = {"change": change}
+    row.update(zip(self.match_on, key))
+    row.update(zip(self.kept, values))
+    row["changes"] = changes
+    return row
+
+  def load_old(self, issues):
+    for issue in issues:
+      self.stats["old"] += 1
+      self._count(self.old_counts, issue)
+      key = self._key(issue)
+      values = tuple(issue.get(f) for f in self.kept)
+      slot = self.index.get(key)
+      if slot is None:
+        self.index[key] = values
+        continue
+      # 同一快照内键重复（例如 FA# 为空）：按出现顺序一一配对
+      self.stats["duplicate_keys"] += 1
+      if isinstance(slot, list):
+        slot.append(values)
+      else:
+        self.index[key] = [slot, values]
+
+  def _take(self, key):
+    slot = self.index.get(key)
+    if slot is None or not isinstance(slot, list):
+      return self.index.pop(key, None)
+    values = slot.pop(0)
+    if len(slot) == 1:
+      self.index[key] = slot[0]
+    return values
+
+  def probe_new(self, issues):
+    for issue in issues:
+      self.stats["new"] += 1
+      self._count(self.new_counts, issue)
+      key = self._key(issue)
+      new_values = tuple(issue.get(f) for f in self.kept)
+      old_values = self._take(key)
+      if old_values is None:
+        self.stats["added"] += 1
+        yield self._record("added", key, new_values)
+        continue
+      old = dict(zip(self.kept, old_values))
+      changes = [
+        f"{f}: {_diff_text(old[f])} -> {_diff_text(issue.get(f))}"
+        for f in self.compare
+        if _diff_text(old[f]) != _diff_text(issue.get(f))
+      ]
+      if changes:
+        self.stats["changed"] += 1
+        yield self._record("changed", key, new_values, "; ".join(changes))
+      else:
+        self.stats["unchanged"] += 1
+
+  def removed(self):
+    for key, slot in self.index.items():
+      for values in slot if isinstance(slot, list) else [slot]:
+        self.stats["removed"] += 1
+        yield self._record("removed", key, values)
+
+  def deltas(self, include_zero=False):
+    rows = []
+    for d in self.dimensions:
+      old, new = self.old_counts[d], self.new_counts[d]
+      part = []
+      for value in set(old) | set(new):
+        delta = new[value] - old[value]
+        if delta or include_zero:
+          part.append({"dimension": d, "value": value, "old": old[value], "new": new[value], "delta": delta})
+      rows.extend(sorted(part, key=lambda r: (-abs(r["delta"]), r["value"])))
+    return rows
+
+
+def _diff_snapshots(args, client):
+  # --from_id 缺省时取同 project_key 中紧挨着 --to_id 的上一次上传
+  projects = client.projects()
+  if args.to_id is not None:
+    new = select_project(projects, project_id=args.to_id)
+  else:
+    new = select_project(projects, project_id=args.project_id, project_key=args.project_key, phase=args.phase, name=args.project_name)
+  if args.from_id is not None:
+    old = select_project(projects, project_id=args.from_id)
+  else:
+    key = str(new.get("project_key") or "").strip()
+    if not key:
+      raise RuntimeError(f"Project {new.get('id')} has no project_key; pass --from_id")
+    history = _match_projects(projects, project_key=key)
+    pos = next(i for i, p in enumerate(history) if str(p.get("id")) == str(new.get("id")))
+    if pos == 0:
+      raise RuntimeError(f"No earlier snapshot of project_key {key} before project {new.get('id')}; pass --from_id")
+    old = history[pos - 1]
+  if str(old.get("id")) == str(new.get("id")):
+    raise RuntimeError("diff needs two different snapshots")
+  return old, new
+
+
+def _iter_snapshot_issues(args, client, pid):
+  if isinstance(client.session, LocalSession):
+    return client.session.mirror.iter_issues(pid)
+  return client.iter_issues(pid, sort_by="fa_number", sort_order="ASC", page_size=args.page_size, workers=args.workers)
+
+
+def cmd_diff(args):
+  client = _open_client(args)
+  if isinstance(client.session, AuthSession):
+    # 两个快照各流式读一遍，不把每页 issues 写进响应缓存
+    client.session.response_cache = None
+  old, new = _diff_snapshots(args, client)
+  match_on = (_parse_csv(args.match_on) or "").split(",")
+  compare = (_parse_csv(args.fields) or "").split(",") if _parse_csv(args.fields) else []
+  dimensions = (_parse_csv(args.dimensions) or "").split(",") if _parse_csv(args.dimensions) else []
+  if not match_on or not match_on[0]:
+    raise RuntimeError("--match_on needs at least one field")
+  differ = SnapshotDiff(match_on, compare, dimensions)
+
+  started = time.monotonic()
+  rows = _iter_snapshot_issues(args, client, old["id"])
+  try:
+    differ.load_old(rows)
+  finally:
+    rows.close()
+
+  new_rows = _iter_snapshot_issues(args, client, new["id"])
+
+  def records():
+    try:
+      yield from differ.probe_new(new_rows)
+    finally:
+      new_rows.close()
+    yield from differ.removed()
+
+  columns = list(dict.fromkeys(["change"] + match_on + DIFF_RECORD_COLUMNS[1:]))
+  snapshots = {
+    "from": {k: old.get(k) for k in ("id", "name", "project_key", "phase", "upload_time")},
+    "to": {k: new.get(k) for k in ("id", "name", "project_key", "phase", "upload_time")},
+  }
+  fmt = args.format
+  out = sys.stdout
+  with_records = args.section != "deltas"
+  with_deltas = args.section != "records"
+  if not with_records:
+    collections.deque(records(), maxlen=0)
+  if fmt == "json":
+    payload = {**snapshots, "match_on": match_on, "fields": compare}
+
+    def tail():
+      return {"stats": differ.stats, **({"deltas": differ.deltas(args.include_zero)} if with_deltas else {})}
+
+    # records 边比对边写出，内存只有旧快照的键索引
+    if with_records:
+      JsonRowsWriter(out, columns, payload=payload, key="records", tail=tail).write_all(records())
+    else:
+      write_json(out, {**payload, **tail()})
+  else:
+    if with_records:
+      make_row_writer(fmt, out, columns).write_all(records())
+    if with_deltas:
+      if with_records and fmt != "ndjson":
+        out.write("\n")
+      make_row_writer(fmt, out, DIFF_DELTA_COLUMNS).write_all(differ.deltas(args.include_zero))
+  s = differ.stats
+  sys.stderr.write(
+    f"diff {old.get('id')} -> {new.get('id')}: +{s['added']} added, -{s['removed']} removed, ~{s['changed']} changed, "
+    f"{s['unchanged']} unchanged (old={s['old']}, new={s['new']}, duplicate keys={s['duplicate_keys']}) in {time.monotonic() - started:.1f}s\n"
+  )
 
 
 def add_project_select_args(parser):
@@ -466,10 +2476,45 @@ def add_auth_args(parser):
   parser.add_argument("--base", type=str, default="http://localhost:3000", help="服务端地址（例如 https://xxx.com）")
   parser.add_argument("--username", type=str, default=None, help="登录用户名（也可用环境变量 ISSUE_ANALYZOR_USERNAME）")
   parser.add_argument("--password", type=str, default=None, help="登录密码（也可用环境变量 ISSUE_ANALYZOR_PASSWORD）")
+  parser.add_argument("--no_token_cache", action="store_true", default=False, help="不读写本地 token 缓存（每次都重新登录）")
+  parser.add_argument("--no_pool", action="store_true", default=False, help="不复用 HTTP 连接，每个请求单独 urlopen（也可用环境变量 ISSUE_ANALYZOR_NO_POOL=1）")
+  parser.add_argument("--pool_size", type=int, default=None, help=f"每个 host 保留的 keep-alive 空闲连接数（默认 {POOL_MAXSIZE}）")
+  parser.add_argument("--indent", type=int, default=None, help=f"JSON 输出缩进（默认 {JSON_INDENT}；0 为紧凑单行）")
+  parser.add_argument("--table_sample", type=int, default=None, help=f"table 输出用前 N 行估算列宽后开始流式输出（默认 {TABLE_WIDTH_SAMPLE_ROWS}）")
+  parser.add_argument("--no-cache", dest="no_cache", action="store_true", default=False, help="不读写本地响应缓存（也可用环境变量 ISSUE_ANALYZOR_NO_CACHE=1）")
+  parser.add_argument("--refresh", action="store_true", default=False, help="忽略已有响应缓存，重新请求并写回缓存")
+  parser.add_argument("--cache_ttl", type=int, default=None, help=f"响应缓存有效期（秒，默认 {RESPONSE_CACHE_TTL_SECONDS}；projects 列表固定 {PROJECTS_CACHE_TTL_SECONDS}s）")
+  parser.add_argument("--trace", action="store_true", default=False, help="结束时在 stderr 输出每个 HTTP 请求的耗时拆分（DNS/连接/TLS/等待/下载/解析）、字节数与服务端缓存命中")
+  parser.add_argument("--trace_file", type=str, default=None, help="把每个请求的耗时记录追加写入该 NDJSON 文件（带 run_id，便于多次运行汇总）")
+  parser.add_argument("--record", type=str, default=None, help="把本次所有 HTTP 请求/响应录制到该目录（cassette，可多次运行追加；登录请求不录）")
+  parser.add_argument("--replay", type=str, default=None, help="不连服务端：从该 cassette 目录起本地回放服务，--base 自动指向它，无需账号")
+  add_replay_args(parser)
+  parser.add_argument("--no_daemon", action="store_true", default=False, help="即使 daemon 在运行也在本进程执行（也可用环境变量 ISSUE_ANALYZOR_NO_DAEMON=1）")
+
+
+def add_replay_args(parser):
+  parser.add_argument("--replay_latency", type=str, default=None, help="回放时每个响应在返回响应头前等待的毫秒数；recorded 表示按录制时的耗时（默认 0）")
+  parser.add_argument("--replay_bandwidth", type=float, default=None, help="回放时的下载带宽上限（KB/s，默认不限）")
+
+
+def add_snapshot_args(parser, with_format=False):
+  parser.add_argument("--all-snapshots", dest="all_snapshots", action="store_true", default=False, help="对所有匹配 --project_key/--phase/--project_name 的快照并发查询，合并为宽表（按 upload_time 从旧到新，带 Δ 列）")
+  if with_format:
+    parser.add_argument("--format", type=str, choices=["table", "json", "csv", "ndjson"], default=None, help="--all-snapshots 时的输出格式（默认 table）；单快照默认输出 JSON，failure-matrix 单快照也可逐单元格输出 table/csv/ndjson")
+
+
+def add_local_args(parser, with_switch=True):
+  if with_switch:
+    parser.add_argument("--local", action="store_true", default=False, help="不访问服务端，用 sync 下来的本地 SQLite 镜像计算（口径与服务端一致）")
+  parser.add_argument("--local_db", type=str, default=None, help=f"本地镜像文件（默认 <缓存目录>/{LOCAL_DB_FILENAME}；也可用环境变量 ISSUE_ANALYZOR_LOCAL_DB）")
+
+
+def add_compact_format_args(parser):
+  parser.add_argument("--format", type=str, choices=["table", "json", "csv", "ndjson"], default="table", help="输出格式（csv/ndjson 边翻页边输出）")
 
 
 def add_output_args(parser):
-  parser.add_argument("--format", type=str, choices=["table", "json", "csv"], default="table", help="输出格式")
+  parser.add_argument("--format", type=str, choices=["table", "json", "csv", "ndjson"], default="table", help="输出格式（均边取边写）")
 
 
 def add_filter_args(parser):
@@ -534,14 +2579,47 @@ def build_parser():
   p_stats.add_argument("--match", type=str, default=None, help="按关键字段模糊匹配过滤（例如 ISB / Rattle lv3）")
   p_stats.add_argument("--top", type=int, default=0, help="仅输出前 N 行（0=不限制）")
   p_stats.add_argument("--order_by", type=str, default=None, help="按字段排序（例如 totalCount/specFailureRate）")
-  p_stats.add_argument("--order_dir", type=str, choices=["asc", "desc"], default="desc")
-  p_stats.add_argument("--columns", type=str, default=None, help="自定义输出列（逗号分隔）")
+  p_stats.add_argument("--order_dir", type=str, choices=["asc", "desc"], default=None, help="排序方向（默认 desc）")
+  p_stats.add_argument("--columns", type=str, default=None, help="自定义输出列（逗号分隔；--all-snapshots 时为每个快照输出的指标列）")
+  add_snapshot_args(p_stats)
+  p_stats.add_argument("--compact", action="store_true", default=False, help="改用 /fr-compact：服务端按 kind 分组、排序并分页，只取需要的行（输出 failures/totalSamples/ppm）")
+  p_stats.add_argument("--numerator", type=str, choices=["spec", "strife", "all"], default=None, help="--compact 时的分子口径（默认 spec）")
+  p_stats.add_argument("--page_size", type=int, default=COMPACT_PAGE_SIZE, help="--compact 时每页 key 数（服务端上限 1000）")
+  add_local_args(p_stats)
   p_stats.set_defaults(func=cmd_stats)
 
+  p_watch = sub.add_parser("watch", help="按间隔轮询 /filter-statistics（条件请求，未变化时服务端返回 304），只输出计数/失败率变化的行")
+  add_auth_args(p_watch)
+  add_project_select_args(p_watch)
+  add_filter_args(p_watch)
+  p_watch.add_argument("--format", type=str, choices=["table", "csv", "ndjson"], default="table", help="输出格式（table 每轮一张表；csv/ndjson 持续追加）")
+  p_watch.add_argument("--kind", type=str, choices=sorted(STATS_KINDS.keys()), required=True, help="要监视的分布类型")
+  p_watch.add_argument("--match", type=str, default=None, help="按关键字段模糊匹配过滤")
+  p_watch.add_argument("--metrics", type=str, default=None, help=f"比较并输出的指标列（逗号分隔，默认 {','.join(WATCH_METRICS)}）")
+  p_watch.add_argument("--interval", type=float, default=WATCH_INTERVAL_SECONDS, help=f"轮询间隔秒数（默认 {WATCH_INTERVAL_SECONDS}）")
+  p_watch.add_argument("--count", type=int, default=0, help="轮询 N 次后退出（默认 0 一直运行，Ctrl-C 结束）")
+  p_watch.add_argument("--quiet", action="store_true", default=False, help="不在 stderr 打印每轮“未变化”的状态行")
+  p_watch.set_defaults(func=cmd_watch)
+
+  p_sweep = sub.add_parser("sweep", help="按 /filter-options 的取值逐值（或逐组合）并发请求 /filter-statistics，合并成一张长表边查边输出")
+  add_auth_args(p_sweep)
+  add_project_select_args(p_sweep)
+  add_filter_args(p_sweep)
+  p_sweep.add_argument("--over", type=str, required=True, help="遍历的维度，逗号分隔，多个维度时取各值的组合（如 wfs 或 wfs,configs；也接受 wf/config 等列名）")
+  p_sweep.add_argument("--kind", type=str, choices=sorted(STATS_KINDS.keys()), default=None, help="输出每个取值下该分布的行（默认每个取值一行总计）")
+  p_sweep.add_argument("--match", type=str, default=None, help="--kind 时按关键字段模糊匹配过滤")
+  p_sweep.add_argument("--metrics", type=str, default=None, help=f"输出的指标列（逗号分隔，默认 {','.join(SWEEP_METRICS)}）")
+  p_sweep.add_argument("--workers", type=int, default=SWEEP_WORKERS, help=f"同时在途的请求数（默认 {SWEEP_WORKERS}）")
+  p_sweep.add_argument("--rate", type=float, default=0, help="每秒最多发出的请求数（默认 0 不限速）")
+  p_sweep.add_argument("--format", type=str, choices=["table", "csv", "ndjson", "json"], default="table", help="输出格式（行按查询完成的顺序输出）")
+  p_sweep.set_defaults(func=cmd_sweep)
+
   p_analysis = sub.add_parser("analysis", help="调用 /analysis（overview + 各维度统计）")
   add_auth_args(p_analysis)
   add_project_select_args(p_analysis)
   add_filter_args(p_analysis)
+  add_snapshot_args(p_analysis, with_format=True)
+  p_analysis.add_argument("--section", type=str, choices=list(ANALYSIS_SECTIONS.keys()), default="overview", help="--all-snapshots 时对比的部分")
   p_analysis.set_defaults(func=cmd_analysis)
 
   p_analysis_test = sub.add_parser("analysis-test", help="调用 /analysis/test（Test 维度分析）")
@@ -556,34 +2634,222 @@ def build_parser():
   add_filter_args(p_cross)
   p_cross.add_argument("--dimension1", type=str, required=True)
   p_cross.add_argument("--dimension2", type=str, required=True)
+  add_local_args(p_cross)
   p_cross.set_defaults(func=cmd_cross)
 
   p_issues = sub.add_parser("issues", help="调用 /issues（分页 issues 明细）")
   add_auth_args(p_issues)
   add_project_select_args(p_issues)
   add_filter_args(p_issues)
+  p_issues.add_argument("--all", action="store_true", default=False, help="自动翻页拉取全部匹配 issues，并流式输出（--limit 为每页大小，默认 500）")
+  p_issues.add_argument("--workers", type=int, default=ISSUES_ALL_WORKERS, help="--all 时并发预取的页数（线程数）")
+  p_issues.add_argument("--format", type=str, choices=["json", "ndjson", "csv"], default=None, help="输出格式：单页默认 json（也可逐条输出 ndjson/csv）；--all 默认 ndjson（也支持 csv）")
   p_issues.set_defaults(func=cmd_issues)
 
   p_opts = sub.add_parser("filter-options", help="调用 /filter-options（联动下拉可选值）")
   add_auth_args(p_opts)
   add_project_select_args(p_opts)
   add_filter_args(p_opts)
+  add_local_args(p_opts)
   p_opts.set_defaults(func=cmd_filter_options)
 
   p_matrix = sub.add_parser("failure-matrix", help="调用 /failure-rate-matrix（WF×Test×Config 矩阵）")
   add_auth_args(p_matrix)
   add_project_select_args(p_matrix)
   add_filter_args(p_matrix)
+  add_snapshot_args(p_matrix, with_format=True)
+  p_matrix.add_argument("--rollup", type=str, default=None, help="在本地按维度汇总（wf/test/config 逗号组合，如 test 或 wf,config；none 为总计；空字符串为逐单元格），失败率按分子与样本数重新计算")
+  p_matrix.add_argument("--pivot", type=str, default=None, help="本地透视为宽表：ROW_DIM,COLUMN_DIM（如 test,config），单元格为 --metric")
+  p_matrix.add_argument("--top", type=int, default=0, help="按 --metric 从大到小取前 N 行（逐单元格，或 --rollup 汇总后的行）")
+  p_matrix.add_argument("--metric", type=str, choices=MATRIX_ROLLUP_METRICS, default="specFailureRate", help="--pivot 的单元格值 / --top 的排序指标（默认 specFailureRate）")
+  add_local_args(p_matrix)
   p_matrix.set_defaults(func=cmd_failure_matrix)
 
+  p_ac = sub.add_parser("analysis-compact", help="调用 /analysis-compact（overview + 各维度 Top N，服务端聚合）")
+  p_fsc = sub.add_parser("filter-stats-compact", help="调用 /filter-statistics-compact（同上，另含 failed_location）")
+  for p in (p_ac, p_fsc):
+    add_auth_args(p)
+    add_project_select_args(p)
+    add_filter_args(p)
+    add_compact_format_args(p)
+    p.add_argument("--top", type=int, default=None, help="每个维度返回前 N 个（服务端默认 20，上限 500）")
+    p.add_argument("--numerator", type=str, choices=["spec", "strife", "all"], default=None, help="分子口径（默认 spec）")
+    p.add_argument("--sort", type=str, choices=["ppm", "failures", "key"], default=None, help="服务端排序（默认 ppm）")
+    p.set_defaults(func=cmd_analysis_compact)
+
+  p_cc = sub.add_parser("cross-compact", help="调用 /analysis/cross-compact（交叉分析 Top N 单元格）")
+  add_auth_args(p_cc)
+  add_project_select_args(p_cc)
+  add_filter_args(p_cc)
+  add_compact_format_args(p_cc)
+  p_cc.add_argument("--dimension1", type=str, required=True)
+  p_cc.add_argument("--dimension2", type=str, required=True)
+  p_cc.add_argument("--top", type=int, default=None, help="返回前 N 个单元格（服务端默认 300，0=全部，上限 5000）")
+  p_cc.add_argument("--sort", type=str, choices=["specSN", "strifeSN", "issues"], default=None, help="服务端排序（默认 specSN）")
+  p_cc.set_defaults(func=cmd_cross_compact)
+
+  p_fr = sub.add_parser("fr-compact", help="调用 /fr-compact（按 groupBy 分组，自动翻页流式输出）")
+  add_auth_args(p_fr)
+  add_project_select_args(p_fr)
+  add_filter_args(p_fr)
+  add_compact_format_args(p_fr)
+  p_fr.add_argument("--group_by", type=str, choices=["none", "symptom", "wf", "config", "failed_test", "failed_location"], default="symptom")
+  p_fr.add_argument("--numerator", type=str, choices=["spec", "strife", "all"], default=None, help="分子口径（默认 spec）")
+  p_fr.add_argument("--sort", type=str, choices=["ppm", "failures", "key"], default=None, help="服务端排序（默认 ppm）")
+  p_fr.add_argument("--keys", type=str, default=None, help="只查询指定 key（逗号分隔，一次返回，不翻页）")
+  p_fr.add_argument("--top", type=int, default=0, help="只输出前 N 行（达到后停止翻页；0=全部）")
+  p_fr.add_argument("--page_size", type=int, default=COMPACT_PAGE_SIZE, help="每页 key 数（服务端上限 1000）")
+  p_fr.set_defaults(func=cmd_fr_compact)
+
+  p_ssc = sub.add_parser("sample-size-compact", help="调用 /sample-size-compact（按 wf/config/failed_test 的样本量，自动翻页）")
+  add_auth_args(p_ssc)
+  add_project_select_args(p_ssc)
+  add_filter_args(p_ssc)
+  add_compact_format_args(p_ssc)
+  p_ssc.add_argument("--group_by", type=str, choices=["wf", "config", "failed_test"], default="failed_test")
+  p_ssc.add_argument("--keys", type=str, default=None, help="只查询指定 key（逗号分隔）")
+  p_ssc.add_argument("--top", type=int, default=0, help="只输出前 N 行（0=全部）")
+  p_ssc.add_argument("--page_size", type=int, default=COMPACT_PAGE_SIZE, help="每页 key 数（服务端上限 1000）")
+  p_ssc.set_defaults(func=cmd_sample_size_compact)
+
+  p_batch = sub.add_parser("batch", help="调用 POST /batch：按 JSON spec 一次执行多条查询，结果按 id 写到 --out_dir")
+  add_auth_args(p_batch)
+  add_project_select_args(p_batch)
+  add_filter_args(p_batch)
+  add_output_args(p_batch)
+  p_batch.add_argument("--spec", type=str, required=True, help="JSON spec 文件：{\"filters\": {...}, \"queries\": [{\"id\", \"endpoint\", \"filters\", \"output\"}]}")
+  p_batch.add_argument("--out_dir", type=str, default=".", help="结果输出目录（每条查询一个 JSON 文件）")
+  p_batch.set_defaults(func=cmd_batch)
+
+  p_export = sub.add_parser("export", help="下载 Excel/矩阵/交叉分析导出（.xlsx）：边下载边写文件，多个快照/维度并发，本地已是该快照的文件跳过")
+  add_auth_args(p_export)
+  add_project_select_args(p_export)
+  add_filter_args(p_export)
+  add_output_args(p_export)
+  p_export.add_argument("--kind", type=str, default="excel", help=f"导出类型，逗号分隔（{','.join(EXPORT_KINDS)}；默认 excel）")
+  p_export.add_argument("--pairs", type=str, default=None, help="--kind cross 的维度对，逗号分隔的 DIM1:DIM2（如 wf:config,config:symptom）")
+  p_export.add_argument("--project_ids", type=str, default=None, help="逗号分隔的多个 project_id")
+  add_snapshot_args(p_export)
+  p_export.add_argument("--latest", action="store_true", default=False, help="每个 project_key/phase 的最新快照各导出一份（可配合 --project_key/--phase/--project_name 缩小范围）")
+  p_export.add_argument("--out_dir", type=str, default=".", help="输出目录")
+  p_export.add_argument("--workers", type=int, default=EXPORT_WORKERS, help=f"同时下载的文件数（默认 {EXPORT_WORKERS}）")
+  p_export.add_argument("--force", action="store_true", default=False, help="忽略本地文件，全部重新下载")
+  p_export.set_defaults(func=cmd_export)
+
+  p_upload = sub.add_parser("upload", help="分片上传 Excel（.xlsx/.xls）并导入为新快照：进度输出到 stderr，中断后重新执行同一命令从已上传的位置续传")
+  add_auth_args(p_upload)
+  p_upload.add_argument("file", type=str, help="要上传的 Excel 文件")
+  p_upload.add_argument("--name", type=str, default=None, help="项目名称（默认取文件名）")
+  p_upload.add_argument("--uploader", type=str, default=None, help="上传人")
+  p_upload.add_argument("--chunk_size", type=int, default=UPLOAD_CHUNK_SIZE, help=f"每个分片的字节数（默认 {UPLOAD_CHUNK_SIZE}）")
+  p_upload.add_argument("--retries", type=int, default=UPLOAD_MAX_RETRIES, help=f"单个分片连续失败的最大重试次数（默认 {UPLOAD_MAX_RETRIES}，指数退避）")
+  p_upload.set_defaults(func=cmd_upload)
+
+  p_prewarm = sub.add_parser("prewarm", help="新快照上传后预热服务端缓存：由服务端按所有用户已保存的筛选（同一 project_key 的任一快照上保存的）重放 analysis/filter-statistics/failure-matrix")
+  add_auth_args(p_prewarm)
+  add_project_select_args(p_prewarm)
+  add_output_args(p_prewarm)
+  p_prewarm.add_argument("--workers", type=int, default=PREWARM_WORKERS, help=f"同时预热的筛选数（默认 {PREWARM_WORKERS}；预热与真实请求争用服务端，不宜过大）")
+  p_prewarm.add_argument("--max_filters", type=int, default=PREWARM_MAX_FILTERS, help=f"最多预热的已保存筛选数，按保存时间从新到旧（默认 {PREWARM_MAX_FILTERS}）")
+  p_prewarm.add_argument("--client", action="store_true", help="不调用 POST /:id/prewarm（需要 power user），改为在本进程按当前用户保存的筛选发 POST /:id/batch")
+  p_prewarm.set_defaults(func=cmd_prewarm)
+
+  p_bench = sub.add_parser("bench", help="按 workload 文件压测分析接口：cold/warm 分别统计 p50/p95/p99、吞吐与错误率，可与基线对比")
+  add_auth_args(p_bench)
+  add_project_select_args(p_bench)
+  add_filter_args(p_bench)
+  add_output_args(p_bench)
+  p_bench.add_argument("--workload", type=str, default=None, help="JSON workload：{\"filters\": {...}, \"requests\": [{\"id\", \"endpoint\", \"filters\", \"weight\"}]}（与 batch spec 同构）")
+  p_bench.add_argument("--concurrency", type=int, default=BENCH_CONCURRENCY, help=f"最多同时在途的请求数（默认 {BENCH_CONCURRENCY}）")
+  p_bench.add_argument("--rate", type=float, default=0, help="warm/cold 阶段的目标请求速率（个/秒，默认 0 不限速）")
+  p_bench.add_argument("--requests", type=int, default=BENCH_REQUESTS, help=f"warm 阶段按权重轮转发出的请求总数（默认 {BENCH_REQUESTS}）")
+  p_bench.add_argument("--duration", type=float, default=0, help="warm 阶段最长秒数（先到 --requests 或 --duration 即停止；默认 0 不限）")
+  p_bench.add_argument("--skip_cold", action="store_true", default=False, help="跳过 cold 阶段（默认先对每条请求各发一次绕过服务端缓存的请求）")
+  p_bench.add_argument("--save", type=str, default=None, help="把本次结果写入 JSON 文件（供之后 --baseline 对比）")
+  p_bench.add_argument("--baseline", type=str, default=None, help="与之前 --save 的结果对比，出现 REGRESSION 时退出码非 0")
+  p_bench.add_argument("--against", type=str, default=None, help="不压测，只对比 --baseline 与该文件两次已保存的结果")
+  p_bench.add_argument("--threshold", type=float, default=BENCH_REGRESSION_PCT, help=f"p95 变慢超过该百分比（且超过 {BENCH_NOISE_FLOOR_MS:g}ms）记为回归（默认 {BENCH_REGRESSION_PCT:g}）")
+  p_bench.set_defaults(func=cmd_bench)
+
+  p_daemon = sub.add_parser("daemon", help="常驻进程：保持 token、连接池和内存结果缓存，之后的命令经 Unix socket 转发给它执行")
+  p_daemon.add_argument("action", choices=["start", "stop", "status", "run"], help="start 后台启动 / stop 停止 / status 查看状态 / run 前台运行")
+  p_daemon.add_argument("--idle_timeout", type=float, default=DAEMON_IDLE_TIMEOUT_SECONDS, help=f"空闲多少秒后自动退出（默认 {DAEMON_IDLE_TIMEOUT_SECONDS}）")
+  p_daemon.set_defaults(func=cmd_daemon)
+
+  p_replay = sub.add_parser("replay-server", help="把 --record 录下的 cassette 作为独立的本地 HTTP 服务运行（给其它客户端或多次运行共用）")
+  p_replay.add_argument("--replay", type=str, required=True, help="cassette 目录（--record 的输出）")
+  p_replay.add_argument("--port", type=int, default=3000, help="监听 127.0.0.1 的端口（默认 3000；0 为随机端口）")
+  add_replay_args(p_replay)
+  p_replay.set_defaults(func=cmd_replay_server)
+
+  p_sync = sub.add_parser("sync", help="把快照的 issues + sample sizes 下载到本地 SQLite 镜像（之后可用 --local 离线查询）")
+  add_auth_args(p_sync)
+  add_project_select_args(p_sync)
+  add_snapshot_args(p_sync)
+  add_local_args(p_sync, with_switch=False)
+  add_output_args(p_sync)
+  p_sync.add_argument("--force", action="store_true", default=False, help="已同步的快照也重新下载")
+  p_sync.add_argument("--page_size", type=int, default=SYNC_PAGE_SIZE, help="issues 每页条数")
+  p_sync.add_argument("--workers", type=int, default=ISSUES_ALL_WORKERS, help="并发翻页的线程数")
+  p_sync.set_defaults(func=cmd_sync)
+
+  p_verify = sub.add_parser("verify-local", help="对比本地镜像与服务端的 stats/cross/filter-options/failure-matrix 结果")
+  add_auth_args(p_verify)
+  add_project_select_args(p_verify)
+  add_filter_args(p_verify)
+  add_local_args(p_verify, with_switch=False)
+  add_output_args(p_verify)
+  p_verify.add_argument("--cross", type=str, default="wf:config,symptom:config,failed_test:config,symptom:wf", help="要核对的交叉维度对（dim1:dim2，逗号分隔）")
+  p_verify.set_defaults(func=cmd_verify_local)
+
+  p_diff = sub.add_parser("diff", help="对比两次上传：新增/消失/FA status 或 symptom 变化的 issues + 各维度数量变化")
+  add_auth_args(p_diff)
+  add_project_select_args(p_diff)
+  add_local_args(p_diff)
+  add_output_args(p_diff)
+  p_diff.add_argument("--from_id", type=int, default=None, help="旧快照 project_id（默认：同 project_key 中新快照之前的那次上传）")
+  p_diff.add_argument("--to_id", type=int, default=None, help="新快照 project_id（默认按项目选择参数选最新）")
+  p_diff.add_argument("--match_on", type=str, default="fa_number,sn,unit_number", help="匹配键字段（逗号分隔）")
+  p_diff.add_argument("--fields", type=str, default="fa_status,symptom", help="判定 changed 的比较字段（逗号分隔）")
+  p_diff.add_argument("--dimensions", type=str, default="fa_status,symptom,wf,config,failure_type,failed_test", help="统计数量变化的维度（逗号分隔）")
+  p_diff.add_argument("--section", type=str, choices=["all", "records", "deltas"], default="all", help="输出明细记录、维度变化或两者")
+  p_diff.add_argument("--include_zero", action="store_true", default=False, help="维度变化中也列出数量不变的值")
+  p_diff.add_argument("--page_size", type=int, default=SYNC_PAGE_SIZE, help="issues 每页条数")
+  p_diff.add_argument("--workers", type=int, default=ISSUES_ALL_WORKERS, help="并发翻页的线程数")
+  p_diff.set_defaults(func=cmd_diff)
+
   return parser
 
 
+def run_command(args):
+  _configure_transport(args)
+  _configure_output(args)
+  _configure_trace(args)
+  _configure_record_replay(args)
+  try:
+    args.func(args)
+  finally:
+    _report_replay(args)
+    _report_trace(args)
+
+
 def main():
+  # daemon 在运行时，只做一次 Unix socket 往返，不构建子命令解析器
+  try:
+    code = forward_to_daemon(sys.argv[1:])
+  except BrokenPipeError:
+    os.dup2(os.open(os.devnull, os.O_WRONLY), sys.stdout.fileno())
+    sys.exit(1)
+  if code is not None:
+    sys.exit(code)
   parser = build_parser()
   args = parser.parse_args()
   try:
-    args.func(args)
+    run_command(args)
+  except BrokenPipeError:
+    devnull = os.open(os.devnull, os.O_WRONLY)
+    os.dup2(devnull, sys.stdout.fileno())
+    sys.exit(1)
   except Exception as e:
     sys.stderr.write(f"ERROR: {e}\n")
     sys.exit(2)
@@ -0,0 +1,801 @@
+import base64
+import codecs
+import collections
+import functools
+import hashlib
+import http.client
+import json
+import os
+import re
+import socket
+import threading
+import time
+import urllib.error
+import urllib.parse
+import urllib.request
+import zlib
+from datetime import datetime
+
+try:
+  import brotli  # 可选：安装了 brotli 包时额外协商 br
+except ImportError:
+  brotli = None
+
+
+POOL_MAXSIZE = 8
+MAX_REDIRECTS = 5
+
+READ_CHUNK_SIZE = 64 * 1024
+
+LOGIN_PATH = "/api/auth/login"
+CASSETTE_INDEX = "cassette.ndjson"
+CASSETTE_HEADERS = ("Content-Type", "Content-Encoding", "X-Cache", "Server-Timing", "ETag", "Last-Modified", "Cache-Control")
+
+STALE_CONNECTION_ERRORS = (http.client.RemoteDisconnected, ConnectionResetError, BrokenPipeError, ConnectionAbortedError)
+
+
+class HttpError(RuntimeError):
+  def __init__(self, status, reason, payload):
+    super().__init__(f"HTTP {status} {reason}: {payload}")
+    self.status = status
+    self.reason = reason
+    self.payload = payload
+
+
+def _iso_now():
+  return datetime.utcnow().replace(microsecond=0).isoformat() + "Z"
+
+
+class _UrllibResponse:
+  def __init__(self, resp, status, reason, trace=None):
+    self._resp = resp
+    self.status = status
+    self.reason = reason
+    self.headers = resp.headers
+    self.trace = trace
+
+  def read(self, amt=None):
+    data = self._resp.read() if amt is None else self._resp.read(amt)
+    if self.trace is not None:
+      self.trace.wire_bytes += len(data)
+    return data
+
+  def close(self):
+    self._resp.close()
+    if self.trace is not None:
+      self.trace.body_done()
+
+  def __enter__(self):
+    return self
+
+  def __exit__(self, *exc):
+    self.close()
+
+
+class UrllibTransport:
+  """每个请求独立 urlopen（不复用连接），等价于旧实现；用于 --no_pool 回退。"""
+
+  def open(self, method, url, headers=None, body=None, timeout=60, trace=None):
+    req = urllib.request.Request(url=url, method=method, headers=dict(headers or {}), data=body)
+    started = time.perf_counter()
+    try:
+      resp = urllib.request.urlopen(req, timeout=timeout)
+      result = _UrllibResponse(resp, resp.status, resp.reason, trace)
+    except urllib.error.HTTPError as e:
+      result = _UrllibResponse(e, e.code, e.reason, trace)
+    except urllib.error.URLError as e:
+      raise RuntimeError(f"Request failed: {e}") from None
+    if trace is not None:
+      # urlopen 内部完成 DNS/连接/发送，无法再拆分，整体计入 wait
+      trace.wait = time.perf_counter() - started
+    return result
+
+  def close(self):
+    pass
+
+
+class _PooledResponse:
+  def __init__(self, pool, key, conn, resp, trace=None):
+    self._pool = pool
+    self._key = key
+    self._conn = conn
+    self._resp = resp
+    self.status = resp.status
+    self.reason = resp.reason
+    self.headers = resp.headers
+    self.trace = trace
+
+  def read(self, amt=None):
+    data = self._resp.read() if amt is None else self._resp.read(amt)
+    if self.trace is not None:
+      self.trace.wire_bytes += len(data)
+    return data
+
+  def close(self):
+    conn, self._conn = self._conn, None
+    if conn is None:
+      return
+    if self.trace is not None:
+      self.trace.body_done()
+    if self._resp.isclosed() and not self._resp.will_close:
+      self._pool._release(self._key, conn)
+    else:
+      self._resp.close()
+      conn.close()
+
+  def __enter__(self):
+    return self
+
+  def __exit__(self, *exc):
+    self.close()
+
+
+class ConnectionPool:
+  """按 (scheme, host, port) 复用 http.client 长连接（keep-alive），线程安全。
+
+  maxsize 是每个 host 保留的空闲连接数；并发请求超过时会临时新建连接，用完后多余的直接关闭。
+  """
+
+  def __init__(self, maxsize=POOL_MAXSIZE):
+    self.maxsize = max(1, int(maxsize))
+    self._idle = {}
+    self._lock = threading.Lock()
+
+  @staticmethod
+  def _route(url):
+    parts = urllib.parse.urlsplit(url)
+    scheme = parts.scheme.lower()
+    if scheme not in ("http", "https"):
+      raise RuntimeError(f"Unsupported URL scheme: {url}")
+    host = parts.hostname or ""
+    port = parts.port or (443 if scheme == "https" else 80)
+    target = parts.path or "/"
+    if parts.query:
+      target += "?" + parts.query
+    proxy = None
+    proxies = urllib.request.getproxies()
+    if proxies.get(scheme) and not urllib.request.proxy_bypass(host):
+      proxy = urllib.parse.urlsplit(proxies[scheme])
+      if scheme == "http":
+        target = urllib.parse.urlunsplit((scheme, parts.netloc, parts.path or "/", parts.query, ""))
+    return (scheme, host, port, proxy.hostname if proxy else None, proxy.port if proxy else None), target
+
+  @staticmethod
+  def _connect(key, timeout):
+    scheme, host, port, proxy_host, proxy_port = key
+    if proxy_host:
+      cls = http.client.HTTPSConnection if scheme == "https" else http.client.HTTPConnection
+      conn = cls(proxy_host, proxy_port or (443 if scheme == "https" else 80), timeout=timeout)
+      if scheme == "https":
+        conn.set_tunnel(host, port)
+      return conn
+    if scheme == "https":
+      return http.client.HTTPSConnection(host, port, timeout=timeout)
+    return http.client.HTTPConnection(host, port, timeout=timeout)
+
+  def _acquire(self, key, timeout):
+    with self._lock:
+      idle = self._idle.get(key)
+      conn = idle.pop() if idle else None
+    if conn is None:
+      return self._connect(key, timeout), False
+    conn.timeout = timeout
+    if conn.sock is not None:
+      conn.sock.settimeout(timeout)
+    return conn, True
+
+  def _release(self, key, conn):
+    with self._lock:
+      idle = self._idle.setdefault(key, [])
+      if len(idle) < self.maxsize:
+        idle.append(conn)
+        return
+    conn.close()
+
+  @staticmethod
+  def _traced_connect(conn, trace):
+    # 显式建立连接以分别计时 DNS、TCP 与 TLS（http.client 默认在 request 里隐式连接）
+    def create_connection(address, *args):
+      started = time.perf_counter()
+      infos = socket.getaddrinfo(address[0], address[1], 0, socket.SOCK_STREAM)
+      resolved = time.perf_counter()
+      trace.dns = resolved - started
+      error = None
+      for info in infos:
+        try:
+          sock = socket.create_connection(info[4][:2], *args)
+          break
+        except OSError as e:
+          error = e
+      else:
+        raise error or OSError(f"getaddrinfo returned no address for {address[0]}")
+      trace.connect = time.perf_counter() - resolved
+      return sock
+
+    conn._create_connection = create_connection
+    started = time.perf_counter()
+    conn.connect()
+    if isinstance(conn, http.client.HTTPSConnection):
+      trace.tls = max(0.0, time.perf_counter() - started - trace.dns - trace.connect)
+
+  def _send(self, method, url, headers, body, timeout, trace=None):
+    key, target = self._route(url)
+    while True:
+      conn, reused = self._acquire(key, timeout)
+      try:
+        if trace is not None:
+          trace.reused = reused
+          if conn.sock is None:
+            self._traced_connect(conn, trace)
+          started = time.perf_counter()
+        conn.request(method, target, body=body, headers=headers)
+        if trace is not None:
+          sent = time.perf_counter()
+          trace.send = sent - started
+        resp = conn.getresponse()
+        if trace is not None:
+          trace.wait = time.perf_counter() - sent
+        return _PooledResponse(self, key, conn, resp, trace)
+      except STALE_CONNECTION_ERRORS:
+        conn.close()
+        if not reused:
+          raise
+      except Exception:
+        conn.close()
+        raise
+
+  def open(self, method, url, headers=None, body=None, timeout=60, trace=None):
+    headers = dict(headers or {})
+    try:
+      for _ in range(MAX_REDIRECTS + 1):
+        resp = self._send(method, url, headers, body, timeout, trace)
+        location = resp.headers.get("Location")
+        if resp.status not in (301, 302, 303, 307, 308) or not location:
+          return resp
+        resp.read()
+        resp.close()
+        url = urllib.parse.urljoin(url, location)
+        if resp.status == 303 or (resp.status in (301, 302) and method not in ("GET", "HEAD")):
+          method = "GET"
+          body = None
+          headers = {k: v for k, v in headers.items() if k.lower() not in ("content-type", "content-length")}
+      raise RuntimeError(f"Request failed: too many redirects ({url})")
+    except (OSError, http.client.HTTPException) as e:
+      raise RuntimeError(f"Request failed: {e}") from None
+
+  def close(self):
+    with self._lock:
+      idle, self._idle = self._idle, {}
+    for conns in idle.values():
+      for conn in conns:
+        conn.close()
+
+
+_TRANSPORT = None
+_TRANSPORT_LOCK = threading.Lock()
+_THREAD_TRANSPORT = threading.local()
+
+
+def get_transport():
+  global _TRANSPORT
+  override = getattr(_THREAD_TRANSPORT, "transport", None)
+  if override is not None:
+    return override
+  with _TRANSPORT_LOCK:
+    if _TRANSPORT is None:
+      _TRANSPORT = UrllibTransport() if _maybe_get_env("ISSUE_ANALYZOR_NO_POOL") else ConnectionPool()
+    return _TRANSPORT
+
+
+def _use_thread_transport(transport):
+  # ThreadPoolExecutor 的 initializer：该线程上的请求改用 transport（None 表示用全局 transport）
+  _THREAD_TRANSPORT.transport = transport
+
+
+def set_transport(transport):
+  global _TRANSPORT
+  with _TRANSPORT_LOCK:
+    previous, _TRANSPORT = _TRANSPORT, transport
+  if previous is not None and previous is not transport:
+    previous.close()
+
+
+_TRACER = None
+
+
+def get_tracer():
+  return _TRACER
+
+
+def set_tracer(tracer):
+  # tracer.start(method, url) 返回的对象由 _open_json / ConnectionPool 记录各阶段耗时；None 关闭
+  global _TRACER
+  _TRACER = tracer
+
+
+def _request_key(method, url, body=None):
+  # cassette 匹配键不含 host：录制与回放可以用不同的 --base
+  parts = urllib.parse.urlsplit(url)
+  target = (parts.path or "/") + ("?" + parts.query if parts.query else "")
+  return method.upper(), target, hashlib.sha256(body).hexdigest()[:16] if body else None
+
+
+class Cassette:
+  """--record/--replay 的磁盘格式：目录下 cassette.ndjson 每行一个请求/响应，响应体按 sha256 去重存在 bodies/ 里（保留原始 Content-Encoding 的字节）。"""
+
+  def __init__(self, path):
+    self.path = path
+    self._lock = threading.Lock()
+
+  @property
+  def index_path(self):
+    return os.path.join(self.path, CASSETTE_INDEX)
+
+  def body_path(self, digest):
+    return os.path.join(self.path, "bodies", f"{digest}.bin")
+
+  def record(self, method, url, body, status, reason, headers, data, elapsed):
+    digest = hashlib.sha256(data).hexdigest()
+    key_method, target, body_hash = _request_key(method, url, body)
+    entry = {
+      "recorded_at": _iso_now(),
+      "method": key_method,
+      "path": target,
+      "body_sha256": body_hash,
+      "status": status,
+      "reason": reason,
+      "headers": {name: headers.get(name) for name in CASSETTE_HEADERS if headers.get(name) is not None},
+      "body": digest,
+      "size": len(data),
+      "elapsed_ms": round(elapsed * 1000, 1),
+    }
+    with self._lock:
+      body_path = self.body_path(digest)
+      if not os.path.exists(body_path):
+        os.makedirs(os.path.dirname(body_path), exist_ok=True)
+        with open(body_path + ".tmp", "wb") as f:
+          f.write(data)
+        os.replace(body_path + ".tmp", body_path)
+      with open(self.index_path, "a", encoding="utf-8") as f:
+        f.write(json.dumps(entry, ensure_ascii=False) + "\n")
+
+  def load(self):
+    if not os.path.exists(self.index_path):
+      raise RuntimeError(f"No cassette at {self.index_path} (record one with --record {self.path})")
+    entries = collections.OrderedDict()
+    with open(self.index_path, "r", encoding="utf-8") as f:
+      for line in f:
+        if line.strip():
+          entry = json.loads(line)
+          entries.setdefault((entry["method"], entry["path"], entry.get("body_sha256")), []).append(entry)
+    return entries
+
+  def read_body(self, entry):
+    with open(self.body_path(entry["body"]), "rb") as f:
+      return f.read()
+
+
+class _RecordingResponse:
+  def __init__(self, resp, on_close):
+    self._resp = resp
+    self._on_close = on_close
+    self._chunks = []
+    self._eof = False
+    self.status = resp.status
+    self.reason = resp.reason
+    self.headers = resp.headers
+    self.trace = getattr(resp, "trace", None)
+
+  def read(self, amt=None):
+    data = self._resp.read() if amt is None else self._resp.read(amt)
+    self._chunks.append(data)
+    if amt is None or not data:
+      self._eof = True
+    return data
+
+  def close(self):
+    on_close, self._on_close = self._on_close, None
+    if on_close is None:
+      return
+    try:
+      if not self._eof:
+        # 调用方提前停止读取（如 --limit）时读完剩余部分，保证 cassette 里是完整响应
+        self._chunks.append(self._resp.read())
+    finally:
+      self._resp.close()
+    on_close(self, b"".join(self._chunks))
+
+  def __enter__(self):
+    return self
+
+  def __exit__(self, *exc):
+    self.close()
+
+
+class RecordingTransport:
+  """--record：包装实际的 transport，把经过它的每个请求/响应写入 Cassette。
+
+  登录请求不录（请求体含密码、响应含 token），回放时由 ReplayServer 签发假 token。
+  """
+
+  def __init__(self, inner, cassette):
+    self.inner = inner
+    self.cassette = cassette
+
+  def open(self, method, url, headers=None, body=None, timeout=60, trace=None):
+    started = time.perf_counter()
+    resp = self.inner.open(method, url, headers=headers, body=body, timeout=timeout, trace=trace)
+    if urllib.parse.urlsplit(url).path == LOGIN_PATH:
+      return resp
+    elapsed = time.perf_counter() - started
+
+    def save(r, data):
+      self.cassette.record(method, url, body, r.status, r.reason, r.headers, data, elapsed)
+
+    return _RecordingResponse(resp, save)
+
+  def close(self):
+    self.inner.close()
+
+
+def _replay_token():
+  encode = lambda obj: base64.urlsafe_b64encode(json.dumps(obj).encode("utf-8")).rstrip(b"=").decode("ascii")
+  return f"{encode({'alg': 'none', 'typ': 'JWT'})}.{encode({'username': 'replay', 'exp': int(time.time()) + 3600})}.replay"
+
+
+@functools.lru_cache(maxsize=None)
+def _replay_handler_class():
+  # http.server 只在起回放服务时导入（同 _numpy()）
+  import http.server
+
+  class _ReplayHandler(http.server.BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def log_message(self, *args):
+      pass
+
+    def _send(self, status, reason, headers, data):
+      self.send_response(status, reason)
+      for name, value in headers.items():
+        self.send_header(name, value)
+      self.send_header("Content-Length", str(len(data)))
+      self.end_headers()
+      bandwidth = self.server.replay.bandwidth
+      if not bandwidth:
+        self.wfile.write(data)
+        return
+      step = max(1024, int(bandwidth / 20))
+      for start in range(0, len(data), step):
+        self.wfile.write(data[start:start + step])
+        self.wfile.flush()
+        time.sleep(min(step, len(data) - start) / bandwidth)
+
+    def _send_json(self, status, obj):
+      self._send(status, None, {"Content-Type": "application/json; charset=utf-8"}, json.dumps(obj, ensure_ascii=False).encode("utf-8"))
+
+    def _handle(self):
+      length = int(self.headers.get("Content-Length") or 0)
+      body = self.rfile.read(length) if length else b""
+      server = self.server.replay
+      if urllib.parse.urlsplit(self.path).path == LOGIN_PATH:
+        self._send_json(200, {"success": True, "data": {"token": _replay_token(), "username": "replay", "role": "user", "expiresIn": "1h"}})
+        return
+      key = _request_key(self.command, self.path, body)
+      entry = server.next_entry(key)
+      if entry is None:
+        self._send_json(404, {"success": False, "error": {"code": "NOT_RECORDED", "message": f"{key[0]} {key[1]} is not in the cassette"}})
+        return
+      delay = entry.get("elapsed_ms", 0) / 1000 if server.latency == "recorded" else server.latency
+      if delay:
+        time.sleep(delay)
+      headers = dict(entry.get("headers") or {})
+      data = server.cassette.read_body(entry)
+      encoding = headers.get("Content-Encoding")
+      if encoding and encoding.lower() not in (self.headers.get("Accept-Encoding") or "").lower():
+        decoder = _body_decoder(encoding)
+        data = decoder.decompress(data) + decoder.flush()
+        del headers["Content-Encoding"]
+      self._send(entry["status"], entry.get("reason"), headers, data)
+
+    do_GET = do_POST = do_PUT = do_PATCH = do_DELETE = _handle
+
+  return _ReplayHandler
+
+
+class ReplayServer:
+  """--replay：在本机起一个只回放 cassette 的 HTTP 服务（默认随机端口），可注入固定/录制时的延迟和带宽限制。
+
+  同一请求录到多次时按录制顺序依次返回，用完后重复最后一次；cassette 里没有的请求返回 404 NOT_RECORDED 并记入 misses。
+  serve_forever/shutdown/server_close/server_address 同 http.server.ThreadingHTTPServer。
+  """
+
+  def __init__(self, path, port=0, latency=0, bandwidth=None):
+    import http.server
+
+    self.httpd = http.server.ThreadingHTTPServer(("127.0.0.1", port), _replay_handler_class())
+    self.httpd.daemon_threads = True
+    self.httpd.replay = self
+    self.cassette = Cassette(path)
+    self.entries = self.cassette.load()
+    self.latency = latency
+    self.bandwidth = bandwidth
+    self.misses = []
+    self._cursor = {}
+    self._entry_lock = threading.Lock()
+
+  @property
+  def server_address(self):
+    return self.httpd.server_address
+
+  @property
+  def url(self):
+    return f"http://127.0.0.1:{self.server_address[1]}"
+
+  def serve_forever(self):
+    self.httpd.serve_forever()
+
+  def shutdown(self):
+    self.httpd.shutdown()
+
+  def server_close(self):
+    self.httpd.server_close()
+
+  def next_entry(self, key):
+    with self._entry_lock:
+      entries = self.entries.get(key)
+      if not entries:
+        self.misses.append(key)
+        return None
+      i = self._cursor.get(key, 0)
+      self._cursor[key] = i + 1
+      return entries[min(i, len(entries) - 1)]
+
+  def start(self):
+    threading.Thread(target=self.serve_forever, name="replay-server", daemon=True).start()
+    return self
+
+
+def _accept_encoding():
+  if _maybe_get_env("ISSUE_ANALYZOR_NO_COMPRESSION"):
+    return "identity"
+  return "br, gzip" if brotli is not None else "gzip"
+
+
+class _BrotliDecoder:
+  def __init__(self):
+    self._d = brotli.Decompressor()
+
+  def decompress(self, data):
+    return self._d.process(data) if hasattr(self._d, "process") else self._d.decompress(data)
+
+  def flush(self):
+    return b""
+
+
+def _body_decoder(content_encoding):
+  encoding = (content_encoding or "").strip().lower()
+  if encoding in ("", "identity"):
+    return None
+  if encoding in ("gzip", "x-gzip"):
+    return zlib.decompressobj(16 + zlib.MAX_WBITS)
+  if encoding == "deflate":
+    return zlib.decompressobj()
+  if encoding == "br" and brotli is not None:
+    return _BrotliDecoder()
+  raise RuntimeError(f"Unsupported Content-Encoding: {content_encoding}")
+
+
+def iter_response_body(resp, chunk_size=READ_CHUNK_SIZE):
+  decoder = _body_decoder(resp.headers.get("Content-Encoding"))
+  trace = getattr(resp, "trace", None)
+  while True:
+    chunk = resp.read(chunk_size)
+    if not chunk:
+      break
+    if decoder is not None:
+      chunk = decoder.decompress(chunk)
+    if chunk:
+      if trace is not None:
+        trace.body_bytes += len(chunk)
+      yield chunk
+  if decoder is not None:
+    tail = decoder.flush()
+    if tail:
+      if trace is not None:
+        trace.body_bytes += len(tail)
+      yield tail
+
+
+def _open_json(method, url, headers=None, body_obj=None, timeout=60, body=None):
+  # 状态码 >= 400 时读完 body 并抛出 HttpError；body_obj 编码为 JSON，body 原样发送（Content-Type 由调用方给出）
+  req_headers = {"Accept": "application/json", "Accept-Encoding": _accept_encoding()}
+  if headers:
+    req_headers.update(headers)
+  data = body
+  if body_obj is not None:
+    payload = json.dumps(body_obj, ensure_ascii=False).encode("utf-8")
+    data = payload
+    req_headers["Content-Type"] = "application/json; charset=utf-8"
+  trace = _TRACER.start(method, url) if _TRACER is not None else None
+  resp = get_transport().open(method, url, headers=req_headers, body=data, timeout=timeout, trace=trace)
+  if trace is not None:
+    trace.headers_received(resp)
+  if resp.status < 400:
+    return resp
+  with resp:
+    raw = b"".join(iter_response_body(resp)).decode("utf-8", errors="replace")
+  try:
+    parsed = json.loads(raw) if raw else {}
+  except Exception:
+    parsed = {"raw": raw}
+  raise HttpError(resp.status, resp.reason, parsed)
+
+
+def _http_json(method, url, headers=None, body_obj=None, timeout=60, body=None):
+  with _open_json(method, url, headers=headers, body_obj=body_obj, timeout=timeout, body=body) as resp:
+    raw = b"".join(iter_response_body(resp)).decode("utf-8", errors="replace")
+  if not raw:
+    return None
+  trace = getattr(resp, "trace", None)
+  if trace is None:
+    return json.loads(raw)
+  started = time.perf_counter()
+  data = json.loads(raw)
+  trace.add_decode(time.perf_counter() - started)
+  return data
+
+
+_WHITESPACE = re.compile(r"[ \t\n\r]*")
+_NUMBER_CONTINUATION = frozenset(".eE+-0123456789")
+STREAMED_ARRAY = object()
+STREAMED_OBJECT = object()
+
+
+class _JsonReader:
+  """在按块到达的 UTF-8 字节流上做增量 JSON 解析：标量/子树用 json.JSONDecoder.raw_decode 解码，已消费的前缀会被丢弃。"""
+
+  def __init__(self, chunks):
+    self._chunks = iter(chunks)
+    self._decode = codecs.getincrementaldecoder("utf-8")(errors="replace").decode
+    self._decoder = json.JSONDecoder()
+    self.buf = ""
+    self.pos = 0
+    self.eof = False
+
+  def _fill(self, min_len=0):
+    if self.eof:
+      return False
+    parts = [self.buf[self.pos:]]
+    size = len(parts[0])
+    before = size
+    while True:
+      chunk = next(self._chunks, None)
+      text = self._decode(b"", final=True) if chunk is None else self._decode(chunk)
+      parts.append(text)
+      size += len(text)
+      if chunk is None:
+        self.eof = True
+        break
+      if size >= min_len and size > before:
+        break
+    self.buf = "".join(parts)
+    self.pos = 0
+    return size > before
+
+  def peek(self):
+    while True:
+      self.pos = _WHITESPACE.match(self.buf, self.pos).end()
+      if self.pos < len(self.buf):
+        return self.buf[self.pos]
+      if not self._fill():
+        raise ValueError("Unexpected end of JSON stream")
+
+  def expect(self, ch):
+    if self.peek() != ch:
+      raise ValueError(f"Expected {ch!r} at JSON stream offset, got {self.buf[self.pos]!r}")
+    self.pos += 1
+
+  def value(self):
+    self.peek()
+    while True:
+      try:
+        value, end = self._decoder.raw_decode(self.buf, self.pos)
+      except json.JSONDecodeError:
+        # 值被块边界截断：按几何级数扩大缓冲区后重试，避免大值反复重解析
+        if not self._fill(min_len=2 * (len(self.buf) - self.pos)):
+          raise
+        continue
+      # 值恰好结束在缓冲区末尾时（如数字 12|3），多读一块确认
+      if end >= len(self.buf) and self._fill():
+        continue
+      # 数字在小数点/指数处被截断（0|.5、1e|5、1e|-5）：raw_decode 只解出前缀，后面紧跟数字字符，多读一块重试
+      if isinstance(value, (int, float)) and not isinstance(value, bool) and self.buf[end] in _NUMBER_CONTINUATION and self._fill():
+        continue
+      self.pos = end
+      return value
+
+
+def _walk_json(reader, path, prefix, meta, strip):
+  def store(key, value):
+    if len(key) > strip:
+      meta[key[strip:]] = value
+
+  if len(prefix) == len(path):
+    c = reader.peek()
+    if c == "[":
+      store(prefix, STREAMED_ARRAY)
+      reader.pos += 1
+      if reader.peek() == "]":
+        reader.pos += 1
+        return
+      while True:
+        yield reader.value()
+        c = reader.peek()
+        reader.pos += 1
+        if c == "]":
+          return
+        if c != ",":
+          raise ValueError(f"Malformed JSON array in stream: {c!r}")
+    if c == "{":
+      store(prefix, STREAMED_OBJECT)
+      reader.pos += 1
+      if reader.peek() == "}":
+        reader.pos += 1
+        return
+      while True:
+        key = reader.value()
+        reader.expect(":")
+        yield key, reader.value()
+        c = reader.peek()
+        reader.pos += 1
+        if c == "}":
+          return
+        if c != ",":
+          raise ValueError(f"Malformed JSON object in stream: {c!r}")
+    store(prefix, reader.value())
+    return
+
+  if reader.peek() != "{":
+    store(prefix, reader.value())
+    return
+  reader.pos += 1
+  if reader.peek() == "}":
+    reader.pos += 1
+    return
+  while True:
+    key = reader.value()
+    reader.expect(":")
+    child = prefix + (key,)
+    if key == path[len(prefix)]:
+      yield from _walk_json(reader, path, child, meta, strip)
+    else:
+      store(child, reader.value())
+    c = reader.peek()
+    reader.pos += 1
+    if c == "}":
+      return
+    if c != ",":
+      raise ValueError(f"Malformed JSON object in stream: {c!r}")
+
+
+def iter_json_items(chunks, path, meta=None, strip=0):
+  # path 之外的字段写入 meta（key 为路径 tuple）；strip 去掉 meta key 的前缀层级（例如缓存文件的信封）
+  meta = {} if meta is None else meta
+  yield from _walk_json(_JsonReader(chunks), tuple(path), (), meta, strip)
+
+
+def _build_url(base, path, params=None):
+  base = base.rstrip("/")
+  if not path.startswith("/"):
+    path = "/" + path
+  url = base + path
+  if params:
+    encoded = urllib.parse.urlencode(params, doseq=True)
+    if encoded:
+      url += "?" + encoded
+  return url
+
+
+def _maybe_get_env(name):
+  v = os.environ.get(name)
+  return v if v else None
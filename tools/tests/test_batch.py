@@ -0,0 +1,80 @@
+import contextlib
+import io
+import json
+import os
+import shutil
+import sys
+import tempfile
+import unittest
+from unittest import mock
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import issue_query as iq  # noqa: E402
+
+
+class _BatchClient:
+  def __init__(self):
+    self.calls = []
+
+  def select_project(self, **kwargs):
+    return {"id": 7, "name": "M60 P1"}
+
+  def batch(self, project_id, queries, filters):
+    self.calls.append((project_id, queries, filters))
+    results = {q["id"]: {"success": True, "data": {"endpoint": q["endpoint"]}} for q in queries}
+    return {"results": results, "stats": {"queries": len(queries)}}
+
+
+class BatchCommandTest(unittest.TestCase):
+  def setUp(self):
+    self.tmp = tempfile.mkdtemp(prefix="issue-query-batch-")
+    self.out_dir = os.path.join(self.tmp, "out")
+
+  def tearDown(self):
+    shutil.rmtree(self.tmp, ignore_errors=True)
+
+  def _run(self, spec, *argv):
+    spec_path = os.path.join(self.tmp, "spec.json")
+    with open(spec_path, "w", encoding="utf-8") as f:
+      json.dump(spec, f)
+    args = iq.build_parser().parse_args(["batch", "--project_id", "7", "--spec", spec_path, "--out_dir", self.out_dir, "--format", "json", *argv])
+    client = _BatchClient()
+    stdout = io.StringIO()
+    with mock.patch.object(iq, "_open_client", return_value=client), contextlib.redirect_stdout(stdout), contextlib.redirect_stderr(io.StringIO()):
+      args.func(args)
+    return client, json.loads(stdout.getvalue())
+
+  def test_command_line_filters_override_spec_filters(self):
+    spec = {"filters": {"wfs": "1", "symptoms": "Rattle"}, "queries": [{"id": "overview", "endpoint": "analysis"}]}
+    client, _ = self._run(spec, "--wfs", "3")
+    filters = client.calls[0][2]
+    self.assertEqual(filters["wfs"], "3")
+    self.assertEqual(filters["symptoms"], "Rattle")
+
+  def test_output_stays_inside_out_dir(self):
+    outside = os.path.join(self.tmp, "escaped.json")
+    spec = {"queries": [
+      {"id": "up", "endpoint": "analysis", "output": "../escaped.json"},
+      {"id": "abs", "endpoint": "analysis", "output": outside.replace("escaped", "absolute")},
+      {"id": "../id", "endpoint": "analysis"},
+    ]}
+    _, summary = self._run(spec)
+    files = [r["file"] for r in summary["results"]]
+    self.assertEqual([os.path.dirname(f) for f in files], [self.out_dir] * 3)
+    self.assertEqual(sorted(os.listdir(self.out_dir)), ["absolute.json", "escaped.json", "id.json"])
+    self.assertFalse(os.path.exists(outside))
+
+  def test_colliding_file_names_are_rejected(self):
+    for queries in (
+      [{"id": "a b", "endpoint": "analysis"}, {"id": "a_b", "endpoint": "analysis"}],
+      [{"id": "x", "endpoint": "analysis", "output": "r.json"}, {"id": "y", "endpoint": "stats", "output": "sub/r.json"}],
+    ):
+      with self.subTest(queries=queries):
+        with self.assertRaises(RuntimeError):
+          self._run({"queries": queries})
+        self.assertFalse(os.path.exists(self.out_dir))
+
+
+if __name__ == "__main__":
+  unittest.main()
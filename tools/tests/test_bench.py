@@ -0,0 +1,47 @@
+import os
+import sys
+import threading
+import unittest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import issue_query as iq  # noqa: E402
+
+
+class _TimedSession:
+  def __init__(self):
+    self.calls = []
+    self.cached = set()
+    self._lock = threading.Lock()
+
+  def get_raw(self, path, params=None, headers=None):
+    key = (path, tuple(sorted((params or {}).items())))
+    with self._lock:
+      self.calls.append((path, dict(params or {}), dict(headers or {})))
+      bypass = (headers or {}).get("X-Cache-Bypass") == "1"
+      hit = key in self.cached and not bypass
+      self.cached.add(key)
+    return 10, {"X-Cache": "HIT" if hit else "MISS"}
+
+
+class BenchRunnerTest(unittest.TestCase):
+  def test_cold_phase_bypasses_server_cache_without_extra_params(self):
+    session = _TimedSession()
+    runner = iq.BenchRunner(session, 7, concurrency=2)
+    query = {"id": "stats", "path": "filter-statistics"}
+    params = {"wfs": "1"}
+    runner.run("cold", [(query, params)], headers=iq.BENCH_COLD_HEADERS)
+    runner.run("warm", [(query, params)] * 3)
+
+    self.assertEqual([c[1] for c in session.calls], [params] * 4)
+    self.assertEqual(session.calls[0][2], {"X-Cache-Bypass": "1"})
+    self.assertTrue(all(c[2] == {} for c in session.calls[1:]))
+    cold, warm = [s for s in runner.samples if s["phase"] == "cold"], [s for s in runner.samples if s["phase"] == "warm"]
+    self.assertEqual([s["cache"] for s in cold], ["MISS"])
+    # cold 写回的是同一个键，warm 直接命中，不算 refetched
+    self.assertEqual([s["cache"] for s in warm], ["HIT"] * 3)
+    self.assertFalse(any(s["refetched"] for s in runner.samples))
+
+
+if __name__ == "__main__":
+  unittest.main()
@@ -0,0 +1,306 @@
+import asyncio
+import gzip
+import http.server
+import inspect
+import json
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+import unittest
+import urllib.parse
+from unittest import mock
+
+TOOLS_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, TOOLS_DIR)
+
+import issue_client as ic  # noqa: E402
+import issue_transport as it  # noqa: E402
+
+BACKEND_DIR = os.path.join(os.path.dirname(TOOLS_DIR), "backend")
+
+PROJECTS = [
+  {"id": 1, "name": "M60 EVT", "project_key": "M60", "phase": "EVT", "upload_time": "2026-01-01 10:00:00"},
+  {"id": 2, "name": "M60 DVT", "project_key": "M60", "phase": "DVT", "upload_time": "2026-02-01 10:00:00"},
+  {"id": 3, "name": "X1 EVT", "project_key": "X1", "phase": "EVT", "upload_time": "2026-03-01 10:00:00"},
+]
+ISSUES = [{"id": i, "fa_number": f"FA-{i}", "wf": str(i % 2 + 1), "rate": i / 8} for i in range(1, 8)]
+
+
+class _BackendHandler(http.server.BaseHTTPRequestHandler):
+  """录制用的最小服务端：分页 projects、issues 翻页、filter-statistics 回显参数、batch 回显请求体；接受 gzip 时压缩响应。"""
+
+  protocol_version = "HTTP/1.1"
+
+  def log_message(self, *args):
+    pass
+
+  def _json(self, status, obj):
+    body = json.dumps(obj).encode("utf-8")
+    self.send_response(status)
+    self.send_header("Content-Type", "application/json; charset=utf-8")
+    if "gzip" in (self.headers.get("Accept-Encoding") or ""):
+      body = gzip.compress(body)
+      self.send_header("Content-Encoding", "gzip")
+    self.send_header("Content-Length", str(len(body)))
+    self.end_headers()
+    self.wfile.write(body)
+
+  def do_POST(self):
+    length = int(self.headers.get("Content-Length") or 0)
+    body = json.loads(self.rfile.read(length) or b"{}")
+    if self.path == it.LOGIN_PATH:
+      self._json(200, {"success": True, "data": {"token": it._replay_token()}})
+    elif self.path.endswith("/batch"):
+      results = {q["id"]: {"success": True, "endpoint": q["endpoint"], "data": {"filters": {**body["filters"], **q["filters"]}}} for q in body["queries"]}
+      self._json(200, {"success": True, "data": {"results": results, "stats": {"queries": len(results), "computed": len(results)}}})
+    else:
+      self._json(404, {"success": False})
+
+  def do_GET(self):
+    url = urllib.parse.urlsplit(self.path)
+    query = {k: v[0] if len(v) == 1 else v for k, v in urllib.parse.parse_qs(url.query).items()}
+    if url.path == "/api/projects":
+      # 每页最多 2 个，强制客户端翻页
+      page, limit = int(query["page"]), 2
+      data = {"projects": PROJECTS[(page - 1) * limit:page * limit], "total": len(PROJECTS), "page": page, "limit": limit}
+      self._json(200, {"success": True, "data": data})
+    elif url.path.endswith("/issues"):
+      page, limit = int(query["page"]), int(query["limit"])
+      self._json(200, {"success": True, "data": {"issues": ISSUES[(page - 1) * limit:page * limit], "total": len(ISSUES), "page": page, "limit": limit}})
+    elif url.path.endswith("/filter-statistics"):
+      self._json(200, {"success": True, "data": {"statistics": {"query": query}}})
+    else:
+      self._json(404, {"success": False, "error": {"message": "not found"}})
+
+
+def _exercise(client):
+  """在录制与回放两侧执行同一组调用，返回可比较的结果。"""
+  project = client.select_project(project_key="M60")
+  meta = {}
+  streamed = list(client.stream_issues(project["id"], {"wfs": "1"}, meta, page=1, limit=3))
+  return {
+    "projects": client.projects(project_key="M60"),
+    "selected": project,
+    "stats": client.filter_statistics(project["id"], {"wfs": "2,1", "symptoms": "Rattle"}),
+    "all_issues": list(client.iter_issues(project["id"], page_size=3, workers=2)),
+    "streamed": streamed,
+    "stream_total": meta.get(("data", "total")),
+    "batch": client.batch(project["id"], [{"id": "a", "endpoint": "analysis", "filters": {"wfs": "1"}}], {"configs": "R1CASN"}),
+  }
+
+
+class ClientReplayTest(unittest.TestCase):
+  """IssueAnalyzorClient 对 --record 录下的 cassette 回放（ReplayServer）得到与录制时相同的结果。"""
+
+  @classmethod
+  def setUpClass(cls):
+    cls.tmp = tempfile.mkdtemp(prefix="issue-query-cassette-")
+    backend = http.server.ThreadingHTTPServer(("127.0.0.1", 0), _BackendHandler)
+    backend.daemon_threads = True
+    threading.Thread(target=backend.serve_forever, daemon=True).start()
+    it.set_transport(it.RecordingTransport(it.UrllibTransport(), it.Cassette(cls.tmp)))
+    try:
+      client = ic.IssueAnalyzorClient(f"http://127.0.0.1:{backend.server_address[1]}", "u", "p", token_cache=False, response_cache=False)
+      cls.recorded = _exercise(client)
+      client.close()
+    finally:
+      it.set_transport(None)
+      backend.shutdown()
+      backend.server_close()
+
+  @classmethod
+  def tearDownClass(cls):
+    shutil.rmtree(cls.tmp, ignore_errors=True)
+
+  def setUp(self):
+    self.server = it.ReplayServer(self.tmp).start()
+    self.client = ic.IssueAnalyzorClient(self.server.url, "replay", "x", token_cache=False, response_cache=False)
+
+  def tearDown(self):
+    self.client.close()
+    self.server.shutdown()
+    self.server.server_close()
+    it.set_transport(None)
+
+  def test_replay_matches_recording(self):
+    self.assertEqual(self.recorded["selected"]["id"], 2)
+    self.assertEqual([p["id"] for p in self.recorded["projects"]], [1, 2])
+    self.assertEqual(self.recorded["all_issues"], ISSUES)
+    self.assertEqual(self.recorded["stream_total"], len(ISSUES))
+    self.assertEqual(_exercise(self.client), self.recorded)
+    self.assertEqual(self.server.misses, [])
+
+  def test_unrecorded_request_is_reported(self):
+    with self.assertRaises(it.HttpError) as ctx:
+      self.client.filter_statistics(2, {"wfs": "3"})
+    self.assertEqual(ctx.exception.status, 404)
+    self.assertEqual(len(self.server.misses), 1)
+
+  def test_cassette_keeps_encoded_bodies(self):
+    entries = it.Cassette(self.tmp).load()
+    self.assertTrue(entries)
+    self.assertNotIn(("POST", it.LOGIN_PATH, None), {k[:2] + (None,) for k in entries})
+    self.assertTrue(all(e["headers"].get("Content-Encoding") == "gzip" for group in entries.values() for e in group))
+
+
+class ResponseCacheScopeTest(unittest.TestCase):
+  """逐页遍历 issues 不写响应缓存；普通分析查询照常缓存。"""
+
+  def setUp(self):
+    self.tmp = tempfile.mkdtemp(prefix="issue-query-cache-")
+    self.backend = http.server.ThreadingHTTPServer(("127.0.0.1", 0), _BackendHandler)
+    self.backend.daemon_threads = True
+    threading.Thread(target=self.backend.serve_forever, daemon=True).start()
+    self.client = ic.IssueAnalyzorClient(f"http://127.0.0.1:{self.backend.server_address[1]}", "u", "p", token_cache=False, response_cache=False)
+    self.client.session.response_cache = ic.ResponseCache(root=self.tmp)
+
+  def tearDown(self):
+    self.client.close()
+    it.set_transport(None)
+    self.backend.shutdown()
+    self.backend.server_close()
+    shutil.rmtree(self.tmp, ignore_errors=True)
+
+  def test_page_walk_bypasses_cache(self):
+    self.assertEqual(list(self.client.iter_issues(2, page_size=3, workers=2)), ISSUES)
+    self.assertEqual(os.listdir(self.tmp), [])
+    self.client.filter_statistics(2, {"wfs": "1"})
+    self.assertEqual(len(os.listdir(self.tmp)), 1)
+
+
+class NormalizeParamsParityTest(unittest.TestCase):
+  """_normalize_params 与后端 CacheService._normalizeFilters 对 query string 形态的参数（字符串 / 字符串数组）结果一致。"""
+
+  CASES = [
+    {},
+    {"wfs": ["2", "10", "1"], "configs": "R1CASN"},
+    {"symptoms": ["b", "a"], "date_from": "2026-01-01", "empty": "", "none": None, "z": "1", "a": "2"},
+    {"includeTrend": "true", "failed_tests": ["Beta", "Alpha", "alpha"]},
+  ]
+
+  def _node_normalize(self, cases):
+    script = (
+      "const cacheService = require(process.argv[1]);"
+      "const cases = JSON.parse(require('fs').readFileSync(0, 'utf-8'));"
+      "process.stdout.write('\\n' + JSON.stringify(cases.map((c) => cacheService._normalizeFilters(c))));"
+    )
+    try:
+      proc = subprocess.run(
+        ["node", "-e", script, os.path.join(BACKEND_DIR, "src", "services", "cacheService.js")],
+        input=json.dumps(cases), capture_output=True, text=True, timeout=60,
+      )
+    except (OSError, subprocess.TimeoutExpired) as e:
+      self.skipTest(f"node is not available: {e}")
+    if proc.returncode != 0:
+      self.skipTest(f"backend cacheService cannot be loaded (npm install in backend/): {proc.stderr.strip()[-200:]}")
+    # config 加载时会往 stdout 打日志，结果在最后一行
+    return json.loads(proc.stdout.splitlines()[-1])
+
+  def test_matches_cache_service(self):
+    expected = self._node_normalize(self.CASES)
+    for case, js in zip(self.CASES, expected):
+      with self.subTest(case=case):
+        normalized = ic._normalize_params(case)
+        self.assertEqual(normalized, js)
+        self.assertEqual(list(normalized), list(js))
+
+  def test_csv_strings_are_order_insensitive(self):
+    # 服务端把 "2,1" 与 "1,2" 缓存为两个键（结果相同）；本地缓存合并为一个
+    self.assertEqual(ic._normalize_params({"wfs": "2, 1"}), ic._normalize_params({"wfs": "1,2"}))
+
+
+class _SlowClient:
+  def __init__(self, delay):
+    self.delay = delay
+    self.lock = threading.Lock()
+    self.active = 0
+    self.peak = 0
+    self.closed = False
+
+  def analysis(self, project_id, filters=None):
+    with self.lock:
+      self.active += 1
+      self.peak = max(self.peak, self.active)
+    try:
+      time.sleep(self.delay)
+      return {"project_id": project_id, "filters": filters}
+    finally:
+      with self.lock:
+        self.active -= 1
+
+  def iter_issues(self, project_id, filters=None, **kwargs):
+    yield from ISSUES
+
+  def close(self):
+    self.closed = True
+
+
+class AsyncClientTest(unittest.TestCase):
+  def test_calls_run_concurrently_up_to_limit(self):
+    sync_client = _SlowClient(delay=0.1)
+
+    async def run():
+      async with ic.AsyncIssueAnalyzorClient(client=sync_client, max_concurrency=4) as client:
+        started = time.monotonic()
+        results = await asyncio.gather(*(client.analysis(i, {"wfs": str(i)}) for i in range(12)))
+        return results, time.monotonic() - started
+
+    results, elapsed = asyncio.run(run())
+    self.assertEqual([r["project_id"] for r in results], list(range(12)))
+    self.assertEqual(sync_client.peak, 4)
+    # 12 个 0.1s 的调用、4 个并发：约 0.3s，串行需要 1.2s
+    self.assertLess(elapsed, 0.9)
+    self.assertTrue(sync_client.closed)
+
+  def test_async_iterators(self):
+    sync_client = _SlowClient(delay=0)
+
+    async def run():
+      async with ic.AsyncIssueAnalyzorClient(client=sync_client) as client:
+        return [issue async for issue in client.iter_issues(1, batch=3)]
+
+    self.assertEqual(asyncio.run(run()), ISSUES)
+
+  def test_own_pool_leaves_global_transport_alone(self):
+    saved = it.get_transport()
+    pool = it.ConnectionPool(maxsize=2)
+    it.set_transport(pool)
+    try:
+      async def run():
+        async with ic.AsyncIssueAnalyzorClient(client=_SlowClient(delay=0), max_concurrency=16) as client:
+          return client._transport, await client._call(it.get_transport)
+
+      own, seen = asyncio.run(run())
+      self.assertIs(seen, own)
+      self.assertEqual(own.maxsize, 16)
+      self.assertIs(it.get_transport(), pool)
+      self.assertEqual(pool.maxsize, 2)
+    finally:
+      it.set_transport(saved)
+
+  def test_methods_have_real_signatures(self):
+    params = inspect.signature(ic.AsyncIssueAnalyzorClient.analysis).parameters
+    self.assertEqual(list(params)[:3], ["self", "project_id", "filters"])
+    self.assertTrue(inspect.iscoroutinefunction(ic.AsyncIssueAnalyzorClient.analysis))
+
+
+class ClientPasswordTest(unittest.TestCase):
+  def test_missing_password_raises_instead_of_prompting(self):
+    with mock.patch.dict(os.environ, {"ISSUE_ANALYZOR_PASSWORD": ""}), mock.patch("getpass.getpass", side_effect=AssertionError("prompted")):
+      client = ic.IssueAnalyzorClient("http://127.0.0.1:9", "u", token_cache=False, response_cache=False)
+      with self.assertRaisesRegex(RuntimeError, "Missing password"):
+        client.login()
+
+  def test_password_callable_is_used_lazily(self):
+    calls = []
+    client = ic.IssueAnalyzorClient("http://127.0.0.1:9", "u", password=lambda: calls.append(1) or "pw", token_cache=False, response_cache=False)
+    self.assertEqual(calls, [])
+    self.assertEqual(client.session._password_provider(), "pw")
+
+
+if __name__ == "__main__":
+  unittest.main()
@@ -0,0 +1,52 @@
+import os
+import shutil
+import sys
+import tempfile
+import unittest
+from unittest import mock
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import issue_query as iq  # noqa: E402
+
+
+class ForwardToDaemonTest(unittest.TestCase):
+  def setUp(self):
+    self.tmp = tempfile.mkdtemp(prefix="issue-query-daemon-")
+    self.socket_path = os.path.join(self.tmp, "daemon.sock")
+    open(self.socket_path, "w").close()
+    env = {"ISSUE_ANALYZOR_DAEMON_SOCKET": self.socket_path}
+    patcher = mock.patch.dict(os.environ, env)
+    patcher.start()
+    self.addCleanup(patcher.stop)
+    os.environ.pop("ISSUE_ANALYZOR_NO_DAEMON", None)
+
+  def tearDown(self):
+    shutil.rmtree(self.tmp, ignore_errors=True)
+
+  def test_long_running_commands_stay_local(self):
+    # 这些命令不连 socket，直接返回 None 由本进程执行
+    with mock.patch.object(iq.socket, "socket", side_effect=AssertionError("should not connect")):
+      for argv in (["sync", "--project_id", "1"], ["export", "--latest"], ["diff", "--project_key", "M60"], ["sweep"], ["prewarm"], ["issues", "--project_id", "1", "--all"]):
+        with self.subTest(argv=argv):
+          self.assertIsNone(iq.forward_to_daemon(argv))
+
+  def test_short_queries_are_forwarded(self):
+    with mock.patch.object(iq.socket, "socket", side_effect=AssertionError("connect")):
+      with self.assertRaises(AssertionError):
+        iq.forward_to_daemon(["stats", "--project_id", "1", "--all-snapshots"])
+
+
+class DaemonSessionTest(unittest.TestCase):
+  def test_session_key_does_not_hold_password(self):
+    daemon = iq.IssueQueryDaemon(os.path.join(tempfile.gettempdir(), "unused.sock"))
+    argv = ["projects", "--base", "http://127.0.0.1:9", "--username", "u", "--password", "s3cret-pw", "--no_token_cache", "--no-cache"]
+    first = daemon.session_for(daemon.parser.parse_args(argv))
+    self.assertIs(daemon.session_for(daemon.parser.parse_args(argv)), first)
+    self.assertNotIn("s3cret-pw", repr(list(daemon._sessions)))
+    other = daemon.session_for(daemon.parser.parse_args(argv[:-3] + ["other-pw", "--no_token_cache", "--no-cache"]))
+    self.assertIsNot(other, first)
+
+
+if __name__ == "__main__":
+  unittest.main()
@@ -0,0 +1,104 @@
+import contextlib
+import io
+import json
+import os
+import shutil
+import sys
+import tempfile
+import time
+import unittest
+from unittest import mock
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import issue_client as ic  # noqa: E402
+import issue_query as iq  # noqa: E402
+
+
+class _DownloadSession:
+  def __init__(self):
+    self.downloads = []
+
+  def download(self, path, params, dest):
+    self.downloads.append(path)
+    body = f"{path} #{len(self.downloads)}".encode("utf-8")
+    with open(dest, "wb") as f:
+      f.write(body)
+    return len(body)
+
+
+class _ExportClient:
+  def __init__(self, project):
+    self.project = project
+    self.session = _DownloadSession()
+
+  def select_project(self, **kwargs):
+    return self.project
+
+  def iter_exports(self, jobs, workers=None):
+    return ic.iter_exports(self.session, jobs, workers=workers)
+
+
+class ExportUpToDateTest(unittest.TestCase):
+  def setUp(self):
+    self.tmp = tempfile.mkdtemp(prefix="issue-query-export-")
+
+  def tearDown(self):
+    shutil.rmtree(self.tmp, ignore_errors=True)
+
+  def _run(self, client, *argv):
+    args = iq.build_parser().parse_args(["export", "--project_id", "7", "--out_dir", self.tmp, "--format", "json", *argv])
+    stdout = io.StringIO()
+    with mock.patch.object(iq, "_open_client", return_value=client), contextlib.redirect_stdout(stdout), contextlib.redirect_stderr(io.StringIO()):
+      args.func(args)
+    return [r["status"] for r in json.loads(stdout.getvalue())["rows"]]
+
+  def test_skips_current_file_and_overwrites_on_new_snapshot(self):
+    project = {"id": 7, "project_key": "M60", "phase": "DVT", "upload_time": "2026-01-01 10:00:00"}
+    client = _ExportClient(project)
+    self.assertEqual(self._run(client), ["downloaded"])
+    self.assertEqual(self._run(client), ["skipped"])
+    self.assertEqual(len(client.session.downloads), 1)
+
+    # 同一 project_key/phase 上传了新快照：同名文件被覆盖，mtime 换成新的 upload_time
+    client.project = {**project, "id": 8, "upload_time": "2026-01-02 10:00:00"}
+    self.assertEqual(self._run(client), ["downloaded"])
+    path = os.path.join(self.tmp, "M60_DVT_excel.xlsx")
+    with open(path, encoding="utf-8") as f:
+      self.assertEqual(f.read(), "/api/projects/8/export/excel #2")
+    self.assertEqual(int(os.stat(path).st_mtime), ic._export_version(client.project))
+
+  def test_version_does_not_depend_on_local_timezone(self):
+    project = {"upload_time": "2026-01-01 08:00:00"}
+    versions = []
+    for tz in ("UTC", "America/New_York", "Asia/Shanghai"):
+      with mock.patch.dict(os.environ, {"TZ": tz}):
+        time.tzset()
+        versions.append(ic._export_version(project))
+    time.tzset()
+    # 北京时间 08:00 即 UTC 00:00
+    self.assertEqual(versions, [1767225600] * 3)
+    self.assertEqual(ic._export_version({"upload_time": "2026-01-01T00:00:00Z"}), 1767225600)
+
+
+class PlanExportsTest(unittest.TestCase):
+  def test_repeated_labels_get_project_id_suffix(self):
+    projects = [
+      {"id": 1, "project_key": "M60", "phase": "DVT", "upload_time": "2026-01-01 10:00:00"},
+      {"id": 2, "project_key": "M60", "phase": "DVT", "upload_time": "2026-01-02 10:00:00"},
+      {"id": 3, "project_key": "M60", "phase": "EVT", "upload_time": "2026-01-03 10:00:00"},
+    ]
+    jobs = ic.plan_exports(projects, ["excel", "cross"], pairs=[("wf", "config")], out_dir="out")
+    self.assertEqual([os.path.basename(j["path"]) for j in jobs], [
+      "M60_DVT_p1_excel.xlsx",
+      "M60_DVT_p1_cross_wfxconfig.xlsx",
+      "M60_DVT_p2_excel.xlsx",
+      "M60_DVT_p2_cross_wfxconfig.xlsx",
+      "M60_EVT_excel.xlsx",
+      "M60_EVT_cross_wfxconfig.xlsx",
+    ])
+    self.assertEqual(jobs[1]["params"], {"dimension1": "wf", "dimension2": "config"})
+
+
+if __name__ == "__main__":
+  unittest.main()
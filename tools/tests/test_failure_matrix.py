@@ -0,0 +1,73 @@
+import os
+import sys
+import unittest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import issue_client as ic  # noqa: E402
+import issue_local as il  # noqa: E402
+import issue_query as iq  # noqa: E402
+
+
+def _matrix(configs):
+  return {"matrix": {"1-0": {"testName": "Alpha", "configs": configs}}}
+
+
+class MatrixCellsTest(unittest.TestCase):
+  def test_spec_and_strife_in_same_cell(self):
+    # 文本只显示 Spec（1F/10T），Strife 数只在数值字段里
+    data = _matrix({
+      "R1CASN": {"text": "1F/10T", "type": "spec", "specCount": 1, "strifeCount": 2, "samples": 10},
+      "R2CBCN": {"text": "1SF/5T", "type": "strife", "specCount": 0, "strifeCount": 1, "samples": 5},
+      "R4FNSN": None,
+    })
+    self.assertEqual(ic.matrix_cells(data), [
+      {"wf": "1", "testName": "Alpha", "config": "R1CASN", "specFail": 1, "strifeFail": 2, "samples": 10},
+      {"wf": "1", "testName": "Alpha", "config": "R2CBCN", "specFail": 0, "strifeFail": 1, "samples": 5},
+    ])
+
+    matrix = ic.FailureMatrix.from_cells(ic.matrix_cells(data))
+    self.assertEqual(matrix.rollup([]), [
+      {"specFail": 1, "strifeFail": 3, "samples": 15, "specFailureRate": 66667, "strifeFailureRate": 200000},
+    ])
+    self.assertEqual(matrix.pivot("test", "config", metric="strifeFailureRate")[1], [
+      {"testName": "Alpha", "R1CASN": 200000, "R2CBCN": 200000},
+    ])
+
+  def test_text_fallback_for_old_servers(self):
+    data = _matrix({
+      "R1CASN": {"text": "3F/10T", "type": "spec"},
+      "R2CBCN": {"text": "2SF/5T", "type": "strife"},
+      "R3CBCN": {"text": "N/A"},
+    })
+    self.assertEqual([(c["specFail"], c["strifeFail"], c["samples"]) for c in ic.matrix_cells(data)], [(3, 0, 10), (0, 2, 5)])
+
+  def test_local_matrix_emits_counts(self):
+    sample_sizes = [{"waterfall": "1", "tests": [{"testId": "T1", "testName": "Alpha"}], "config_samples": {"R1CASN": 10}}]
+    issues = [
+      {"fa_number": "FA-1", "sn": "SN-1", "wf": "1", "config": "R1CASN", "failed_test": "Alpha", "failure_type": "Spec."},
+      {"fa_number": "FA-2", "sn": "SN-2", "wf": "1", "config": "R1CASN", "failed_test": "Alpha", "failure_type": "Strife"},
+    ]
+    data = il.calculate_failure_rate_matrix(issues, sample_sizes)
+    self.assertEqual(data["matrix"]["1-0"]["configs"]["R1CASN"], {"text": "1F/10T", "type": "spec", "specCount": 1, "strifeCount": 1, "samples": 10})
+    self.assertEqual(ic.matrix_cells(data)[0]["strifeFail"], 1)
+
+
+class SnapshotCompareTest(unittest.TestCase):
+  def test_strife_deltas_for_cells_with_spec_failures(self):
+    # failure-matrix --all-snapshots：两个快照的同一单元格都有 Spec 失败，Strife 数与 Δ 仍然正确
+    old = _matrix({"R1CASN": {"text": "1F/10T", "type": "spec", "specCount": 1, "strifeCount": 2, "samples": 10}})
+    new = _matrix({"R1CASN": {"text": "2F/12T", "type": "spec", "specCount": 2, "strifeCount": 5, "samples": 12}})
+    rows, columns = iq.merge_snapshot_rows(
+      ["EVT", "DVT"], [ic.matrix_cells(old), ic.matrix_cells(new)], ["wf", "testName", "config"], iq.MATRIX_METRICS
+    )
+    self.assertIn("DVT.ΔstrifeFail", columns)
+    self.assertEqual(len(rows), 1)
+    self.assertEqual(rows[0]["EVT.strifeFail"], 2)
+    self.assertEqual(rows[0]["DVT.strifeFail"], 5)
+    self.assertEqual(rows[0]["DVT.ΔstrifeFail"], 3)
+    self.assertEqual(rows[0]["DVT.ΔspecFail"], 1)
+
+
+if __name__ == "__main__":
+  unittest.main()
@@ -0,0 +1,73 @@
+import json
+import os
+import random
+import sys
+import unittest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import issue_transport as it  # noqa: E402
+
+DOCUMENTS = [
+  {"success": True, "data": {"total": 3, "issues": [12345678901234, 0.5, "end"]}},
+  {"success": True, "data": {"ppm": 1.5e-7, "issues": [-0.25, 1e21, 6.02E+23, -3e-5, 0, -0, 10.0, 123.456e2], "avg": -12.75}},
+  {"data": {"issues": [{"id": 1, "rate": 0.000125, "nested": [1.0, 2e3]}, {"id": 2, "rate": -7.5e-3}], "scale": 1E2}, "ratio": 99.99},
+  {"meta": {"threshold": 3.14159, "limits": [1e-9, 2.5]}, "data": {"issues": []}, "elapsed": 0.001},
+]
+PATH = ("data", "issues")
+
+
+def _chunkings(raw, seed, count=200):
+  rng = random.Random(seed)
+  for _ in range(count):
+    chunks = []
+    pos = 0
+    while pos < len(raw):
+      size = rng.randint(1, 7)
+      chunks.append(raw[pos:pos + size])
+      pos += size
+    yield chunks
+
+
+def _expected_meta(doc, prefix=()):
+  # path 之外的叶子字段（与 _walk_json 的 store 规则一致：path 上的对象逐层展开，其它值整体存储）
+  meta = {}
+  for key, value in doc.items():
+    child = prefix + (key,)
+    if child == PATH[:len(child)]:
+      if len(child) == len(PATH):
+        meta[child] = it.STREAMED_ARRAY
+      else:
+        meta.update(_expected_meta(value, child))
+    else:
+      meta[child] = value
+  return meta
+
+
+class IterJsonItemsChunkingTest(unittest.TestCase):
+  def test_numbers_split_at_any_chunk_boundary(self):
+    for index, doc in enumerate(DOCUMENTS):
+      for separators in ((",", ":"), (", ", ": ")):
+        raw = json.dumps(doc, separators=separators).encode("utf-8")
+        for chunks in _chunkings(raw, seed=index):
+          meta = {}
+          items = list(it.iter_json_items(chunks, PATH, meta))
+          self.assertEqual(items, doc["data"]["issues"], raw)
+          self.assertEqual(meta, _expected_meta(doc), raw)
+
+  def test_streamed_object_values(self):
+    doc = {"data": {"issues": {"a": 0.5, "b": -1e-3, "c": 7E+2}}, "scale": 2.5e1}
+    raw = json.dumps(doc).encode("utf-8")
+    for chunks in _chunkings(raw, seed=99):
+      meta = {}
+      self.assertEqual(list(it.iter_json_items(chunks, PATH, meta)), list(doc["data"]["issues"].items()))
+      self.assertEqual(meta[("scale",)], 25.0)
+
+  def test_truncated_stream_still_fails(self):
+    raw = b'{"data": {"issues": [1.5, 2e'
+    with self.assertRaises(ValueError):
+      list(it.iter_json_items([raw[i:i + 3] for i in range(0, len(raw), 3)], PATH))
+
+
+if __name__ == "__main__":
+  unittest.main()
@@ -0,0 +1,50 @@
+import json
+import os
+import shutil
+import sys
+import tempfile
+import unittest
+
+TOOLS_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, TOOLS_DIR)
+
+import issue_client as ic  # noqa: E402
+import issue_local as il  # noqa: E402
+import issue_query as iq  # noqa: E402
+
+# expected 由服务端 analysisModel 计算（backend/test/analysisParity.test.js 校验同一份 fixture）
+FIXTURE_PATH = os.path.join(os.path.dirname(TOOLS_DIR), "backend", "test", "fixtures", "analysisParity.json")
+
+
+class LocalParityTest(unittest.TestCase):
+  """本地镜像（sync / --local）与服务端的一致性：固定快照上逐项比对，数值 1 与 1.0 视为相等（同 verify-local）。"""
+
+  @classmethod
+  def setUpClass(cls):
+    with open(FIXTURE_PATH, "r", encoding="utf-8") as f:
+      cls.fixture = json.load(f)
+    cls.tmp = tempfile.mkdtemp(prefix="issue-query-parity-")
+    db_path = os.path.join(cls.tmp, "mirror.sqlite3")
+    mirror = il.LocalMirror(db_path, create=True)
+    try:
+      mirror.store_project(cls.fixture["project"], cls.fixture["issues"], cls.fixture["sampleSizes"])
+    finally:
+      mirror.close()
+    cls.client = ic.IssueAnalyzorClient.local(db_path)
+
+  @classmethod
+  def tearDownClass(cls):
+    cls.client.close()
+    shutil.rmtree(cls.tmp, ignore_errors=True)
+
+  def test_checks_match_server_results(self):
+    pid = self.fixture["project"]["id"]
+    self.assertTrue(self.fixture["checks"])
+    for check in self.fixture["checks"]:
+      with self.subTest(check["label"]):
+        actual = json.loads(json.dumps(self.client.get(f"/api/projects/{pid}/{check['endpoint']}", params=check["params"])))
+        self.assertIsNone(iq._first_difference(check["expected"], actual))
+
+
+if __name__ == "__main__":
+  unittest.main()
@@ -0,0 +1,71 @@
+import contextlib
+import io
+import json
+import os
+import sys
+import unittest
+from unittest import mock
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import issue_query as iq  # noqa: E402
+import issue_transport as it  # noqa: E402
+
+STATS = {"queries": 3, "computed": 3, "cacheHits": 0, "errors": 0, "durationMs": 5}
+
+
+class _PrewarmClient:
+  def __init__(self, power_user=True):
+    self.power_user = power_user
+    self.calls = []
+
+  def select_project(self, **kwargs):
+    return {"id": 7, "name": "M60 DVT", "project_key": "M60"}
+
+  def prewarm(self, project_id, concurrency=None, max_filters=None):
+    self.calls.append(("prewarm", project_id, concurrency, max_filters))
+    if not self.power_user:
+      raise it.HttpError(403, "Forbidden", {"error": {"code": "FORBIDDEN"}})
+    return {"items": [{"name": "(all)", "filters": {}, **STATS}, {"name": "shared", "filters": {"wfs": "1"}, **STATS}]}
+
+  def prewarm_filter_sets(self, project, max_filters=None):
+    self.calls.append(("prewarm_filter_sets", project["id"], max_filters))
+    return [{"name": "(all)", "filters": {}}]
+
+  def iter_prewarm(self, project_id, filter_sets, workers=None):
+    self.calls.append(("iter_prewarm", project_id, workers))
+    for item in filter_sets:
+      yield item, STATS, 0.01, None
+
+
+class PrewarmCommandTest(unittest.TestCase):
+  def _run(self, client, *argv):
+    args = iq.build_parser().parse_args(["prewarm", "--project_id", "7", "--format", "json", "--workers", "2", "--max_filters", "5", *argv])
+    stdout, stderr = io.StringIO(), io.StringIO()
+    with mock.patch.object(iq, "_open_client", return_value=client), contextlib.redirect_stdout(stdout), contextlib.redirect_stderr(stderr):
+      args.func(args)
+    return json.loads(stdout.getvalue()), stderr.getvalue()
+
+  def test_defaults_to_server_prewarm(self):
+    client = _PrewarmClient()
+    payload, _ = self._run(client)
+    self.assertEqual(client.calls, [("prewarm", 7, 2, 5)])
+    self.assertTrue(payload["server"])
+    self.assertEqual([r["name"] for r in payload["rows"]], ["(all)", "shared"])
+
+  def test_forbidden_falls_back_to_own_filters(self):
+    client = _PrewarmClient(power_user=False)
+    payload, stderr = self._run(client)
+    self.assertEqual([c[0] for c in client.calls], ["prewarm", "prewarm_filter_sets", "iter_prewarm"])
+    self.assertFalse(payload["server"])
+    self.assertIn("power user", stderr)
+
+  def test_client_flag_skips_server_request(self):
+    client = _PrewarmClient()
+    payload, _ = self._run(client, "--client")
+    self.assertEqual([c[0] for c in client.calls], ["prewarm_filter_sets", "iter_prewarm"])
+    self.assertFalse(payload["server"])
+
+
+if __name__ == "__main__":
+  unittest.main()
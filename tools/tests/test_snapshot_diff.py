@@ -0,0 +1,94 @@
+import io
+import json
+import os
+import sys
+import unittest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import issue_query as iq  # noqa: E402
+
+
+def _issue(fa, wf="1", config="C1", symptom="Rattle", fa_status="open", root_cause=""):
+  return {"fa_number": fa, "wf": wf, "config": config, "symptom": symptom, "fa_status": fa_status, "root_cause": root_cause}
+
+
+def _run(old, new, compare=("fa_status", "root_cause"), dimensions=("symptom",)):
+  differ = iq.SnapshotDiff(["fa_number"], compare, dimensions)
+  differ.load_old(iter(old))
+  records = list(differ.probe_new(iter(new))) + list(differ.removed())
+  return differ, records
+
+
+class SnapshotDiffTest(unittest.TestCase):
+  def test_added_removed_changed(self):
+    old = [_issue("FA-1"), _issue("FA-2"), _issue("FA-3", root_cause="ESD")]
+    new = [_issue("FA-1"), _issue("FA-3", fa_status="close", root_cause="ESD"), _issue("FA-4", symptom="Noise")]
+    differ, records = _run(old, new)
+    self.assertEqual([(r["change"], r["fa_number"]) for r in records], [("changed", "FA-3"), ("added", "FA-4"), ("removed", "FA-2")])
+    self.assertEqual(records[0]["changes"], "fa_status: open -> close")
+    self.assertEqual(records[0]["fa_status"], "close")
+    self.assertEqual(records[2]["fa_status"], "open")
+    self.assertEqual(
+      {k: differ.stats[k] for k in ("old", "new", "added", "removed", "changed", "unchanged", "duplicate_keys")},
+      {"old": 3, "new": 3, "added": 1, "removed": 1, "changed": 1, "unchanged": 1, "duplicate_keys": 0},
+    )
+
+  def test_duplicate_keys_pair_in_order(self):
+    # FA# 为空的三行：按出现顺序与新快照的两行配对，多出的一行记为 removed
+    old = [_issue("", fa_status="open"), _issue("", fa_status="close"), _issue("", fa_status="hold")]
+    new = [_issue("", fa_status="open"), _issue("", fa_status="open")]
+    differ, records = _run(old, new)
+    self.assertEqual(differ.stats["duplicate_keys"], 2)
+    self.assertEqual([(r["change"], r["fa_status"]) for r in records], [("changed", "open"), ("removed", "hold")])
+    self.assertEqual(records[0]["changes"], "fa_status: close -> open")
+
+  def test_take_collapses_list_slot(self):
+    differ = iq.SnapshotDiff(["fa_number"], [], [])
+    differ.load_old(iter([_issue("A", wf="1"), _issue("A", wf="2")]))
+    self.assertIsInstance(differ.index[("A",)], list)
+    self.assertEqual(differ._take(("A",))[0], "1")
+    self.assertEqual(differ.index[("A",)][0], "2")
+    self.assertEqual(differ._take(("A",))[0], "2")
+    self.assertIsNone(differ._take(("A",)))
+
+  def test_deltas(self):
+    old = [_issue("1", symptom="Rattle"), _issue("2", symptom="Rattle"), _issue("3", symptom="Noise")]
+    new = [_issue("1", symptom="Rattle"), _issue("4", symptom="Noise"), _issue("5", symptom="Noise"), _issue("6", symptom="Noise"), _issue("7", symptom="Scratch")]
+    differ, _ = _run(old, new)
+    self.assertEqual(differ.deltas(), [
+      {"dimension": "symptom", "value": "Noise", "old": 1, "new": 3, "delta": 2},
+      {"dimension": "symptom", "value": "Rattle", "old": 2, "new": 1, "delta": -1},
+      {"dimension": "symptom", "value": "Scratch", "old": 0, "new": 1, "delta": 1},
+    ])
+    differ, _ = _run(old[:1], new[:1])
+    self.assertEqual(differ.deltas(), [])
+    self.assertEqual(differ.deltas(include_zero=True), [{"dimension": "symptom", "value": "Rattle", "old": 1, "new": 1, "delta": 0}])
+
+
+class JsonRowsWriterTailTest(unittest.TestCase):
+  def test_matches_write_json(self):
+    saved = iq.JSON_INDENT
+    try:
+      for indent in (2, 0):
+        for rows in ([], [{"a": 1}, {"a": [2, 3]}]):
+          with self.subTest(indent=indent, rows=rows):
+            iq.JSON_INDENT = indent
+            tail_calls = []
+
+            def tail():
+              tail_calls.append(True)
+              return {"stats": {"n": len(rows)}, "deltas": []}
+
+            streamed, expected = io.StringIO(), io.StringIO()
+            iq.JsonRowsWriter(streamed, payload={"from": {"id": 1}}, key="records", tail=tail).write_all(iter(rows))
+            iq.write_json(expected, {"from": {"id": 1}, "records": rows, "stats": {"n": len(rows)}, "deltas": []})
+            self.assertEqual(streamed.getvalue(), expected.getvalue())
+            self.assertEqual(len(tail_calls), 1)
+            json.loads(streamed.getvalue())
+    finally:
+      iq.JSON_INDENT = saved
+
+
+if __name__ == "__main__":
+  unittest.main()
@@ -0,0 +1,61 @@
+import contextlib
+import io
+import os
+import sys
+import unittest
+from unittest import mock
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import issue_query as iq  # noqa: E402
+
+
+class _CompactClient:
+  def __init__(self):
+    self.params = []
+
+  def select_project(self, **kwargs):
+    return {"id": 7, "name": "M60 P1"}
+
+  def iter_fr_compact(self, project_id, group_by, params, page_size=None, key_name="key"):
+    self.params.append(params)
+    yield {key_name: "C1", "failures": 2, "totalSamples": 100, "ppm": 20000.0}
+
+
+class StatsCompactOrderTest(unittest.TestCase):
+  def _run(self, *argv):
+    args = iq.build_parser().parse_args(["stats", "--project_id", "7", "--kind", "config", "--compact", "--format", "csv", *argv])
+    client = _CompactClient()
+    with mock.patch.object(iq, "_open_client", return_value=client), contextlib.redirect_stdout(io.StringIO()):
+      args.func(args)
+    return client
+
+  def test_supported_orders_map_to_server_sort(self):
+    for argv, sort in (
+      ((), "ppm"),
+      (("--order_by", "ppm"), "ppm"),
+      (("--order_by", "specSNCount"), "failures"),
+      (("--order_by", "totalCount", "--order_dir", "desc"), "failures"),
+      (("--order_by", "config"), "key"),
+      (("--order_by", "key", "--order_dir", "asc"), "key"),
+    ):
+      with self.subTest(argv=argv):
+        self.assertEqual(self._run(*argv).params[0]["sortBy"], sort)
+
+  def test_unsupported_orders_are_rejected(self):
+    for argv in (
+      ("--order_by", "strifeSNCount"),
+      ("--order_by", "specFailureRate"),
+      ("--order_dir", "asc"),
+      ("--order_by", "failures", "--order_dir", "asc"),
+      ("--order_by", "key", "--order_dir", "desc"),
+    ):
+      with self.subTest(argv=argv):
+        with mock.patch.object(_CompactClient, "iter_fr_compact") as fetch:
+          with self.assertRaises(RuntimeError):
+            self._run(*argv)
+          fetch.assert_not_called()
+
+
+if __name__ == "__main__":
+  unittest.main()